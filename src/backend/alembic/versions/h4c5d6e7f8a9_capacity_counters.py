@@ -0,0 +1,44 @@
+"""Add capacity_counters table for O(1) atomic seat claims.
+
+Counters are seeded lazily by app.services.capacity_service the first time
+an event or sub-event is claimed against, so no backfill is needed here.
+
+Revision ID: h4c5d6e7f8a9
+Revises: g3b4c5d6e7f8
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "h4c5d6e7f8a9"
+down_revision = "g3b4c5d6e7f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "capacity_counters",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("event_id", sa.Uuid(), sa.ForeignKey("events.id"), nullable=False),
+        sa.Column("sub_event_id", sa.Uuid(), sa.ForeignKey("sub_events.id"), nullable=True, unique=True),
+        sa.Column("capacity", sa.Integer(), nullable=True),
+        sa.Column("taken", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_capacity_counters_event_id", "capacity_counters", ["event_id"])
+    op.create_index(
+        "uq_capacity_counters_event",
+        "capacity_counters",
+        ["event_id"],
+        unique=True,
+        postgresql_where=sa.text("sub_event_id IS NULL"),
+        sqlite_where=sa.text("sub_event_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_capacity_counters_event", table_name="capacity_counters")
+    op.drop_index("ix_capacity_counters_event_id", table_name="capacity_counters")
+    op.drop_table("capacity_counters")
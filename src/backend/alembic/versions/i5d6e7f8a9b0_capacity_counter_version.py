@@ -0,0 +1,25 @@
+"""Add capacity_counters.version, used as the public info ETag's capacity component.
+
+Revision ID: i5d6e7f8a9b0
+Revises: h4c5d6e7f8a9
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "i5d6e7f8a9b0"
+down_revision = "h4c5d6e7f8a9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "capacity_counters",
+        sa.Column("version", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("capacity_counters", "version")
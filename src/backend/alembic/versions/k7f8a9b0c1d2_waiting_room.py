@@ -0,0 +1,29 @@
+"""Add waiting-room admission control: events.admission_rate_per_second + admission_gates.
+
+Revision ID: k7f8a9b0c1d2
+Revises: j6e7f8a9b0c1
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "k7f8a9b0c1d2"
+down_revision = "j6e7f8a9b0c1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("admission_rate_per_second", sa.Integer(), nullable=True))
+    op.create_table(
+        "admission_gates",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("event_id", sa.Uuid(), sa.ForeignKey("events.id"), nullable=False, unique=True),
+        sa.Column("next_slot", sa.Double(), server_default=sa.text("0"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("admission_gates")
+    op.drop_column("events", "admission_rate_per_second")
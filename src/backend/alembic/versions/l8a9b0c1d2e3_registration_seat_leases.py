@@ -0,0 +1,30 @@
+"""Add registrations.lease_expires_at for time-boxed pending_payment seat leases.
+
+Existing pending_payment rows keep a NULL lease and are left to the Stripe
+checkout.session.expired webhook, as before.
+
+Revision ID: l8a9b0c1d2e3
+Revises: k7f8a9b0c1d2
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "l8a9b0c1d2e3"
+down_revision = "k7f8a9b0c1d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "registrations",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_registrations_lease_expires_at", "registrations", ["lease_expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_registrations_lease_expires_at", table_name="registrations")
+    op.drop_column("registrations", "lease_expires_at")
@@ -0,0 +1,45 @@
+"""Make attendee email unique case-insensitively (unique index on lower(email)).
+
+Registration paths upsert attendees with INSERT ... ON CONFLICT (lower(email)),
+which needs this index as the conflict arbiter. The old case-sensitive unique
+index is dropped. Upgrade refuses to run while case-variant duplicates exist;
+merge those rows first.
+
+Revision ID: m9b0c1d2e3f4
+Revises: l8a9b0c1d2e3
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "m9b0c1d2e3f4"
+down_revision = "l8a9b0c1d2e3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(
+        sa.text(
+            "SELECT lower(email) FROM attendees GROUP BY lower(email) HAVING count(*) > 1"
+        )
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Attendees with case-variant duplicate emails must be merged first: "
+            + ", ".join(duplicates)
+        )
+
+    op.drop_index("ix_attendees_email", table_name="attendees")
+    op.create_index(
+        "uq_attendees_email_lower",
+        "attendees",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_attendees_email_lower", table_name="attendees")
+    op.create_index("ix_attendees_email", "attendees", ["email"], unique=True)
@@ -0,0 +1,42 @@
+"""Add processing-queue columns to webhooks_raw.
+
+Stripe webhooks are acknowledged as soon as the raw event is stored; a worker
+pool claims rows with processed_at IS NULL and retries failures with backoff.
+
+Revision ID: n0c1d2e3f4a5
+Revises: m9b0c1d2e3f4
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "n0c1d2e3f4a5"
+down_revision = "m9b0c1d2e3f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhooks_raw",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "webhooks_raw",
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column("webhooks_raw", sa.Column("last_error", sa.Text(), nullable=True))
+    op.create_index(
+        "ix_webhooks_raw_pending",
+        "webhooks_raw",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhooks_raw_pending", table_name="webhooks_raw")
+    op.drop_column("webhooks_raw", "last_error")
+    op.drop_column("webhooks_raw", "next_attempt_at")
+    op.drop_column("webhooks_raw", "attempts")
@@ -0,0 +1,43 @@
+"""Unique index on webhooks_raw.twilio_sid for insert-on-conflict dedupe.
+
+Inbound Twilio webhooks are claimed with INSERT ... ON CONFLICT (twilio_sid)
+DO NOTHING. Redelivered duplicates that slipped past the old SELECT-then-
+INSERT check are removed first (the earliest row for each SID is kept).
+stripe_event_id already has a unique index.
+
+Revision ID: o1d2e3f4a5b6
+Revises: n0c1d2e3f4a5
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "o1d2e3f4a5b6"
+down_revision = "n0c1d2e3f4a5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM webhooks_raw
+            WHERE twilio_sid IS NOT NULL
+              AND EXISTS (
+                SELECT 1 FROM webhooks_raw AS earlier
+                WHERE earlier.twilio_sid = webhooks_raw.twilio_sid
+                  AND (
+                    earlier.created_at < webhooks_raw.created_at
+                    OR (earlier.created_at = webhooks_raw.created_at AND earlier.id < webhooks_raw.id)
+                  )
+              )
+            """
+        )
+    )
+    op.create_index("ix_webhooks_raw_twilio_sid", "webhooks_raw", ["twilio_sid"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhooks_raw_twilio_sid", table_name="webhooks_raw")
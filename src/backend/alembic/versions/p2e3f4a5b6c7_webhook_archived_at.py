@@ -0,0 +1,28 @@
+"""Add webhooks_raw.archived_at for payload retention.
+
+Processed rows past the retention window have their payload moved to
+compressed NDJSON archive files; the row itself (and its dedupe ids) stays.
+
+Revision ID: p2e3f4a5b6c7
+Revises: o1d2e3f4a5b6
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "p2e3f4a5b6c7"
+down_revision = "o1d2e3f4a5b6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhooks_raw",
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhooks_raw", "archived_at")
@@ -0,0 +1,27 @@
+"""Add stripe_product_id to events and sub_events.
+
+Fixed-price events and sub-events are mirrored as Stripe Products/Prices
+(services/stripe_catalog.py) so Checkout can send price references.
+
+Revision ID: q3f4a5b6c7d8
+Revises: p2e3f4a5b6c7
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "q3f4a5b6c7d8"
+down_revision = "p2e3f4a5b6c7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("stripe_product_id", sa.String(100), nullable=True))
+    op.add_column("sub_events", sa.Column("stripe_product_id", sa.String(100), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("sub_events", "stripe_product_id")
+    op.drop_column("events", "stripe_product_id")
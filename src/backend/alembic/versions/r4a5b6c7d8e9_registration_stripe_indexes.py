@@ -0,0 +1,34 @@
+"""Index registrations by Stripe checkout session and payment intent.
+
+Reconciliation (services/stripe_reconciliation.py) and the charge.refunded
+webhook look registrations up by these columns.
+
+Revision ID: r4a5b6c7d8e9
+Revises: q3f4a5b6c7d8
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "r4a5b6c7d8e9"
+down_revision = "q3f4a5b6c7d8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_registrations_stripe_checkout_session_id",
+        "registrations",
+        ["stripe_checkout_session_id"],
+    )
+    op.create_index(
+        "ix_registrations_stripe_payment_intent_id",
+        "registrations",
+        ["stripe_payment_intent_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_registrations_stripe_payment_intent_id", table_name="registrations")
+    op.drop_index("ix_registrations_stripe_checkout_session_id", table_name="registrations")
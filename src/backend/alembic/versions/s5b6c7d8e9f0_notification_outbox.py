@@ -0,0 +1,46 @@
+"""Add notification_outbox: notifications written with the change that triggers them.
+
+Revision ID: s5b6c7d8e9f0
+Revises: r4a5b6c7d8e9
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "s5b6c7d8e9f0"
+down_revision = "r4a5b6c7d8e9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("kind", sa.String(50), nullable=False),
+        sa.Column("registration_id", sa.Uuid(), sa.ForeignKey("registrations.id"), nullable=True),
+        sa.Column("payload", postgresql.JSONB(), nullable=True),
+        sa.Column("dedupe_key", sa.String(255), nullable=True, unique=True),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_notification_outbox_registration_id", "notification_outbox", ["registration_id"]
+    )
+    op.create_index(
+        "ix_notification_outbox_pending",
+        "notification_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_outbox_pending", table_name="notification_outbox")
+    op.drop_index("ix_notification_outbox_registration_id", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
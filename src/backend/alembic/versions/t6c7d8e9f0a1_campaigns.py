@@ -0,0 +1,69 @@
+"""Add campaigns and campaign_recipients: background bulk messages with per-recipient progress.
+
+Revision ID: t6c7d8e9f0a1
+Revises: s5b6c7d8e9f0
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "t6c7d8e9f0a1"
+down_revision = "s5b6c7d8e9f0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "campaigns",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("event_id", sa.Uuid(), sa.ForeignKey("events.id"), nullable=False),
+        sa.Column("channel", sa.String(10), nullable=False),
+        sa.Column("template_id", sa.Uuid(), sa.ForeignKey("message_templates.id"), nullable=True),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("subject", sa.Text(), nullable=True),
+        sa.Column("idempotency_key", sa.String(255), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("pending", "running", "completed", "cancelled", name="campaignstatus", native_enum=False),
+            nullable=False,
+        ),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("sent_count", sa.Integer(), nullable=False),
+        sa.Column("failed_count", sa.Integer(), nullable=False),
+        sa.Column("skipped_count", sa.Integer(), nullable=False),
+        sa.Column("created_by", sa.Uuid(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("event_id", "idempotency_key", name="uq_campaign_idempotency_key"),
+    )
+    op.create_index("ix_campaigns_event_id", "campaigns", ["event_id"])
+
+    op.create_table(
+        "campaign_recipients",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("campaign_id", sa.Uuid(), sa.ForeignKey("campaigns.id"), nullable=False),
+        sa.Column("registration_id", sa.Uuid(), sa.ForeignKey("registrations.id"), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("pending", "sent", "failed", "skipped", name="campaignrecipientstatus", native_enum=False),
+            nullable=False,
+        ),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("campaign_id", "registration_id", name="uq_campaign_recipient"),
+    )
+    op.create_index(
+        "ix_campaign_recipients_campaign_status",
+        "campaign_recipients",
+        ["campaign_id", "status", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_campaign_recipients_campaign_status", table_name="campaign_recipients")
+    op.drop_table("campaign_recipients")
+    op.drop_index("ix_campaigns_event_id", table_name="campaigns")
+    op.drop_table("campaigns")
@@ -0,0 +1,38 @@
+"""Limit the one-registration-per-attendee rule to seat-holding statuses.
+
+uq_attendee_event covered every status, so an attendee whose pending
+lease was swept (or who cancelled) could never register for the event
+again. The partial index keeps expired / cancelled / refunded rows as
+history and only forbids a second seat-holding registration.
+
+Revision ID: u7d8e9f0a1b2
+Revises: t6c7d8e9f0a1
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "u7d8e9f0a1b2"
+down_revision = "t6c7d8e9f0a1"
+branch_labels = None
+depends_on = None
+
+_SEAT_HOLDING = "status IN ('pending_payment', 'cash_pending', 'complete')"
+
+
+def upgrade() -> None:
+    op.drop_constraint("uq_attendee_event", "registrations", type_="unique")
+    op.create_index(
+        "uq_attendee_event_active",
+        "registrations",
+        ["attendee_id", "event_id"],
+        unique=True,
+        postgresql_where=sa.text(_SEAT_HOLDING),
+        sqlite_where=sa.text(_SEAT_HOLDING),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_attendee_event_active", table_name="registrations")
+    op.create_unique_constraint("uq_attendee_event", "registrations", ["attendee_id", "event_id"])
@@ -0,0 +1,22 @@
+"""Add campaigns.lease_token so only the worker holding a campaign's lease checkpoints it.
+
+Revision ID: v8e9f0a1b2c3
+Revises: u7d8e9f0a1b2
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "v8e9f0a1b2c3"
+down_revision = "u7d8e9f0a1b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("campaigns", sa.Column("lease_token", sa.Uuid(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("campaigns", "lease_token")
@@ -0,0 +1,30 @@
+"""Add admission_ticket_uses so each waiting-room ticket admits a single registration.
+
+Revision ID: w9f0a1b2c3d4
+Revises: v8e9f0a1b2c3
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "w9f0a1b2c3d4"
+down_revision = "v8e9f0a1b2c3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "admission_ticket_uses",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("jti", sa.String(36), nullable=False, unique=True),
+        sa.Column("event_id", sa.Uuid(), sa.ForeignKey("events.id"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_admission_ticket_uses_expires_at", "admission_ticket_uses", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_admission_ticket_uses_expires_at", table_name="admission_ticket_uses")
+    op.drop_table("admission_ticket_uses")
@@ -9,15 +9,62 @@ class Settings(BaseSettings):
     stripe_secret_key: str = ""
     stripe_publishable_key: str = ""
     stripe_webhook_secret: str = ""
+    stripe_timeout_seconds: float = 10.0
+    stripe_max_concurrency: int = 8
+    # Stripe webhook processing queue (webhooks_raw rows worked off by a pool)
+    stripe_webhook_workers: int = 4
+    stripe_webhook_poll_seconds: float = 2.0
+    stripe_webhook_max_attempts: int = 8
+    stripe_webhook_retry_base_seconds: int = 10
+    stripe_webhook_claim_timeout_seconds: int = 300
+    # Daily reconciliation re-checks Checkout Sessions / Charges created this far back
+    stripe_reconcile_lookback_hours: int = 72
+
+    # webhooks_raw retention: processed payloads older than this move to gzip NDJSON archives.
+    # Off unless webhook_archive_dir is set; it must be durable storage (a mounted volume),
+    # since archived payloads are cleared from the database.
+    webhook_retention_days: int = 90
+    webhook_archive_dir: str = ""
+
+    # Provider circuit breakers (Stripe, Resend, Twilio): open after this many
+    # consecutive failures or slow calls, fail fast, then probe after reset_seconds
+    circuit_failure_threshold: int = 5
+    circuit_slow_call_seconds: float = 5.0
+    circuit_reset_seconds: float = 30.0
 
     # Twilio
     twilio_account_sid: str = ""
     twilio_auth_token: str = ""
     twilio_phone_number: str = ""
+    twilio_timeout_seconds: float = 10.0
+    # Threads for the (synchronous) Twilio SDK; caps concurrent Twilio requests per process
+    twilio_max_concurrency: int = 8
 
     # Resend
     resend_api_key: str = ""
     from_email: str = "onboarding@resend.dev"
+    resend_timeout_seconds: float = 10.0
+    # Threads for the (synchronous) Resend SDK; caps concurrent Resend requests per process
+    resend_max_concurrency: int = 8
+
+    # Notification outbox (confirmation / admin emails written with the state change,
+    # sent by the dispatcher in batches of batch_size, concurrency sends at a time).
+    # Sends beyond resend_max_concurrency only queue for a Resend thread.
+    notification_outbox_batch_size: int = 50
+    notification_outbox_concurrency: int = 8
+    notification_outbox_poll_seconds: float = 2.0
+    notification_outbox_max_attempts: int = 8
+    notification_outbox_retry_base_seconds: int = 30
+    notification_outbox_claim_timeout_seconds: int = 300
+    # Provider calls in flight at once for an admin SMS blast / bulk message
+    # (at most twilio_max_concurrency / resend_max_concurrency actually run)
+    bulk_notification_concurrency: int = 8
+    # Campaigns (background bulk messages): recipients per checkpointed chunk, how long a
+    # worker's claim on a running campaign lasts, and how often the progress stream polls
+    campaign_chunk_size: int = 100
+    campaign_poll_seconds: float = 2.0
+    campaign_lease_seconds: int = 300
+    campaign_progress_poll_seconds: float = 1.0
 
     # JWT
     jwt_secret_key: str = "change-me-in-production"
@@ -27,6 +74,37 @@ class Settings(BaseSettings):
     # Magic Links
     magic_link_expiration_hours: int = 72
 
+    # Public page caching (ETag revalidation + CDN)
+    public_cache_max_age_seconds: int = 15
+    public_cache_stale_while_revalidate_seconds: int = 60
+
+    # In-process event catalog (public slug lookups); bounds cross-worker staleness
+    event_catalog_ttl_seconds: int = 30
+
+    # Idempotency-Key replay window for public registration POSTs
+    idempotency_key_ttl_minutes: int = 60
+
+    # Waiting room: how long an admitted queue ticket stays usable
+    admission_ticket_window_minutes: int = 20
+
+    # How long a pending_payment registration holds its seat
+    seat_lease_minutes: int = 30
+
+    # Provider simulators (app/simulators) for offline development and load
+    # tests: a comma-separated subset of "stripe,twilio,resend", or "all".
+    # Latency is log-normal (median / p99); each call may instead get a 429
+    # or a 500. simulator_overrides tunes one provider, e.g.
+    # {"twilio": {"error_rate": 0.2, "latency_ms": 300}}. Refused in production.
+    provider_simulators: str = ""
+    simulator_latency_ms: float = 80.0
+    simulator_latency_p99_ms: float = 400.0
+    simulator_error_rate: float = 0.0
+    simulator_rate_limit_rate: float = 0.0
+    simulator_seed: int | None = None
+    simulator_overrides: dict[str, dict] = {}
+    # Where simulated Stripe webhooks are posted (default: this app's endpoint)
+    simulator_webhook_url: str = ""
+
     # Application
     app_env: str = "development"
     app_url: str = "http://localhost:8000"
@@ -21,3 +21,16 @@ async def init_db():
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+def dialect_insert(db: AsyncSession, model):
+    """Return an INSERT construct that supports ON CONFLICT for the session's dialect.
+
+    Postgres (prod) and SQLite (tests, local dev) both implement
+    ``on_conflict_do_nothing`` / ``on_conflict_do_update`` with the same API.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
@@ -0,0 +1,135 @@
+"""Conditional GET and CDN cache headers for public, read-mostly endpoints.
+
+Handlers compute a strong ETag from the data that shapes their payload
+(event.updated_at, the capacity counter version, ...) and call
+`conditional()`, which sets ETag / Last-Modified / Cache-Control and
+remembers the validator in a small in-process map. A repeat request whose
+If-None-Match matches a remembered validator is answered with 304 by
+`not_modified()` before the handler touches the database.
+
+Writes that change a payload call `invalidate_event()`. Remembered
+validators also expire after `public_cache_max_age_seconds`, which bounds
+staleness for writes made by other worker processes.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from uuid import UUID
+
+from fastapi import Request, Response
+
+from app.config import settings
+
+# Guard against unbounded growth (e.g. many distinct `count` values)
+_MAX_ENTRIES = 5000
+
+# cache key -> (etag, last_modified header or None, expires at [monotonic])
+_validators: dict[str, tuple[str, str | None, float]] = {}
+# event id -> cache keys whose payload depends on that event
+_keys_by_event: dict[str, set[str]] = {}
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the values that determine a payload."""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _cache_control() -> str:
+    # Browsers always revalidate (cheap 304); shared caches/CDN may serve
+    # for s-maxage and keep serving stale while they revalidate.
+    return (
+        f"public, max-age=0, s-maxage={settings.public_cache_max_age_seconds}, "
+        f"stale-while-revalidate={settings.public_cache_stale_while_revalidate_seconds}"
+    )
+
+
+def _http_date(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _apply_headers(response: Response, etag: str, last_modified: str | None) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _cache_control()
+    if last_modified:
+        response.headers["Last-Modified"] = last_modified
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match uses weak comparison
+        if candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _not_modified_response(etag: str, last_modified: str | None) -> Response:
+    response = Response(status_code=304)
+    _apply_headers(response, etag, last_modified)
+    return response
+
+
+def not_modified(request: Request, key: str) -> Response | None:
+    """Return a 304 if the client's If-None-Match matches a live remembered validator."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    entry = _validators.get(key)
+    if entry is None:
+        return None
+    etag, last_modified, expires_at = entry
+    if expires_at < time.monotonic():
+        _validators.pop(key, None)
+        return None
+    if _matches(header, etag):
+        return _not_modified_response(etag, last_modified)
+    return None
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    key: str,
+    event_id: UUID,
+    etag: str,
+    last_modified: datetime | None = None,
+) -> Response | None:
+    """Remember the validator, set caching headers and return a 304 if it matches.
+
+    Returns None when the caller should send its full payload.
+    """
+    last_modified_header = _http_date(last_modified)
+    if len(_validators) >= _MAX_ENTRIES:
+        clear()
+    _validators[key] = (
+        etag,
+        last_modified_header,
+        time.monotonic() + settings.public_cache_max_age_seconds,
+    )
+    _keys_by_event.setdefault(str(event_id), set()).add(key)
+
+    if _matches(request.headers.get("if-none-match"), etag):
+        return _not_modified_response(etag, last_modified_header)
+    _apply_headers(response, etag, last_modified_header)
+    return None
+
+
+def invalidate_event(event_id: UUID) -> None:
+    """Forget validators for every cached payload derived from the event."""
+    for key in _keys_by_event.pop(str(event_id), ()):
+        _validators.pop(key, None)
+
+
+def clear() -> None:
+    _validators.clear()
+    _keys_by_event.clear()
@@ -20,6 +20,12 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Startup: initialize database tables + scheduler. Shutdown: cleanup."""
     from app.tasks.scheduler import start_scheduler, stop_scheduler
+    from app.tasks.campaign_worker import start_campaign_worker, stop_campaign_worker
+    from app.tasks.notification_dispatcher import (
+        start_notification_dispatcher,
+        stop_notification_dispatcher,
+    )
+    from app.tasks.webhook_worker import start_webhook_workers, stop_webhook_workers
 
     logger.info("Starting JLF ERP backend...")
     await init_db()
@@ -29,11 +35,20 @@ async def lifespan(app: FastAPI):
         logger.info("Background scheduler started.")
     except Exception:
         logger.exception("Failed to start background scheduler — app will run without scheduled tasks")
+    start_webhook_workers()
+    start_notification_dispatcher()
+    start_campaign_worker()
     yield
+    await stop_campaign_worker()
+    await stop_notification_dispatcher()
+    await stop_webhook_workers()
     try:
         stop_scheduler()
     except Exception:
         logger.exception("Error stopping scheduler")
+    from app.services import stripe_service
+
+    stripe_service.shutdown()
     logger.info("Shutting down JLF ERP backend.")
 
 
@@ -63,6 +78,7 @@ def create_app() -> FastAPI:
         admin_import,
         auth,
         bootstrap,
+        campaigns,
         co_creators,
         dashboard,
         events,
@@ -89,6 +105,7 @@ def create_app() -> FastAPI:
     app.include_router(dashboard.router, prefix="/api/v1")
     app.include_router(portal.router, prefix="/api/v1")
     app.include_router(notifications.router, prefix="/api/v1")
+    app.include_router(campaigns.router, prefix="/api/v1")
     app.include_router(co_creators.router, prefix="/api/v1")
     app.include_router(users.router, prefix="/api/v1")
     app.include_router(form_templates.router, prefix="/api/v1")
@@ -100,6 +117,14 @@ def create_app() -> FastAPI:
     app.include_router(sms_conversations.router, prefix="/api/v1")
     app.include_router(admin_import.router, prefix="/api/v1")
 
+    # Local provider simulators (offline development / load tests only)
+    if settings.provider_simulators:
+        from app import simulators
+        from app.routers import simulators as simulator_routes
+
+        simulators.install()
+        app.include_router(simulator_routes.router, prefix="/api/v1")
+
     # Health check
     @app.get("/health")
     async def health_check():
@@ -107,12 +132,13 @@ def create_app() -> FastAPI:
 
     @app.get("/health/deep")
     async def deep_health_check():
-        """Check database connectivity. Returns sanitized status only."""
+        """Check database connectivity and provider circuit breakers. Returns sanitized status only."""
         from sqlalchemy import text
 
         from app.database import async_session
+        from app.services import circuit_breaker
 
-        checks = {"service": "jlf-erp", "database": "unknown"}
+        checks = {"service": "jlf-erp", "database": "unknown", "providers": circuit_breaker.states()}
         try:
             async with async_session() as session:
                 result = await session.execute(text("SELECT 1"))
@@ -124,7 +150,9 @@ def create_app() -> FastAPI:
             checks["database"] = "unavailable"
             return JSONResponse(status_code=503, content=checks)
 
-        checks["status"] = "healthy"
+        # An open provider circuit degrades the app but does not make it unhealthy
+        degraded = any(p["state"] != "closed" for p in checks["providers"].values())
+        checks["status"] = "degraded" if degraded else "healthy"
         return checks
 
     # Request logging middleware
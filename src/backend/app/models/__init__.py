@@ -12,6 +12,8 @@ from app.models.sub_event import SubEvent, SubEventPricingModel
 from app.models.registration_sub_event import RegistrationSubEvent
 from app.models.co_creator import CoCreator, EventCoCreator
 from app.models.notification import NotificationChannel, NotificationLog, NotificationStatus
+from app.models.notification_outbox import NotificationOutbox
+from app.models.campaign import Campaign, CampaignRecipient, CampaignRecipientStatus, CampaignStatus
 from app.models.webhook import WebhookRaw
 from app.models.audit import AuditLog
 from app.models.user import User, UserRole
@@ -21,6 +23,9 @@ from app.models.membership import Membership
 from app.models.scholarship_link import ScholarshipLink
 from app.models.message_template import MessageTemplate, TemplateCategory, TemplateChannel
 from app.models.sms_conversation import SmsConversation, SmsDirection
+from app.models.capacity_counter import CapacityCounter
+from app.models.idempotency_key import IdempotencyKey
+from app.models.admission_gate import AdmissionGate, AdmissionTicketUse
 
 __all__ = [
     "Base",
@@ -41,6 +46,11 @@ __all__ = [
     "NotificationLog",
     "NotificationChannel",
     "NotificationStatus",
+    "NotificationOutbox",
+    "Campaign",
+    "CampaignStatus",
+    "CampaignRecipient",
+    "CampaignRecipientStatus",
     "WebhookRaw",
     "AuditLog",
     "User",
@@ -55,4 +65,8 @@ __all__ = [
     "TemplateChannel",
     "SmsConversation",
     "SmsDirection",
+    "CapacityCounter",
+    "IdempotencyKey",
+    "AdmissionGate",
+    "AdmissionTicketUse",
 ]
@@ -0,0 +1,37 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Double, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, gen_uuid
+
+
+class AdmissionGate(Base):
+    """Waiting-room pacing state for an event with admission control enabled.
+
+    next_slot is the epoch time (seconds) of the next unassigned admission
+    slot; each queue ticket advances it by 1 / admission_rate_per_second.
+    """
+
+    __tablename__ = "admission_gates"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=gen_uuid)
+    event_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("events.id"), unique=True)
+    next_slot: Mapped[float] = mapped_column(Double, default=0.0)
+
+
+class AdmissionTicketUse(Base):
+    """A waiting-room ticket that has been spent on a registration.
+
+    Recorded in the registration's transaction, so an attempt that fails
+    leaves the ticket usable. Rows are purged once expires_at (the ticket's
+    own expiry) passes — an expired ticket is rejected anyway.
+    """
+
+    __tablename__ = "admission_ticket_uses"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=gen_uuid)
+    jti: Mapped[str] = mapped_column(String(36), unique=True)
+    event_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("events.id"))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, ForeignKey, String, Text
+from sqlalchemy import Boolean, ForeignKey, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, gen_uuid
@@ -10,7 +10,8 @@ class Attendee(TimestampMixin, Base):
     __tablename__ = "attendees"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=gen_uuid)
-    email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    # Unique case-insensitively via uq_attendees_email_lower (below)
+    email: Mapped[str] = mapped_column(String(255))
     first_name: Mapped[str] = mapped_column(String(100))
     last_name: Mapped[str] = mapped_column(String(100))
     phone: Mapped[str | None] = mapped_column(String(20), nullable=True)
@@ -29,3 +30,6 @@ class Attendee(TimestampMixin, Base):
     membership = relationship(
         "Membership", foreign_keys=[membership_id], lazy="selectin"
     )
+
+
+Index("uq_attendees_email_lower", func.lower(Attendee.email), unique=True)
@@ -0,0 +1,90 @@
+import enum
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, gen_uuid
+
+
+class CampaignStatus(str, enum.Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    cancelled = "cancelled"
+
+
+class CampaignRecipientStatus(str, enum.Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+    skipped = "skipped"
+
+
+class Campaign(Base):
+    """A bulk message sent in the background, one CampaignRecipient per attendee.
+
+    The worker (services/campaign_service.py) sends pending recipients in
+    chunks; each chunk's results and counters commit together, so a crashed
+    or cancelled campaign resumes from the last committed chunk.
+    """
+
+    __tablename__ = "campaigns"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=gen_uuid)
+    event_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("events.id"), index=True)
+    channel: Mapped[str] = mapped_column(String(10))
+    template_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("message_templates.id"), nullable=True
+    )
+    # Snapshot of the text at creation, so template edits do not change a running send
+    body: Mapped[str] = mapped_column(Text)
+    subject: Mapped[str | None] = mapped_column(Text, nullable=True)
+    idempotency_key: Mapped[str] = mapped_column(String(255))
+    status: Mapped[CampaignStatus] = mapped_column(
+        Enum(CampaignStatus, native_enum=False), default=CampaignStatus.pending
+    )
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    sent_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    skipped_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_by: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    # A running campaign whose lease lapsed was abandoned by its worker
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Set by each claim; a worker only checkpoints while the token is still its own
+    lease_token: Mapped[uuid.UUID | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # One campaign per bulk message: a repeated POST returns the existing one
+        UniqueConstraint("event_id", "idempotency_key", name="uq_campaign_idempotency_key"),
+    )
+
+    @property
+    def remaining(self) -> int:
+        return max(self.total - self.sent_count - self.failed_count - self.skipped_count, 0)
+
+
+class CampaignRecipient(Base):
+    __tablename__ = "campaign_recipients"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=gen_uuid)
+    campaign_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("campaigns.id"))
+    registration_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("registrations.id"))
+    status: Mapped[CampaignRecipientStatus] = mapped_column(
+        Enum(CampaignRecipientStatus, native_enum=False), default=CampaignRecipientStatus.pending
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("campaign_id", "registration_id", name="uq_campaign_recipient"),
+        # The worker pages through a campaign's pending recipients in id order
+        Index("ix_campaign_recipients_campaign_status", "campaign_id", "status", "id"),
+    )
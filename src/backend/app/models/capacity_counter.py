@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, gen_uuid
+
+
+class CapacityCounter(Base):
+    """Running seat count for an event (sub_event_id NULL) or one of its sub-events.
+
+    `taken` mirrors the number of registrations in a seat-holding status.
+    Claims go through a single conditional UPDATE in capacity_service, so the
+    check stays O(1) regardless of how many registrations the event has.
+    """
+
+    __tablename__ = "capacity_counters"
+    __table_args__ = (
+        # One event-level row per event (sub_event_id IS NULL rows are not
+        # covered by the sub_event_id unique constraint).
+        Index(
+            "uq_capacity_counters_event",
+            "event_id",
+            unique=True,
+            postgresql_where=text("sub_event_id IS NULL"),
+            sqlite_where=text("sub_event_id IS NULL"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=gen_uuid)
+    event_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("events.id"), index=True)
+    sub_event_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("sub_events.id"), unique=True, nullable=True
+    )
+    capacity: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    taken: Mapped[int] = mapped_column(Integer, default=0)
+    # Bumped on every change; feeds the public info endpoint's ETag
+    version: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
@@ -40,6 +40,7 @@ class Event(TimestampMixin, Base):
     fixed_price_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
     min_donation_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
     stripe_price_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    stripe_product_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
     capacity: Mapped[int | None] = mapped_column(Integer, nullable=True)
     meeting_point_a: Mapped[str | None] = mapped_column(Text, nullable=True)
     meeting_point_b: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -57,6 +58,9 @@ class Event(TimestampMixin, Base):
     is_recurring: Mapped[bool] = mapped_column(Boolean, default=False)
     recurrence_rule: Mapped[str | None] = mapped_column(String(255), nullable=True)
     virtual_meeting_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Waiting room: when set, registrations need a queue ticket and are
+    # admitted at this many per second (see admission_service)
+    admission_rate_per_second: Mapped[int | None] = mapped_column(Integer, nullable=True)
     status: Mapped[EventStatus] = mapped_column(
         Enum(EventStatus, native_enum=False), default=EventStatus.draft
     )
@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import JSONType, Base, gen_uuid
+
+
+class IdempotencyKey(Base):
+    """Client-supplied Idempotency-Key and the response it produced.
+
+    A row with response_status NULL is still in flight. Rows are purged once
+    expires_at passes (see app.tasks.idempotency).
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=gen_uuid)
+    key: Mapped[str] = mapped_column(String(255), unique=True)
+    # sha256 of method + path + body, so a reused key with a different request is rejected
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    response_status: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[dict | None] = mapped_column(JSONType, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
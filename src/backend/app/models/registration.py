@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import JSONType, Base, TimestampMixin, gen_uuid
@@ -42,7 +42,17 @@ class RegistrationSource(str, enum.Enum):
 class Registration(TimestampMixin, Base):
     __tablename__ = "registrations"
     __table_args__ = (
-        UniqueConstraint("attendee_id", "event_id", name="uq_attendee_event"),
+        # One seat-holding registration per attendee and event. Expired,
+        # cancelled and refunded rows stay as history, so the attendee can
+        # register again once a lease is swept or a seat is given up.
+        Index(
+            "uq_attendee_event_active",
+            "attendee_id",
+            "event_id",
+            unique=True,
+            postgresql_where=text("status IN ('pending_payment', 'cash_pending', 'complete')"),
+            sqlite_where=text("status IN ('pending_payment', 'cash_pending', 'complete')"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=gen_uuid)
@@ -60,10 +70,10 @@ class Registration(TimestampMixin, Base):
     )
     payment_amount_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
     stripe_checkout_session_id: Mapped[str | None] = mapped_column(
-        String(255), nullable=True
+        String(255), nullable=True, index=True
     )
     stripe_payment_intent_id: Mapped[str | None] = mapped_column(
-        String(255), nullable=True
+        String(255), nullable=True, index=True
     )
     group_id: Mapped[uuid.UUID | None] = mapped_column(nullable=True, index=True)
     accommodation_type: Mapped[AccommodationType | None] = mapped_column(
@@ -87,6 +97,11 @@ class Registration(TimestampMixin, Base):
     )
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     member_discount_applied: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Seat lease for pending_payment: the seat is released by the lease
+    # sweeper once this passes (only meaningful while pending_payment)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True
+    )
 
     attendee = relationship("Attendee", back_populates="registrations", lazy="selectin")
     event = relationship("Event", back_populates="registrations", lazy="selectin")
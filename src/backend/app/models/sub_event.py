@@ -29,6 +29,7 @@ class SubEvent(TimestampMixin, Base):
     fixed_price_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
     min_donation_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
     stripe_price_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    stripe_product_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
     capacity: Mapped[int | None] = mapped_column(Integer, nullable=True)
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
     is_required: Mapped[bool] = mapped_column(Boolean, default=False)
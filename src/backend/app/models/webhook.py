@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import JSONType, Base, gen_uuid
@@ -15,12 +15,34 @@ class WebhookRaw(Base):
         String(255), unique=True, index=True, nullable=True
     )
     source: Mapped[str | None] = mapped_column(String(20), nullable=True)
-    twilio_sid: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    twilio_sid: Mapped[str | None] = mapped_column(
+        String(255), unique=True, index=True, nullable=True
+    )
     event_type: Mapped[str] = mapped_column(String(100))
     payload_json: Mapped[dict | None] = mapped_column(JSONType, nullable=True)
     processed_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Processing queue state (Stripe events are handled by the webhook workers)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Set when payload_json has been moved to the archive (services/webhook_archive.py)
+    archived_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+
+    __table_args__ = (
+        # Only unprocessed rows are ever scanned by the workers
+        Index(
+            "ix_webhooks_raw_pending",
+            "next_attempt_at",
+            postgresql_where=processed_at.is_(None),
+            sqlite_where=processed_at.is_(None),
+        ),
+    )
@@ -0,0 +1,123 @@
+"""Campaigns router — queue a bulk message for background sending and follow its progress."""
+
+import asyncio
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.models.campaign import Campaign, CampaignStatus
+from app.models.user import User
+from app.schemas.campaigns import CampaignResponse
+from app.schemas.sms_conversations import BulkNotificationRequest
+from app.services import campaign_service
+from app.services.auth_service import get_current_operator
+
+router = APIRouter(tags=["campaigns"])
+
+# Comment line sent on a quiet stream so proxies keep the connection open
+_HEARTBEAT_SECONDS = 15.0
+
+
+async def _get_campaign(db: AsyncSession, campaign_id: UUID) -> Campaign:
+    campaign = await db.get(Campaign, campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+
+@router.post(
+    "/events/{event_id}/campaigns",
+    response_model=CampaignResponse,
+    status_code=202,
+)
+async def create_campaign(
+    event_id: UUID,
+    data: BulkNotificationRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_operator),
+):
+    """Queue a personalized message to all COMPLETE + CASH_PENDING attendees.
+
+    Returns at once with the campaign id; the same message (idempotency key)
+    returns the campaign already queued for it.
+    """
+    campaign = await campaign_service.create(db, event_id, data, user)
+    return CampaignResponse.model_validate(campaign)
+
+
+@router.get("/campaigns/{campaign_id}", response_model=CampaignResponse)
+async def get_campaign(
+    campaign_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_operator),
+):
+    return CampaignResponse.model_validate(await _get_campaign(db, campaign_id))
+
+
+@router.get("/campaigns/{campaign_id}/events")
+async def stream_campaign_progress(
+    campaign_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_operator),
+):
+    """Server-sent events: a ``progress`` event whenever the counts change.
+
+    The stream ends after the campaign completes or is cancelled.
+    """
+    await _get_campaign(db, campaign_id)
+
+    async def _events():
+        last = None
+        quiet = 0.0
+        while True:
+            campaign = await db.get(Campaign, campaign_id, populate_existing=True)
+            # End the read so the connection goes back to the pool between polls
+            await db.commit()
+            payload = CampaignResponse.model_validate(campaign).model_dump_json()
+            if payload != last:
+                yield f"event: progress\ndata: {payload}\n\n"
+                last = payload
+                quiet = 0.0
+            elif quiet >= _HEARTBEAT_SECONDS:
+                yield ": keepalive\n\n"
+                quiet = 0.0
+            if campaign.status in (CampaignStatus.completed, CampaignStatus.cancelled):
+                return
+            await asyncio.sleep(settings.campaign_progress_poll_seconds)
+            quiet += settings.campaign_progress_poll_seconds
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/campaigns/{campaign_id}/cancel", response_model=CampaignResponse)
+async def cancel_campaign(
+    campaign_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_operator),
+):
+    """Stop sending after the chunk in flight. Recipients already reached stay recorded."""
+    campaign = await _get_campaign(db, campaign_id)
+    campaign_service.cancel(campaign)
+    await db.commit()
+    return CampaignResponse.model_validate(campaign)
+
+
+@router.post("/campaigns/{campaign_id}/resume", response_model=CampaignResponse, status_code=202)
+async def resume_campaign(
+    campaign_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_operator),
+):
+    """Queue a cancelled campaign again; only recipients not yet reached are sent to."""
+    campaign = await _get_campaign(db, campaign_id)
+    campaign_service.resume(db, campaign)
+    await db.commit()
+    return CampaignResponse.model_validate(campaign)
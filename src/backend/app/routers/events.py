@@ -11,6 +11,7 @@ from ..database import get_db
 from ..models import AuditLog, Event, EventStatus, Registration, RegistrationStatus
 from ..schemas.events import EventCreate, EventResponse, EventStats, EventUpdate, SubEventBrief
 from ..schemas.common import PaginatedResponse, PaginationMeta
+from ..services import capacity_service, event_catalog, stripe_catalog
 from ..services.auth_service import get_current_user
 from ..models import User
 
@@ -153,6 +154,7 @@ def _event_to_response(event: Event, stats: EventStats | None = None) -> EventRe
         notification_templates=event.notification_templates,
         is_recurring=event.is_recurring,
         recurrence_rule=event.recurrence_rule,
+        admission_rate_per_second=event.admission_rate_per_second,
         sub_events=sub_events,
         status=event.status.value if hasattr(event.status, "value") else event.status,
         created_at=event.created_at,
@@ -223,6 +225,8 @@ async def create_event(
 
     event = Event(**body.model_dump())
     db.add(event)
+    await db.flush()
+    await stripe_catalog.sync_event(event)
 
     await _audit_log(
         db,
@@ -234,6 +238,7 @@ async def create_event(
     )
 
     await db.commit()
+    event_catalog.invalidate(event.id)
     await db.refresh(event)
     return _event_to_response(event)
 
@@ -292,6 +297,10 @@ async def update_event(
 
     for field, value in update_data.items():
         setattr(event, field, value)
+    await stripe_catalog.sync_event(event, changed=update_data)
+
+    if "capacity" in update_data:
+        await capacity_service.set_capacity(db, event.id, update_data["capacity"])
 
     await _audit_log(
         db,
@@ -304,6 +313,7 @@ async def update_event(
     )
 
     await db.commit()
+    event_catalog.invalidate(event.id)
     await db.refresh(event)
 
     stats = await _compute_event_stats(db, event)
@@ -336,6 +346,7 @@ async def delete_event(
     )
 
     await db.commit()
+    event_catalog.invalidate(event.id)
     return {"detail": "Event cancelled", "id": event_id}
 
 
@@ -381,6 +392,7 @@ async def duplicate_event(
             max_member_discount_slots=source_event.max_member_discount_slots,
             is_recurring=source_event.is_recurring,
             recurrence_rule=source_event.recurrence_rule,
+            admission_rate_per_second=source_event.admission_rate_per_second,
         )
         db.add(candidate)
         try:
@@ -394,6 +406,7 @@ async def duplicate_event(
 
     if new_event is None:
         raise HTTPException(status_code=409, detail="Could not generate a unique slug for the duplicated event.")
+    await stripe_catalog.sync_event(new_event)
 
     await _audit_log(
         db,
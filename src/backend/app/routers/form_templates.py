@@ -18,6 +18,7 @@ from ..schemas.form_templates import (
     FormTemplateResponse,
     FormTemplateUpdate,
 )
+from ..services import event_catalog
 from ..services.auth_service import get_current_user
 from ..models import User
 
@@ -373,6 +374,7 @@ async def attach_form_to_event(
     db.add(link)
     await db.commit()
     await db.refresh(link)
+    event_catalog.invalidate(link.event_id)
 
     return EventFormLinkResponse(
         id=link.id,
@@ -404,4 +406,5 @@ async def detach_form_from_event(
 
     await db.delete(link)
     await db.commit()
+    event_catalog.invalidate(link.event_id)
     return {"detail": "Form template detached", "link_id": link_id}
@@ -5,26 +5,25 @@ import logging
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.event import Event
-from app.models.message_template import MessageTemplate
 from app.models.notification import (
     NotificationChannel,
     NotificationLog,
     NotificationStatus,
 )
 from app.models.registration import Registration, RegistrationStatus
-from app.models.sms_conversation import SmsConversation, SmsDirection
+from app.models.sms_conversation import SmsConversation
 from app.models.user import User
 from app.schemas.notification import NotificationLogEntry, SMSRequest, SMSResponse
 from app.schemas.sms_conversations import BulkNotificationRequest, BulkNotificationResponse
+from app.services import bulk_messaging
 from app.services.auth_service import get_current_operator
-from app.services.email_service import send_branded_email
+from app.services.email_service import send_batch
 from app.services.sms_service import send_sms
-from app.utils import render_template_text
 
 logger = logging.getLogger(__name__)
 
@@ -48,40 +47,28 @@ async def send_event_sms(
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Get all COMPLETE registrations with attendee phone numbers
-    result = await db.execute(
-        select(Registration).where(
-            Registration.event_id == event_id,
-            Registration.status == RegistrationStatus.complete,
-        )
-    )
-    registrations = result.scalars().all()
-
-    sent_count = 0
-    failed_count = 0
+    registrations = await bulk_messaging.load_recipients(db, event_id, [RegistrationStatus.complete])
+    recipients = [reg for reg in registrations if reg.attendee and reg.attendee.phone]
     content_hash = hashlib.sha256(data.message.encode()).hexdigest()[:64]
 
-    for reg in registrations:
-        attendee = reg.attendee
-        if not attendee or not attendee.phone:
-            failed_count += 1
-            continue
-
-        success = await send_sms(attendee.phone, data.message)
-
-        log_entry = NotificationLog(
-            registration_id=reg.id,
-            channel=NotificationChannel.sms,
-            template_id="day_of_sms",
-            content_hash=content_hash,
-            status=NotificationStatus.sent if success else NotificationStatus.failed,
-        )
-        db.add(log_entry)
-
-        if success:
-            sent_count += 1
-        else:
-            failed_count += 1
+    # Release the connection while the provider is called
+    await db.commit()
+    results = await bulk_messaging.send_all(recipients, lambda reg: send_sms(reg.attendee.phone, data.message))
+
+    if recipients:
+        await db.execute(insert(NotificationLog), [
+            {
+                "registration_id": reg.id,
+                "channel": NotificationChannel.sms,
+                "template_id": "day_of_sms",
+                "content_hash": content_hash,
+                "status": NotificationStatus.sent if success else NotificationStatus.failed,
+            }
+            for reg, success in zip(recipients, results)
+        ])
+
+    sent_count = sum(results)
+    failed_count = len(registrations) - sent_count
 
     logger.info(
         "SMS blast for event %s: %d sent, %d failed",
@@ -132,29 +119,6 @@ async def get_notification_log(
     ]
 
 
-def _build_attendee_variables(registration: Registration, event: Event) -> dict[str, str]:
-    """Build template variable dict for an attendee/registration."""
-    from app.config import settings
-
-    attendee = registration.attendee
-    event_date_str = event.event_date.strftime("%B %d, %Y") if event.event_date else ""
-    event_time_str = event.event_date.strftime("%I:%M %p") if event.event_date else ""
-    meeting_point = event.meeting_point_a or "See event details for directions"
-    cancel_url = f"{settings.app_url}/register/{event.slug}/cancel?reg={registration.id}"
-
-    return {
-        "first_name": attendee.first_name if attendee else "",
-        "last_name": attendee.last_name if attendee else "",
-        "email": attendee.email if attendee else "",
-        "phone": attendee.phone or "" if attendee else "",
-        "event_name": event.name,
-        "event_date": event_date_str,
-        "event_time": event_time_str,
-        "meeting_point": meeting_point,
-        "cancel_url": cancel_url,
-    }
-
-
 @router.post(
     "/events/{event_id}/notifications/bulk",
     response_model=BulkNotificationResponse,
@@ -165,128 +129,58 @@ async def send_bulk_notification(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_operator),
 ):
-    """Send personalized message to all COMPLETE + CASH_PENDING attendees."""
-    # Verify event exists
-    event_result = await db.execute(select(Event).where(Event.id == event_id))
-    event = event_result.scalar_one_or_none()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-
-    # Validate channel
-    if data.channel not in ("sms", "email", "both"):
-        raise HTTPException(status_code=422, detail="Channel must be sms, email, or both")
-
-    # Get template if provided
-    template = None
-    if data.template_id:
-        tmpl_result = await db.execute(
-            select(MessageTemplate).where(MessageTemplate.id == data.template_id)
-        )
-        template = tmpl_result.scalar_one_or_none()
-        if not template:
-            raise HTTPException(status_code=404, detail="Template not found")
+    """Send personalized message to all COMPLETE + CASH_PENDING attendees.
 
-    if not template and not data.custom_message:
-        raise HTTPException(status_code=422, detail="Either template_id or custom_message is required")
+    Sends inline; large audiences should use a campaign (routers/campaigns.py).
+    """
+    bulk = await bulk_messaging.resolve_request(db, event_id, data)
+    registrations = await bulk_messaging.load_recipients(db, event_id, bulk_messaging.RECIPIENT_STATUSES)
 
-    # Generate idempotency key from request data if not provided
-    if data.idempotency_key:
-        idempotency_key = data.idempotency_key
-    else:
-        key_source = f"{event_id}:{data.channel}:{data.template_id or ''}:{data.custom_message or ''}"
-        idempotency_key = hashlib.sha256(key_source.encode()).hexdigest()[:32]
+    # Idempotency: registrations that already received this bulk send, in one query
+    already_sent = await bulk_messaging.already_sent(db, bulk.template_key, [reg.id for reg in registrations])
 
-    # Get registrations
-    result = await db.execute(
-        select(Registration).where(
-            Registration.event_id == event_id,
-            Registration.status.in_([
-                RegistrationStatus.complete,
-                RegistrationStatus.cash_pending,
-            ]),
-        )
-    )
-    registrations = result.scalars().all()
-
-    sent_count = 0
+    recipients = []
     failed_count = 0
     skipped = 0
-
     for reg in registrations:
-        attendee = reg.attendee
-        if not attendee:
+        if not reg.attendee:
             failed_count += 1
             continue
-
-        # Build variables
-        variables = _build_attendee_variables(reg, event)
-
-        # Render message
-        if template:
-            body_text = render_template_text(template.body, variables)
-            subject_text = render_template_text(template.subject, variables) if template.subject else None
-        else:
-            body_text = render_template_text(data.custom_message, variables)
-            subject_text = render_template_text(data.subject, variables) if data.subject else f"Message from Just Love Forest"
-
-        content_hash = hashlib.sha256(body_text.encode()).hexdigest()[:64]
-
-        # Idempotency: check if this registration already received this bulk send
-        bulk_template_key = f"bulk:{idempotency_key}"
-        existing_log = await db.execute(
-            select(NotificationLog).where(
-                NotificationLog.registration_id == reg.id,
-                NotificationLog.template_id == bulk_template_key,
-            )
-        )
-        if existing_log.first():
+        if reg.id in already_sent:
             skipped += 1
             continue
-        success = False
+        recipients.append(reg)
 
-        # Send SMS
-        if data.channel in ("sms", "both") and attendee.phone:
-            sms_success = await send_sms(attendee.phone, body_text)
-            db.add(NotificationLog(
-                registration_id=reg.id,
-                channel=NotificationChannel.sms,
-                template_id=bulk_template_key,
-                content_hash=content_hash,
-                status=NotificationStatus.sent if sms_success else NotificationStatus.failed,
-            ))
-            # Store in sms_conversations
-            db.add(SmsConversation(
-                registration_id=reg.id,
-                attendee_phone=attendee.phone,
-                direction=SmsDirection.outbound,
-                body=body_text,
-                sent_by=user.id,
-            ))
-            if sms_success:
-                success = True
+    # Render every message up front
+    messages = bulk_messaging.render_messages(recipients, bulk.event, bulk.channel, *bulk.compiled)
 
-        # Send email
-        if data.channel in ("email", "both") and attendee.email:
-            email_success = await send_branded_email(
-                to=attendee.email,
-                subject=subject_text,
-                body_text=body_text,
-            )
-            db.add(NotificationLog(
-                registration_id=reg.id,
-                channel=NotificationChannel.email,
-                template_id=bulk_template_key,
-                content_hash=content_hash,
-                status=NotificationStatus.sent if email_success else NotificationStatus.failed,
-            ))
-            if email_success:
-                success = True
+    # Release the connection while providers are called
+    await db.commit()
+    results = await bulk_messaging.deliver(
+        messages,
+        [f"{bulk.template_key}/{message.registration_id}" for message in messages],
+        send_sms,
+        send_batch,
+    )
 
-        if success:
+    logs = []
+    conversations = []
+    sent_count = 0
+    for message, (sms_success, email_success) in zip(messages, results):
+        message_logs, message_conversations = bulk_messaging.result_rows(
+            message, sms_success, email_success, bulk.template_key, user.id
+        )
+        logs.extend(message_logs)
+        conversations.extend(message_conversations)
+        if sms_success or email_success:
             sent_count += 1
         else:
             failed_count += 1
 
+    if logs:
+        await db.execute(insert(NotificationLog), logs)
+    if conversations:
+        await db.execute(insert(SmsConversation), conversations)
     await db.commit()
 
     logger.info(
@@ -1,64 +1,23 @@
 """Public registration endpoints — no auth required."""
 
 import logging
+import time
 import uuid as uuid_mod
 from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import http_cache
 from app.database import get_db
 from app.limiter import limiter  # shared app-level limiter
 
 logger = logging.getLogger(__name__)
 
 
-def sanitize_intake_data(data: dict | None, max_size_kb: int = 10) -> dict:
-    """Sanitize intake_data JSON to prevent abuse.
-
-    - Removes keys starting with _ or $
-    - Truncates string values to 2000 chars
-    - Limits nesting depth to 2
-    - Rejects if serialized size > max_size_kb
-    """
-    import json
-
-    if data is None:
-        return {}
-
-    def _sanitize(obj: object, depth: int = 0) -> object:
-        if depth > 2:
-            return "[truncated]"  # Too deep — explicit sentinel instead of null
-
-        if isinstance(obj, dict):
-            return {
-                k: _sanitize(v, depth + 1)
-                for k, v in obj.items()
-                if isinstance(k, str) and not k.startswith(("_", "$"))
-            }
-        elif isinstance(obj, list):
-            return [_sanitize(item, depth + 1) for item in obj[:100]]  # Max 100 items
-        elif isinstance(obj, str):
-            return obj[:2000]  # Truncate long strings
-        elif isinstance(obj, (int, float, bool, type(None))):
-            return obj
-        else:
-            return str(obj)[:500]  # Convert unknown types to string
-
-    sanitized = _sanitize(data)
-
-    # Check size using compact JSON (no extra whitespace) for accurate byte count
-    serialized = json.dumps(sanitized, separators=(",", ":"))
-    if len(serialized) > max_size_kb * 1024:
-        raise ValueError(f"intake_data exceeds {max_size_kb}KB limit")
-
-    return sanitized
-
-
-from app.models.attendee import Attendee
-from app.models.event import Event, EventStatus
+from app.models.event import Event
 from app.models.registration import (
     AccommodationType,
     PaymentMethod,
@@ -66,7 +25,6 @@ from app.models.registration import (
     RegistrationSource,
     RegistrationStatus,
 )
-from app.models.membership import Membership
 from app.models.scholarship_link import ScholarshipLink
 from app.models.sub_event import SubEvent
 from app.models.registration_sub_event import RegistrationSubEvent
@@ -81,8 +39,22 @@ from app.schemas.registration import (
 )
 from app.models.audit import AuditLog
 from app.schemas.sms_conversations import CancelRequest
-from app.services.email_service import send_confirmation_email
-from app.services.stripe_service import create_checkout_session, create_composite_checkout_session
+from app.services import (
+    admission_service,
+    attendee_service,
+    capacity_service,
+    event_catalog,
+    idempotency_service,
+    intake_service,
+    notification_outbox,
+)
+from app.services.stripe_service import (
+    call_stripe,
+    checkout_expires_at,
+    create_checkout_session,
+    create_composite_checkout_session,
+    price_data,
+)
 
 router = APIRouter(prefix="/register", tags=["registration"])
 
@@ -91,11 +63,14 @@ async def _calculate_composite_price(
     db: AsyncSession,
     event: Event,
     selected_sub_event_ids: list[str],
-    guest_count: int = 1,
+    all_sub_events: list[SubEvent] | None = None,
 ) -> tuple[list[SubEvent], int]:
     """Validate sub-event selections and calculate total price for a composite event.
 
-    Returns (selected_sub_events, total_price_cents).
+    Returns (selected_sub_events, total_price_cents). Sub-event capacity is
+    enforced separately by _claim_sub_event_seats once validation has passed.
+    Callers validating several selections can pass the event's sub-events
+    (ordered by sort_order) to skip the per-call lookup.
     """
     # Deduplicate selected IDs (Issue 4: prevent inflated totals + unique constraint errors)
     selected_sub_event_ids = list(dict.fromkeys(selected_sub_event_ids))
@@ -104,12 +79,13 @@ async def _calculate_composite_price(
         raise HTTPException(status_code=422, detail="At least one sub-event must be selected for composite events")
 
     # Fetch sub-events for this event
-    result = await db.execute(
-        select(SubEvent)
-        .where(SubEvent.parent_event_id == event.id)
-        .order_by(SubEvent.sort_order)
-    )
-    all_sub_events = result.scalars().all()
+    if all_sub_events is None:
+        result = await db.execute(
+            select(SubEvent)
+            .where(SubEvent.parent_event_id == event.id)
+            .order_by(SubEvent.sort_order)
+        )
+        all_sub_events = result.scalars().all()
     sub_event_map = {str(se.id): se for se in all_sub_events}
 
     # Validate all selected IDs exist and belong to this event
@@ -129,37 +105,6 @@ async def _calculate_composite_price(
                 detail=f"Required sub-event '{se.name}' must be selected",
             )
 
-    # Enforce sub-event capacity — count distinct registrations per sub-event.
-    # Each guest in a group has their own Registration + RegistrationSubEvent row,
-    # so counting distinct registration_ids correctly reflects headcount.
-    capped_ids = [se.id for se in selected if se.capacity is not None]
-    if capped_ids:
-        counts_result = await db.execute(
-            select(
-                RegistrationSubEvent.sub_event_id,
-                func.count(func.distinct(RegistrationSubEvent.registration_id)).label("count"),
-            )
-            .join(Registration, Registration.id == RegistrationSubEvent.registration_id)
-            .where(
-                RegistrationSubEvent.sub_event_id.in_(capped_ids),
-                Registration.status.in_([
-                    RegistrationStatus.complete,
-                    RegistrationStatus.cash_pending,
-                    RegistrationStatus.pending_payment,
-                ]),
-            )
-            .group_by(RegistrationSubEvent.sub_event_id)
-        )
-        counts_map = {row.sub_event_id: row.count for row in counts_result}
-        for se in selected:
-            if se.capacity is not None:
-                current = counts_map.get(se.id, 0)
-                if current + guest_count > se.capacity:
-                    raise HTTPException(
-                        status_code=409,
-                        detail=f"Sub-event '{se.name}' is full",
-                    )
-
     # Calculate total price
     total = 0
     for se in selected:
@@ -190,26 +135,70 @@ async def _create_registration_sub_events(
         db.add(rse)
 
 
+async def _claim_sub_event_seats(
+    db: AsyncSession, event: Event, seats_by_sub_event: dict[SubEvent, int]
+) -> None:
+    """Claim sub-event seats, raising 409 naming the first full sub-event."""
+    if not seats_by_sub_event:
+        return
+    full = await capacity_service.claim_sub_event_seats(db, event.id, seats_by_sub_event)
+    if full:
+        raise HTTPException(status_code=409, detail=f"Sub-event '{full[0].name}' is full")
+
+
+async def _discard_unpaid_registrations(
+    db: AsyncSession,
+    event: Event,
+    registrations: list[Registration],
+    scholarship_link: ScholarshipLink | None = None,
+    admission_ticket: str | None = None,
+) -> None:
+    """Undo committed pending registrations whose Checkout session failed.
+
+    Registrations and their seat claims are committed before calling Stripe
+    so the capacity counter row lock is not held across the provider
+    round-trip. If Stripe then fails, the rows are deleted (not expired) so
+    the attendee can retry without tripping uq_attendee_event_active, and
+    the waiting-room ticket they spent is released for that retry.
+    """
+    ids = [r.id for r in registrations]
+    await capacity_service.release_registrations(db, event.id, ids)
+    await db.execute(delete(RegistrationSubEvent).where(RegistrationSubEvent.registration_id.in_(ids)))
+    await db.execute(delete(Registration).where(Registration.id.in_(ids)))
+    if scholarship_link:
+        await db.execute(
+            update(ScholarshipLink)
+            .where(ScholarshipLink.id == scholarship_link.id)
+            .values(uses=ScholarshipLink.uses - len(ids))
+        )
+    await admission_service.release_ticket(db, admission_ticket)
+    await db.commit()
+
+
 @router.get("/{event_slug}/info", response_model=dict)
-async def get_event_info(event_slug: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Event).where(Event.slug == event_slug))
-    event = result.scalar_one_or_none()
+async def get_event_info(
+    event_slug: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    cache_key = f"info:{event_slug}"
+    if cached := http_cache.not_modified(request, cache_key):
+        return cached
+
+    event = await event_catalog.get_by_slug(db, event_slug)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Count COMPLETE + PENDING_PAYMENT registrations for spots
-    reg_count_result = await db.execute(
-        select(func.count(Registration.id)).where(
-            Registration.event_id == event.id,
-            Registration.status.in_([
-                RegistrationStatus.pending_payment,
-                RegistrationStatus.cash_pending,
-                RegistrationStatus.complete,
-            ]),
-        )
+    capacity, spots_remaining, capacity_version = await capacity_service.availability(db, event)
+    etag = http_cache.make_etag(
+        event.id,
+        event.updated_at,
+        capacity_version,
+        *sorted((str(se.id), se.updated_at) for se in event.sub_events),
     )
-    reg_count = reg_count_result.scalar() or 0
-    spots_remaining = (event.capacity - reg_count) if event.capacity else None
+    if not_modified := http_cache.conditional(request, response, cache_key, event.id, etag, event.updated_at):
+        return not_modified
 
     # Build sub_events for composite events
     sub_events_info = None
@@ -239,13 +228,14 @@ async def get_event_info(event_slug: str, db: AsyncSession = Depends(get_db)):
         pricing_model=pm,
         fixed_price_cents=event.fixed_price_cents,
         min_donation_cents=event.min_donation_cents,
-        capacity=event.capacity,
+        capacity=capacity,
         spots_remaining=spots_remaining,
         registration_fields=event.registration_fields,
         description=event.description,
         allow_cash_payment=event.allow_cash_payment,
         is_recurring=event.is_recurring,
         recurrence_rule=event.recurrence_rule,
+        waiting_room=bool(event.admission_rate_per_second),
         sub_events=sub_events_info,
     )
     return {"event": info.model_dump(mode="json")}
@@ -257,45 +247,33 @@ async def create_registration(
     request: Request,
     event_slug: str,
     data: RegistrationCreate,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
-    # Look up event
-    result = await db.execute(
-        select(Event).where(Event.slug == event_slug, Event.status == EventStatus.active)
+    return await idempotency_service.run(
+        request,
+        db,
+        lambda: _create_registration(
+            event_slug, data, db, request.headers.get(admission_service.TICKET_HEADER)
+        ),
+        status_code=201,
     )
-    event = result.scalar_one_or_none()
-    if not event:
+
+
+async def _create_registration(
+    event_slug: str,
+    data: RegistrationCreate,
+    db: AsyncSession,
+    queue_ticket: str | None = None,
+):
+    # Look up event (catalog snapshot, no SQL)
+    event = await event_catalog.get_by_slug(db, event_slug)
+    if not event or not event.is_active:
         raise HTTPException(status_code=404, detail="Event not found or not active")
 
-    # Check capacity
-    if event.capacity:
-        reg_count_result = await db.execute(
-            select(func.count(Registration.id)).where(
-                Registration.event_id == event.id,
-                Registration.status.in_([
-                    RegistrationStatus.pending_payment,
-                    RegistrationStatus.complete,
-                ]),
-            )
-        )
-        if (reg_count_result.scalar() or 0) >= event.capacity:
-            raise HTTPException(status_code=403, detail="Event is at capacity")
+    admission_ticket = await admission_service.require_admission(db, event, queue_ticket)
 
-    # Get or create attendee
-    att_result = await db.execute(
-        select(Attendee).where(Attendee.email == data.email)
-    )
-    attendee = att_result.scalar_one_or_none()
-    if not attendee:
-        attendee = Attendee(
-            email=data.email,
-            first_name=data.first_name,
-            last_name=data.last_name,
-            phone=data.phone,
-        )
-        db.add(attendee)
-        await db.flush()
+    # Get or create attendee (one upsert on lower(email))
+    attendee = await attendee_service.upsert_attendee(db, data)
 
     # Check for duplicate registration
     dup_result = await db.execute(
@@ -364,9 +342,14 @@ async def create_registration(
             detail="Free payment method is only allowed for free events",
         )
 
-    # Sanitize intake_data (arbitrary JSON from user input)
+    # Validate intake_data against the event's form templates
+    validators = {}
+    if data.intake_data:
+        validators = await intake_service.get_validators(
+            db, [link.form_template_id for link in event.form_links]
+        )
     try:
-        safe_intake = sanitize_intake_data(data.intake_data)
+        safe_intake = intake_service.sanitize(data.intake_data, validators)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
@@ -377,7 +360,7 @@ async def create_registration(
 
     if is_composite:
         selected_sub_events, composite_total = await _calculate_composite_price(
-            db, event, data.selected_sub_event_ids or []
+            db, event, data.selected_sub_event_ids or [], all_sub_events=event.sub_events
         )
         # For scholarship on composite, use scholarship amount instead
         if scholarship_amount:
@@ -394,6 +377,12 @@ async def create_registration(
     else:
         initial_status = RegistrationStatus.pending_payment
 
+    # Claim seats last, right before the insert, so the counter row lock is
+    # held for as little of the transaction as possible.
+    if not await capacity_service.claim_event_seats(db, event):
+        raise HTTPException(status_code=403, detail="Event is at capacity")
+    await _claim_sub_event_seats(db, event, {se: 1 for se in selected_sub_events})
+
     # Create registration
     registration = Registration(
         attendee_id=attendee.id,
@@ -406,6 +395,11 @@ async def create_registration(
         intake_data=safe_intake,
         waiver_accepted_at=datetime.now(timezone.utc),
         source=RegistrationSource.registration_form,
+        lease_expires_at=(
+            capacity_service.lease_expiry()
+            if initial_status == RegistrationStatus.pending_payment
+            else None
+        ),
     )
     db.add(registration)
     await db.flush()
@@ -424,9 +418,8 @@ async def create_registration(
     if initial_status == RegistrationStatus.complete:
         # Free event — confirm immediately
         registration.attendee = attendee
-        registration.event = event
+        await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, [registration])
         await db.commit()
-        background_tasks.add_task(send_confirmation_email, registration, event)
         return RegistrationResponse(
             registration_id=registration.id,
             checkout_url=None,
@@ -437,9 +430,8 @@ async def create_registration(
     if initial_status == RegistrationStatus.cash_pending:
         # Cash — no Stripe, registered immediately
         registration.attendee = attendee
-        registration.event = event
+        await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, [registration])
         await db.commit()
-        background_tasks.add_task(send_confirmation_email, registration, event)
         return RegistrationResponse(
             registration_id=registration.id,
             checkout_url=None,
@@ -448,26 +440,27 @@ async def create_registration(
         )
 
     # Stripe / scholarship — create Checkout session
+    import stripe
+
     registration.attendee = attendee
-    registration.event = event
+    await db.commit()
 
     if is_composite and selected_sub_events:
         # Multi-line-item Checkout for composite events (via service layer)
-        import stripe
-
         try:
             session = await create_composite_checkout_session(
                 registration, event, selected_sub_events,
                 scholarship_amount=scholarship_amount,
             )
         except stripe.error.StripeError:
+            await _discard_unpaid_registrations(db, event, [registration], scholarship_link, admission_ticket)
             raise HTTPException(status_code=500, detail="Payment provider error. Please try again.")
 
         if session is None:
             # All sub-events are free/donation — no Stripe needed
             registration.status = RegistrationStatus.complete
+            await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, [registration])
             await db.commit()
-            background_tasks.add_task(send_confirmation_email, registration, event)
             return RegistrationResponse(
                 registration_id=registration.id,
                 checkout_url=None,
@@ -486,11 +479,16 @@ async def create_registration(
         )
 
     # Standard (non-composite) Stripe/scholarship checkout
-    checkout_url = await create_checkout_session(
-        registration,
-        event,
-        custom_amount_cents=scholarship_amount or data.donation_amount_cents,
-    )
+    try:
+        checkout_url = await create_checkout_session(
+            registration,
+            event,
+            custom_amount_cents=scholarship_amount or data.donation_amount_cents,
+        )
+    except stripe.error.StripeError:
+        logger.error("Stripe checkout creation failed for registration %s", registration.id, exc_info=True)
+        await _discard_unpaid_registrations(db, event, [registration], scholarship_link, admission_ticket)
+        raise HTTPException(status_code=500, detail="Payment provider error. Please try again.")
     await db.commit()
 
     return RegistrationResponse(
@@ -500,17 +498,66 @@ async def create_registration(
     )
 
 
+@router.post("/{event_slug}/queue", status_code=201)
+@limiter.limit("30/minute")
+async def join_queue(
+    request: Request,
+    event_slug: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """Issue a signed waiting-room ticket (public, no auth).
+
+    Deliberately light: a catalog lookup plus one UPDATE on the event's
+    admission gate. Events without a waiting room get a ticket that
+    is admitted immediately.
+    """
+    event = await event_catalog.get_by_slug(db, event_slug)
+    if not event or not event.is_active:
+        raise HTTPException(status_code=404, detail="Event not found or not active")
+
+    ticket, admit_at = await admission_service.issue_ticket(
+        db, event.id, event_slug, event.admission_rate_per_second
+    )
+    wait = max(0.0, admit_at - time.time())
+    return {
+        "ticket": ticket,
+        "admit_at": datetime.fromtimestamp(admit_at, tz=timezone.utc).isoformat(),
+        "retry_after": round(wait, 1),
+    }
+
+
+@router.get("/{event_slug}/queue/status")
+async def queue_status(event_slug: str, request: Request):
+    """Poll a waiting-room ticket. Signature check only — no database access."""
+    ticket = request.headers.get(admission_service.TICKET_HEADER)
+    if not ticket:
+        raise HTTPException(
+            status_code=422, detail=f"{admission_service.TICKET_HEADER} header is required"
+        )
+    return admission_service.ticket_status(ticket, event_slug)
+
+
 @router.get("/{event_slug}/success")
 async def registration_success(
     event_slug: str,
+    request: Request,
+    response: Response,
     session_id: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Event).where(Event.slug == event_slug))
-    event = result.scalar_one_or_none()
+    # session_id does not affect the payload, so it is left out of the key
+    cache_key = f"success:{event_slug}"
+    if cached := http_cache.not_modified(request, cache_key):
+        return cached
+
+    event = await event_catalog.get_by_slug(db, event_slug)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
+    etag = http_cache.make_etag("success", event.id, event.updated_at)
+    if not_modified := http_cache.conditional(request, response, cache_key, event.id, etag, event.updated_at):
+        return not_modified
+
     return {
         "event_name": event.name,
         "event_date": event.event_date.isoformat(),
@@ -521,13 +568,22 @@ async def registration_success(
 @router.get("/{event_slug}/cancelled")
 async def registration_cancelled(
     event_slug: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Event).where(Event.slug == event_slug))
-    event = result.scalar_one_or_none()
+    cache_key = f"cancelled:{event_slug}"
+    if cached := http_cache.not_modified(request, cache_key):
+        return cached
+
+    event = await event_catalog.get_by_slug(db, event_slug)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
+    etag = http_cache.make_etag("cancelled", event.id, event.updated_at)
+    if not_modified := http_cache.conditional(request, response, cache_key, event.id, etag, event.updated_at):
+        return not_modified
+
     return {
         "event_name": event.name,
         "message": "Your registration was not completed. You can try again anytime.",
@@ -540,22 +596,35 @@ async def create_group_registration(
     request: Request,
     event_slug: str,
     data: GroupRegistrationCreate,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Multi-guest registration — one payer, multiple attendees."""
+    return await idempotency_service.run(
+        request,
+        db,
+        lambda: _create_group_registration(
+            event_slug, data, db, request.headers.get(admission_service.TICKET_HEADER)
+        ),
+        status_code=201,
+    )
+
+
+async def _create_group_registration(
+    event_slug: str,
+    data: GroupRegistrationCreate,
+    db: AsyncSession,
+    queue_ticket: str | None = None,
+):
     import stripe
 
-    # Look up event — BUG 3: lock event row to prevent capacity overbooking
-    result = await db.execute(
-        select(Event)
-        .where(Event.slug == event_slug, Event.status == EventStatus.active)
-        .with_for_update()
-    )
-    event = result.scalar_one_or_none()
-    if not event:
+    # Look up event (catalog snapshot, no SQL) — no row lock; seats are claimed
+    # atomically on capacity_counters (BUG 3) so concurrent groups no longer serialize here.
+    event = await event_catalog.get_by_slug(db, event_slug)
+    if not event or not event.is_active:
         raise HTTPException(status_code=404, detail="Event not found or not active")
 
+    admission_ticket = await admission_service.require_admission(db, event, queue_ticket)
+
     if not data.guests:
         raise HTTPException(status_code=422, detail="At least one guest is required")
 
@@ -569,26 +638,6 @@ async def create_group_registration(
             detail="Group registration is not available for donation-priced events",
         )
 
-    # Check capacity for ALL guests at once
-    if event.capacity:
-        reg_count_result = await db.execute(
-            select(func.count(Registration.id)).where(
-                Registration.event_id == event.id,
-                Registration.status.in_([
-                    RegistrationStatus.pending_payment,
-                    RegistrationStatus.complete,
-                    RegistrationStatus.cash_pending,
-                ]),
-            )
-        )
-        current_count = reg_count_result.scalar() or 0
-        if current_count + len(data.guests) > event.capacity:
-            remaining = event.capacity - current_count
-            raise HTTPException(
-                status_code=403,
-                detail=f"Not enough spots. Only {remaining} spot(s) remaining.",
-            )
-
     # Resolve payment method
     try:
         payment_method = PaymentMethod(data.payment_method)
@@ -640,7 +689,7 @@ async def create_group_registration(
         initial_status = RegistrationStatus.pending_payment
 
     # Check for duplicate emails within the group
-    guest_emails = [g.email.lower() for g in data.guests]
+    guest_emails = [attendee_service.email_key(g.email) for g in data.guests]
     if len(guest_emails) != len(set(guest_emails)):
         raise HTTPException(status_code=422, detail="Duplicate email addresses in guest list")
 
@@ -659,53 +708,22 @@ async def create_group_registration(
     )
     member_discount_count = existing_member_regs.scalar() or 0
 
-    # ARCH 2: Keep ORM registration objects to avoid N+1 re-queries
-    registration_objects = []
-    registrations_created = []
-    total_amount_cents = 0
-
+    # Validate every guest before touching capacity or attendees
+    is_composite = event.pricing_model.value == "composite"
+    validators = {}
+    if any(guest.intake_data for guest in data.guests):
+        validators = await intake_service.get_validators(
+            db, [link.form_template_id for link in event.form_links]
+        )
+    guest_inputs = []
+    sub_event_seats: dict[SubEvent, int] = {}
     for guest in data.guests:
-        # Validate waiver
         if not guest.waiver_accepted:
             raise HTTPException(
                 status_code=422,
                 detail=f"Waiver must be accepted for {guest.first_name} {guest.last_name}",
             )
 
-        # Get or create attendee
-        att_result = await db.execute(
-            select(Attendee).where(Attendee.email == guest.email)
-        )
-        attendee = att_result.scalar_one_or_none()
-        if not attendee:
-            attendee = Attendee(
-                email=guest.email,
-                first_name=guest.first_name,
-                last_name=guest.last_name,
-                phone=guest.phone,
-            )
-            db.add(attendee)
-            await db.flush()
-
-        # Check for duplicate registration
-        dup_result = await db.execute(
-            select(Registration).where(
-                Registration.attendee_id == attendee.id,
-                Registration.event_id == event.id,
-                Registration.status.in_([
-                    RegistrationStatus.pending_payment,
-                    RegistrationStatus.cash_pending,
-                    RegistrationStatus.complete,
-                ]),
-            )
-        )
-        if dup_result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=409,
-                detail=f"{guest.first_name} {guest.last_name} ({guest.email}) is already registered for this event.",
-            )
-
-        # Validate accommodation
         accommodation = None
         if guest.accommodation_type:
             try:
@@ -713,19 +731,69 @@ async def create_group_registration(
             except ValueError:
                 raise HTTPException(status_code=422, detail="Invalid accommodation type")
 
-        # Sanitize intake_data
         try:
-            safe_intake = sanitize_intake_data(guest.intake_data)
+            safe_intake = intake_service.sanitize(guest.intake_data, validators)
         except ValueError as e:
             raise HTTPException(status_code=422, detail=str(e))
 
-        # Handle composite sub-event selection for this guest
         guest_selected_sub_events = []
-        is_composite = event.pricing_model.value == "composite"
         if is_composite and guest.selected_sub_event_ids:
             guest_selected_sub_events, _ = await _calculate_composite_price(
-                db, event, guest.selected_sub_event_ids
+                db, event, guest.selected_sub_event_ids, all_sub_events=event.sub_events
             )
+            for se in guest_selected_sub_events:
+                sub_event_seats[se] = sub_event_seats.get(se, 0) + 1
+
+        guest_inputs.append((guest, accommodation, safe_intake, guest_selected_sub_events))
+
+    # Resolve all attendees with one upsert. Existing attendees are left
+    # untouched, matching the single-registration path. Attendee.membership
+    # is loaded with them, so this is also the one membership fetch used for
+    # discounts below.
+    attendees_by_email = await attendee_service.upsert_attendees(db, data.guests)
+
+    # One duplicate check for the whole group
+    dup_result = await db.execute(
+        select(Registration.attendee_id).where(
+            Registration.event_id == event.id,
+            Registration.attendee_id.in_([a.id for a in attendees_by_email.values()]),
+            Registration.status.in_([
+                RegistrationStatus.pending_payment,
+                RegistrationStatus.cash_pending,
+                RegistrationStatus.complete,
+            ]),
+        )
+    )
+    already_registered = set(dup_result.scalars().all())
+    for guest in data.guests:
+        if attendees_by_email[attendee_service.email_key(guest.email)].id in already_registered:
+            raise HTTPException(
+                status_code=409,
+                detail=f"{guest.first_name} {guest.last_name} ({guest.email}) is already registered for this event.",
+            )
+
+    # Claim seats for ALL guests at once
+    if not await capacity_service.claim_event_seats(db, event, len(data.guests)):
+        remaining = max(0, await capacity_service.seats_remaining(db, event) or 0)
+        raise HTTPException(
+            status_code=403,
+            detail=f"Not enough spots. Only {remaining} spot(s) remaining.",
+        )
+    await _claim_sub_event_seats(db, event, sub_event_seats)
+
+    lease_expires_at = (
+        capacity_service.lease_expiry()
+        if initial_status == RegistrationStatus.pending_payment
+        else None
+    )
+
+    # ARCH 2: Keep ORM registration objects to avoid N+1 re-queries
+    registration_objects = []
+    registrations_created = []
+    total_amount_cents = 0
+
+    for guest, accommodation, safe_intake, guest_selected_sub_events in guest_inputs:
+        attendee = attendees_by_email[attendee_service.email_key(guest.email)]
 
         # Calculate per-guest price
         guest_price = 0
@@ -745,23 +813,18 @@ async def create_group_registration(
         if guest_price > 0 and not scholarship_amount:
             if attendee.is_member and payment_method != PaymentMethod.scholarship:
                 if member_discount_count < event.max_member_discount_slots:
-                    if attendee.membership_id:
-                        mem_result = await db.execute(
-                            select(Membership).where(
-                                Membership.id == attendee.membership_id,
-                                Membership.is_active == True,  # noqa: E712
-                            )
-                        )
-                        membership = mem_result.scalar_one_or_none()
-                        if membership:
-                            guest_price = max(0, guest_price - membership.discount_value_cents)
-                            member_discount_count += 1
-                            discount_applied = True
+                    membership = attendee.membership
+                    if membership and membership.is_active:
+                        guest_price = max(0, guest_price - membership.discount_value_cents)
+                        member_discount_count += 1
+                        discount_applied = True
 
         total_amount_cents += guest_price
 
-        # Create registration
+        # Ids are assigned up front so sub-event rows can reference them and
+        # everything goes out in one flush (batched INSERTs).
         registration = Registration(
+            id=uuid_mod.uuid4(),
             attendee_id=attendee.id,
             event_id=event.id,
             status=initial_status,
@@ -774,11 +837,10 @@ async def create_group_registration(
             source=RegistrationSource.group,
             group_id=group_id,
             member_discount_applied=discount_applied,
+            lease_expires_at=lease_expires_at,
         )
         registration.attendee = attendee
-        registration.event = event
         db.add(registration)
-        await db.flush()
 
         # Create sub-event selections for composite
         if is_composite and guest_selected_sub_events:
@@ -792,16 +854,17 @@ async def create_group_registration(
             )
         )
 
+    await db.flush()
+
     # BUG 1: Increment scholarship uses by guest count (not 1)
     if scholarship_link:
         scholarship_link.uses += len(data.guests)
 
     # Route by payment method
     if initial_status == RegistrationStatus.complete:
+        # BUG 4: Confirmation emails for each guest
+        await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, registration_objects)
         await db.commit()
-        # BUG 4: Send confirmation emails for each guest
-        for reg in registration_objects:
-            background_tasks.add_task(send_confirmation_email, reg, event)
         return GroupRegistrationResponse(
             group_id=group_id,
             registrations=registrations_created,
@@ -810,10 +873,9 @@ async def create_group_registration(
         )
 
     if initial_status == RegistrationStatus.cash_pending:
+        # BUG 4: Confirmation emails for each guest
+        await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, registration_objects)
         await db.commit()
-        # BUG 4: Send confirmation emails for each guest
-        for reg in registration_objects:
-            background_tasks.add_task(send_confirmation_email, reg, event)
         return GroupRegistrationResponse(
             group_id=group_id,
             registrations=registrations_created,
@@ -826,10 +888,9 @@ async def create_group_registration(
         # Edge case: all discounts made it free
         for reg in registration_objects:
             reg.status = RegistrationStatus.complete
+        # BUG 4: Confirmation emails for each guest
+        await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, registration_objects)
         await db.commit()
-        # BUG 4: Send confirmation emails
-        for reg in registration_objects:
-            background_tasks.add_task(send_confirmation_email, reg, event)
         return GroupRegistrationResponse(
             group_id=group_id,
             registrations=registrations_created,
@@ -840,28 +901,31 @@ async def create_group_registration(
     # ARCH 2: Build Stripe Checkout line items from in-memory objects (no N+1 queries)
     from app.config import settings
 
+    # Guests paying the list price share one synced Price reference
     line_items = []
+    list_price_guests = 0
     for reg, reg_item in zip(registration_objects, registrations_created):
         amount = reg.payment_amount_cents or event.fixed_price_cents or 0
-        if amount > 0:
-            line_items.append({
-                "price_data": {
-                    "currency": "usd",
-                    "unit_amount": amount,
-                    "product_data": {
-                        "name": f"{event.name} — {reg_item.attendee_name}",
-                    },
-                },
-                "quantity": 1,
-            })
+        if amount <= 0:
+            continue
+        if event.stripe_price_id and amount == event.fixed_price_cents:
+            list_price_guests += 1
+            continue
+        line_items.append({
+            "price_data": price_data(
+                amount, f"{event.name} — {reg_item.attendee_name}", event.stripe_product_id
+            ),
+            "quantity": 1,
+        })
+    if list_price_guests:
+        line_items.insert(0, {"price": event.stripe_price_id, "quantity": list_price_guests})
 
     if not line_items:
         # Everything is free after discounts
         for reg in registration_objects:
             reg.status = RegistrationStatus.complete
+        await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, registration_objects)
         await db.commit()
-        for reg in registration_objects:
-            background_tasks.add_task(send_confirmation_email, reg, event)
         return GroupRegistrationResponse(
             group_id=group_id,
             registrations=registrations_created,
@@ -869,9 +933,18 @@ async def create_group_registration(
             message="You're registered! Check your email for confirmation.",
         )
 
+    # Commit registrations + seat claims before the Stripe round-trip
+    await db.commit()
+
+    # Checkout session dies with the group's seat lease
+    session_extra = {}
+    if expires_at := checkout_expires_at(lease_expires_at):
+        session_extra["expires_at"] = expires_at
+
     # ARCH 3: Catch stripe.error.StripeError specifically, sanitize message
     try:
-        session = stripe.checkout.Session.create(
+        session = await call_stripe(
+            stripe.checkout.Session.create,
             mode="payment",
             client_reference_id=str(group_id),
             customer_email=data.payer.email,
@@ -886,10 +959,12 @@ async def create_group_registration(
                 ),
             },
             line_items=line_items,
+            **session_extra,
         )
         checkout_url = session.url
     except stripe.error.StripeError as e:
         logger.error("Stripe checkout creation failed: %s", e, exc_info=True)
+        await _discard_unpaid_registrations(db, event, registration_objects, scholarship_link, admission_ticket)
         raise HTTPException(status_code=500, detail="Payment provider error. Please try again.")
 
     # ARCH 2: Store checkout session ID directly on in-memory objects
@@ -918,8 +993,7 @@ async def cancel_request(
     and sends notification to admin.
     """
     # Verify event exists
-    result = await db.execute(select(Event).where(Event.slug == event_slug))
-    event = result.scalar_one_or_none()
+    event = await event_catalog.get_by_slug(db, event_slug)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
@@ -954,14 +1028,11 @@ async def cancel_request(
         actor=attendee.email,
         new_value={"reason": data.reason},
     ))
-    await db.flush()
 
-    # Send notification email to admin (best-effort, non-blocking)
-    try:
-        from app.services.email_service import send_admin_cancel_notification
-        await send_admin_cancel_notification(registration, event, data.reason)
-    except Exception:
-        logger.exception("Failed to send admin cancel notification")
+    # Admin notification email, committed with the request
+    await notification_outbox.enqueue(
+        db, notification_outbox.ADMIN_CANCEL, [registration], payload={"reason": data.reason}, dedupe=False
+    )
 
     return {
         "message": "Your cancellation request has been received. Our team will review it and follow up.",
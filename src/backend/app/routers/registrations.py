@@ -3,6 +3,7 @@
 import csv
 import io
 from datetime import datetime, timezone
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
@@ -26,6 +27,7 @@ from ..schemas.registrations import (
     RegistrationResponse,
     RegistrationUpdate,
 )
+from ..services import attendee_service, capacity_service
 from ..services.auth_service import get_current_user
 
 router = APIRouter(tags=["registrations"])
@@ -184,7 +186,7 @@ async def get_registration(
 
 @router.put("/registrations/{registration_id}", response_model=RegistrationResponse)
 async def update_registration(
-    registration_id: str,
+    registration_id: UUID,
     body: RegistrationUpdate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -203,6 +205,26 @@ async def update_registration(
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
 
+    # Back to a seat-holding status: the attendee may have registered again since
+    if (
+        "status" in update_data
+        and capacity_service.holds_seat(update_data["status"])
+        and not capacity_service.holds_seat(reg.status)
+    ):
+        active = await db.execute(
+            select(Registration.id).where(
+                Registration.attendee_id == reg.attendee_id,
+                Registration.event_id == reg.event_id,
+                Registration.id != reg.id,
+                Registration.status.in_(capacity_service.SEAT_HOLDING_STATUSES),
+            )
+        )
+        if active.first():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This attendee already has another active registration for this event",
+            )
+
     # Capture old values for audit
     old_values = {}
     for field in update_data:
@@ -217,6 +239,9 @@ async def update_registration(
     action = "updated"
     if "status" in update_data:
         action = "status_change"
+        await capacity_service.record_status_change(
+            db, reg.event_id, [reg.id], old_values["status"], update_data["status"]
+        )
 
     await _audit_log(
         db,
@@ -251,32 +276,15 @@ async def manual_registration(
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Find or create attendee
-    att_result = await db.execute(
-        select(Attendee).where(Attendee.email == body.email)
-    )
-    attendee = att_result.scalar_one_or_none()
-    if not attendee:
-        attendee = Attendee(
-            email=body.email,
-            first_name=body.first_name,
-            last_name=body.last_name,
-            phone=body.phone,
-        )
-        db.add(attendee)
-        await db.flush()
-    else:
-        # Update name/phone if provided
-        attendee.first_name = body.first_name
-        attendee.last_name = body.last_name
-        if body.phone:
-            attendee.phone = body.phone
+    # Find or create attendee; an existing one gets name/phone updated (phone only if provided)
+    attendee = await attendee_service.upsert_attendee(db, body, overwrite=True)
 
     # Check for duplicate registration
     dup = await db.execute(
         select(Registration).where(
             Registration.attendee_id == attendee.id,
             Registration.event_id == event_id,
+            Registration.status.in_(capacity_service.SEAT_HOLDING_STATUSES),
         )
     )
     if dup.scalar_one_or_none():
@@ -312,6 +320,9 @@ async def manual_registration(
         waiver_accepted_at=datetime.now(timezone.utc) if reg_status == RegistrationStatus.complete else None,
     )
     db.add(reg)
+    await db.flush()
+    # Operators may overbook manually — record the seat without a capacity check
+    await capacity_service.record_status_change(db, event.id, [reg.id], None, reg_status)
 
     await _audit_log(
         db,
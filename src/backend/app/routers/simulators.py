@@ -0,0 +1,92 @@
+"""Provider simulator routes — stand-ins for Stripe's hosted pages and dashboard.
+
+Only mounted when PROVIDER_SIMULATORS is set (see app/simulators). Each
+action changes the simulated Stripe state and then delivers the signed
+webhook Stripe would send, after the response, like Stripe does.
+"""
+
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import RedirectResponse
+from pydantic import BaseModel
+
+from app import simulators
+from app.simulators.stripe_api import StripeNotFound, deliver_webhook
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/simulators", tags=["simulators"])
+
+
+class RefundRequest(BaseModel):
+    payment_intent: str
+    amount: int | None = None
+
+
+def _stripe():
+    simulator = simulators.get("stripe")
+    if simulator is None:
+        raise HTTPException(status_code=404, detail="Stripe simulator is not enabled")
+    return simulator
+
+
+async def _deliver(event: dict) -> None:
+    try:
+        status = await deliver_webhook(event)
+        logger.info("Simulated %s delivered (HTTP %d)", event["type"], status)
+    except Exception:
+        logger.exception("Could not deliver simulated %s", event["type"])
+
+
+def _apply(action, *args) -> dict:
+    try:
+        return action(*args)
+    except StripeNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@router.get("/stripe/checkout/{session_id}")
+async def pay_checkout_session(session_id: str, background_tasks: BackgroundTasks):
+    """The simulated hosted Checkout page: pays the session and redirects to success_url."""
+    simulator = _stripe()
+    event = _apply(simulator.complete_session, session_id)
+    background_tasks.add_task(_deliver, event)
+    success_url = event["data"]["object"].get("success_url")
+    if success_url:
+        return RedirectResponse(success_url.replace("{CHECKOUT_SESSION_ID}", session_id), status_code=303)
+    return {"status": "complete", "session_id": session_id}
+
+
+@router.post("/stripe/checkout/{session_id}/expire")
+async def expire_checkout_session(session_id: str, background_tasks: BackgroundTasks):
+    event = _apply(_stripe().expire_session, session_id)
+    background_tasks.add_task(_deliver, event)
+    return {"status": "expired", "session_id": session_id}
+
+
+@router.post("/stripe/refunds")
+async def refund_payment(body: RefundRequest, background_tasks: BackgroundTasks):
+    event = _apply(_stripe().refund, body.payment_intent, body.amount)
+    background_tasks.add_task(_deliver, event)
+    charge = event["data"]["object"]
+    return {"charge": charge["id"], "amount_refunded": charge["amount_refunded"]}
+
+
+@router.get("")
+async def simulator_stats():
+    """What the active simulators have seen (for load-test reports)."""
+    stats = {}
+    if stripe_sim := simulators.get("stripe"):
+        stats["stripe"] = {
+            "requests": stripe_sim.request_count,
+            "checkout_sessions": len(stripe_sim.sessions),
+            "charges": len(stripe_sim.charges),
+        }
+    if twilio_sim := simulators.get("twilio"):
+        stats["twilio"] = {"requests": twilio_sim.request_count, "messages": len(twilio_sim.messages)}
+    if resend_sim := simulators.get("resend"):
+        stats["resend"] = {"requests": resend_sim.request_count, "emails": len(resend_sim.emails)}
+    return stats
@@ -3,10 +3,11 @@
 import uuid as _uuid
 from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .. import http_cache
 from ..database import get_db
 from ..models import AuditLog, Event, User
 from ..models.sub_event import SubEvent, SubEventPricingModel
@@ -17,6 +18,7 @@ from ..schemas.sub_events import (
     SubEventResponse,
     SubEventUpdate,
 )
+from ..services import capacity_service, event_catalog, stripe_catalog
 from ..services.auth_service import get_current_user
 
 router = APIRouter(tags=["sub-events"])
@@ -141,6 +143,7 @@ async def create_sub_event(
     )
     db.add(sub_event)
     await db.flush()
+    await stripe_catalog.sync_sub_event(sub_event, event.name)
 
     await _audit_log(
         db,
@@ -152,6 +155,7 @@ async def create_sub_event(
     )
 
     await db.commit()
+    event_catalog.invalidate(sub_event.parent_event_id)
     await db.refresh(sub_event)
     return _sub_event_to_response(sub_event)
 
@@ -195,6 +199,15 @@ async def update_sub_event(
 
     for field, value in update_data.items():
         setattr(sub_event, field, value)
+    event_name = (
+        await db.execute(select(Event.name).where(Event.id == sub_event.parent_event_id))
+    ).scalar_one()
+    await stripe_catalog.sync_sub_event(sub_event, event_name, changed=update_data)
+
+    if "capacity" in update_data:
+        await capacity_service.set_capacity(
+            db, sub_event.parent_event_id, update_data["capacity"], sub_event_id=sub_event.id
+        )
 
     await _audit_log(
         db,
@@ -207,6 +220,7 @@ async def update_sub_event(
     )
 
     await db.commit()
+    event_catalog.invalidate(sub_event.parent_event_id)
     await db.refresh(sub_event)
     return _sub_event_to_response(sub_event)
 
@@ -248,8 +262,10 @@ async def delete_sub_event(
         old_value={"name": sub_event.name},
     )
 
+    await capacity_service.delete_sub_event_counter(db, sub_event.id)
     await db.delete(sub_event)
     await db.commit()
+    event_catalog.invalidate(sub_event.parent_event_id)
     return {"detail": "Sub-event deleted", "id": sub_event_id}
 
 
@@ -260,12 +276,17 @@ async def delete_sub_event(
 @router.get("/events/{event_slug}/recurring-dates")
 async def get_recurring_dates(
     event_slug: str,
+    request: Request,
+    response: Response,
     count: int = Query(10, ge=1, le=52),
     db: AsyncSession = Depends(get_db),
 ):
     """List upcoming dates for a recurring event (public, no auth)."""
-    result = await db.execute(select(Event).where(Event.slug == event_slug))
-    event = result.scalar_one_or_none()
+    cache_key = f"recurring-dates:{event_slug}:{count}"
+    if cached := http_cache.not_modified(request, cache_key):
+        return cached
+
+    event = await event_catalog.get_by_slug(db, event_slug)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
@@ -298,6 +319,12 @@ async def get_recurring_dates(
             date=date_str,
         ))
 
+    # The list rolls forward as dates pass, so the dates themselves are part
+    # of the validator alongside the event version.
+    etag = http_cache.make_etag(event.id, event.updated_at, *(d.date for d in dates))
+    if not_modified := http_cache.conditional(request, response, cache_key, event.id, etag, event.updated_at):
+        return not_modified
+
     return {
         "event_name": event.name,
         "recurrence_rule": event.recurrence_rule,
@@ -0,0 +1,23 @@
+"""Pydantic schemas for campaigns endpoints."""
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class CampaignResponse(BaseModel):
+    id: UUID
+    event_id: UUID
+    channel: str
+    status: str
+    total: int
+    sent_count: int
+    failed_count: int
+    skipped_count: int
+    remaining: int
+    created_at: datetime
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
@@ -31,6 +31,7 @@ class EventCreate(BaseModel):
     virtual_meeting_url: str | None = None
     is_recurring: bool = False
     recurrence_rule: str | None = None
+    admission_rate_per_second: int | None = Field(None, ge=1)
     status: str = "draft"
 
 
@@ -58,6 +59,7 @@ class EventUpdate(BaseModel):
     virtual_meeting_url: str | None = None
     is_recurring: bool | None = None
     recurrence_rule: str | None = None
+    admission_rate_per_second: int | None = Field(None, ge=1)
     status: str | None = None
 
 
@@ -113,6 +115,7 @@ class EventResponse(BaseModel):
     virtual_meeting_url: str | None = None
     is_recurring: bool = False
     recurrence_rule: str | None = None
+    admission_rate_per_second: int | None = None
     sub_events: list[SubEventBrief] | None = None
     status: str
     created_at: datetime
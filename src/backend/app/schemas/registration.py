@@ -116,6 +116,7 @@ class EventInfo(BaseModel):
     allow_cash_payment: bool = False
     is_recurring: bool = False
     recurrence_rule: str | None = None
+    waiting_room: bool = False
     sub_events: list[SubEventInfo] | None = None
 
     model_config = {"from_attributes": True}
@@ -0,0 +1,159 @@
+"""Waiting room for high-demand event launches.
+
+Events with ``admission_rate_per_second`` set only accept registrations that
+carry an admitted queue ticket. A ticket is a signed JWT holding the time the
+holder may enter; issuing one costs a single conditional UPDATE that
+advances the event's admission_gates slot by 1 / rate, so arrivals are paced
+at that rate regardless of demand. Status polls only verify the signature —
+no database access.
+
+A ticket admits one registration. The registration endpoints record its
+``jti`` in admission_ticket_uses inside the registration's transaction, so a
+failed attempt (validation error, sold out, rollback) leaves it usable and a
+payment-provider failure releases it; a second registration with the same
+ticket is refused.
+"""
+
+import time
+import uuid
+from datetime import datetime, timezone
+from uuid import UUID
+
+import jwt
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import dialect_insert
+from app.models.admission_gate import AdmissionGate, AdmissionTicketUse
+
+TICKET_HEADER = "X-Queue-Ticket"
+# Distinct audience so queue tickets and admin access tokens are never interchangeable
+TICKET_AUDIENCE = "jlf:waiting-room"
+
+
+async def _reserve_slot(db: AsyncSession, event_id: UUID, rate: int, now: float) -> float:
+    """Atomically take the next admission slot and return its start time."""
+    interval = 1.0 / rate
+    stmt = (
+        update(AdmissionGate)
+        .where(AdmissionGate.event_id == event_id)
+        .values(
+            next_slot=case((AdmissionGate.next_slot < now, now), else_=AdmissionGate.next_slot)
+            + interval
+        )
+        .returning(AdmissionGate.next_slot)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        await db.execute(
+            dialect_insert(db, AdmissionGate)
+            .values(event_id=event_id, next_slot=now)
+            .on_conflict_do_nothing(index_elements=["event_id"])
+        )
+        row = (await db.execute(stmt)).first()
+    return row[0] - interval
+
+
+async def issue_ticket(
+    db: AsyncSession, event_id: UUID, event_slug: str, rate: int | None
+) -> tuple[str, float]:
+    """Return (signed ticket, admit_at epoch seconds) for a new arrival."""
+    now = time.time()
+    admit_at = await _reserve_slot(db, event_id, rate, now) if rate else now
+    claims = {
+        "aud": TICKET_AUDIENCE,
+        "jti": str(uuid.uuid4()),
+        "evt": str(event_id),
+        "slug": event_slug,
+        "admit_at": admit_at,
+        "exp": int(admit_at + settings.admission_ticket_window_minutes * 60),
+    }
+    token = jwt.encode(claims, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return token, admit_at
+
+
+def _decode(token: str) -> dict:
+    try:
+        return jwt.decode(
+            token,
+            settings.jwt_secret_key,
+            algorithms=[settings.jwt_algorithm],
+            audience=TICKET_AUDIENCE,
+        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Your waiting-room ticket has expired. Please rejoin the queue.",
+        )
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid waiting-room ticket")
+
+
+def ticket_status(token: str, event_slug: str) -> dict:
+    """Cheap poll: is this ticket admitted yet, and if not, how long to wait."""
+    claims = _decode(token)
+    if claims.get("slug") != event_slug:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid waiting-room ticket")
+    wait = max(0.0, claims["admit_at"] - time.time())
+    return {"admitted": wait == 0, "retry_after": round(wait, 1)}
+
+
+async def require_admission(db: AsyncSession, event, token: str | None) -> str | None:
+    """Gate the registration path for events with a waiting room enabled.
+
+    Spends the ticket and returns its jti (None when the event has no
+    waiting room). The use commits with the registration.
+    """
+    if not event.admission_rate_per_second:
+        return None
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="This event uses a waiting room. Please join the queue first.",
+        )
+    claims = _decode(token)
+    if claims.get("evt") != str(event.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid waiting-room ticket")
+    wait = claims["admit_at"] - time.time()
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="You're still in the queue. Please wait for your turn.",
+            headers={"Retry-After": str(int(wait) + 1)},
+        )
+    if not claims.get("jti"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid waiting-room ticket")
+    spent = await db.execute(
+        dialect_insert(db, AdmissionTicketUse)
+        .values(
+            id=uuid.uuid4(),
+            jti=claims["jti"],
+            event_id=event.id,
+            expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc),
+        )
+        .on_conflict_do_nothing(index_elements=["jti"])
+        .returning(AdmissionTicketUse.id)
+    )
+    if spent.first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="This waiting-room ticket has already been used. Please rejoin the queue.",
+        )
+    return claims["jti"]
+
+
+async def release_ticket(db: AsyncSession, jti: str | None) -> None:
+    """Make a spent ticket usable again (its registration was discarded)."""
+    if jti:
+        await db.execute(delete(AdmissionTicketUse).where(AdmissionTicketUse.jti == jti))
+
+
+async def purge_expired(db: AsyncSession) -> int:
+    """Delete uses of tickets that have expired. Returns the number removed."""
+    result = await db.execute(
+        delete(AdmissionTicketUse).where(AdmissionTicketUse.expires_at < datetime.now(timezone.utc))
+    )
+    return result.rowcount or 0
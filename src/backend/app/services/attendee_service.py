@@ -0,0 +1,76 @@
+"""Attendee resolution keyed on case-insensitive email.
+
+Attendees are unique on ``lower(email)`` (uq_attendees_email_lower). Lookups
+go through a single ``INSERT ... ON CONFLICT (lower(email)) DO UPDATE ...
+RETURNING`` so resolving (or creating) any number of attendees is one round
+trip and cannot race into IntegrityErrors or case-variant duplicates.
+SQLite (tests, local dev) supports the same statement.
+"""
+
+from datetime import datetime, timezone
+from typing import Iterable, Protocol
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models.attendee import Attendee
+
+
+class _Person(Protocol):
+    email: str
+    first_name: str
+    last_name: str
+    phone: str | None
+
+
+def email_key(email: str) -> str:
+    """Normalized form used to match attendees by email."""
+    return email.strip().lower()
+
+
+async def upsert_attendees(
+    db: AsyncSession, people: Iterable[_Person], *, overwrite: bool = False
+) -> dict[str, Attendee]:
+    """Create missing attendees and return all of them keyed by email_key().
+
+    Existing attendees keep their details unless `overwrite` is set, in which
+    case name is replaced and phone is replaced when one is given.
+    """
+    rows: dict[str, dict] = {}
+    for person in people:
+        rows.setdefault(
+            email_key(person.email),
+            {
+                "email": person.email.strip(),
+                "first_name": person.first_name,
+                "last_name": person.last_name,
+                "phone": person.phone,
+            },
+        )
+    if not rows:
+        return {}
+
+    stmt = dialect_insert(db, Attendee).values(list(rows.values()))
+    if overwrite:
+        set_ = {
+            "first_name": stmt.excluded.first_name,
+            "last_name": stmt.excluded.last_name,
+            "phone": func.coalesce(stmt.excluded.phone, Attendee.phone),
+            "updated_at": datetime.now(timezone.utc),
+        }
+    else:
+        # No-op update so RETURNING also yields rows that already existed
+        set_ = {"email": Attendee.email}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[func.lower(Attendee.email)], set_=set_
+    ).returning(Attendee)
+
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    return {email_key(a.email): a for a in result.scalars().all()}
+
+
+async def upsert_attendee(db: AsyncSession, person: _Person, *, overwrite: bool = False) -> Attendee:
+    """Single-attendee form of upsert_attendees()."""
+    attendees = await upsert_attendees(db, [person], overwrite=overwrite)
+    return attendees[email_key(person.email)]
@@ -0,0 +1,249 @@
+"""Bulk messages to an event's attendees — shared by the bulk endpoint and campaigns.
+
+A bulk message is resolved once per request (template or custom text,
+idempotency key) and rendered per recipient into a ``BulkMessage``. SMS go
+out with bounded concurrency and emails through Resend's batch endpoint;
+results are recorded as NotificationLog / SmsConversation rows under
+``bulk:{idempotency_key}`` so a repeat send skips everyone already reached.
+"""
+
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, lazyload
+
+from app.config import settings
+from app.models.event import Event
+from app.models.message_template import MessageTemplate
+from app.models.notification import NotificationChannel, NotificationLog, NotificationStatus
+from app.models.registration import Registration, RegistrationStatus
+from app.models.sms_conversation import SmsDirection
+from app.schemas.sms_conversations import BulkNotificationRequest
+from app.services import email_service
+from app.template_cache import CompiledTemplate, compile_message_template, compile_text
+
+DEFAULT_SUBJECT = "Message from Just Love Forest"
+
+# Who a bulk message goes to
+RECIPIENT_STATUSES = [RegistrationStatus.complete, RegistrationStatus.cash_pending]
+
+
+@dataclass
+class BulkRequest:
+    """A validated bulk message: the text to render and its idempotency key."""
+
+    event: Event
+    channel: str
+    template: MessageTemplate | None
+    body: str
+    subject: str | None
+    idempotency_key: str
+
+    @property
+    def compiled(self) -> tuple[CompiledTemplate, CompiledTemplate | None]:
+        """Compiled body and subject (a saved template's are cached by its updated_at)."""
+        if self.template is not None:
+            return compile_message_template(self.template)
+        return compile_text(self.body), compile_text(self.subject) if self.subject else None
+
+    @property
+    def template_key(self) -> str:
+        """NotificationLog.template_id for this send."""
+        return f"bulk:{self.idempotency_key}"
+
+
+@dataclass
+class BulkMessage:
+    """One recipient's rendered bulk message (phone / email None when not sent on that channel)."""
+
+    registration_id: UUID
+    phone: str | None
+    email: str | None
+    body: str
+    subject: str | None
+    content_hash: str
+
+
+async def resolve_request(db: AsyncSession, event_id: UUID, data: BulkNotificationRequest) -> BulkRequest:
+    """Validate a bulk request. Raises 404 / 422 like the endpoints it backs."""
+    event_result = await db.execute(select(Event).where(Event.id == event_id))
+    event = event_result.scalar_one_or_none()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    if data.channel not in ("sms", "email", "both"):
+        raise HTTPException(status_code=422, detail="Channel must be sms, email, or both")
+
+    template = None
+    if data.template_id:
+        tmpl_result = await db.execute(
+            select(MessageTemplate).where(MessageTemplate.id == data.template_id)
+        )
+        template = tmpl_result.scalar_one_or_none()
+        if not template:
+            raise HTTPException(status_code=404, detail="Template not found")
+
+    if not template and not data.custom_message:
+        raise HTTPException(status_code=422, detail="Either template_id or custom_message is required")
+
+    # Generate idempotency key from request data if not provided
+    if data.idempotency_key:
+        idempotency_key = data.idempotency_key
+    else:
+        key_source = f"{event_id}:{data.channel}:{data.template_id or ''}:{data.custom_message or ''}"
+        idempotency_key = hashlib.sha256(key_source.encode()).hexdigest()[:32]
+
+    return BulkRequest(
+        event=event,
+        channel=data.channel,
+        template=template,
+        body=template.body if template else data.custom_message,
+        subject=template.subject if template else (data.subject or DEFAULT_SUBJECT),
+        idempotency_key=idempotency_key,
+    )
+
+
+async def load_recipients(db: AsyncSession, event_id: UUID, statuses: list[RegistrationStatus]):
+    """The event's registrations in `statuses`, attendees joined in the same query."""
+    result = await db.execute(
+        select(Registration)
+        .options(joinedload(Registration.attendee), lazyload("*"))
+        .where(Registration.event_id == event_id, Registration.status.in_(statuses))
+    )
+    return result.scalars().all()
+
+
+async def already_sent(db: AsyncSession, template_key: str, registration_ids: list[UUID]) -> set[UUID]:
+    """Registrations that already have a `template_key` log row, in one query."""
+    if not registration_ids:
+        return set()
+    result = await db.execute(
+        select(NotificationLog.registration_id).where(
+            NotificationLog.template_id == template_key,
+            NotificationLog.registration_id.in_(registration_ids),
+        )
+    )
+    return set(result.scalars())
+
+
+def event_variables(event: Event) -> dict[str, str]:
+    """Template variables that are the same for every attendee of `event`."""
+    return {
+        "event_name": event.name,
+        "event_date": event.event_date.strftime("%B %d, %Y") if event.event_date else "",
+        "event_time": event.event_date.strftime("%I:%M %p") if event.event_date else "",
+        "meeting_point": event.meeting_point_a or "See event details for directions",
+    }
+
+
+def render_messages(
+    registrations: list[Registration],
+    event: Event,
+    channel: str,
+    body: CompiledTemplate,
+    subject: CompiledTemplate | None,
+) -> list[BulkMessage]:
+    """Render one message per registration (each must have an attendee).
+
+    Event variables are bound into the templates once; each recipient then
+    fills only its own fields.
+    """
+    shared = event_variables(event)
+    body = body.bind(shared)
+    subject = subject.bind(shared) if subject else None
+    cancel_url = f"{settings.app_url}/register/{event.slug}/cancel?reg="
+    by_sms = channel in ("sms", "both")
+    by_email = channel in ("email", "both")
+
+    messages = []
+    for registration in registrations:
+        attendee = registration.attendee
+        variables = {
+            "first_name": attendee.first_name,
+            "last_name": attendee.last_name,
+            "email": attendee.email,
+            "phone": attendee.phone or "",
+            "cancel_url": f"{cancel_url}{registration.id}",
+        }
+        body_text = body.render(variables)
+        messages.append(BulkMessage(
+            registration_id=registration.id,
+            phone=attendee.phone if by_sms else None,
+            email=attendee.email if by_email else None,
+            body=body_text,
+            subject=subject.render(variables) if subject else None,
+            content_hash=hashlib.sha256(body_text.encode()).hexdigest()[:64],
+        ))
+    return messages
+
+
+async def send_all(messages: list, send) -> list:
+    """Await ``send(message)`` for every message, bulk_notification_concurrency at a time.
+
+    Results come back in message order.
+    """
+    semaphore = asyncio.Semaphore(settings.bulk_notification_concurrency)
+
+    async def _bounded(message):
+        async with semaphore:
+            return await send(message)
+
+    return await asyncio.gather(*(_bounded(message) for message in messages))
+
+
+async def deliver(
+    messages: list[BulkMessage], idempotency_keys: list[str], send_sms, send_batch
+) -> list[tuple[bool | None, bool | None]]:
+    """Send each message's SMS (bounded fan-out) and email (Resend batches) at the same time.
+
+    `idempotency_keys` holds one Resend key per message. Returns
+    ``(sms_success, email_success)`` per message, None for a channel not sent.
+    """
+    sms_messages = [message for message in messages if message.phone]
+    emailed = [(message, key) for message, key in zip(messages, idempotency_keys) if message.email]
+    sms_results, email_results = await asyncio.gather(
+        send_all(sms_messages, lambda message: send_sms(message.phone, message.body)),
+        send_batch(
+            [email_service.branded_email(message.email, message.subject, message.body) for message, _ in emailed],
+            [key for _, key in emailed],
+        ),
+    )
+    sms_by_id = {message.registration_id: success for message, success in zip(sms_messages, sms_results)}
+    email_by_id = {message.registration_id: success for (message, _), success in zip(emailed, email_results)}
+    return [(sms_by_id.get(message.registration_id), email_by_id.get(message.registration_id)) for message in messages]
+
+
+def result_rows(
+    message: BulkMessage,
+    sms_success: bool | None,
+    email_success: bool | None,
+    template_key: str,
+    sent_by: UUID | None,
+) -> tuple[list[dict], list[dict]]:
+    """NotificationLog and SmsConversation insert values for one sent message."""
+    logs = [
+        {
+            "registration_id": message.registration_id,
+            "channel": channel,
+            "template_id": template_key,
+            "content_hash": message.content_hash,
+            "status": NotificationStatus.sent if success else NotificationStatus.failed,
+        }
+        for channel, success in ((NotificationChannel.sms, sms_success), (NotificationChannel.email, email_success))
+        if success is not None
+    ]
+    conversations = []
+    if sms_success is not None:
+        conversations.append({
+            "registration_id": message.registration_id,
+            "attendee_phone": message.phone,
+            "direction": SmsDirection.outbound,
+            "body": message.body,
+            "sent_by": sent_by,
+        })
+    return logs, conversations
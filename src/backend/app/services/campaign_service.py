@@ -0,0 +1,354 @@
+"""Campaigns — bulk messages sent in the background, resumable from their last chunk.
+
+``create()`` validates the message like the bulk endpoint, snapshots its
+text and writes one CampaignRecipient per attendee (attendees who already
+received this message are ``skipped``). The worker
+(app/tasks/campaign_worker.py) claims a campaign with a lease and sends its
+pending recipients ``campaign_chunk_size`` at a time. A chunk's recipient
+statuses, NotificationLog / SmsConversation rows and campaign counters
+commit in one transaction — the checkpoint.
+
+Every claim stores a new ``lease_token``. A worker renews its lease before
+sending a chunk and checkpoints it with UPDATEs conditional on that token,
+so a worker whose lease was taken over sends nothing more and its late
+checkpoint rolls back instead of recording the chunk twice.
+
+A worker that dies mid-chunk lets its lease lapse; the next claim resends
+only that chunk (pending recipients are taken in id order, so normally the
+same emails under the same Resend batch idempotency key). A cancelled
+campaign stops after the chunk in flight and ``resume()`` continues from
+the same place.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import and_
+from sqlalchemy import event as sa_event
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, joinedload, lazyload
+
+from app.config import settings
+from app.database import async_session, dialect_insert
+from app.models.campaign import Campaign, CampaignRecipient, CampaignRecipientStatus, CampaignStatus
+from app.models.event import Event
+from app.models.notification import NotificationLog
+from app.models.registration import Registration
+from app.models.sms_conversation import SmsConversation
+from app.models.user import User
+from app.schemas.sms_conversations import BulkNotificationRequest
+from app.services import bulk_messaging, email_service, sms_service
+from app.template_cache import compile_text
+
+logger = logging.getLogger(__name__)
+
+# Set after a transaction that queued or resumed a campaign commits
+_work_available = asyncio.Event()
+
+
+def notify() -> None:
+    """Wake the idle campaign worker (same process)."""
+    _work_available.set()
+
+
+async def wait_for_work(timeout: float) -> None:
+    """Sleep until notify() is called or `timeout` seconds pass."""
+    try:
+        await asyncio.wait_for(_work_available.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    _work_available.clear()
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session) -> None:
+    if session.info.pop("campaign_queued", False):
+        notify()
+
+
+async def _find_queued(db: AsyncSession, event_id: uuid.UUID, idempotency_key: str) -> Campaign | None:
+    return (
+        await db.execute(
+            select(Campaign).where(
+                Campaign.event_id == event_id, Campaign.idempotency_key == idempotency_key
+            )
+        )
+    ).scalar_one_or_none()
+
+
+async def create(
+    db: AsyncSession, event_id: uuid.UUID, data: BulkNotificationRequest, user: User
+) -> Campaign:
+    """Queue a campaign for `data`, or return the one already queued for the same message."""
+    bulk = await bulk_messaging.resolve_request(db, event_id, data)
+    existing = await _find_queued(db, event_id, bulk.idempotency_key)
+    if existing:
+        return existing
+
+    registrations = await bulk_messaging.load_recipients(db, event_id, bulk_messaging.RECIPIENT_STATUSES)
+    registration_ids = [reg.id for reg in registrations]
+    already_sent = await bulk_messaging.already_sent(db, bulk.template_key, registration_ids)
+
+    # A concurrent request for the same message may have queued it since the check above
+    inserted = await db.execute(
+        dialect_insert(db, Campaign)
+        .values(
+            id=uuid.uuid4(),
+            event_id=event_id,
+            channel=bulk.channel,
+            template_id=bulk.template.id if bulk.template else None,
+            body=bulk.body,
+            subject=bulk.subject,
+            idempotency_key=bulk.idempotency_key,
+            status=CampaignStatus.pending,
+            total=len(registration_ids),
+            sent_count=0,
+            failed_count=0,
+            skipped_count=len(already_sent),
+            created_by=user.id,
+        )
+        .on_conflict_do_nothing(index_elements=["event_id", "idempotency_key"])
+        .returning(Campaign.id)
+    )
+    campaign_id = inserted.scalar_one_or_none()
+    if campaign_id is None:
+        return await _find_queued(db, event_id, bulk.idempotency_key)
+    campaign = await db.get(Campaign, campaign_id)
+    if registration_ids:
+        await db.execute(insert(CampaignRecipient), [
+            {
+                "id": uuid.uuid4(),
+                "campaign_id": campaign.id,
+                "registration_id": registration_id,
+                "status": (
+                    CampaignRecipientStatus.skipped
+                    if registration_id in already_sent
+                    else CampaignRecipientStatus.pending
+                ),
+            }
+            for registration_id in registration_ids
+        ])
+    db.info["campaign_queued"] = True
+    logger.info(
+        "Queued campaign %s for event %s (channel=%s): %d recipients, %d already sent",
+        campaign.id, event_id, bulk.channel, campaign.total, campaign.skipped_count,
+    )
+    return campaign
+
+
+def cancel(campaign: Campaign) -> None:
+    """Stop `campaign` after the chunk in flight. 409 once it has finished."""
+    if campaign.status not in (CampaignStatus.pending, CampaignStatus.running):
+        raise HTTPException(status_code=409, detail=f"Campaign is already {campaign.status.value}")
+    campaign.status = CampaignStatus.cancelled
+    campaign.lease_expires_at = None
+
+
+def resume(db: AsyncSession, campaign: Campaign) -> None:
+    """Queue a cancelled campaign again; it continues from its last checkpoint."""
+    if campaign.status != CampaignStatus.cancelled:
+        raise HTTPException(status_code=409, detail="Only a cancelled campaign can be resumed")
+    campaign.status = CampaignStatus.pending
+    db.info["campaign_queued"] = True
+
+
+async def claim_next(db: AsyncSession) -> tuple[uuid.UUID, uuid.UUID] | None:
+    """Lease the oldest pending campaign, or a running one whose worker's lease lapsed.
+
+    Returns ``(campaign id, lease token)``. The lease is committed
+    immediately so the row lock is held only for the claim.
+    """
+    now = datetime.now(timezone.utc)
+    lease_token = uuid.uuid4()
+    candidates = (
+        select(Campaign.id)
+        .where(
+            or_(
+                Campaign.status == CampaignStatus.pending,
+                and_(Campaign.status == CampaignStatus.running, Campaign.lease_expires_at <= now),
+            )
+        )
+        .order_by(Campaign.created_at)
+        .limit(1)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    result = await db.execute(
+        update(Campaign)
+        .where(Campaign.id.in_(candidates.scalar_subquery()))
+        .values(
+            status=CampaignStatus.running,
+            lease_expires_at=now + timedelta(seconds=settings.campaign_lease_seconds),
+            lease_token=lease_token,
+            started_at=func.coalesce(Campaign.started_at, now),
+        )
+        .returning(Campaign.id)
+        .execution_options(synchronize_session=False)
+    )
+    campaign_id = result.scalar_one_or_none()
+    await db.commit()
+    return (campaign_id, lease_token) if campaign_id else None
+
+
+async def _hold_lease(db: AsyncSession, campaign_id: uuid.UUID, lease_token: uuid.UUID, **values) -> bool:
+    """Renew the lease and apply `values` if `lease_token` still holds it. False if it was taken over."""
+    result = await db.execute(
+        update(Campaign)
+        .where(Campaign.id == campaign_id, Campaign.lease_token == lease_token)
+        .values(
+            lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.campaign_lease_seconds),
+            **values,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:
+        return True
+    await db.rollback()
+    logger.warning("Campaign %s: lease taken over by another worker, stopping", campaign_id)
+    return False
+
+
+async def run_chunk(
+    campaign_id: uuid.UUID, lease_token: uuid.UUID, session_factory: async_sessionmaker = async_session
+) -> bool:
+    """Send the next chunk of a campaign claimed with `lease_token` and checkpoint it.
+
+    Returns False once the campaign is finished, no longer running or no
+    longer leased to this worker.
+    """
+    async with session_factory() as db:
+        campaign = await db.get(Campaign, campaign_id)
+        if (
+            campaign is None
+            or campaign.status != CampaignStatus.running
+            or campaign.lease_token != lease_token
+        ):
+            return False
+
+        recipients = list(
+            (
+                await db.execute(
+                    select(CampaignRecipient)
+                    .where(
+                        CampaignRecipient.campaign_id == campaign_id,
+                        CampaignRecipient.status == CampaignRecipientStatus.pending,
+                    )
+                    .order_by(CampaignRecipient.id)
+                    .limit(settings.campaign_chunk_size)
+                )
+            ).scalars().all()
+        )
+        now = datetime.now(timezone.utc)
+        if not recipients:
+            result = await db.execute(
+                update(Campaign)
+                .where(Campaign.id == campaign_id, Campaign.lease_token == lease_token)
+                .values(status=CampaignStatus.completed, completed_at=now, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if result.rowcount != 1:
+                return False
+            logger.info(
+                "Campaign %s completed: %d sent, %d failed, %d skipped",
+                campaign_id, campaign.sent_count, campaign.failed_count, campaign.skipped_count,
+            )
+            return False
+
+        event = await db.get(Event, campaign.event_id)
+        registrations = {
+            reg.id: reg
+            for reg in (
+                await db.execute(
+                    select(Registration)
+                    .options(joinedload(Registration.attendee), lazyload("*"))
+                    .where(Registration.id.in_([r.registration_id for r in recipients]))
+                )
+            ).scalars()
+        }
+        reachable = []
+        for recipient in recipients:
+            registration = registrations.get(recipient.registration_id)
+            if registration is None or registration.attendee is None:
+                recipient.status = CampaignRecipientStatus.failed
+                continue
+            reachable.append(recipient)
+        # The snapshot text is the same for every chunk, so it compiles once
+        messages = bulk_messaging.render_messages(
+            [registrations[recipient.registration_id] for recipient in reachable],
+            event,
+            campaign.channel,
+            compile_text(campaign.body),
+            compile_text(campaign.subject) if campaign.subject else None,
+        )
+        sendable = list(zip(reachable, messages))
+
+        # Cover this chunk's sends with the lease, and release the connection meanwhile
+        if not await _hold_lease(db, campaign_id, lease_token):
+            return False
+        await db.commit()
+        results = await bulk_messaging.deliver(
+            [message for _, message in sendable],
+            [f"campaign/{recipient.id}" for recipient, _ in sendable],
+            sms_service.send_sms,
+            email_service.send_batch,
+        )
+
+        template_key = f"bulk:{campaign.idempotency_key}"
+        logs = []
+        conversations = []
+        sent = 0
+        now = datetime.now(timezone.utc)
+        for (recipient, message), (sms_success, email_success) in zip(sendable, results):
+            message_logs, message_conversations = bulk_messaging.result_rows(
+                message, sms_success, email_success, template_key, campaign.created_by
+            )
+            logs.extend(message_logs)
+            conversations.extend(message_conversations)
+            if sms_success or email_success:
+                recipient.status = CampaignRecipientStatus.sent
+                recipient.sent_at = now
+                sent += 1
+            else:
+                recipient.status = CampaignRecipientStatus.failed
+
+        # Checkpoint only while still leased; the counter UPDATE also locks the
+        # campaign row until commit, so no other worker can claim it meanwhile
+        if not await _hold_lease(
+            db,
+            campaign_id,
+            lease_token,
+            sent_count=Campaign.sent_count + sent,
+            failed_count=Campaign.failed_count + len(recipients) - sent,
+        ):
+            return False
+        if logs:
+            await db.execute(insert(NotificationLog), logs)
+        if conversations:
+            await db.execute(insert(SmsConversation), conversations)
+        await db.commit()
+    return True
+
+
+async def process_next(session_factory: async_sessionmaker = async_session) -> bool:
+    """Claim one campaign and send it to the end (or until cancelled). False when idle."""
+    async with session_factory() as db:
+        claim = await claim_next(db)
+    if claim is None:
+        return False
+    campaign_id, lease_token = claim
+    while await run_chunk(campaign_id, lease_token, session_factory):
+        pass
+    return True
+
+
+async def process_pending(session_factory: async_sessionmaker = async_session) -> int:
+    """Run campaigns until none is due. Returns the number processed."""
+    processed = 0
+    while await process_next(session_factory):
+        processed += 1
+    return processed
@@ -0,0 +1,318 @@
+"""Seat accounting backed by the capacity_counters table.
+
+Every registration in a seat-holding status occupies one seat on its event
+and one on each selected sub-event. Claims are a single conditional
+``UPDATE ... SET taken = taken + n WHERE taken + n <= capacity RETURNING``,
+so they cannot oversell under concurrent signups and never count rows.
+Other status transitions (webhooks, admin edits) adjust the counters
+unconditionally via record_status_change().
+
+Counters are seeded lazily from a one-time COUNT the first time an event or
+sub-event is touched, so events created before the table existed (or by
+seed scripts) need no backfill step.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import case, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import http_cache
+from app.config import settings
+from app.database import dialect_insert
+from app.models.audit import AuditLog
+from app.models.base import gen_uuid
+from app.models.capacity_counter import CapacityCounter
+from app.models.registration import Registration, RegistrationStatus
+from app.models.registration_sub_event import RegistrationSubEvent
+
+logger = logging.getLogger(__name__)
+
+# Leases are swept this long after expiry so the matching Stripe session
+# (whose expires_at may be clamped slightly later) is always dead first.
+LEASE_GRACE = timedelta(minutes=2)
+
+SEAT_HOLDING_STATUSES = (
+    RegistrationStatus.pending_payment,
+    RegistrationStatus.cash_pending,
+    RegistrationStatus.complete,
+)
+
+
+def holds_seat(status: RegistrationStatus | str | None) -> bool:
+    return status in SEAT_HOLDING_STATUSES
+
+
+def _scope(event_id: UUID, sub_event_id: UUID | None = None) -> list:
+    if sub_event_id is None:
+        return [CapacityCounter.event_id == event_id, CapacityCounter.sub_event_id.is_(None)]
+    return [CapacityCounter.sub_event_id == sub_event_id]
+
+
+async def _get_state(
+    db: AsyncSession, event_id: UUID, sub_event_id: UUID | None = None
+):
+    """Read a counter's (capacity, taken, version) row (None if it has not been seeded yet).
+
+    Selects columns rather than the entity so a stale identity-map copy can
+    never mask updates made by the UPDATE statements below.
+    """
+    result = await db.execute(
+        select(CapacityCounter.capacity, CapacityCounter.taken, CapacityCounter.version).where(
+            *_scope(event_id, sub_event_id)
+        )
+    )
+    return result.first()
+
+
+async def _seed_event_counter(db: AsyncSession, event_id: UUID, capacity: int | None) -> None:
+    """Create the event-level counter from the current registration count."""
+    taken = (
+        await db.execute(
+            select(func.count(Registration.id)).where(
+                Registration.event_id == event_id,
+                Registration.status.in_(SEAT_HOLDING_STATUSES),
+            )
+        )
+    ).scalar() or 0
+    await db.execute(
+        dialect_insert(db, CapacityCounter)
+        .values(event_id=event_id, sub_event_id=None, capacity=capacity, taken=taken)
+        .on_conflict_do_nothing()
+    )
+
+
+async def _seed_sub_event_counters(db: AsyncSession, event_id: UUID, sub_events: list) -> None:
+    """Create counters for the given sub-events from one grouped COUNT."""
+    ids = [se.id for se in sub_events]
+    counts_result = await db.execute(
+        select(
+            RegistrationSubEvent.sub_event_id,
+            func.count(func.distinct(RegistrationSubEvent.registration_id)),
+        )
+        .join(Registration, Registration.id == RegistrationSubEvent.registration_id)
+        .where(
+            RegistrationSubEvent.sub_event_id.in_(ids),
+            Registration.status.in_(SEAT_HOLDING_STATUSES),
+        )
+        .group_by(RegistrationSubEvent.sub_event_id)
+    )
+    counts = {row[0]: row[1] for row in counts_result}
+    await db.execute(
+        dialect_insert(db, CapacityCounter)
+        .values([
+            {
+                "id": gen_uuid(),
+                "event_id": event_id,
+                "sub_event_id": se.id,
+                "capacity": se.capacity,
+                "taken": counts.get(se.id, 0),
+            }
+            for se in sub_events
+        ])
+        .on_conflict_do_nothing()
+    )
+
+
+def _claim_stmt(event_id: UUID, sub_event_id: UUID | None, seats: int):
+    return (
+        update(CapacityCounter)
+        .where(
+            *_scope(event_id, sub_event_id),
+            or_(
+                CapacityCounter.capacity.is_(None),
+                CapacityCounter.taken + seats <= CapacityCounter.capacity,
+            ),
+        )
+        .values(taken=CapacityCounter.taken + seats, version=CapacityCounter.version + 1)
+        .returning(CapacityCounter.taken)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def claim_event_seats(db: AsyncSession, event, seats: int = 1) -> bool:
+    """Atomically claim `seats` on the event. Returns False if it would oversell."""
+    stmt = _claim_stmt(event.id, None, seats)
+    row = (await db.execute(stmt)).first()
+    if row is None and await _get_state(db, event.id) is None:
+        await _seed_event_counter(db, event.id, event.capacity)
+        row = (await db.execute(stmt)).first()
+    if row is not None:
+        http_cache.invalidate_event(event.id)
+    return row is not None
+
+
+async def claim_sub_event_seats(db: AsyncSession, event_id: UUID, seats_by_sub_event: dict) -> list:
+    """Claim seats on several sub-events of one event.
+
+    `seats_by_sub_event` maps SubEvent -> seat count. Returns the sub-events
+    that could not be claimed (full); the caller is expected to abort the
+    transaction in that case, which also undoes the successful claims.
+    """
+    full = []
+    unseeded = []
+    for se, seats in seats_by_sub_event.items():
+        row = (await db.execute(_claim_stmt(event_id, se.id, seats))).first()
+        if row is None:
+            unseeded.append(se)
+
+    if unseeded:
+        existing = await db.execute(
+            select(CapacityCounter.sub_event_id).where(
+                CapacityCounter.sub_event_id.in_([se.id for se in unseeded])
+            )
+        )
+        existing_ids = set(existing.scalars().all())
+        missing = [se for se in unseeded if se.id not in existing_ids]
+        full = [se for se in unseeded if se.id in existing_ids]
+        if missing:
+            await _seed_sub_event_counters(db, event_id, missing)
+            for se in missing:
+                row = (await db.execute(_claim_stmt(event_id, se.id, seats_by_sub_event[se]))).first()
+                if row is None:
+                    full.append(se)
+    http_cache.invalidate_event(event_id)
+    return full
+
+
+async def availability(db: AsyncSession, event) -> tuple[int | None, int | None, int]:
+    """Return (capacity, seats remaining, counter version) for the event.
+
+    Capacity comes from the counter row, the value claims are checked
+    against, not from `event` (possibly an event catalog snapshot taken
+    before an edit). Remaining is None when the event is uncapped. The
+    version changes whenever the event-level counter does, so callers can
+    use it as a cheap cache validator.
+    """
+    state = await _get_state(db, event.id)
+    if state is None:
+        await _seed_event_counter(db, event.id, event.capacity)
+        state = await _get_state(db, event.id)
+    remaining = state.capacity - state.taken if state.capacity is not None else None
+    return state.capacity, remaining, state.version
+
+
+async def seats_remaining(db: AsyncSession, event) -> int | None:
+    """Return remaining event seats (None when the event is uncapped)."""
+    _, remaining, _ = await availability(db, event)
+    return remaining
+
+
+async def _adjust(db: AsyncSession, event_id: UUID, sub_event_id: UUID | None, delta: int) -> None:
+    """Apply an unconditional delta, clamped at zero. No-op if the counter is unseeded."""
+    new_taken = CapacityCounter.taken + delta
+    await db.execute(
+        update(CapacityCounter)
+        .where(*_scope(event_id, sub_event_id))
+        .values(taken=case((new_taken < 0, 0), else_=new_taken), version=CapacityCounter.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    http_cache.invalidate_event(event_id)
+
+
+async def record_status_change(
+    db: AsyncSession,
+    event_id: UUID,
+    registration_ids: list[UUID],
+    old_status: RegistrationStatus | str | None,
+    new_status: RegistrationStatus | str,
+) -> None:
+    """Keep counters in step when registrations of one event change status.
+
+    Only transitions into or out of a seat-holding status touch the counters.
+    No capacity check is applied — a late Stripe payment or an operator
+    override must be recorded even when it oversubscribes the event.
+    """
+    was_holding = holds_seat(old_status)
+    now_holding = holds_seat(new_status)
+    if was_holding == now_holding:
+        return
+    await _shift_registrations(db, event_id, registration_ids, 1 if now_holding else -1)
+
+
+async def release_registrations(db: AsyncSession, event_id: UUID, registration_ids: list[UUID]) -> None:
+    """Return the seats held by seat-holding registrations that are about to be deleted."""
+    await _shift_registrations(db, event_id, registration_ids, -1)
+
+
+async def _shift_registrations(
+    db: AsyncSession, event_id: UUID, registration_ids: list[UUID], sign: int
+) -> None:
+    if not registration_ids:
+        return
+    await _adjust(db, event_id, None, sign * len(registration_ids))
+
+    sub_counts = await db.execute(
+        select(RegistrationSubEvent.sub_event_id, func.count(RegistrationSubEvent.id))
+        .where(RegistrationSubEvent.registration_id.in_(registration_ids))
+        .group_by(RegistrationSubEvent.sub_event_id)
+    )
+    for sub_event_id, count in sub_counts.all():
+        await _adjust(db, event_id, sub_event_id, sign * count)
+
+
+async def set_capacity(
+    db: AsyncSession, event_id: UUID, capacity: int | None, sub_event_id: UUID | None = None
+) -> None:
+    """Propagate an edited event/sub-event capacity to its counter."""
+    await db.execute(
+        update(CapacityCounter)
+        .where(*_scope(event_id, sub_event_id))
+        .values(capacity=capacity, version=CapacityCounter.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    http_cache.invalidate_event(event_id)
+
+
+async def delete_sub_event_counter(db: AsyncSession, sub_event_id: UUID) -> None:
+    await db.execute(delete(CapacityCounter).where(CapacityCounter.sub_event_id == sub_event_id))
+
+
+def lease_expiry() -> datetime:
+    """Expiry for a new pending_payment seat lease."""
+    return datetime.now(timezone.utc) + timedelta(minutes=settings.seat_lease_minutes)
+
+
+async def release_expired_leases(db: AsyncSession) -> int:
+    """Expire pending_payment registrations whose seat lease has lapsed.
+
+    One set-based UPDATE ... RETURNING flips every lapsed registration, then
+    counters are adjusted per event and audit rows added in one batch.
+    Returns the number of registrations released.
+    """
+    cutoff = datetime.now(timezone.utc) - LEASE_GRACE
+    result = await db.execute(
+        update(Registration)
+        .where(
+            Registration.status == RegistrationStatus.pending_payment,
+            Registration.lease_expires_at.is_not(None),
+            Registration.lease_expires_at < cutoff,
+        )
+        .values(status=RegistrationStatus.expired)
+        .returning(Registration.id, Registration.event_id)
+        .execution_options(synchronize_session=False)
+    )
+    by_event: dict[UUID, list[UUID]] = defaultdict(list)
+    for registration_id, event_id in result.all():
+        by_event[event_id].append(registration_id)
+
+    for event_id, ids in by_event.items():
+        await record_status_change(
+            db, event_id, ids, RegistrationStatus.pending_payment, RegistrationStatus.expired
+        )
+    db.add_all([
+        AuditLog(
+            entity_type="registration",
+            entity_id=registration_id,
+            action="status_change",
+            actor="system/lease",
+            old_value={"status": "pending_payment"},
+            new_value={"status": "expired"},
+        )
+        for ids in by_event.values()
+        for registration_id in ids
+    ])
+    return sum(len(ids) for ids in by_event.values())
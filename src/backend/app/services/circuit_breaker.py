@@ -0,0 +1,173 @@
+"""Per-provider circuit breakers for Stripe, Resend and Twilio.
+
+Each provider's calls go through its breaker:
+
+* **closed** — calls run normally. A call that raises a provider failure,
+  or takes longer than ``circuit_slow_call_seconds``, counts as a failure; a
+  fast success resets the count. ``circuit_failure_threshold`` consecutive
+  failures open the circuit.
+* **open** — calls fail instantly with CircuitOpenError for
+  ``circuit_reset_seconds``, so an outage costs callers nothing instead of a
+  timeout each (a bulk send or the reminders job finishes in seconds).
+* **half-open** — after the reset period one probe call is let through; the
+  others keep failing fast. A healthy probe closes the circuit, a failed one
+  re-opens it for another period.
+
+Breakers are per process. Their state is reported by ``/health/deep``.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Awaitable, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        slow_call_seconds: float,
+        reset_seconds: float,
+        is_failure: Callable[[BaseException], bool] = lambda exc: True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+        self.is_failure = is_failure
+        self.clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.last_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    def _acquire(self) -> None:
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        retry_after = max(self.reset_seconds - (self.clock() - self._opened_at), 0.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _open(self) -> None:
+        if self._state != OPEN:
+            logger.warning("%s circuit opened after %d failures: %s", self.name, self._failures, self.last_error)
+        self._state = OPEN
+        self._opened_at = self.clock()
+
+    def _record(self, failed: bool) -> None:
+        probe, self._probing = self._probing, False
+        if not failed:
+            if self._state != CLOSED:
+                logger.info("%s circuit closed", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            return
+        self._failures += 1
+        if probe or self._failures >= self.failure_threshold:
+            self._open()
+
+    async def call(self, fn: Callable[..., Awaitable], *args, **kwargs):
+        """Await ``fn(*args, **kwargs)`` through the breaker.
+
+        Raises CircuitOpenError without calling `fn` while the circuit is open.
+        """
+        self._acquire()
+        started = self.clock()
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            self._probing = False
+            raise
+        except Exception as exc:
+            failed = self.is_failure(exc)
+            if failed:
+                self.last_error = f"{type(exc).__name__}: {exc}"[:200]
+            self._record(failed)
+            raise
+        elapsed = self.clock() - started
+        if elapsed > self.slow_call_seconds:
+            self.last_error = f"slow call: {elapsed:.1f}s"
+            self._record(True)
+        else:
+            self._record(False)
+        return result
+
+    async def run(self, executor: Executor, fn: Callable, timeout: float | None = None):
+        """Run blocking `fn()` on `executor` through the breaker, giving up after `timeout`.
+
+        A timed-out call keeps its worker thread until the SDK returns, but the
+        caller (and the event loop) moves on immediately.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def _run():
+            return await asyncio.wait_for(loop.run_in_executor(executor, fn), timeout)
+
+        return await self.call(_run)
+
+    def snapshot(self) -> dict:
+        state = self.state
+        snapshot = {"state": state, "consecutive_failures": self._failures}
+        if state != CLOSED:
+            snapshot["last_error"] = self.last_error
+        if state == OPEN:
+            snapshot["retry_in_seconds"] = round(
+                max(self.reset_seconds - (self.clock() - self._opened_at), 0.0), 1
+            )
+        return snapshot
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def register(name: str, is_failure: Callable[[BaseException], bool] = lambda exc: True) -> CircuitBreaker:
+    """Create (or return) the named provider breaker with the configured thresholds."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.circuit_failure_threshold,
+            slow_call_seconds=settings.circuit_slow_call_seconds,
+            reset_seconds=settings.circuit_reset_seconds,
+            is_failure=is_failure,
+        )
+    return _breakers[name]
+
+
+def states() -> dict[str, dict]:
+    return {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())}
+
+
+def reset() -> None:
+    for breaker in _breakers.values():
+        breaker.reset()
@@ -1,11 +1,15 @@
+import functools
+import hashlib
 import html
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import resend
 
 from app.config import settings
 from app.models.event import Event
 from app.models.registration import Registration
+from app.services.circuit_breaker import CircuitOpenError, register
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +17,73 @@ resend.api_key = settings.resend_api_key
 
 FROM_EMAIL = f"Just Love Forest <{settings.from_email}>"
 
+# Resend's limit on emails per /emails/batch request
+BATCH_SIZE = 100
+
+# The Resend SDK is synchronous; its calls run here, off the event loop. The
+# pool size also caps concurrent Resend requests per worker process.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.resend_max_concurrency, thread_name_prefix="resend"
+)
+
+breaker = register("resend")
+
+
+async def _send_email(params: dict, idempotency_key: str | None = None) -> bool:
+    """Send through Resend's circuit breaker. False (without a call) while it is open.
+
+    Resend drops a repeat send with the same `idempotency_key` (24h window).
+    """
+    args = (params, {"idempotency_key": idempotency_key}) if idempotency_key else (params,)
+    try:
+        await breaker.run(
+            _executor,
+            functools.partial(resend.Emails.send, *args),
+            timeout=settings.resend_timeout_seconds,
+        )
+    except CircuitOpenError:
+        logger.warning("Resend circuit open — not sending %r to %s", params["subject"], params["to"])
+        return False
+    return True
+
+
+async def send_batch(emails: list[dict], idempotency_keys: list[str] | None = None) -> list[bool]:
+    """Send personalized emails (Resend send params) BATCH_SIZE per request.
+
+    Returns one result per email, in order. Batches are validated
+    permissively, so one bad address fails only its own email. With
+    `idempotency_keys` (one per email) each request's key is derived from
+    its emails' keys: Resend only drops a repeat of exactly the same chunk,
+    so a caller that may regroup emails on retry should resend them one by
+    one with their own keys.
+    """
+    results: list[bool] = []
+    for start in range(0, len(emails), BATCH_SIZE):
+        chunk = emails[start:start + BATCH_SIZE]
+        options: dict = {"batch_validation": "permissive"}
+        if idempotency_keys:
+            joined = "\n".join(idempotency_keys[start:start + BATCH_SIZE])
+            options["idempotency_key"] = f"batch/{hashlib.sha256(joined.encode()).hexdigest()}"
+        try:
+            response = await breaker.run(
+                _executor,
+                functools.partial(resend.Batch.send, chunk, options),
+                timeout=settings.resend_timeout_seconds,
+            )
+        except CircuitOpenError:
+            logger.warning("Resend circuit open — not sending a batch of %d emails", len(chunk))
+            results.extend([False] * len(chunk))
+            continue
+        except Exception:
+            logger.exception("Failed to send a batch of %d emails", len(chunk))
+            results.extend([False] * len(chunk))
+            continue
+        rejected = {error["index"] for error in response.get("errors") or []}
+        for error in response.get("errors") or []:
+            logger.warning("Resend rejected %s: %s", chunk[error["index"]]["to"], error["message"])
+        results.extend(index not in rejected for index in range(len(chunk)))
+    return results
+
 
 def _base_template(body_html: str) -> str:
     """Wrap body content in the branded JLF email layout."""
@@ -57,8 +128,8 @@ def _base_template(body_html: str) -> str:
 </html>"""
 
 
-async def send_confirmation_email(registration: Registration, event: Event) -> bool:
-    """Send registration confirmation email."""
+def confirmation_email(registration: Registration, event: Event) -> dict:
+    """Resend params for a registration confirmation email."""
     attendee = registration.attendee
     event_date_str = event.event_date.strftime("%B %d, %Y")
     event_time_str = event.event_date.strftime("%I:%M %p")
@@ -82,18 +153,22 @@ async def send_confirmation_email(registration: Registration, event: Event) -> b
   We look forward to seeing you at Just Love Forest!
 </p>"""
 
+    return {
+        "from": FROM_EMAIL,
+        "to": [attendee.email],
+        "subject": f"You're confirmed for {event.name}!",
+        "html": _base_template(body),
+    }
+
+
+async def send_confirmation_email(
+    registration: Registration, event: Event, idempotency_key: str | None = None
+) -> bool:
+    """Send registration confirmation email."""
     try:
-        resend.Emails.send(
-            {
-                "from": FROM_EMAIL,
-                "to": [attendee.email],
-                "subject": f"You're confirmed for {event.name}!",
-                "html": _base_template(body),
-            }
-        )
-        return True
+        return await _send_email(confirmation_email(registration, event), idempotency_key)
     except Exception:
-        logger.exception("Failed to send confirmation email to %s", attendee.email)
+        logger.exception("Failed to send confirmation email to %s", registration.attendee.email)
         return False
 
 
@@ -119,7 +194,7 @@ async def send_magic_link_email(email: str, name: str, token: str) -> bool:
 </p>"""
 
     try:
-        resend.Emails.send(
+        return await _send_email(
             {
                 "from": FROM_EMAIL,
                 "to": [email],
@@ -127,7 +202,6 @@ async def send_magic_link_email(email: str, name: str, token: str) -> bool:
                 "html": _base_template(body),
             }
         )
-        return True
     except Exception:
         logger.exception("Failed to send magic link to %s", email)
         return False
@@ -158,7 +232,7 @@ async def send_reminder_email(registration: Registration, event: Event) -> bool:
 </p>"""
 
     try:
-        resend.Emails.send(
+        return await _send_email(
             {
                 "from": FROM_EMAIL,
                 "to": [attendee.email],
@@ -166,14 +240,13 @@ async def send_reminder_email(registration: Registration, event: Event) -> bool:
                 "html": _base_template(body),
             }
         )
-        return True
     except Exception:
         logger.exception("Failed to send reminder to %s", attendee.email)
         return False
 
 
-async def send_branded_email(to: str, subject: str, body_text: str) -> bool:
-    """Send a branded email with the JLF template wrapper.
+def branded_email(to: str, subject: str, body_text: str) -> dict:
+    """Resend params for a branded email.
 
     body_text is plain text — it will be wrapped in the branded HTML template.
     """
@@ -183,24 +256,27 @@ async def send_branded_email(to: str, subject: str, body_text: str) -> bool:
         for line in body_text.split("\n")
         if line.strip()
     )
+    return {
+        "from": FROM_EMAIL,
+        "to": [to],
+        "subject": subject,
+        "html": _base_template(body_html),
+    }
+
 
+async def send_branded_email(
+    to: str, subject: str, body_text: str, idempotency_key: str | None = None
+) -> bool:
+    """Send a branded email with the JLF template wrapper."""
     try:
-        resend.Emails.send(
-            {
-                "from": FROM_EMAIL,
-                "to": [to],
-                "subject": subject,
-                "html": _base_template(body_html),
-            }
-        )
-        return True
+        return await _send_email(branded_email(to, subject, body_text), idempotency_key=idempotency_key)
     except Exception:
         logger.exception("Failed to send branded email to %s", to)
         return False
 
 
 async def send_admin_cancel_notification(
-    registration: Registration, event: Event, reason: str | None
+    registration: Registration, event: Event, reason: str | None, idempotency_key: str | None = None
 ) -> bool:
     """Send cancellation request notification to admin."""
     attendee = registration.attendee
@@ -224,24 +300,22 @@ async def send_admin_cancel_notification(
 </p>"""
 
     try:
-        resend.Emails.send(
+        return await _send_email(
             {
                 "from": FROM_EMAIL,
                 "to": [settings.from_email],  # Send to the configured admin email
                 "subject": f"Cancel request: {attendee.first_name} {attendee.last_name} — {event.name}",
                 "html": _base_template(body),
-            }
+            },
+            idempotency_key,
         )
-        return True
     except Exception:
         logger.exception("Failed to send admin cancel notification")
         return False
 
 
-async def send_event_reminder_email(
-    registration: Registration, event: Event, reminder_type: str = "1d"
-) -> bool:
-    """Send event reminder email (1 day or 7 day before)."""
+def event_reminder_email(registration: Registration, event: Event, reminder_type: str = "1d") -> dict:
+    """Resend params for an event reminder email (1 day or 7 day before)."""
     attendee = registration.attendee
     event_date_str = event.event_date.strftime("%B %d, %Y")
     meeting_point = html.escape(event.meeting_point_a or "See event details for directions")
@@ -271,18 +345,22 @@ async def send_event_reminder_email(
   Need to cancel? <a href="{cancel_url}" style="color:#2d5a3d;">Submit a cancellation request</a>
 </p>"""
 
+    return {
+        "from": FROM_EMAIL,
+        "to": [attendee.email],
+        "subject": subject,
+        "html": _base_template(body),
+    }
+
+
+async def send_event_reminder_email(
+    registration: Registration, event: Event, reminder_type: str = "1d"
+) -> bool:
+    """Send event reminder email (1 day or 7 day before)."""
     try:
-        resend.Emails.send(
-            {
-                "from": FROM_EMAIL,
-                "to": [attendee.email],
-                "subject": subject,
-                "html": _base_template(body),
-            }
-        )
-        return True
+        return await _send_email(event_reminder_email(registration, event, reminder_type))
     except Exception:
-        logger.exception("Failed to send reminder email to %s", attendee.email)
+        logger.exception("Failed to send reminder email to %s", registration.attendee.email)
         return False
 
 
@@ -314,7 +392,7 @@ async def send_escalation_email(registration: Registration, event: Event) -> boo
 </p>"""
 
     try:
-        resend.Emails.send(
+        return await _send_email(
             {
                 "from": FROM_EMAIL,
                 "to": [attendee.email],
@@ -322,7 +400,6 @@ async def send_escalation_email(registration: Registration, event: Event) -> boo
                 "html": _base_template(body),
             }
         )
-        return True
     except Exception:
         logger.exception("Failed to send escalation email to %s", attendee.email)
         return False
@@ -0,0 +1,202 @@
+"""Read-mostly, in-process catalog of public event data keyed by slug.
+
+Public registration routes resolve events here instead of
+``select(Event)``, which (through the selectin relationships) also pulls
+every registration, sub-event and form link. A snapshot is an immutable copy
+of the event columns plus its sub-events and form links; handlers must treat
+the JSON fields as read-only.
+
+Writes in routers/events.py and routers/sub_events.py call invalidate().
+Every invalidation bumps a generation counter, and a load that raced with an
+invalidation is not stored, so a stale snapshot can never be cached after the
+write that replaced it. Snapshots also expire after
+``event_catalog_ttl_seconds``, which bounds staleness for writes made by
+other worker processes.
+"""
+
+import copy
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as time_of_day
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+
+from app import http_cache
+from app.config import settings
+from app.models.event import Event, EventStatus, PricingModel
+from app.models.sub_event import SubEventPricingModel
+
+
+@dataclass(frozen=True, slots=True)
+class SubEventSnapshot:
+    id: UUID
+    parent_event_id: UUID
+    name: str
+    description: str | None
+    pricing_model: SubEventPricingModel
+    fixed_price_cents: int | None
+    min_donation_cents: int | None
+    stripe_price_id: str | None
+    stripe_product_id: str | None
+    capacity: int | None
+    sort_order: int
+    is_required: bool
+    updated_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class FormLinkSnapshot:
+    id: UUID
+    form_template_id: UUID
+    is_waiver: bool
+    sort_order: int
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class EventSnapshot:
+    id: UUID
+    name: str
+    slug: str
+    description: str | None
+    event_date: datetime
+    event_end_date: datetime | None
+    event_type: str
+    pricing_model: PricingModel
+    fixed_price_cents: int | None
+    min_donation_cents: int | None
+    stripe_price_id: str | None
+    stripe_product_id: str | None
+    capacity: int | None
+    meeting_point_a: str | None
+    meeting_point_b: str | None
+    location_text: str | None
+    zoom_link: str | None
+    allow_cash_payment: bool
+    max_member_discount_slots: int
+    day_of_sms_time: time_of_day | None
+    registration_fields: dict[str, Any] | None
+    notification_templates: dict[str, Any] | None
+    is_recurring: bool
+    recurrence_rule: str | None
+    virtual_meeting_url: str | None
+    admission_rate_per_second: int | None
+    status: EventStatus
+    created_at: datetime
+    updated_at: datetime
+    sub_events: tuple[SubEventSnapshot, ...]
+    form_links: tuple[FormLinkSnapshot, ...]
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == EventStatus.active
+
+
+# slug -> (snapshot, expires at [monotonic])
+_entries: dict[str, tuple[EventSnapshot, float]] = {}
+_slug_by_event_id: dict[UUID, str] = {}
+_generation = 0
+
+
+def _snapshot(event: Event) -> EventSnapshot:
+    return EventSnapshot(
+        id=event.id,
+        name=event.name,
+        slug=event.slug,
+        description=event.description,
+        event_date=event.event_date,
+        event_end_date=event.event_end_date,
+        event_type=event.event_type,
+        pricing_model=event.pricing_model,
+        fixed_price_cents=event.fixed_price_cents,
+        min_donation_cents=event.min_donation_cents,
+        stripe_price_id=event.stripe_price_id,
+        stripe_product_id=event.stripe_product_id,
+        capacity=event.capacity,
+        meeting_point_a=event.meeting_point_a,
+        meeting_point_b=event.meeting_point_b,
+        location_text=event.location_text,
+        zoom_link=event.zoom_link,
+        allow_cash_payment=event.allow_cash_payment,
+        max_member_discount_slots=event.max_member_discount_slots,
+        day_of_sms_time=event.day_of_sms_time,
+        registration_fields=copy.deepcopy(event.registration_fields),
+        notification_templates=copy.deepcopy(event.notification_templates),
+        is_recurring=event.is_recurring,
+        recurrence_rule=event.recurrence_rule,
+        virtual_meeting_url=event.virtual_meeting_url,
+        admission_rate_per_second=event.admission_rate_per_second,
+        status=event.status,
+        created_at=event.created_at,
+        updated_at=event.updated_at,
+        sub_events=tuple(
+            SubEventSnapshot(
+                id=se.id,
+                parent_event_id=se.parent_event_id,
+                name=se.name,
+                description=se.description,
+                pricing_model=se.pricing_model,
+                fixed_price_cents=se.fixed_price_cents,
+                min_donation_cents=se.min_donation_cents,
+                stripe_price_id=se.stripe_price_id,
+                stripe_product_id=se.stripe_product_id,
+                capacity=se.capacity,
+                sort_order=se.sort_order,
+                is_required=se.is_required,
+                updated_at=se.updated_at,
+            )
+            for se in sorted(event.sub_events, key=lambda s: s.sort_order)
+        ),
+        form_links=tuple(
+            FormLinkSnapshot(
+                id=link.id,
+                form_template_id=link.form_template_id,
+                is_waiver=link.is_waiver,
+                sort_order=link.sort_order,
+            )
+            for link in sorted(event.form_links, key=lambda fl: fl.sort_order)
+        ),
+    )
+
+
+async def get_by_slug(db: AsyncSession, slug: str) -> EventSnapshot | None:
+    """Return the event snapshot for `slug`, loading it on a miss (None if no such event)."""
+    entry = _entries.get(slug)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+
+    generation = _generation
+    result = await db.execute(
+        select(Event).where(Event.slug == slug).options(raiseload(Event.registrations))
+    )
+    event = result.scalar_one_or_none()
+    if event is None:
+        return None
+    snapshot = _snapshot(event)
+    # Detach so later queries in this session load a full Event, not this partial one
+    db.expunge(event)
+
+    if generation == _generation:
+        _entries[slug] = (snapshot, time.monotonic() + settings.event_catalog_ttl_seconds)
+        _slug_by_event_id[snapshot.id] = slug
+    return snapshot
+
+
+def invalidate(event_id: UUID) -> None:
+    """Drop the event's snapshot (and derived HTTP validators) after a write."""
+    global _generation
+    _generation += 1
+    slug = _slug_by_event_id.pop(event_id, None)
+    if slug is not None:
+        _entries.pop(slug, None)
+    http_cache.invalidate_event(event_id)
+
+
+def clear() -> None:
+    global _generation
+    _generation += 1
+    _entries.clear()
+    _slug_by_event_id.clear()
@@ -0,0 +1,148 @@
+"""Idempotency-Key support for public POST endpoints.
+
+A client that retries a request with the same ``Idempotency-Key`` header
+gets the stored response of the first attempt back instead of re-running the
+handler (no second Checkout session, no duplicate writes). Only successful
+responses are stored; if the handler raises, the key is released so a retry
+executes normally.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import dialect_insert
+from app.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# An in-flight record older than this is assumed abandoned (worker died) and can be reclaimed
+IN_PROGRESS_TIMEOUT = timedelta(minutes=2)
+
+
+async def _fingerprint(request: Request) -> str:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.url.path.encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+async def _claim(db: AsyncSession, key: str, fingerprint: str) -> IdempotencyKey | None:
+    """Reserve `key` for this request.
+
+    Returns None when the caller owns the key and should run the handler, or
+    the completed record to replay. Raises 409/422 for in-flight or mismatched
+    reuse. Commits so concurrent retries see the reservation immediately.
+    """
+    now = datetime.now(timezone.utc)
+    values = {
+        "fingerprint": fingerprint,
+        "response_status": None,
+        "response_body": None,
+        "created_at": now,
+        "expires_at": now + timedelta(minutes=settings.idempotency_key_ttl_minutes),
+    }
+
+    # Take over a record that expired or whose request never finished
+    reclaimed = await db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.key == key,
+            or_(
+                IdempotencyKey.expires_at < now,
+                and_(
+                    IdempotencyKey.response_status.is_(None),
+                    IdempotencyKey.created_at < now - IN_PROGRESS_TIMEOUT,
+                ),
+            ),
+        )
+        .values(**values)
+        .returning(IdempotencyKey.id)
+        .execution_options(synchronize_session=False)
+    )
+    if reclaimed.first() is None:
+        inserted = await db.execute(
+            dialect_insert(db, IdempotencyKey)
+            .values(key=key, **values)
+            .on_conflict_do_nothing(index_elements=["key"])
+            .returning(IdempotencyKey.id)
+        )
+        if inserted.first() is None:
+            result = await db.execute(
+                select(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .execution_options(populate_existing=True)
+            )
+            record = result.scalar_one()
+            if record.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request",
+                )
+            if record.response_status is None:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                )
+            return record
+    await db.commit()
+    return None
+
+
+async def run(
+    request: Request,
+    db: AsyncSession,
+    handler: Callable[[], Awaitable],
+    status_code: int = 200,
+):
+    """Run `handler` at most once per Idempotency-Key; replay its response otherwise."""
+    key = request.headers.get(HEADER)
+    if not key:
+        return await handler()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=422, detail=f"{HEADER} must be at most {MAX_KEY_LENGTH} characters")
+
+    record = await _claim(db, key, await _fingerprint(request))
+    if record is not None:
+        return JSONResponse(
+            content=record.response_body,
+            status_code=record.response_status,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        result = await handler()
+    except Exception:
+        # Nothing was stored for this attempt — free the key for a retry
+        await db.rollback()
+        await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+        await db.commit()
+        raise
+
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(response_status=status_code, response_body=jsonable_encoder(result))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result
+
+
+async def purge_expired(db: AsyncSession) -> int:
+    """Delete records past their replay window. Returns the number removed."""
+    result = await db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+    )
+    return result.rowcount or 0
@@ -0,0 +1,300 @@
+"""Validation of registration intake_data against the event's form templates.
+
+The registration form submits intake_data namespaced by template:
+``{"<form_template_id>": {"<field id>": value, ...}, ...}``. Each linked
+FormTemplate's ``fields`` are compiled once into a validator (allowed field
+ids, a coercer per field type, a max length) and cached by
+``(template_id, updated_at)``, so editing a template simply misses the cache.
+
+For events with linked templates only those namespaces and their declared
+fields are kept; anything else is dropped. Events without templates keep the
+older free-form behaviour (private keys stripped, strings truncated, depth
+and list length capped). Both paths run in one pass that tracks the compact
+JSON size of the output as it goes and abort as soon as it exceeds the limit,
+so an oversized payload is never walked (or serialized) in full.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import date, datetime
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.form_template import FormTemplate
+
+MAX_SIZE_KB = 10
+
+# Free-form (no template) limits
+_MAX_DEPTH = 2
+_MAX_LIST_ITEMS = 100
+_MAX_STRING = 2000
+_MAX_UNKNOWN = 500
+
+# Default max length per template field type; a field may set "max_length"
+_FIELD_MAX_LENGTH = {
+    "text": 500,
+    "textarea": 2000,
+    "dropdown": 500,
+    "radio": 500,
+    "multi_select": 500,
+    "date": 10,
+}
+
+
+class IntakeTooLarge(ValueError):
+    pass
+
+
+class _Budget:
+    """Running compact-JSON byte count of the sanitized output."""
+
+    __slots__ = ("limit", "used", "max_size_kb")
+
+    def __init__(self, max_size_kb: int):
+        self.max_size_kb = max_size_kb
+        self.limit = max_size_kb * 1024
+        self.used = 0
+
+    def add(self, n: int) -> None:
+        self.used += n
+        if self.used > self.limit:
+            raise IntakeTooLarge(f"intake_data exceeds {self.max_size_kb}KB limit")
+
+    def scalar(self, value: Any) -> Any:
+        if isinstance(value, str):
+            self.add(len(encode_basestring_ascii(value)))
+        elif value is None or isinstance(value, bool):
+            self.add(5 if value is False else 4)
+        else:
+            self.add(len(repr(value)))
+        return value
+
+
+# ── Template validators ──────────────────────────────────────────────
+
+
+@dataclass(frozen=True, slots=True)
+class _FieldSpec:
+    label: str
+    coerce: Callable[[Any, "_FieldSpec"], Any]
+    max_length: int
+    options: frozenset[str] | None
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledTemplate:
+    template_id: str
+    fields: dict[str, _FieldSpec]
+
+
+def _invalid(spec: _FieldSpec) -> ValueError:
+    return ValueError(f'Invalid value for "{spec.label}"')
+
+
+def _as_text(value: Any, spec: _FieldSpec) -> str:
+    if isinstance(value, (dict, list)):
+        raise _invalid(spec)
+    return (value if isinstance(value, str) else str(value))[: spec.max_length]
+
+
+def _as_choice(value: Any, spec: _FieldSpec) -> str:
+    text = _as_text(value, spec)
+    if spec.options is not None and text not in spec.options:
+        raise _invalid(spec)
+    return text
+
+
+def _as_choices(value: Any, spec: _FieldSpec) -> list[str]:
+    if not isinstance(value, list):
+        raise _invalid(spec)
+    return [_as_choice(item, spec) for item in value[:_MAX_LIST_ITEMS]]
+
+
+def _as_bool(value: Any, spec: _FieldSpec) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    raise _invalid(spec)
+
+
+def _as_number(value: Any, spec: _FieldSpec) -> int | float:
+    if isinstance(value, bool):
+        raise _invalid(spec)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            raise _invalid(spec) from None
+        if value.is_integer():
+            return int(value)
+    # nan and ±inf (including overflowing literals like "1e400") aren't valid JSON
+    if isinstance(value, float) and math.isfinite(value):
+        return value
+    raise _invalid(spec)
+
+
+def _as_date(value: Any, spec: _FieldSpec) -> str:
+    if not isinstance(value, str):
+        raise _invalid(spec)
+    try:
+        return date.fromisoformat(value[: spec.max_length]).isoformat()
+    except ValueError:
+        raise _invalid(spec) from None
+
+
+_COERCERS = {
+    "text": _as_text,
+    "textarea": _as_text,
+    "dropdown": _as_choice,
+    "radio": _as_choice,
+    "multi_select": _as_choices,
+    "checkbox": _as_bool,
+    "number": _as_number,
+    "date": _as_date,
+}
+
+
+def compile_template(template_id: UUID | str, fields: list[dict] | None) -> CompiledTemplate:
+    """Compile a template's field definitions into a validator."""
+    specs = {}
+    for field in fields or []:
+        field_id = field.get("id")
+        if not isinstance(field_id, str) or not field_id:
+            continue
+        field_type = field.get("type", "text")
+        options = field.get("options")
+        specs[field_id] = _FieldSpec(
+            label=str(field.get("label") or field_id),
+            coerce=_COERCERS.get(field_type, _as_text),
+            max_length=int(field.get("max_length") or _FIELD_MAX_LENGTH.get(field_type, _MAX_STRING)),
+            options=frozenset(str(o) for o in options) if options else None,
+        )
+    return CompiledTemplate(template_id=str(template_id), fields=specs)
+
+
+# (template_id, updated_at) -> compiled validator
+_compiled: dict[tuple[UUID, datetime], CompiledTemplate] = {}
+_MAX_ENTRIES = 1000
+
+
+async def get_validators(db: AsyncSession, template_ids: list[UUID]) -> dict[str, CompiledTemplate]:
+    """Return compiled validators for the given templates, keyed by str(template id).
+
+    One light query checks each template's updated_at; `fields` are only
+    loaded for templates that are not cached at their current version.
+    """
+    if not template_ids:
+        return {}
+    versions = (
+        await db.execute(
+            select(FormTemplate.id, FormTemplate.updated_at).where(FormTemplate.id.in_(template_ids))
+        )
+    ).all()
+    missing = [key for key in versions if tuple(key) not in _compiled]
+    if missing:
+        rows = await db.execute(
+            select(FormTemplate.id, FormTemplate.updated_at, FormTemplate.fields).where(
+                FormTemplate.id.in_([template_id for template_id, _ in missing])
+            )
+        )
+        if len(_compiled) >= _MAX_ENTRIES:
+            _compiled.clear()
+        for template_id, updated_at, fields in rows:
+            _compiled[(template_id, updated_at)] = compile_template(template_id, fields)
+    return {
+        str(template_id): _compiled[(template_id, updated_at)]
+        for template_id, updated_at in versions
+        if (template_id, updated_at) in _compiled
+    }
+
+
+def clear() -> None:
+    _compiled.clear()
+
+
+# ── Sanitizing ───────────────────────────────────────────────────────
+
+
+def _sanitize_free_form(obj: Any, budget: _Budget, depth: int = 0) -> Any:
+    if depth > _MAX_DEPTH:
+        return budget.scalar("[truncated]")  # Too deep — explicit sentinel instead of null
+    if isinstance(obj, dict):
+        out = {}
+        budget.add(2)  # {}
+        for k, v in obj.items():
+            if not isinstance(k, str) or k.startswith(("_", "$")):
+                continue
+            budget.add(1 if out else 0)  # ,
+            budget.scalar(k)
+            budget.add(1)  # :
+            out[k] = _sanitize_free_form(v, budget, depth + 1)
+        return out
+    if isinstance(obj, list):
+        out = []
+        budget.add(2)  # []
+        for item in obj[:_MAX_LIST_ITEMS]:
+            budget.add(1 if out else 0)
+            out.append(_sanitize_free_form(item, budget, depth + 1))
+        return out
+    if isinstance(obj, str):
+        return budget.scalar(obj[:_MAX_STRING])
+    if obj is None or isinstance(obj, (int, float, bool)):
+        return budget.scalar(obj)
+    return budget.scalar(str(obj)[:_MAX_UNKNOWN])
+
+
+def _sanitize_templated(
+    data: dict, validators: dict[str, CompiledTemplate], budget: _Budget
+) -> dict:
+    out: dict[str, dict] = {}
+    budget.add(2)
+    for template_id, values in data.items():
+        validator = validators.get(template_id) if isinstance(template_id, str) else None
+        if validator is None or not isinstance(values, dict):
+            continue  # Not a template linked to this event
+        budget.add(1 if out else 0)
+        budget.scalar(template_id)
+        budget.add(3)  # :{}
+        section: dict[str, Any] = {}
+        for field_id, value in values.items():
+            spec = validator.fields.get(field_id) if isinstance(field_id, str) else None
+            if spec is None or value is None or value == "":
+                continue
+            coerced = spec.coerce(value, spec)
+            budget.add(1 if section else 0)
+            budget.scalar(field_id)
+            budget.add(1)
+            if isinstance(coerced, list):
+                budget.add(2 + max(len(coerced) - 1, 0))
+                for item in coerced:
+                    budget.scalar(item)
+            else:
+                budget.scalar(coerced)
+            section[field_id] = coerced
+        out[template_id] = section
+    return out
+
+
+def sanitize(
+    data: dict | None,
+    validators: dict[str, CompiledTemplate] | None = None,
+    max_size_kb: int = MAX_SIZE_KB,
+) -> dict:
+    """Sanitize intake_data in one pass. Raises ValueError if invalid or too large.
+
+    With `validators` (the event's linked templates) only declared fields of
+    those templates survive; otherwise the free-form rules apply.
+    """
+    if data is None:
+        return {}
+    budget = _Budget(max_size_kb)
+    if validators:
+        return _sanitize_templated(data, validators, budget)
+    return _sanitize_free_form(data, budget)
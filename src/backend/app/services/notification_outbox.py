@@ -0,0 +1,254 @@
+"""Notification outbox — emails written with the state change, sent by a dispatcher.
+
+Request handlers and webhook handlers never call a provider for these
+notifications. They ``enqueue()`` rows in the transaction that changes the
+registration, so the notification exists if and only if the change
+commits. The dispatcher (app/tasks/notification_dispatcher.py) claims due
+rows in batches, sends them (first-attempt confirmations through Resend's
+batch endpoint, everything else with bounded concurrency) and marks them
+sent.
+
+Claims mirror the Stripe webhook queue (services/stripe_webhooks.py): one
+``UPDATE ... RETURNING`` leases a batch for
+``notification_outbox_claim_timeout_seconds`` (``FOR UPDATE SKIP LOCKED``
+on Postgres), failures retry with exponential backoff until
+``notification_outbox_max_attempts``, and a dispatcher that dies mid-send
+lets its lease lapse.
+
+A batch request's Resend idempotency key covers the whole request, and
+rows are grouped differently each time they are claimed, so a retried row
+is never batched: it is sent on its own under ``outbox/{row id}``, which
+every later retry of it reuses.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import async_session, dialect_insert
+from app.models.notification_outbox import NotificationOutbox
+from app.models.registration import Registration
+from app.services import email_service
+
+logger = logging.getLogger(__name__)
+
+CONFIRMATION = "confirmation"
+ADMIN_CANCEL = "admin_cancel"
+
+_MAX_BACKOFF = timedelta(hours=6)
+
+# Set after a transaction that enqueued rows commits, so the idle dispatcher starts immediately
+_work_available = asyncio.Event()
+
+
+def notify() -> None:
+    """Wake the idle dispatcher (same process)."""
+    _work_available.set()
+
+
+async def wait_for_work(timeout: float) -> None:
+    """Sleep until notify() is called or `timeout` seconds pass."""
+    try:
+        await asyncio.wait_for(_work_available.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    _work_available.clear()
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session) -> None:
+    if session.info.pop("outbox_enqueued", False):
+        notify()
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    registrations: list[Registration],
+    payload: dict | None = None,
+    dedupe: bool = True,
+) -> None:
+    """Add a `kind` notification per registration to `db`'s transaction.
+
+    With `dedupe`, a registration gets at most one notification of each
+    kind (a webhook and reconciliation both completing it enqueue once).
+    """
+    if not registrations:
+        return
+    await db.flush()
+    statement = dialect_insert(db, NotificationOutbox).values([
+        {
+            "id": uuid.uuid4(),
+            "kind": kind,
+            "registration_id": registration.id,
+            "payload": payload,
+            "dedupe_key": f"{kind}:{registration.id}" if dedupe else None,
+        }
+        for registration in registrations
+    ])
+    if dedupe:
+        statement = statement.on_conflict_do_nothing(index_elements=["dedupe_key"])
+    await db.execute(statement)
+    db.info["outbox_enqueued"] = True
+
+
+def _pending(now: datetime):
+    return [
+        NotificationOutbox.sent_at.is_(None),
+        NotificationOutbox.attempts < settings.notification_outbox_max_attempts,
+        or_(NotificationOutbox.next_attempt_at.is_(None), NotificationOutbox.next_attempt_at <= now),
+    ]
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = timedelta(
+        seconds=settings.notification_outbox_retry_base_seconds * 2 ** max(attempts - 1, 0)
+    )
+    return min(delay, _MAX_BACKOFF)
+
+
+async def claim_batch(db: AsyncSession, limit: int) -> list[uuid.UUID]:
+    """Lease up to `limit` due rows, oldest first, and return their ids.
+
+    The lease is committed immediately so row locks are held only for the claim.
+    """
+    now = datetime.now(timezone.utc)
+    candidates = (
+        select(NotificationOutbox.id)
+        .where(*_pending(now))
+        .order_by(NotificationOutbox.created_at)
+        .limit(limit)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    result = await db.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(candidates.scalar_subquery()))
+        .values(
+            attempts=NotificationOutbox.attempts + 1,
+            next_attempt_at=now
+            + timedelta(seconds=settings.notification_outbox_claim_timeout_seconds),
+        )
+        .returning(NotificationOutbox.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = list(result.scalars().all())
+    await db.commit()
+    return ids
+
+
+async def _send_confirmations(
+    rows: list[NotificationOutbox], registrations: dict[uuid.UUID, Registration]
+) -> list[str | None]:
+    """Send first-attempt confirmations in Resend batch requests. Returns an error (or None) per row."""
+    errors: list[str | None] = []
+    built: list[tuple[int, dict]] = []
+    for index, row in enumerate(rows):
+        registration = registrations[row.registration_id]
+        try:
+            built.append((index, email_service.confirmation_email(registration, registration.event)))
+            errors.append(None)
+        except Exception as exc:
+            logger.exception("Outbox %s (%s) could not be rendered", row.id, row.kind)
+            errors.append(f"{type(exc).__name__}: {exc}"[:2000])
+    if built:
+        results = await email_service.send_batch(
+            [email for _, email in built], [f"outbox/{rows[index].id}" for index, _ in built]
+        )
+        for (index, _), sent in zip(built, results):
+            if not sent:
+                errors[index] = "Provider send failed"
+    return errors
+
+
+async def _send(row: NotificationOutbox, registration: Registration) -> bool:
+    key = f"outbox/{row.id}"
+    if row.kind == CONFIRMATION:
+        return await email_service.send_confirmation_email(
+            registration, registration.event, idempotency_key=key
+        )
+    if row.kind == ADMIN_CANCEL:
+        return await email_service.send_admin_cancel_notification(
+            registration, registration.event, (row.payload or {}).get("reason"), idempotency_key=key
+        )
+    raise ValueError(f"Unknown notification kind {row.kind!r}")
+
+
+async def dispatch_batch(session_factory: async_sessionmaker = async_session) -> int:
+    """Claim and send one batch. Returns the number of rows claimed (0 when idle)."""
+    async with session_factory() as db:
+        ids = await claim_batch(db, settings.notification_outbox_batch_size)
+        if not ids:
+            return 0
+        rows = list(
+            (await db.execute(select(NotificationOutbox).where(NotificationOutbox.id.in_(ids))))
+            .scalars().all()
+        )
+        registration_ids = {row.registration_id for row in rows if row.registration_id}
+        registrations = {
+            registration.id: registration
+            for registration in (
+                await db.execute(select(Registration).where(Registration.id.in_(registration_ids)))
+            ).scalars()
+        }
+
+        errors: dict[uuid.UUID, str | None] = {}
+        for row in rows:
+            if row.registration_id not in registrations:
+                logger.warning("Outbox %s: registration %s no longer exists", row.id, row.registration_id)
+                errors[row.id] = None  # nothing left to notify about
+
+        semaphore = asyncio.Semaphore(settings.notification_outbox_concurrency)
+
+        async def _attempt(row: NotificationOutbox) -> str | None:
+            async with semaphore:
+                try:
+                    sent = await _send(row, registrations[row.registration_id])
+                except Exception as exc:
+                    logger.exception("Outbox %s (%s) failed", row.id, row.kind)
+                    return f"{type(exc).__name__}: {exc}"[:2000]
+            return None if sent else "Provider send failed"
+
+        # First-attempt confirmations go out in Resend batch requests; retries
+        # and other kinds one call each, keyed by row
+        confirmations = [
+            row for row in rows if row.id not in errors and row.kind == CONFIRMATION and row.attempts <= 1
+        ]
+        batched = {row.id for row in confirmations}
+        singles = [row for row in rows if row.id not in errors and row.id not in batched]
+        confirmation_errors, single_errors = await asyncio.gather(
+            _send_confirmations(confirmations, registrations),
+            asyncio.gather(*(_attempt(row) for row in singles)),
+        )
+        errors.update(zip((row.id for row in confirmations), confirmation_errors))
+        errors.update(zip((row.id for row in singles), single_errors))
+
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            error = errors[row.id]
+            if error is None:
+                row.sent_at = now
+                row.next_attempt_at = None
+                row.last_error = None
+            else:
+                row.last_error = error
+                row.next_attempt_at = now + _backoff(row.attempts)
+                if row.attempts >= settings.notification_outbox_max_attempts:
+                    logger.error("Outbox %s (%s) gave up after %d attempts", row.id, row.kind, row.attempts)
+        await db.commit()
+    return len(rows)
+
+
+async def dispatch_pending(session_factory: async_sessionmaker = async_session) -> int:
+    """Send batches until nothing is due. Returns the number of rows attempted."""
+    attempted = 0
+    while claimed := await dispatch_batch(session_factory):
+        attempted += claimed
+    return attempted
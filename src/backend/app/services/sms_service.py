@@ -1,15 +1,30 @@
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+from twilio.http import HttpClient
 from twilio.rest import Client
 
 from app.config import settings
+from app.services.circuit_breaker import CircuitOpenError, register
 
 logger = logging.getLogger(__name__)
 
+# The Twilio SDK is synchronous; its calls run here, off the event loop. The
+# pool size also caps concurrent Twilio requests per worker process.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.twilio_max_concurrency, thread_name_prefix="twilio"
+)
+
+breaker = register("twilio")
+
+# Transport override (the provider simulator); None uses Twilio's own
+http_client: HttpClient | None = None
+
 
 def _get_client() -> Client | None:
     if settings.twilio_account_sid and settings.twilio_auth_token:
-        return Client(settings.twilio_account_sid, settings.twilio_auth_token)
+        return Client(settings.twilio_account_sid, settings.twilio_auth_token, http_client=http_client)
     return None
 
 
@@ -20,12 +35,20 @@ async def send_sms(to: str, body: str) -> bool:
         logger.warning("Twilio not configured — skipping SMS to %s", to)
         return False
     try:
-        client.messages.create(
-            body=body,
-            from_=settings.twilio_phone_number,
-            to=to,
+        await breaker.run(
+            _executor,
+            functools.partial(
+                client.messages.create,
+                body=body,
+                from_=settings.twilio_phone_number,
+                to=to,
+            ),
+            timeout=settings.twilio_timeout_seconds,
         )
         return True
+    except CircuitOpenError:
+        logger.warning("Twilio circuit open — not sending SMS to %s", to)
+        return False
     except Exception:
         logger.exception("Failed to send SMS to %s", to)
         return False
@@ -0,0 +1,159 @@
+"""Mirror fixed-price events and sub-events as Stripe Products and Prices.
+
+Admin create/edit endpoints call sync_event() / sync_sub_event() after
+applying their changes. A fixed-price item gets one Product (renamed when
+the item is) and one active Price for its current amount; Stripe Prices are
+immutable, so a price change creates a new Price and archives the old one.
+The IDs are stored on the row, and Checkout then sends ``{"price": id}``
+(or ``price_data`` with ``product``) instead of a full product payload.
+An item that stops being fixed-price (or loses its amount) drops its Price.
+
+A replaced Price is archived only after ``event_catalog_ttl_seconds`` plus
+a grace period: until then other workers' catalog snapshots may still
+reference it for Checkout. The delayed archive runs in-process; if the
+process stops first the old Price just stays active, unreferenced.
+
+Sync is best-effort: with no Stripe key configured it does nothing, and on a
+Stripe error the row is left without a price ID (never with a stale one), so
+Checkout falls back to ad-hoc ``price_data`` for that item.
+"""
+
+import asyncio
+import logging
+from typing import Iterable
+
+import stripe
+
+from app.config import settings
+from app.models.event import Event, PricingModel
+from app.models.sub_event import SubEvent, SubEventPricingModel
+from app.services.stripe_service import call_stripe
+
+logger = logging.getLogger(__name__)
+
+# Fields whose change requires a new Stripe Price / Product rename
+_PRICE_FIELDS = {"pricing_model", "fixed_price_cents"}
+
+# Extra wait, past the event catalog TTL, before a replaced Price is archived
+_ARCHIVE_GRACE_SECONDS = 30.0
+
+_archiving: set[asyncio.Task] = set()
+
+
+def _enabled() -> bool:
+    return bool(settings.stripe_secret_key)
+
+
+async def _archive_later(price_id: str, delay: float) -> None:
+    await asyncio.sleep(delay)
+    try:
+        await call_stripe(stripe.Price.modify, price_id, active=False)
+    except stripe.error.StripeError as e:
+        logger.warning("Could not archive replaced Stripe price %s: %s", price_id, e)
+
+
+def _retire_price(price_id: str) -> None:
+    """Archive a replaced Price once no catalog snapshot can still reference it."""
+    task = asyncio.create_task(
+        _archive_later(price_id, settings.event_catalog_ttl_seconds + _ARCHIVE_GRACE_SECONDS)
+    )
+    _archiving.add(task)
+    task.add_done_callback(_archiving.discard)
+
+
+async def wait_for_archives() -> None:
+    """Wait for scheduled Price archives to finish (tests)."""
+    if _archiving:
+        await asyncio.gather(*_archiving)
+
+
+async def _sync(
+    item: Event | SubEvent,
+    product_name: str,
+    metadata: dict[str, str],
+    is_fixed: bool,
+    changed: Iterable[str] | None,
+) -> None:
+    changed = None if changed is None else set(changed)
+    if not _enabled():
+        return
+    # A price ID set explicitly by an admin is left alone
+    if changed is not None and "stripe_price_id" in changed:
+        return
+    if not is_fixed or not item.fixed_price_cents:
+        # No longer sold at a fixed amount: Checkout must not charge the old Price
+        if changed and changed & _PRICE_FIELDS and item.stripe_price_id:
+            _retire_price(item.stripe_price_id)
+            item.stripe_price_id = None
+        return
+    if changed is None and item.stripe_price_id:
+        return
+
+    price_stale = changed is None or bool(changed & _PRICE_FIELDS) or not item.stripe_price_id
+    try:
+        if not item.stripe_product_id:
+            product = await call_stripe(stripe.Product.create, name=product_name, metadata=metadata)
+            item.stripe_product_id = product.id
+        elif changed is not None and "name" in changed:
+            await call_stripe(stripe.Product.modify, item.stripe_product_id, name=product_name)
+
+        if price_stale:
+            old_price_id = item.stripe_price_id
+            price = await call_stripe(
+                stripe.Price.create,
+                product=item.stripe_product_id,
+                unit_amount=item.fixed_price_cents,
+                currency="usd",
+                metadata=metadata,
+            )
+            item.stripe_price_id = price.id
+            if old_price_id:
+                _retire_price(old_price_id)
+    except stripe.error.StripeError as e:
+        logger.error("Stripe catalog sync failed for %s: %s", metadata, e, exc_info=True)
+        if price_stale:
+            item.stripe_price_id = None
+
+
+async def sync_event(event: Event, changed: Iterable[str] | None = None) -> None:
+    """Create or update the event's Stripe Product/Price.
+
+    `changed` is the set of fields just edited (None for a new event).
+    """
+    await _sync(
+        event,
+        product_name=event.name,
+        metadata={"event_id": str(event.id)},
+        is_fixed=event.pricing_model == PricingModel.fixed,
+        changed=changed,
+    )
+    if changed is not None and "name" in changed and _enabled():
+        # Sub-event Products are named after their event
+        for sub_event in event.sub_events:
+            if not sub_event.stripe_product_id:
+                continue
+            try:
+                await call_stripe(
+                    stripe.Product.modify,
+                    sub_event.stripe_product_id,
+                    name=_sub_event_product_name(event.name, sub_event),
+                )
+            except stripe.error.StripeError as e:
+                logger.error("Stripe product rename failed for sub-event %s: %s", sub_event.id, e)
+
+
+def _sub_event_product_name(event_name: str, sub_event: SubEvent) -> str:
+    return f"{event_name} — {sub_event.name}"
+
+
+async def sync_sub_event(
+    sub_event: SubEvent, event_name: str, changed: Iterable[str] | None = None
+) -> None:
+    """Create or update the sub-event's Stripe Product/Price (see sync_event)."""
+    await _sync(
+        sub_event,
+        product_name=_sub_event_product_name(event_name, sub_event),
+        metadata={"event_id": str(sub_event.parent_event_id), "sub_event_id": str(sub_event.id)},
+        is_fixed=sub_event.pricing_model == SubEventPricingModel.fixed,
+        changed=changed,
+    )
@@ -0,0 +1,274 @@
+"""Reconcile local registrations against Stripe (ADR-007 daily check).
+
+Webhooks are the primary path for payment state; this job repairs whatever
+they missed. It walks Checkout Sessions and Charges created in a time window
+with the Stripe list API's auto-pagination and, one page at a time:
+
+1. bulk-loads every local registration the page refers to in one query
+   (by checkout session id, payment intent, client_reference_id / group id
+   and metadata registration ids),
+2. decides each registration's target state in memory, and
+3. applies each kind of transition with a single UPDATE (per-row payment
+   fields via ``case``) plus its audit rows and outbox confirmations, then
+   commits.
+
+So a window with tens of thousands of sessions costs a few statements per
+page of 100, never one lookup per session. Transitions are conservative and
+idempotent:
+
+* paid, complete session  -> pending_payment / expired registrations COMPLETE
+* expired session         -> pending_payment registrations EXPIRED
+* fully refunded charge   -> registrations on that payment intent REFUNDED
+
+Partial refunds are left to the charge.refunded webhook.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator
+
+import stripe
+from sqlalchemy import case, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.models.registration import Registration, RegistrationStatus
+from app.services import notification_outbox
+from app.services.stripe_service import call_stripe
+from app.services.stripe_webhooks import transition_registrations, without_rebooked
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100  # Stripe's maximum list page size
+
+ACTOR = "system/reconciliation"
+
+_PAID = {"paid", "no_payment_required"}
+
+
+@dataclass
+class ReconcileStats:
+    sessions: int = 0
+    charges: int = 0
+    completed: int = 0
+    expired: int = 0
+    refunded: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.sessions} sessions, {self.charges} charges checked; "
+            f"{self.completed} completed, {self.expired} expired, {self.refunded} refunded"
+        )
+
+
+def _window(since: datetime, until: datetime) -> dict:
+    return {"gte": int(since.timestamp()), "lt": int(until.timestamp())}
+
+
+def _list_sessions(since: datetime, until: datetime) -> Iterator:
+    return stripe.checkout.Session.list(
+        created=_window(since, until), limit=PAGE_SIZE
+    ).auto_paging_iter()
+
+
+def _list_charges(since: datetime, until: datetime) -> Iterator:
+    return stripe.Charge.list(created=_window(since, until), limit=PAGE_SIZE).auto_paging_iter()
+
+
+def _take(iterator: Iterator, n: int) -> list[dict]:
+    # Runs on the Stripe pool: advancing the iterator may fetch the next page.
+    # StripeObjects no longer act as dicts, so hand plain dicts to the rest.
+    return [obj.to_dict() if hasattr(obj, "to_dict") else obj for obj in islice(iterator, n)]
+
+
+async def _pages(iterator: Iterator) -> AsyncIterator[list]:
+    while page := await call_stripe(_take, iterator, PAGE_SIZE):
+        yield page
+
+
+def _parse_uuid(value) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(str(value).strip())
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def _session_refs(session) -> set[uuid.UUID]:
+    """Registration / group ids a session names (see stripe_webhooks)."""
+    metadata = session.get("metadata") or {}
+    raw = [
+        *(metadata.get("registration_ids") or "").split(","),
+        metadata.get("registration_id"),
+        session.get("client_reference_id"),
+    ]
+    return {parsed for value in raw if value and (parsed := _parse_uuid(value))}
+
+
+class _Index:
+    """In-memory lookup of one page's registrations by every key a session may use."""
+
+    def __init__(self, registrations: Iterable[Registration]):
+        self.by_key: dict[object, list[Registration]] = {}
+        for registration in registrations:
+            for key in (
+                registration.id,
+                registration.group_id,
+                registration.stripe_checkout_session_id,
+                registration.stripe_payment_intent_id,
+            ):
+                if key is not None:
+                    self.by_key.setdefault(key, []).append(registration)
+
+    def lookup(self, *keys) -> list[Registration]:
+        found: dict[uuid.UUID, Registration] = {}
+        for key in keys:
+            for registration in self.by_key.get(key, ()):
+                found[registration.id] = registration
+        return list(found.values())
+
+
+async def _load(
+    db: AsyncSession,
+    session_ids: set[str] = frozenset(),
+    payment_intents: set[str] = frozenset(),
+    refs: set[uuid.UUID] = frozenset(),
+) -> _Index:
+    conditions = []
+    if session_ids:
+        conditions.append(Registration.stripe_checkout_session_id.in_(session_ids))
+    if payment_intents:
+        conditions.append(Registration.stripe_payment_intent_id.in_(payment_intents))
+    if refs:
+        conditions += [Registration.id.in_(refs), Registration.group_id.in_(refs)]
+    if not conditions:
+        return _Index([])
+    result = await db.execute(select(Registration).where(or_(*conditions)))
+    return _Index(result.scalars().all())
+
+
+def _per_row(values: dict[uuid.UUID, object], column) -> object:
+    """A ``case`` setting each registration's own value in a batched UPDATE."""
+    return case(values, value=Registration.id, else_=column)
+
+
+async def _reconcile_sessions(db: AsyncSession, sessions: list, stats: ReconcileStats) -> None:
+    index = await _load(
+        db,
+        session_ids={s["id"] for s in sessions},
+        payment_intents={s["payment_intent"] for s in sessions if s.get("payment_intent")},
+        refs=set().union(*(_session_refs(s) for s in sessions)),
+    )
+
+    to_complete: dict[uuid.UUID, Registration] = {}
+    to_expire: dict[uuid.UUID, Registration] = {}
+    session_ids: dict[uuid.UUID, str] = {}
+    payment_intents: dict[uuid.UUID, str] = {}
+    amounts: dict[uuid.UUID, int] = {}
+    for session in sessions:
+        registrations = index.lookup(
+            session["id"], session.get("payment_intent"), *_session_refs(session)
+        )
+        if session.get("status") == "complete" and session.get("payment_status") in _PAID:
+            for registration in registrations:
+                if registration.status not in (RegistrationStatus.pending_payment, RegistrationStatus.expired):
+                    continue
+                to_complete[registration.id] = registration
+                session_ids[registration.id] = session["id"]
+                if session.get("payment_intent"):
+                    payment_intents[registration.id] = session["payment_intent"]
+                if len(registrations) == 1 and session.get("amount_total") is not None:
+                    # Group registrations already carry their per-guest amounts
+                    amounts[registration.id] = session["amount_total"]
+        elif session.get("status") == "expired":
+            for registration in registrations:
+                # A retry may have moved the registration to a newer session
+                if registration.stripe_checkout_session_id not in (None, session["id"]):
+                    continue
+                if registration.status == RegistrationStatus.pending_payment:
+                    to_expire[registration.id] = registration
+    for registration_id in to_complete:
+        to_expire.pop(registration_id, None)
+
+    # A paid session whose registration expired and was since re-registered
+    # is left for a manual refund (completing it would hold a second seat)
+    completed = await without_rebooked(db, list(to_complete.values()))
+    if completed:
+        values = {
+            "stripe_checkout_session_id": _per_row(session_ids, Registration.stripe_checkout_session_id),
+        }
+        if payment_intents:
+            values["stripe_payment_intent_id"] = _per_row(
+                payment_intents, Registration.stripe_payment_intent_id
+            )
+        if amounts:
+            values["payment_amount_cents"] = _per_row(amounts, Registration.payment_amount_cents)
+        # Rows that changed status meanwhile are left for the next run
+        completed = await transition_registrations(
+            db, completed, RegistrationStatus.complete, values, actor=ACTOR
+        )
+        await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, completed)
+        stats.completed += len(completed)
+    if to_expire:
+        expired = await transition_registrations(
+            db, list(to_expire.values()), RegistrationStatus.expired, actor=ACTOR
+        )
+        stats.expired += len(expired)
+
+
+async def _reconcile_charges(db: AsyncSession, charges: list, stats: ReconcileStats) -> None:
+    refunded_intents = {
+        charge["payment_intent"]
+        for charge in charges
+        if charge.get("payment_intent")
+        and charge.get("amount", 0) > 0
+        and charge.get("amount_refunded", 0) >= charge["amount"]
+    }
+    if not refunded_intents:
+        return
+    index = await _load(db, payment_intents=refunded_intents)
+    to_refund = [
+        registration
+        for registration in index.lookup(*refunded_intents)
+        if registration.status != RegistrationStatus.refunded
+    ]
+    if to_refund:
+        refunded = await transition_registrations(db, to_refund, RegistrationStatus.refunded, actor=ACTOR)
+        stats.refunded += len(refunded)
+
+
+async def reconcile(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    session_factory: async_sessionmaker = async_session,
+    list_sessions=_list_sessions,
+    list_charges=_list_charges,
+) -> ReconcileStats:
+    """Reconcile Checkout Sessions and Charges created in [since, until).
+
+    Defaults to the last ``stripe_reconcile_lookback_hours``. `list_sessions`
+    / `list_charges` return blocking iterators over Stripe objects (the SDK's
+    auto-pagination by default; a local stub in tests).
+    """
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(hours=settings.stripe_reconcile_lookback_hours)
+    stats = ReconcileStats()
+
+    sessions = await call_stripe(list_sessions, since, until)
+    async for page in _pages(sessions):
+        stats.sessions += len(page)
+        async with session_factory() as db:
+            await _reconcile_sessions(db, page, stats)
+            await db.commit()
+
+    charges = await call_stripe(list_charges, since, until)
+    async for page in _pages(charges):
+        stats.charges += len(page)
+        async with session_factory() as db:
+            await _reconcile_charges(db, page, stats)
+            await db.commit()
+
+    return stats
@@ -1,4 +1,7 @@
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 import stripe
 
@@ -6,10 +9,72 @@ from app.config import settings
 from app.models.event import Event
 from app.models.registration import Registration
 from app.models.sub_event import SubEvent
+from app.services.circuit_breaker import CircuitOpenError, register
 
 logger = logging.getLogger(__name__)
 
 stripe.api_key = settings.stripe_secret_key
+# RequestsClient keeps one requests.Session per thread, so each worker in
+# the pool below reuses its keep-alive connection to api.stripe.com.
+stripe.default_http_client = stripe.RequestsClient(timeout=settings.stripe_timeout_seconds)
+
+# The Stripe SDK is synchronous; run its calls on a small dedicated pool so a
+# slow Stripe round-trip never blocks the event loop. The pool size also caps
+# concurrent Stripe requests per worker process.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.stripe_max_concurrency, thread_name_prefix="stripe"
+)
+
+
+# Stripe rejects Checkout expires_at less than 30 minutes out; keep a margin
+# for clock skew and the request round-trip.
+_MIN_SESSION_LIFETIME = timedelta(minutes=30, seconds=60)
+
+
+def checkout_expires_at(lease_expires_at: datetime | None) -> int | None:
+    """Stripe `expires_at` (epoch seconds) matching a registration's seat lease."""
+    if lease_expires_at is None:
+        return None
+    if lease_expires_at.tzinfo is None:
+        lease_expires_at = lease_expires_at.replace(tzinfo=timezone.utc)
+    earliest = datetime.now(timezone.utc) + _MIN_SESSION_LIFETIME
+    return int(max(lease_expires_at, earliest).timestamp())
+
+
+# Errors caused by the request itself say nothing about Stripe's health
+_CLIENT_ERRORS = (
+    stripe.error.CardError,
+    stripe.error.InvalidRequestError,
+    stripe.error.IdempotencyError,
+)
+
+breaker = register("stripe", is_failure=lambda exc: not isinstance(exc, _CLIENT_ERRORS))
+
+
+async def call_stripe(fn, /, *args, **kwargs):
+    """Run a blocking Stripe SDK call on the Stripe thread pool and await it.
+
+    While Stripe's circuit is open this fails at once with an
+    APIConnectionError, which callers already handle as a provider outage.
+    """
+    try:
+        return await breaker.run(_executor, functools.partial(fn, *args, **kwargs))
+    except CircuitOpenError as exc:
+        raise stripe.error.APIConnectionError(str(exc)) from exc
+
+
+def price_data(amount_cents: int, name: str, product_id: str | None = None) -> dict:
+    """Checkout `price_data` for an ad-hoc amount; references the synced Product when there is one."""
+    data = {"currency": "usd", "unit_amount": amount_cents}
+    if product_id:
+        data["product"] = product_id
+    else:
+        data["product_data"] = {"name": name}
+    return data
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
 
 
 async def create_checkout_session(
@@ -34,11 +99,7 @@ async def create_checkout_session(
     elif event.pricing_model == "fixed" and event.fixed_price_cents:
         params["line_items"] = [
             {
-                "price_data": {
-                    "currency": "usd",
-                    "unit_amount": event.fixed_price_cents,
-                    "product_data": {"name": event.name},
-                },
+                "price_data": price_data(event.fixed_price_cents, event.name, event.stripe_product_id),
                 "quantity": 1,
             }
         ]
@@ -54,20 +115,16 @@ async def create_checkout_session(
         if event.min_donation_cents and amount < event.min_donation_cents:
             amount = event.min_donation_cents
         params["line_items"] = [
-            {
-                "price_data": {
-                    "currency": "usd",
-                    "unit_amount": amount,
-                    "product_data": {"name": event.name},
-                },
-                "quantity": 1,
-            }
+            {"price_data": price_data(amount, event.name, event.stripe_product_id), "quantity": 1}
         ]
     else:
         # Free event — no Stripe needed
         return ""
 
-    session = stripe.checkout.Session.create(**params)
+    if expires_at := checkout_expires_at(registration.lease_expires_at):
+        params["expires_at"] = expires_at
+
+    session = await call_stripe(stripe.checkout.Session.create, **params)
     return session.url
 
 
@@ -98,23 +155,26 @@ async def create_composite_checkout_session(
     else:
         for se in selected_sub_events:
             pm = se.pricing_model.value if hasattr(se.pricing_model, "value") else se.pricing_model
-            if pm == "fixed" and se.fixed_price_cents:
+            if pm == "fixed" and se.stripe_price_id:
+                line_items.append({"price": se.stripe_price_id, "quantity": 1})
+            elif pm == "fixed" and se.fixed_price_cents:
                 line_items.append({
-                    "price_data": {
-                        "currency": "usd",
-                        "unit_amount": se.fixed_price_cents,
-                        "product_data": {
-                            "name": f"{event.name} — {se.name}",
-                        },
-                    },
+                    "price_data": price_data(
+                        se.fixed_price_cents, f"{event.name} — {se.name}", se.stripe_product_id
+                    ),
                     "quantity": 1,
                 })
 
     if not line_items:
         return None
 
+    extra = {}
+    if expires_at := checkout_expires_at(registration.lease_expires_at):
+        extra["expires_at"] = expires_at
+
     try:
-        session = stripe.checkout.Session.create(
+        session = await call_stripe(
+            stripe.checkout.Session.create,
             mode="payment",
             client_reference_id=str(registration.id),
             customer_email=registration.attendee.email,
@@ -126,6 +186,7 @@ async def create_composite_checkout_session(
                 "event_slug": event.slug,
             },
             line_items=line_items,
+            **extra,
         )
         return session
     except stripe.error.StripeError as e:
@@ -0,0 +1,455 @@
+"""Stripe webhook processing — a durable queue over webhooks_raw.
+
+The /webhooks/stripe endpoint only verifies the signature, stores the raw
+event and acknowledges it. Worker tasks (app/tasks/webhook_worker.py) claim
+unprocessed rows and run the handlers below, so a slow downstream call (e.g.
+Resend) never delays the response Stripe is waiting for.
+
+A claim is one ``UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED
+LIMIT 1) RETURNING id`` that leases the row for
+``stripe_webhook_claim_timeout_seconds``; concurrent workers skip each
+other's rows on Postgres, and on SQLite (no row locks, single writer) the
+statement is atomic on its own. A failed attempt is retried with exponential
+backoff until ``stripe_webhook_max_attempts``; after that the row stays
+unprocessed with its last_error for inspection. A worker that dies
+mid-event simply lets its lease lapse. All handlers are idempotent.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.models.audit import AuditLog
+from app.models.registration import Registration, RegistrationStatus
+from app.models.webhook import WebhookRaw
+from app.services import capacity_service, notification_outbox
+
+logger = logging.getLogger(__name__)
+
+_MAX_BACKOFF = timedelta(hours=1)
+
+# Statuses a completed checkout moves to complete
+_PAYABLE_STATUSES = (RegistrationStatus.pending_payment, RegistrationStatus.expired)
+
+# Set by the endpoint after storing an event so idle workers start immediately
+_work_available = asyncio.Event()
+
+
+def notify() -> None:
+    """Wake idle workers (same process) after new events are stored."""
+    _work_available.set()
+
+
+async def wait_for_work(timeout: float) -> None:
+    """Sleep until notify() is called or `timeout` seconds pass."""
+    try:
+        await asyncio.wait_for(_work_available.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    _work_available.clear()
+
+
+def _pending(now: datetime):
+    return [
+        WebhookRaw.processed_at.is_(None),
+        WebhookRaw.stripe_event_id.is_not(None),
+        WebhookRaw.attempts < settings.stripe_webhook_max_attempts,
+        or_(WebhookRaw.next_attempt_at.is_(None), WebhookRaw.next_attempt_at <= now),
+    ]
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = timedelta(seconds=settings.stripe_webhook_retry_base_seconds * 2 ** max(attempts - 1, 0))
+    return min(delay, _MAX_BACKOFF)
+
+
+async def claim_next(db: AsyncSession) -> uuid.UUID | None:
+    """Lease the oldest due Stripe event and return its id (None if the queue is empty).
+
+    The lease is committed immediately so the row's lock is held only for
+    the claim itself.
+    """
+    now = datetime.now(timezone.utc)
+    candidate = (
+        select(WebhookRaw.id)
+        .where(*_pending(now))
+        .order_by(WebhookRaw.created_at)
+        .limit(1)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        candidate = candidate.with_for_update(skip_locked=True)
+    result = await db.execute(
+        update(WebhookRaw)
+        .where(WebhookRaw.id == candidate.scalar_subquery())
+        .values(
+            attempts=WebhookRaw.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=settings.stripe_webhook_claim_timeout_seconds),
+        )
+        .returning(WebhookRaw.id)
+        .execution_options(synchronize_session=False)
+    )
+    webhook_id = result.scalar_one_or_none()
+    await db.commit()
+    return webhook_id
+
+
+async def dispatch(event: dict, webhook: WebhookRaw, db: AsyncSession) -> None:
+    """Route a stored Stripe event to its handler."""
+    handler = _HANDLERS.get(event.get("type"))
+    if handler is None:
+        logger.info("Unhandled webhook event type: %s", event.get("type"))
+        return
+    await handler(event, webhook, db)
+
+
+async def process_webhook(db: AsyncSession, webhook_id: uuid.UUID) -> bool:
+    """Run the stored event's handler and commit. Returns False if it failed.
+
+    On failure the handler's work is rolled back and the row records
+    last_error and its next retry time.
+    """
+    webhook = await db.get(WebhookRaw, webhook_id)
+    try:
+        await dispatch(webhook.payload_json or {}, webhook, db)
+        webhook.processed_at = datetime.now(timezone.utc)
+        webhook.next_attempt_at = None
+        webhook.last_error = None
+        await db.commit()
+        return True
+    except Exception as exc:
+        await db.rollback()
+        webhook = await db.get(WebhookRaw, webhook_id, populate_existing=True)
+        logger.exception(
+            "Stripe webhook %s failed (attempt %d/%d)",
+            webhook.stripe_event_id,
+            webhook.attempts,
+            settings.stripe_webhook_max_attempts,
+        )
+        webhook.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+        webhook.next_attempt_at = datetime.now(timezone.utc) + _backoff(webhook.attempts)
+        await db.commit()
+        return False
+
+
+async def process_next(session_factory: async_sessionmaker = async_session) -> bool:
+    """Claim and process one event. Returns False when nothing was due."""
+    async with session_factory() as db:
+        webhook_id = await claim_next(db)
+        if webhook_id is None:
+            return False
+        await process_webhook(db, webhook_id)
+        return True
+
+
+async def process_pending(
+    session_factory: async_sessionmaker = async_session, max_events: int | None = None
+) -> int:
+    """Process due events until the queue is empty (or `max_events`). Returns the count."""
+    processed = 0
+    while max_events is None or processed < max_events:
+        if not await process_next(session_factory):
+            break
+        processed += 1
+    return processed
+
+
+# --- Handlers ---
+#
+# A Checkout Session pays for one registration or a whole group. Individual
+# sessions carry client_reference_id=<registration id> (metadata
+# registration_id); group sessions carry client_reference_id=<group id> and
+# a comma-joined metadata registration_ids. Handlers resolve every
+# registration the session covers in one query and transition them together
+# with one UPDATE and one batch of audit rows, so a party of ten costs the
+# same round trips as a party of one.
+
+
+def _parse_uuid(value) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(str(value).strip())
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+async def _session_registrations(session: dict, db: AsyncSession) -> list[Registration]:
+    """Load every registration a Checkout Session pays for."""
+    metadata = session.get("metadata") or {}
+    ids = {
+        parsed
+        for raw in [
+            *(metadata.get("registration_ids") or "").split(","),
+            metadata.get("registration_id"),
+        ]
+        if raw and (parsed := _parse_uuid(raw))
+    }
+    conditions = [Registration.id.in_(ids)] if ids else []
+    reference = _parse_uuid(session.get("client_reference_id"))
+    if reference is not None:
+        conditions += [Registration.id == reference, Registration.group_id == reference]
+    if not conditions:
+        return []
+    result = await db.execute(select(Registration).where(or_(*conditions)))
+    return list(result.scalars().all())
+
+
+async def transition_registrations(
+    db: AsyncSession,
+    registrations: list[Registration],
+    new_status: RegistrationStatus,
+    values: dict | None = None,
+    actor: str = "system/stripe",
+) -> list[Registration]:
+    """Move registrations to `new_status`, keeping counters and audit in step.
+
+    One UPDATE per status the registrations were read in, each conditional
+    on the row still having that status: a row changed meanwhile (e.g.
+    expired by the lease sweeper) is left alone rather than recorded with a
+    transition that never happened. Returns the registrations moved.
+
+    `values` may hold SQL expressions (e.g. a ``case`` keyed on id) to set
+    per-row values in the same statement.
+    """
+    old_statuses = {r.id: r.status for r in registrations}
+    by_status: dict[RegistrationStatus, list[uuid.UUID]] = {}
+    for registration_id, old_status in old_statuses.items():
+        by_status.setdefault(old_status, []).append(registration_id)
+    moved_ids: set[uuid.UUID] = set()
+    for old_status, ids in by_status.items():
+        result = await db.execute(
+            update(Registration)
+            .where(Registration.id.in_(ids), Registration.status == old_status)
+            .values(status=new_status, **(values or {}))
+            .returning(Registration.id)
+        )
+        moved_ids.update(result.scalars())
+    moved = [r for r in registrations if r.id in moved_ids]
+
+    by_transition: dict[tuple, list[uuid.UUID]] = {}
+    for registration in moved:
+        key = (registration.event_id, old_statuses[registration.id])
+        by_transition.setdefault(key, []).append(registration.id)
+    for (event_id, old_status), ids in by_transition.items():
+        await capacity_service.record_status_change(db, event_id, ids, old_status, new_status)
+
+    db.add_all([
+        AuditLog(
+            entity_type="registration",
+            entity_id=registration_id,
+            action="status_change",
+            actor=actor,
+            old_value={"status": old_statuses[registration.id].value},
+            new_value={"status": new_status.value},
+        )
+        for registration in moved
+    ])
+    return moved
+
+
+async def _retry_if_still_due(
+    db: AsyncSession, moved: list[Registration], registrations: list[Registration], due_statuses
+) -> None:
+    """Fail the event (so it is retried) if a registration that changed status under it still needs it.
+
+    E.g. the lease sweeper expiring a registration between the read and the
+    UPDATE: the retry then completes it from ``expired``. One moved to a
+    status the handler would not act on (already complete, cancelled) is fine.
+    """
+    moved_ids = {r.id for r in moved}
+    missed = [r.id for r in registrations if r.id not in moved_ids]
+    if not missed:
+        return
+    result = await db.execute(
+        select(Registration.id).where(Registration.id.in_(missed), Registration.status.in_(due_statuses))
+    )
+    if still_due := result.scalars().all():
+        raise RuntimeError(f"{len(still_due)} registration(s) changed status concurrently; retrying")
+
+
+async def without_rebooked(db: AsyncSession, registrations: list[Registration]) -> list[Registration]:
+    """Drop expired registrations whose attendee has since registered for the event again.
+
+    Their payment needs a manual refund; completing them would give the
+    attendee a second seat.
+    """
+    expired = [r for r in registrations if r.status == RegistrationStatus.expired]
+    if not expired:
+        return registrations
+    result = await db.execute(
+        select(Registration.attendee_id, Registration.event_id).where(
+            Registration.attendee_id.in_({r.attendee_id for r in expired}),
+            Registration.event_id.in_({r.event_id for r in expired}),
+            Registration.status.in_(capacity_service.SEAT_HOLDING_STATUSES),
+        )
+    )
+    rebooked = set(result.all())
+    kept = []
+    for registration in registrations:
+        if (
+            registration.status == RegistrationStatus.expired
+            and (registration.attendee_id, registration.event_id) in rebooked
+        ):
+            logger.warning(
+                "Payment for expired registration %s arrived after the attendee registered again; "
+                "not completing it (refund manually)",
+                registration.id,
+            )
+            continue
+        kept.append(registration)
+    return kept
+
+
+async def _handle_checkout_completed(event: dict, webhook: WebhookRaw, db: AsyncSession):
+    """Handle checkout.session.completed — mark the session's registration(s) COMPLETE."""
+    session = event["data"]["object"]
+    if not session.get("client_reference_id") and not session.get("metadata"):
+        logger.warning("checkout.session.completed missing client_reference_id")
+        return
+
+    registrations = await _session_registrations(session, db)
+    if not registrations:
+        logger.warning(
+            "No registrations found for completed checkout %s (ref %s)",
+            session.get("id"),
+            session.get("client_reference_id"),
+        )
+        return
+
+    # Only unpaid registrations move. Complete ones make this idempotent, and a
+    # replayed or late event must not revive a refunded or cancelled one.
+    pending = [r for r in registrations if r.status in _PAYABLE_STATUSES]
+    pending = await without_rebooked(db, pending)
+    if not pending:
+        return
+
+    values = {
+        "stripe_checkout_session_id": session.get("id"),
+        "stripe_payment_intent_id": session.get("payment_intent"),
+    }
+    if len(registrations) == 1:
+        # Group registrations already carry their per-guest amounts
+        values["payment_amount_cents"] = session.get("amount_total")
+    # A payment landing after the session expired re-takes its seat. If the
+    # sweeper expired one meanwhile, the retry sees (and completes) it as expired.
+    moved = await transition_registrations(db, pending, RegistrationStatus.complete, values)
+    await _retry_if_still_due(db, moved, pending, _PAYABLE_STATUSES)
+    pending = moved
+
+    # Committed with the transition; the outbox dispatcher sends them
+    await notification_outbox.enqueue(db, notification_outbox.CONFIRMATION, pending)
+
+    logger.info(
+        "%d registration(s) marked COMPLETE via webhook for checkout %s",
+        len(pending),
+        session.get("id"),
+    )
+
+
+async def _handle_checkout_expired(event: dict, webhook: WebhookRaw, db: AsyncSession):
+    """Handle checkout.session.expired — mark the session's registration(s) EXPIRED."""
+    session = event["data"]["object"]
+    if not session.get("client_reference_id") and not session.get("metadata"):
+        logger.warning("checkout.session.expired missing client_reference_id")
+        return
+
+    registrations = await _session_registrations(session, db)
+    if not registrations:
+        logger.warning(
+            "No registrations found for expired checkout %s (ref %s)",
+            session.get("id"),
+            session.get("client_reference_id"),
+        )
+        return
+
+    # Only expire registrations that are still pending
+    pending = [r for r in registrations if r.status == RegistrationStatus.pending_payment]
+    if not pending:
+        return
+
+    # Any registration that left pending_payment meanwhile is already settled
+    expired = await transition_registrations(db, pending, RegistrationStatus.expired)
+
+    logger.info(
+        "%d registration(s) marked EXPIRED via webhook for checkout %s",
+        len(expired),
+        session.get("id"),
+    )
+
+
+async def _handle_charge_refunded(event: dict, webhook: WebhookRaw, db: AsyncSession):
+    """Handle charge.refunded — mark registration(s) REFUNDED (or record a partial refund)."""
+    charge = event["data"]["object"]
+    payment_intent_id = charge.get("payment_intent")
+
+    if not payment_intent_id:
+        logger.warning("charge.refunded missing payment_intent")
+        return
+
+    # A group checkout stores its payment intent on every guest's registration
+    result = await db.execute(
+        select(Registration).where(
+            Registration.stripe_payment_intent_id == payment_intent_id
+        )
+    )
+    registrations = list(result.scalars().all())
+    if not registrations:
+        logger.warning("Registration not found for payment_intent %s", payment_intent_id)
+        return
+
+    amount_refunded = charge.get("amount_refunded", 0)
+    amount_total = charge.get("amount", 0)
+
+    if amount_refunded >= amount_total:
+        # Full refund
+        to_refund = [r for r in registrations if r.status != RegistrationStatus.refunded]
+        if to_refund:
+            moved = await transition_registrations(db, to_refund, RegistrationStatus.refunded)
+            await _retry_if_still_due(
+                db, moved, to_refund, [s for s in RegistrationStatus if s != RegistrationStatus.refunded]
+            )
+    else:
+        # Partial refund — keep status, add note (and the new amount for a single registration)
+        note = f"Partial refund: {amount_refunded} cents refunded."
+        values = {
+            "notes": case(
+                (func.coalesce(Registration.notes, "") == "", note),
+                else_=Registration.notes + "\n" + note,
+            ),
+        }
+        if len(registrations) == 1:
+            values["payment_amount_cents"] = amount_total - amount_refunded
+        await db.execute(
+            update(Registration)
+            .where(Registration.id.in_([r.id for r in registrations]))
+            .values(**values)
+        )
+        db.add_all([
+            AuditLog(
+                entity_type="registration",
+                entity_id=registration.id,
+                action="partial_refund",
+                actor="system/stripe",
+                old_value={"payment_amount_cents": amount_total},
+                new_value={"payment_amount_cents": amount_total - amount_refunded},
+            )
+            for registration in registrations
+        ])
+
+    logger.info(
+        "%d registration(s) for PI %s processed refund (refunded=%s, total=%s)",
+        len(registrations),
+        payment_intent_id,
+        amount_refunded,
+        amount_total,
+    )
+
+_HANDLERS = {
+    "checkout.session.completed": _handle_checkout_completed,
+    "checkout.session.expired": _handle_checkout_expired,
+    "charge.refunded": _handle_charge_refunded,
+}
@@ -0,0 +1,218 @@
+"""Retention for webhooks_raw: move old processed payloads to compressed archives.
+
+Processed rows older than ``webhook_retention_days`` are written to gzip
+NDJSON files partitioned by the day the webhook was received::
+
+    <webhook_archive_dir>/2026/03/01/part-20261017T031500Z-1a2b3c4d.ndjson.gz
+    <webhook_archive_dir>/2026/03/01/index.ndjson
+
+Each line of a part file is the complete row. The day's ``index.ndjson``
+maps every archived row (id, stripe_event_id, twilio_sid, event_type) to its
+part file and line, so a single event can be found without scanning.
+
+The row itself stays in webhooks_raw with payload_json cleared and
+archived_at set, keeping stripe_event_id / twilio_sid for redelivery dedupe.
+Files are written before the rows are cleared, so an interrupted run can
+only leave a payload archived twice, never lost. restore() puts payloads
+back (e.g. before a replay with app.tools.replay_webhooks).
+
+Archiving is opt-in: with no ``webhook_archive_dir`` configured (and none
+passed in) payloads stay in the database.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import null, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.database import async_session, dialect_insert
+from app.models.webhook import WebhookRaw
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.ndjson"
+
+
+def _archive_dir(archive_dir: Path | str | None) -> Path:
+    archive_dir = archive_dir or settings.webhook_archive_dir
+    if not archive_dir:
+        raise ValueError("No webhook archive directory configured (WEBHOOK_ARCHIVE_DIR)")
+    return Path(archive_dir)
+
+
+_COLUMNS = [column.key for column in WebhookRaw.__table__.columns]
+
+
+def _partition(archive_dir: Path, day: date) -> Path:
+    return archive_dir / f"{day.year:04d}" / f"{day.month:02d}" / f"{day.day:02d}"
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _to_record(webhook: WebhookRaw) -> dict:
+    return {key: _encode(getattr(webhook, key)) for key in _COLUMNS}
+
+
+def _from_record(record: dict) -> dict:
+    row = dict(record)
+    row["id"] = uuid.UUID(row["id"])
+    for key in ("processed_at", "next_attempt_at", "created_at"):
+        if row.get(key):
+            row[key] = datetime.fromisoformat(row[key])
+    row["archived_at"] = None
+    return row
+
+
+def _write_partitions(archive_dir: Path, records: list[dict]) -> None:
+    """Append one part file (plus index entries) per received-on day."""
+    by_day: dict[date, list[dict]] = defaultdict(list)
+    for record in records:
+        by_day[datetime.fromisoformat(record["created_at"]).date()].append(record)
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    for day, day_records in by_day.items():
+        partition = _partition(archive_dir, day)
+        partition.mkdir(parents=True, exist_ok=True)
+        part_name = f"part-{stamp}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+
+        with gzip.open(partition / part_name, "wt", encoding="utf-8") as part:
+            for record in day_records:
+                part.write(json.dumps(record, separators=(",", ":")) + "\n")
+            part.flush()
+            os.fsync(part.fileno())
+
+        with open(partition / INDEX_FILE, "a", encoding="utf-8") as index:
+            for line, record in enumerate(day_records):
+                entry = {
+                    "id": record["id"],
+                    "stripe_event_id": record["stripe_event_id"],
+                    "twilio_sid": record["twilio_sid"],
+                    "event_type": record["event_type"],
+                    "file": part_name,
+                    "line": line,
+                }
+                index.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            index.flush()
+            os.fsync(index.fileno())
+
+
+async def archive_processed(
+    archive_dir: Path | str | None = None,
+    older_than: timedelta | None = None,
+    batch_size: int = 1000,
+    session_factory: async_sessionmaker = async_session,
+) -> int:
+    """Archive processed payloads past the retention window. Returns rows archived."""
+    archive_dir = _archive_dir(archive_dir)
+    cutoff = datetime.now(timezone.utc) - (older_than or timedelta(days=settings.webhook_retention_days))
+    archived = 0
+    while True:
+        async with session_factory() as db:
+            result = await db.execute(
+                select(WebhookRaw)
+                .where(
+                    WebhookRaw.processed_at.is_not(None),
+                    WebhookRaw.processed_at < cutoff,
+                    WebhookRaw.archived_at.is_(None),
+                )
+                .order_by(WebhookRaw.created_at)
+                .limit(batch_size)
+            )
+            webhooks = result.scalars().all()
+            if not webhooks:
+                return archived
+
+            await asyncio.to_thread(_write_partitions, archive_dir, [_to_record(w) for w in webhooks])
+            await db.execute(
+                update(WebhookRaw)
+                .where(WebhookRaw.id.in_([w.id for w in webhooks]))
+                .values(payload_json=null(), archived_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        archived += len(webhooks)
+        if len(webhooks) < batch_size:
+            return archived
+
+
+def _read_archived(
+    archive_dir: Path, since: date, until: date, stripe_event_ids: set[str] | None
+) -> list[dict]:
+    """Collect archived rows received on [since, until], optionally only some event ids."""
+    records: dict[str, dict] = {}
+    day = since
+    while day <= until:
+        partition = _partition(archive_dir, day)
+        day += timedelta(days=1)
+        index_path = partition / INDEX_FILE
+        if not index_path.exists():
+            continue
+
+        wanted: dict[str, set[int]] = defaultdict(set)
+        with open(index_path, encoding="utf-8") as index:
+            for raw in index:
+                entry = json.loads(raw)
+                if stripe_event_ids is None or entry["stripe_event_id"] in stripe_event_ids:
+                    wanted[entry["file"]].add(entry["line"])
+
+        for part_name, lines in sorted(wanted.items()):
+            with gzip.open(partition / part_name, "rt", encoding="utf-8") as part:
+                for n, raw in enumerate(part):
+                    if n in lines:
+                        record = json.loads(raw)
+                        # A row archived twice (interrupted run) restores once
+                        records[record["id"]] = record
+    return list(records.values())
+
+
+async def restore(
+    since: date,
+    until: date | None = None,
+    stripe_event_ids: list[str] | None = None,
+    archive_dir: Path | str | None = None,
+    session_factory: async_sessionmaker = async_session,
+) -> int:
+    """Put archived payloads back into webhooks_raw. Returns rows restored.
+
+    Rows still present get their payload back; rows that were deleted are
+    re-inserted.
+    """
+    archive_dir = _archive_dir(archive_dir)
+    records = await asyncio.to_thread(
+        _read_archived,
+        archive_dir,
+        since,
+        until or since,
+        set(stripe_event_ids) if stripe_event_ids else None,
+    )
+    if not records:
+        return 0
+
+    async with session_factory() as db:
+        for start in range(0, len(records), 500):
+            rows = [_from_record(record) for record in records[start:start + 500]]
+            stmt = dialect_insert(db, WebhookRaw).values(rows)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={"payload_json": stmt.excluded.payload_json, "archived_at": None},
+                )
+            )
+        await db.commit()
+    logger.info("Restored %d archived webhook payloads", len(records))
+    return len(records)
@@ -0,0 +1,113 @@
+"""Local simulators for Stripe, Twilio and Resend.
+
+Selected with ``PROVIDER_SIMULATORS`` (see Settings): each simulated
+provider's SDK keeps running unmodified, but its HTTP transport is replaced
+by an in-process fake that answers from memory after an injected latency,
+sometimes with a 429 or 500. Registration, bulk notifications and webhook
+throughput can then be load-tested offline, on a laptop or in CI, with
+realistic provider behaviour and no real accounts.
+
+Missing credentials for a simulated provider are filled with placeholders
+so the app's "is this provider configured?" checks pass.
+"""
+
+import logging
+
+import resend
+import stripe
+
+from app.config import settings
+from app.services import sms_service
+from app.simulators.faults import FaultProfile
+from app.simulators.resend_api import ResendSimulator
+from app.simulators.stripe_api import StripeSimulator
+from app.simulators.twilio_api import TwilioSimulator
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("stripe", "twilio", "resend")
+
+_installed: dict[str, object] = {}
+_saved: dict[str, object] = {}
+
+
+def configured() -> set[str]:
+    """Providers named in settings.provider_simulators."""
+    names = {name.strip().lower() for name in settings.provider_simulators.split(",") if name.strip()}
+    if "all" in names:
+        return set(PROVIDERS)
+    unknown = names - set(PROVIDERS)
+    if unknown:
+        raise ValueError(f"Unknown provider simulators: {', '.join(sorted(unknown))}")
+    return names
+
+
+def faults_for(provider: str) -> FaultProfile:
+    options = {
+        "latency_ms": settings.simulator_latency_ms,
+        "latency_p99_ms": settings.simulator_latency_p99_ms,
+        "error_rate": settings.simulator_error_rate,
+        "rate_limit_rate": settings.simulator_rate_limit_rate,
+        "seed": settings.simulator_seed,
+    }
+    options.update(settings.simulator_overrides.get(provider, {}))
+    return FaultProfile(**options)
+
+
+def _save(key: str, obj, attr: str) -> None:
+    _saved.setdefault(key, (obj, attr, getattr(obj, attr)))
+
+
+def _default(obj, attr: str, placeholder: str) -> None:
+    if not getattr(obj, attr):
+        _save(f"{id(obj)}.{attr}", obj, attr)
+        setattr(obj, attr, placeholder)
+
+
+def install(providers=None) -> dict[str, object]:
+    """Swap the named providers' transports for simulators. Returns them by provider."""
+    providers = configured() if providers is None else set(providers)
+    if providers and settings.app_env == "production":
+        raise RuntimeError("Provider simulators cannot be enabled in production")
+
+    if "stripe" in providers:
+        simulator = StripeSimulator(faults_for("stripe"))
+        _save("stripe.default_http_client", stripe, "default_http_client")
+        stripe.default_http_client = simulator
+        _default(stripe, "api_key", "sk_test_simulator")
+        _default(settings, "stripe_secret_key", "sk_test_simulator")
+        _default(settings, "stripe_webhook_secret", "whsec_simulator")
+        _installed["stripe"] = simulator
+
+    if "twilio" in providers:
+        simulator = TwilioSimulator(faults_for("twilio"))
+        _save("sms_service.http_client", sms_service, "http_client")
+        sms_service.http_client = simulator
+        _default(settings, "twilio_account_sid", "AC" + "0" * 32)
+        _default(settings, "twilio_auth_token", "simulator")
+        _default(settings, "twilio_phone_number", "+15005550006")
+        _installed["twilio"] = simulator
+
+    if "resend" in providers:
+        simulator = ResendSimulator(faults_for("resend"))
+        _save("resend.default_http_client", resend, "default_http_client")
+        resend.default_http_client = simulator
+        _default(resend, "api_key", "re_simulator")
+        _installed["resend"] = simulator
+
+    if providers:
+        logger.warning("Provider simulators active: %s", ", ".join(sorted(providers)))
+    return dict(_installed)
+
+
+def uninstall() -> None:
+    """Restore the real transports and settings."""
+    for obj, attr, value in _saved.values():
+        setattr(obj, attr, value)
+    _saved.clear()
+    _installed.clear()
+
+
+def get(provider: str):
+    """The active simulator for `provider`, or None."""
+    return _installed.get(provider)
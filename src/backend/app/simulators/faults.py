@@ -0,0 +1,59 @@
+"""Latency and failure injection shared by the provider simulators."""
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+# z-score of the 99th percentile of a standard normal
+_Z99 = 2.326
+
+
+@dataclass
+class FaultProfile:
+    """How a simulated provider behaves.
+
+    Latency is log-normal with the given median and p99 (fixed when
+    ``latency_p99_ms <= latency_ms``). Each request is then answered with a
+    429 with probability ``rate_limit_rate``, else a 500 with probability
+    ``error_rate``, else normally.
+    """
+
+    latency_ms: float = 0.0
+    latency_p99_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: int | None = None
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()  # SDK calls arrive on several pool threads
+
+    def sample_latency(self) -> float:
+        """One latency draw, in seconds."""
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_p99_ms <= self.latency_ms:
+            return self.latency_ms / 1000
+        sigma = math.log(self.latency_p99_ms / self.latency_ms) / _Z99
+        with self._lock:
+            z = self._random.gauss(0.0, 1.0)
+        return self.latency_ms * math.exp(sigma * z) / 1000
+
+    def outcome(self) -> int | None:
+        """Injected HTTP status for this request (429 or 500), or None to answer normally."""
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+    def apply(self) -> int | None:
+        """Sleep for a latency draw (we are on an SDK worker thread) and pick the outcome."""
+        delay = self.sample_latency()
+        if delay:
+            time.sleep(delay)
+        return self.outcome()
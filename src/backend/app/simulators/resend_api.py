@@ -0,0 +1,61 @@
+"""In-process Resend API simulator, installed as ``resend.default_http_client``.
+
+Handles single and batch email sends (strict or permissive batch validation);
+sent emails are kept in memory.
+"""
+
+import json
+import threading
+import uuid
+
+import resend
+
+from app.simulators.faults import FaultProfile
+
+_JSON = {"content-type": "application/json"}
+
+
+class ResendSimulator(resend.HTTPClient):
+    def __init__(self, faults: FaultProfile | None = None):
+        self.faults = faults or FaultProfile()
+        self.emails: list[dict] = []
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers, json=None, files=None, data=None):
+        with self._lock:
+            self.request_count += 1
+        injected = self.faults.apply()
+        if injected == 429:
+            return _error(429, "rate_limit_exceeded", "Too many requests")
+        if injected == 500:
+            return _error(500, "application_error", "Simulated Resend error")
+
+        if method.lower() != "post" or not url.endswith(("/emails", "/emails/batch")):
+            return _error(404, "not_found", f"Unknown endpoint {url}")
+        emails = (json or []) if url.endswith("/batch") else [json or {}]
+        invalid = [index for index, email in enumerate(emails) if not email.get("to") or not email.get("from")]
+        permissive = url.endswith("/batch") and headers.get("x-batch-validation") == "permissive"
+        if invalid and not permissive:
+            return _error(422, "validation_error", "Missing `to` or `from`")
+        ids = [self._store(email) for index, email in enumerate(emails) if index not in invalid]
+        if url.endswith("/batch"):
+            body = {"data": [{"id": email_id} for email_id in ids]}
+            if permissive:
+                body["errors"] = [{"index": index, "message": "Missing `to` or `from`"} for index in invalid]
+            return _ok(body)
+        return _ok({"id": ids[0]})
+
+    def _store(self, email: dict) -> str:
+        email = {**email, "id": str(uuid.uuid4())}
+        with self._lock:
+            self.emails.append(email)
+        return email["id"]
+
+
+def _ok(body: dict):
+    return json.dumps(body).encode(), 200, _JSON
+
+
+def _error(status: int, name: str, message: str):
+    return json.dumps({"statusCode": status, "name": name, "message": message}).encode(), status, _JSON
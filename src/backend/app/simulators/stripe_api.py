@@ -0,0 +1,296 @@
+"""In-process Stripe API simulator, installed as ``stripe.default_http_client``.
+
+The SDK builds and parses requests exactly as in production (form-encoded
+bodies, error mapping, retries, auto-pagination); only the transport is
+replaced. Supported: Checkout Sessions (create, retrieve, list), Products
+and Prices (create, update) and Charges (list). State lives in memory.
+
+A simulated session's ``url`` points at the simulator routes
+(app/routers/simulators.py): visiting it pays the session and delivers a
+signed ``checkout.session.completed`` webhook to the app, as Stripe would.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import re
+import threading
+import time
+import uuid
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+import stripe
+
+from app.config import settings
+from app.simulators.faults import FaultProfile
+
+_ROUTES = [
+    ("POST", re.compile(r"^/v1/checkout/sessions$"), "_create_session"),
+    ("GET", re.compile(r"^/v1/checkout/sessions$"), "_list_sessions"),
+    ("GET", re.compile(r"^/v1/checkout/sessions/(?P<id>[\w-]+)$"), "_retrieve_session"),
+    ("POST", re.compile(r"^/v1/products$"), "_create_product"),
+    ("POST", re.compile(r"^/v1/products/(?P<id>[\w-]+)$"), "_update_product"),
+    ("POST", re.compile(r"^/v1/prices$"), "_create_price"),
+    ("POST", re.compile(r"^/v1/prices/(?P<id>[\w-]+)$"), "_update_price"),
+    ("GET", re.compile(r"^/v1/charges$"), "_list_charges"),
+]
+
+
+class StripeNotFound(Exception):
+    pass
+
+
+def _token(prefix: str) -> str:
+    return f"{prefix}_sim_{uuid.uuid4().hex[:24]}"
+
+
+def _nested(pairs: list[tuple[str, str]]) -> dict:
+    """Decode Stripe's form encoding (``a[b][0][c]=v``) into dicts and lists."""
+    root: dict = {}
+    for key, value in pairs:
+        parts = re.findall(r"[^\[\]]+", key)
+        node = root
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return _listify(root)
+
+
+def _listify(node):
+    if not isinstance(node, dict):
+        return node
+    if node and all(key.isdigit() for key in node):
+        return [_listify(node[key]) for key in sorted(node, key=int)]
+    return {key: _listify(value) for key, value in node.items()}
+
+
+def _error(status: int, error_type: str, message: str) -> tuple[dict, int]:
+    return {"error": {"type": error_type, "message": message}}, status
+
+
+def sign_payload(payload: bytes, secret: str, timestamp: int | None = None) -> str:
+    """A Stripe-Signature header for `payload` (what stripe.Webhook verifies)."""
+    timestamp = timestamp or int(time.time())
+    signed = f"{timestamp}.".encode() + payload
+    signature = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+class StripeSimulator(stripe.HTTPClient):
+    name = "simulator"
+
+    def __init__(self, faults: FaultProfile | None = None, checkout_base_url: str | None = None):
+        super().__init__()
+        self.faults = faults or FaultProfile()
+        self.checkout_base_url = checkout_base_url or f"{settings.api_url}/api/v1/simulators/stripe"
+        self.sessions: dict[str, dict] = {}
+        self.products: dict[str, dict] = {}
+        self.prices: dict[str, dict] = {}
+        self.charges: dict[str, dict] = {}
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    # --- stripe.HTTPClient ---
+
+    def request(self, method, url, headers, post_data=None, *, _usage=None):
+        with self._lock:
+            self.request_count += 1
+        injected = self.faults.apply()
+        if injected == 429:
+            body, status = _error(429, "invalid_request_error", "Simulated rate limit")
+        elif injected == 500:
+            body, status = _error(500, "api_error", "Simulated Stripe error")
+        else:
+            body, status = self._dispatch(method.upper(), url, post_data)
+        return json.dumps(body), status, {"request-id": _token("req")}
+
+    def request_stream(self, method, url, headers, post_data=None, *, _usage=None):
+        raise NotImplementedError("The Stripe simulator does not stream")
+
+    def close(self):
+        pass
+
+    def _dispatch(self, method: str, url: str, post_data) -> tuple[dict, int]:
+        parts = urlsplit(url)
+        params = _nested(parse_qsl(parts.query) + parse_qsl(post_data or ""))
+        for route_method, pattern, handler in _ROUTES:
+            match = pattern.match(parts.path)
+            if match and route_method == method:
+                try:
+                    with self._lock:
+                        return getattr(self, handler)(params, **match.groupdict()), 200
+                except StripeNotFound as exc:
+                    return _error(404, "invalid_request_error", str(exc))
+                except (KeyError, ValueError) as exc:
+                    return _error(400, "invalid_request_error", f"Invalid request: {exc}")
+        return _error(404, "invalid_request_error", f"Unrecognized request URL ({method}: {parts.path})")
+
+    # --- Resources ---
+
+    def _get(self, store: dict, object_id: str) -> dict:
+        if object_id not in store:
+            raise StripeNotFound(f"No such object: '{object_id}'")
+        return store[object_id]
+
+    def _create_session(self, params: dict) -> dict:
+        amount = 0
+        for item in params.get("line_items", []):
+            if "price" in item:
+                unit_amount = int(self._get(self.prices, item["price"])["unit_amount"])
+            else:
+                unit_amount = int(item["price_data"]["unit_amount"])
+            amount += unit_amount * int(item.get("quantity", 1))
+        now = int(time.time())
+        session_id = _token("cs")
+        session = {
+            "id": session_id,
+            "object": "checkout.session",
+            "created": now,
+            "expires_at": int(params.get("expires_at") or now + 24 * 3600),
+            "status": "open",
+            "payment_status": "unpaid",
+            "mode": params.get("mode", "payment"),
+            "amount_total": amount,
+            "currency": "usd",
+            "client_reference_id": params.get("client_reference_id"),
+            "customer_email": params.get("customer_email"),
+            "metadata": params.get("metadata", {}),
+            "payment_intent": None,
+            "success_url": params.get("success_url"),
+            "cancel_url": params.get("cancel_url"),
+            "url": f"{self.checkout_base_url}/checkout/{session_id}",
+            "livemode": False,
+        }
+        self.sessions[session_id] = session
+        return session
+
+    def _retrieve_session(self, params: dict, id: str) -> dict:
+        return self._get(self.sessions, id)
+
+    def _list(self, store: dict, params: dict, url: str) -> dict:
+        created = params.get("created", {})
+        items = sorted(store.values(), key=lambda o: (o["created"], o["id"]), reverse=True)
+        if "gte" in created:
+            items = [o for o in items if o["created"] >= int(created["gte"])]
+        if "lt" in created:
+            items = [o for o in items if o["created"] < int(created["lt"])]
+        if after := params.get("starting_after"):
+            ids = [o["id"] for o in items]
+            items = items[ids.index(after) + 1:] if after in ids else []
+        limit = int(params.get("limit", 10))
+        return {"object": "list", "url": url, "data": items[:limit], "has_more": len(items) > limit}
+
+    def _list_sessions(self, params: dict) -> dict:
+        return self._list(self.sessions, params, "/v1/checkout/sessions")
+
+    def _list_charges(self, params: dict) -> dict:
+        return self._list(self.charges, params, "/v1/charges")
+
+    def _create_product(self, params: dict) -> dict:
+        product = {
+            "id": _token("prod"),
+            "object": "product",
+            "active": True,
+            "name": params["name"],
+            "metadata": params.get("metadata", {}),
+        }
+        self.products[product["id"]] = product
+        return product
+
+    def _update_product(self, params: dict, id: str) -> dict:
+        product = self._get(self.products, id)
+        product.update({k: v for k, v in params.items() if k in ("name", "metadata")})
+        return product
+
+    def _create_price(self, params: dict) -> dict:
+        self._get(self.products, params["product"])
+        price = {
+            "id": _token("price"),
+            "object": "price",
+            "active": True,
+            "product": params["product"],
+            "unit_amount": int(params["unit_amount"]),
+            "currency": params.get("currency", "usd"),
+            "metadata": params.get("metadata", {}),
+        }
+        self.prices[price["id"]] = price
+        return price
+
+    def _update_price(self, params: dict, id: str) -> dict:
+        price = self._get(self.prices, id)
+        if "active" in params:
+            price["active"] = params["active"] == "true"
+        return price
+
+    # --- Customer actions (what the hosted page / dashboard would do) ---
+
+    def _event(self, event_type: str, obj: dict) -> dict:
+        return {
+            "id": _token("evt"),
+            "object": "event",
+            "type": event_type,
+            "created": int(time.time()),
+            "livemode": False,
+            "data": {"object": dict(obj)},
+        }
+
+    def complete_session(self, session_id: str) -> dict:
+        """Pay an open session; returns the checkout.session.completed event."""
+        with self._lock:
+            session = self._get(self.sessions, session_id)
+            if session["status"] != "open":
+                raise ValueError(f"Session {session_id} is {session['status']}")
+            payment_intent = _token("pi")
+            session.update(status="complete", payment_status="paid", payment_intent=payment_intent)
+            charge = {
+                "id": _token("ch"),
+                "object": "charge",
+                "created": int(time.time()),
+                "amount": session["amount_total"],
+                "amount_refunded": 0,
+                "refunded": False,
+                "paid": True,
+                "payment_intent": payment_intent,
+            }
+            self.charges[charge["id"]] = charge
+            return self._event("checkout.session.completed", session)
+
+    def expire_session(self, session_id: str) -> dict:
+        """Expire an open session; returns the checkout.session.expired event."""
+        with self._lock:
+            session = self._get(self.sessions, session_id)
+            if session["status"] != "open":
+                raise ValueError(f"Session {session_id} is {session['status']}")
+            session["status"] = "expired"
+            return self._event("checkout.session.expired", session)
+
+    def refund(self, payment_intent: str, amount: int | None = None) -> dict:
+        """Refund a paid session's charge (fully by default); returns the charge.refunded event."""
+        with self._lock:
+            charge = next(
+                (c for c in self.charges.values() if c["payment_intent"] == payment_intent), None
+            )
+            if charge is None:
+                raise StripeNotFound(f"No charge for payment intent '{payment_intent}'")
+            charge["amount_refunded"] = min(charge["amount"], charge["amount_refunded"] + (amount or charge["amount"]))
+            charge["refunded"] = charge["amount_refunded"] >= charge["amount"]
+            return self._event("charge.refunded", charge)
+
+
+def webhook_url() -> str:
+    return settings.simulator_webhook_url or f"{settings.api_url}/api/v1/webhooks/stripe"
+
+
+async def deliver_webhook(event: dict, url: str | None = None) -> int:
+    """POST a signed event to the app's Stripe webhook endpoint. Returns the HTTP status."""
+    payload = json.dumps(event).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "Stripe-Signature": sign_payload(payload, settings.stripe_webhook_secret),
+    }
+    response = await asyncio.to_thread(
+        requests.post, url or webhook_url(), data=payload, headers=headers, timeout=10
+    )
+    return response.status_code
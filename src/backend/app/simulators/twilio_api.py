@@ -0,0 +1,66 @@
+"""In-process Twilio API simulator, passed to twilio.rest.Client as its http_client.
+
+Handles Messages create (the only Twilio call the app makes); sent messages
+are kept in memory.
+"""
+
+import json
+import logging
+import threading
+import uuid
+
+from twilio.http import HttpClient
+from twilio.http.response import Response
+
+from app.simulators.faults import FaultProfile
+
+logger = logging.getLogger(__name__)
+
+
+class TwilioSimulator(HttpClient):
+    def __init__(self, faults: FaultProfile | None = None):
+        super().__init__(logger, is_async=False)
+        self.faults = faults or FaultProfile()
+        self.messages: list[dict] = []
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method,
+        uri,
+        params=None,
+        data=None,
+        headers=None,
+        auth=None,
+        timeout=None,
+        allow_redirects=False,
+    ) -> Response:
+        with self._lock:
+            self.request_count += 1
+        injected = self.faults.apply()
+        if injected == 429:
+            return _error(429, 20429, "Too Many Requests")
+        if injected == 500:
+            return _error(500, 20500, "Simulated Twilio error")
+        if method.upper() != "POST" or not uri.endswith("/Messages.json"):
+            return _error(404, 20404, f"The requested resource {uri} was not found")
+
+        data = data or {}
+        message = {
+            "sid": f"SM{uuid.uuid4().hex}",
+            "account_sid": auth[0] if auth else None,
+            "to": data.get("To"),
+            "from": data.get("From"),
+            "body": data.get("Body"),
+            "status": "queued",
+            "direction": "outbound-api",
+            "num_segments": "1",
+        }
+        with self._lock:
+            self.messages.append(message)
+        return Response(201, json.dumps(message))
+
+
+def _error(status: int, code: int, message: str) -> Response:
+    return Response(status, json.dumps({"code": code, "message": message, "status": status}))
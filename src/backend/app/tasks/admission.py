@@ -0,0 +1,16 @@
+import logging
+
+from ..database import async_session
+from ..services.admission_service import purge_expired
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_admission_tickets() -> int:
+    """Remove spent waiting-room tickets that have expired."""
+    async with async_session() as db:
+        removed = await purge_expired(db)
+        await db.commit()
+    if removed:
+        logger.info("Purged %d expired waiting-room ticket uses", removed)
+    return removed
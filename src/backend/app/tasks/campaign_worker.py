@@ -0,0 +1,39 @@
+import asyncio
+import logging
+
+from ..config import settings
+from ..services import campaign_service
+
+logger = logging.getLogger(__name__)
+
+_task: asyncio.Task | None = None
+
+
+async def _run_worker() -> None:
+    while True:
+        try:
+            if await campaign_service.process_next():
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The campaign keeps its checkpoint; it is reclaimed once its lease lapses
+            logger.exception("Campaign worker error")
+        await campaign_service.wait_for_work(settings.campaign_poll_seconds)
+
+
+def start_campaign_worker() -> None:
+    """Start the campaign worker. Called during app lifespan startup."""
+    global _task
+    _task = asyncio.create_task(_run_worker(), name="campaign-worker")
+    logger.info("Started campaign worker")
+
+
+async def stop_campaign_worker() -> None:
+    """Cancel the worker. A running campaign resumes from its last chunk after its lease lapses."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
@@ -0,0 +1,16 @@
+import logging
+
+from ..database import async_session
+from ..services.idempotency_service import purge_expired
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_idempotency_keys() -> int:
+    """Remove Idempotency-Key records whose replay window has passed."""
+    async with async_session() as db:
+        removed = await purge_expired(db)
+        await db.commit()
+    if removed:
+        logger.info("Purged %d expired idempotency keys", removed)
+    return removed
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+
+from ..config import settings
+from ..services import notification_outbox
+
+logger = logging.getLogger(__name__)
+
+_task: asyncio.Task | None = None
+
+
+async def _run_dispatcher() -> None:
+    while True:
+        try:
+            if await notification_outbox.dispatch_batch():
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Claim/DB errors: back off for one poll interval and try again
+            logger.exception("Notification dispatcher error")
+        await notification_outbox.wait_for_work(settings.notification_outbox_poll_seconds)
+
+
+def start_notification_dispatcher() -> None:
+    """Start the notification outbox dispatcher. Called during app lifespan startup."""
+    global _task
+    _task = asyncio.create_task(_run_dispatcher(), name="notification-dispatcher")
+    logger.info("Started notification outbox dispatcher")
+
+
+async def stop_notification_dispatcher() -> None:
+    """Cancel the dispatcher. A batch being sent is retried after its lease lapses."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
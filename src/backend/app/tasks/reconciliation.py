@@ -0,0 +1,14 @@
+import logging
+
+from ..config import settings
+from ..services.stripe_reconciliation import reconcile
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_stripe_payments() -> None:
+    """Repair registrations whose Stripe webhooks were missed (ADR-007)."""
+    if not settings.stripe_secret_key:
+        return
+    stats = await reconcile()
+    logger.info("Stripe reconciliation: %s", stats.summary())
@@ -22,7 +22,7 @@ from ..models import (
     Registration,
     RegistrationStatus,
 )
-from ..services.email_service import send_event_reminder_email
+from ..services.email_service import event_reminder_email, send_batch
 from ..services.sms_service import send_sms
 
 logger = logging.getLogger(__name__)
@@ -83,38 +83,35 @@ async def send_event_reminders() -> int:
                     ]),
                 )
             )
-            registrations = reg_result.unique().scalars().all()
-
-            meeting_point = event.meeting_point_a or "See event details"
-
-            for reg in registrations:
-                if not reg.attendee:
-                    continue
-
-                # Idempotency: check if reminder already sent
-                existing = await db.execute(
-                    select(NotificationLog).where(
-                        NotificationLog.registration_id == reg.id,
-                        NotificationLog.template_id == template_id,
-                    )
+            registrations = [reg for reg in reg_result.unique().scalars().all() if reg.attendee]
+
+            # Idempotency: reminders already logged for these registrations, in one query
+            sms_template_id = f"{template_id}_sms"
+            logged = await db.execute(
+                select(NotificationLog.registration_id, NotificationLog.template_id).where(
+                    NotificationLog.registration_id.in_([reg.id for reg in registrations]),
+                    NotificationLog.template_id.in_([template_id, sms_template_id]),
                 )
-                if existing.first():
-                    continue
-
-                attendee = reg.attendee
-                content_key = f"{template_id}:{event.id}:{reg.id}"
-                content_hash = hashlib.sha256(content_key.encode()).hexdigest()[:64]
-
-                # Send email
-                if attendee.email:
-                    email_success = await send_event_reminder_email(
-                        reg, event, reminder_type
-                    )
+            )
+            emailed, texted = set(), set()
+            for registration_id, logged_template in logged:
+                (emailed if logged_template == template_id else texted).add(registration_id)
+            pending = [reg for reg in registrations if reg.id not in emailed]
+
+            # Send emails through Resend's batch endpoint
+            to_email = [reg for reg in pending if reg.attendee.email]
+            if to_email:
+                results = await send_batch(
+                    [event_reminder_email(reg, event, reminder_type) for reg in to_email],
+                    [f"{template_id}/{reg.id}" for reg in to_email],
+                )
+                for reg, email_success in zip(to_email, results):
+                    content_key = f"{template_id}:{event.id}:{reg.id}"
                     db.add(NotificationLog(
                         registration_id=reg.id,
                         channel=NotificationChannel.email,
                         template_id=template_id,
-                        content_hash=content_hash,
+                        content_hash=hashlib.sha256(content_key.encode()).hexdigest()[:64],
                         status=(
                             NotificationStatus.sent
                             if email_success
@@ -124,44 +121,40 @@ async def send_event_reminders() -> int:
                     if email_success:
                         sent_count += 1
 
-                # Send SMS (with idempotency check)
-                sms_template_id = f"{template_id}_sms"
-                if attendee.phone:
-                    existing_sms = await db.execute(
-                        select(NotificationLog).where(
-                            NotificationLog.registration_id == reg.id,
-                            NotificationLog.template_id == sms_template_id,
-                        )
+            meeting_point = event.meeting_point_a or "See event details"
+
+            # Send SMS (with idempotency check)
+            for reg in pending:
+                attendee = reg.attendee
+                if not attendee.phone or reg.id in texted:
+                    continue
+
+                event_date_str = event.event_date.strftime("%B %d, %Y")
+                if reminder_type == "1d":
+                    sms_body = (
+                        f"Hi {attendee.first_name}, reminder: {event.name} is tomorrow! "
+                        f"Meeting point: {meeting_point}. See you at Just Love Forest!"
                     )
-                    if existing_sms.first():
-                        continue
-
-                    event_date_str = event.event_date.strftime("%B %d, %Y")
-                    if reminder_type == "1d":
-                        sms_body = (
-                            f"Hi {attendee.first_name}, reminder: {event.name} is tomorrow! "
-                            f"Meeting point: {meeting_point}. See you at Just Love Forest!"
-                        )
-                    else:
-                        sms_body = (
-                            f"Hi {attendee.first_name}, {event.name} is coming up on "
-                            f"{event_date_str}! Looking forward to seeing you."
-                        )
-
-                    sms_success = await send_sms(attendee.phone, sms_body)
-                    db.add(NotificationLog(
-                        registration_id=reg.id,
-                        channel=NotificationChannel.sms,
-                        template_id=f"{template_id}_sms",
-                        content_hash=hashlib.sha256(sms_body.encode()).hexdigest()[:64],
-                        status=(
-                            NotificationStatus.sent
-                            if sms_success
-                            else NotificationStatus.failed
-                        ),
-                    ))
-                    if sms_success:
-                        sent_count += 1
+                else:
+                    sms_body = (
+                        f"Hi {attendee.first_name}, {event.name} is coming up on "
+                        f"{event_date_str}! Looking forward to seeing you."
+                    )
+
+                sms_success = await send_sms(attendee.phone, sms_body)
+                db.add(NotificationLog(
+                    registration_id=reg.id,
+                    channel=NotificationChannel.sms,
+                    template_id=sms_template_id,
+                    content_hash=hashlib.sha256(sms_body.encode()).hexdigest()[:64],
+                    status=(
+                        NotificationStatus.sent
+                        if sms_success
+                        else NotificationStatus.failed
+                    ),
+                ))
+                if sms_success:
+                    sent_count += 1
 
         await db.commit()
 
@@ -2,8 +2,14 @@ import logging
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from ..config import settings
+from .admission import purge_admission_tickets
 from .day_of_sms import send_day_of_notifications
+from .idempotency import purge_idempotency_keys
+from .reconciliation import reconcile_stripe_payments
+from .seat_leases import release_seat_leases
 from .reminders import send_event_reminders
+from .webhook_retention import archive_old_webhooks
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +22,8 @@ def start_scheduler() -> None:
     Called during FastAPI app lifespan startup.
 
     NOTE: Payment-chase jobs (check_pending_reminders, check_expired_registrations,
-    send_escalation_reminders) were removed in v4 per ADR-016. PENDING_PAYMENT is
-    now transient — no auto-expire or reminder timers needed.
+    send_escalation_reminders) were removed in v4 per ADR-016. PENDING_PAYMENT
+    only holds its seat for a short lease, released by release_seat_leases.
     """
     scheduler.add_job(
         send_day_of_notifications,
@@ -37,8 +43,57 @@ def start_scheduler() -> None:
         replace_existing=True,
     )
 
+    # Seat leases: return seats held by abandoned Stripe checkouts
+    scheduler.add_job(
+        release_seat_leases,
+        "interval",
+        minutes=1,
+        id="release_seat_leases",
+        replace_existing=True,
+    )
+
+    # Idempotency-Key records: drop expired replay entries
+    scheduler.add_job(
+        purge_idempotency_keys,
+        "interval",
+        minutes=15,
+        id="purge_idempotency_keys",
+        replace_existing=True,
+    )
+
+    # Waiting-room tickets: drop uses of tickets past their expiry
+    scheduler.add_job(
+        purge_admission_tickets,
+        "interval",
+        minutes=15,
+        id="purge_admission_tickets",
+        replace_existing=True,
+    )
+
+    # webhooks_raw retention: archive old processed payloads (daily, off-peak).
+    # Only with a durable archive dir configured; otherwise payloads stay in the DB.
+    if settings.webhook_archive_dir:
+        scheduler.add_job(
+            archive_old_webhooks,
+            "cron",
+            hour=8,
+            minute=30,
+            id="archive_old_webhooks",
+            replace_existing=True,
+        )
+
+    # Stripe reconciliation: catch payments/expiries/refunds whose webhooks were missed
+    scheduler.add_job(
+        reconcile_stripe_payments,
+        "cron",
+        hour=7,
+        minute=0,
+        id="reconcile_stripe_payments",
+        replace_existing=True,
+    )
+
     scheduler.start()
-    logger.info("Background scheduler started with 2 periodic jobs")
+    logger.info("Background scheduler started with %d periodic jobs", len(scheduler.get_jobs()))
 
 
 def stop_scheduler() -> None:
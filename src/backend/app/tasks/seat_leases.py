@@ -0,0 +1,16 @@
+import logging
+
+from ..database import async_session
+from ..services.capacity_service import release_expired_leases
+
+logger = logging.getLogger(__name__)
+
+
+async def release_seat_leases() -> int:
+    """Release seats held by pending_payment registrations whose lease lapsed."""
+    async with async_session() as db:
+        released = await release_expired_leases(db)
+        await db.commit()
+    if released:
+        logger.info("Released %d expired seat leases", released)
+    return released
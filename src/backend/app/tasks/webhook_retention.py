@@ -0,0 +1,19 @@
+import logging
+
+from ..config import settings
+from ..services.webhook_archive import archive_processed
+
+logger = logging.getLogger(__name__)
+
+
+async def archive_old_webhooks() -> int:
+    """Move processed webhook payloads past the retention window to the archive.
+
+    Does nothing unless a durable archive directory is configured.
+    """
+    if not settings.webhook_archive_dir:
+        return 0
+    archived = await archive_processed()
+    if archived:
+        logger.info("Archived %d webhook payloads", archived)
+    return archived
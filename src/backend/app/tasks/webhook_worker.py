@@ -0,0 +1,37 @@
+import asyncio
+import logging
+
+from ..config import settings
+from ..services import stripe_webhooks
+
+logger = logging.getLogger(__name__)
+
+_workers: list[asyncio.Task] = []
+
+
+async def _run_worker(n: int) -> None:
+    while True:
+        try:
+            if await stripe_webhooks.process_next():
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Claim/DB errors: back off for one poll interval and try again
+            logger.exception("Stripe webhook worker %d error", n)
+        await stripe_webhooks.wait_for_work(settings.stripe_webhook_poll_seconds)
+
+
+def start_webhook_workers() -> None:
+    """Start the Stripe webhook worker pool. Called during app lifespan startup."""
+    for n in range(settings.stripe_webhook_workers):
+        _workers.append(asyncio.create_task(_run_worker(n), name=f"stripe-webhook-worker-{n}"))
+    logger.info("Started %d Stripe webhook workers", len(_workers))
+
+
+async def stop_webhook_workers() -> None:
+    """Cancel the worker pool. An event being processed is retried after its lease lapses."""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
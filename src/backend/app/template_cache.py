@@ -0,0 +1,124 @@
+"""Compiled message templates — parse ``{{placeholders}}`` once, render many times.
+
+A template compiles to a list of literal segments and placeholder slots.
+Rendering fills the slots from a dict and joins the parts, with no regex
+per recipient. ``bind()`` fills the slots that are the same for every
+recipient (event name, date, meeting point, ...) once per send, so a bulk
+render only substitutes the attendee's own fields.
+
+MessageTemplate rows are cached by ``(id, updated_at)``: an edit bumps
+updated_at and the next send recompiles. Ad-hoc text (custom bulk
+messages, campaign snapshots, previews) is cached by content.
+
+Unknown placeholders render as written, like ``render_template_text``
+always did.
+"""
+
+import functools
+import re
+from datetime import datetime
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from app.models.message_template import MessageTemplate
+
+_PLACEHOLDER = re.compile(r"\{\{([\w.]+)\}\}")
+
+# Bound on ad-hoc texts kept compiled
+_MAX_TEXTS = 256
+
+
+class CompiledTemplate:
+    """Literal parts with placeholder slots.
+
+    ``_parts`` holds every segment, with a placeholder's original
+    ``{{name}}`` text in its slot; ``_slots`` lists ``(index, name)`` for the
+    slots still to fill.
+    """
+
+    __slots__ = ("_parts", "_slots")
+
+    def __init__(self, parts: list[str], slots: list[tuple[int, str]]):
+        self._parts = parts
+        self._slots = slots
+
+    @classmethod
+    def parse(cls, text: str) -> "CompiledTemplate":
+        parts: list[str] = []
+        slots: list[tuple[int, str]] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(text):
+            if match.start() > position:
+                parts.append(text[position:match.start()])
+            slots.append((len(parts), match.group(1)))
+            parts.append(match.group(0))
+            position = match.end()
+        if position < len(text):
+            parts.append(text[position:])
+        return cls(parts, slots)
+
+    @property
+    def placeholders(self) -> set[str]:
+        """Names still to be filled."""
+        return {name for _, name in self._slots}
+
+    def bind(self, variables: dict[str, str]) -> "CompiledTemplate":
+        """A copy with every placeholder in `variables` filled in and merged into its neighbours."""
+        filled = dict(self._slots)
+        parts: list[str] = []
+        slots: list[tuple[int, str]] = []
+        literal = False  # whether parts[-1] is a literal that can absorb the next one
+        for index, part in enumerate(self._parts):
+            name = filled.get(index)
+            if name is not None and name not in variables:
+                slots.append((len(parts), name))
+                parts.append(part)
+                literal = False
+                continue
+            value = variables[name] if name is not None else part
+            if literal:
+                parts[-1] += value
+            else:
+                parts.append(value)
+                literal = True
+        return CompiledTemplate(parts, slots)
+
+    def render(self, variables: dict[str, str]) -> str:
+        if not self._slots:
+            return "".join(self._parts)
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            value = variables.get(name)
+            if value is not None:
+                parts[index] = value
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=_MAX_TEXTS)
+def compile_text(text: str) -> CompiledTemplate:
+    """The compiled form of `text` (cached by content)."""
+    return CompiledTemplate.parse(text)
+
+
+# template id -> (updated_at, compiled body, compiled subject or None)
+_templates: dict[UUID, tuple[datetime | None, CompiledTemplate, CompiledTemplate | None]] = {}
+
+
+def compile_message_template(
+    template: "MessageTemplate",
+) -> tuple[CompiledTemplate, CompiledTemplate | None]:
+    """Compiled body and subject of a MessageTemplate, recompiled when it is edited."""
+    cached = _templates.get(template.id)
+    if cached is not None and cached[0] == template.updated_at:
+        return cached[1], cached[2]
+    body = CompiledTemplate.parse(template.body)
+    subject = CompiledTemplate.parse(template.subject) if template.subject else None
+    _templates[template.id] = (template.updated_at, body, subject)
+    return body, subject
+
+
+def clear() -> None:
+    """Forget all compiled templates (tests)."""
+    _templates.clear()
+    compile_text.cache_clear()
@@ -0,0 +1,484 @@
+"""Benchmark webhook ingestion with signed synthetic Stripe and Twilio traffic.
+
+Usage:
+    cd src/backend
+    DATABASE_URL=postgresql://localhost/jlf_bench python -m app.tools.bench_webhooks \\
+        --registrations 2000 --concurrency 32 --workers 4 --json bench.json
+
+Seeds a throwaway event with --registrations pending Stripe registrations,
+then builds the traffic Stripe and Twilio would send for them:
+checkout.session.completed for most sessions and .expired for the rest,
+full refunds for some payments, late expiries for sessions already paid,
+redeliveries of a share of the events (same event id / MessageSid) and
+inbound "ETA" texts from the attendees' phones. The traffic is shuffled, so
+handlers also see refunds before payments and expiries after them.
+
+Everything is signed with the configured webhook secrets (bench secrets
+when unset) and posted concurrently to the app in-process: the real
+middleware, routers and database, minus the network hop. Ingestion is
+reported per kind as p50/p99 latency and SQL statements per request; the
+queued Stripe events are then drained by --workers webhook workers and
+reported the same way (confirmation emails are only queued in the
+notification outbox). Run it against a scratch database: seeded rows are
+left behind.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import math
+import random
+import sys
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from twilio.request_validator import RequestValidator
+
+from app.config import settings
+from app.database import async_session
+from app.models import (
+    Attendee,
+    Event,
+    EventStatus,
+    PricingModel,
+    Registration,
+    RegistrationSource,
+    RegistrationStatus,
+)
+from app.services import stripe_webhooks
+from app.simulators.stripe_api import sign_payload
+
+logger = logging.getLogger(__name__)
+
+STRIPE_PATH = "/api/v1/webhooks/stripe"
+TWILIO_PATH = "/api/v1/webhooks/twilio/inbound"
+_BASE_URL = "http://bench"
+_PRICE_CENTS = 25000
+
+# Statement counter for the request (or worker) running in this context.
+# SQLAlchemy runs the sync cursor events in a greenlet that shares the
+# calling task's context, so concurrent requests are counted separately.
+_statements: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar(
+    "bench_statements", default=None
+)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@dataclass
+class Mix:
+    """Traffic shape, as shares of the seeded registrations."""
+
+    expired: float = 0.2
+    refunded: float = 0.1
+    late_expired: float = 0.05
+    sms: float = 0.5
+    duplicates: float = 0.1
+
+
+@dataclass
+class Delivery:
+    kind: str
+    path: str
+    body: bytes
+    twilio_signature: str | None = None
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+@dataclass
+class KindStats:
+    latencies: list[float] = field(default_factory=list)
+    statements: list[int] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, latency: float, statements: int, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.statements.append(statements)
+        if not ok:
+            self.errors += 1
+
+    def to_dict(self) -> dict:
+        count = len(self.latencies)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "p50_ms": round(_percentile(self.latencies, 50) * 1000, 2),
+            "p99_ms": round(_percentile(self.latencies, 99) * 1000, 2),
+            "queries_per_event": round(sum(self.statements) / count, 2) if count else 0.0,
+        }
+
+
+@dataclass
+class BenchResult:
+    kinds: dict[str, KindStats] = field(default_factory=dict)
+    ingest_seconds: float = 0.0
+    processed: int = 0
+    failed: int = 0
+    process_seconds: float = 0.0
+    process_statements: int = 0
+
+    @property
+    def requests(self) -> int:
+        return sum(len(stats.latencies) for stats in self.kinds.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(stats.errors for stats in self.kinds.values())
+
+    def to_dict(self) -> dict:
+        all_latencies = [latency for stats in self.kinds.values() for latency in stats.latencies]
+        all_statements = sum(sum(stats.statements) for stats in self.kinds.values())
+        return {
+            "ingest": {
+                "requests": self.requests,
+                "errors": self.errors,
+                "seconds": round(self.ingest_seconds, 3),
+                "events_per_second": round(self.requests / self.ingest_seconds, 1)
+                if self.ingest_seconds else 0.0,
+                "p50_ms": round(_percentile(all_latencies, 50) * 1000, 2),
+                "p99_ms": round(_percentile(all_latencies, 99) * 1000, 2),
+                "queries_per_event": round(all_statements / self.requests, 2) if self.requests else 0.0,
+                "kinds": {kind: stats.to_dict() for kind, stats in sorted(self.kinds.items())},
+            },
+            "processing": {
+                "events": self.processed,
+                "failed": self.failed,
+                "seconds": round(self.process_seconds, 3),
+                "events_per_second": round(self.processed / self.process_seconds, 1)
+                if self.process_seconds else 0.0,
+                "queries_per_event": round(self.process_statements / self.processed, 2)
+                if self.processed else 0.0,
+            },
+        }
+
+    def report(self) -> str:
+        data = self.to_dict()
+        ingest, processing = data["ingest"], data["processing"]
+        lines = [f"{'kind':<22}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}"]
+        for kind, stats in ingest["kinds"].items():
+            lines.append(
+                f"{kind:<22}{stats['count']:>8}{stats['errors']:>8}"
+                f"{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['queries_per_event']:>9.2f}"
+            )
+        lines.append(
+            f"ingest: {ingest['requests']} requests in {ingest['seconds']:.2f}s "
+            f"({ingest['events_per_second']:.1f}/s), p50 {ingest['p50_ms']:.2f}ms, "
+            f"p99 {ingest['p99_ms']:.2f}ms, {ingest['queries_per_event']:.2f} queries/event, "
+            f"{ingest['errors']} errors"
+        )
+        lines.append(
+            f"processing: {processing['events']} events in {processing['seconds']:.2f}s "
+            f"({processing['events_per_second']:.1f}/s), "
+            f"{processing['queries_per_event']:.2f} queries/event, {processing['failed']} failed"
+        )
+        return "\n".join(lines)
+
+
+# --- Traffic ---
+
+
+def _stripe_event(event_type: str, obj: dict) -> dict:
+    return {
+        "id": f"evt_bench_{uuid.uuid4().hex}",
+        "object": "event",
+        "type": event_type,
+        "created": int(time.time()),
+        "livemode": False,
+        "data": {"object": obj},
+    }
+
+
+def _session(registration: Registration, status: str) -> dict:
+    paid = status == "complete"
+    return {
+        "id": registration.stripe_checkout_session_id,
+        "object": "checkout.session",
+        "client_reference_id": str(registration.id),
+        "metadata": {"registration_id": str(registration.id)},
+        "status": status,
+        "payment_status": "paid" if paid else "unpaid",
+        "payment_intent": f"pi_{registration.stripe_checkout_session_id}" if paid else None,
+        "amount_total": _PRICE_CENTS,
+    }
+
+
+def _refund(registration: Registration) -> dict:
+    return {
+        "id": f"ch_bench_{uuid.uuid4().hex}",
+        "object": "charge",
+        "payment_intent": f"pi_{registration.stripe_checkout_session_id}",
+        "amount": _PRICE_CENTS,
+        "amount_refunded": _PRICE_CENTS,
+        "refunded": True,
+    }
+
+
+def _sms(attendee: Attendee) -> dict:
+    return {
+        "MessageSid": f"SM{uuid.uuid4().hex}",
+        "AccountSid": settings.twilio_account_sid or "AC" + "0" * 32,
+        "From": attendee.phone,
+        "To": settings.twilio_phone_number or "+15005550006",
+        "Body": "On my way, about 30 min",
+    }
+
+
+def build_traffic(
+    registrations: list[Registration], mix: Mix, rng: random.Random
+) -> list[Delivery]:
+    """Signed-at-send Stripe events plus signed Twilio posts for the seeded registrations, shuffled."""
+    validator = RequestValidator(settings.twilio_auth_token)
+    stripe_events: list[tuple[str, dict]] = []
+    sms_posts: list[dict] = []
+
+    for registration in registrations:
+        if rng.random() < mix.expired:
+            stripe_events.append(("stripe.expired", _stripe_event(
+                "checkout.session.expired", _session(registration, "expired")
+            )))
+        else:
+            stripe_events.append(("stripe.completed", _stripe_event(
+                "checkout.session.completed", _session(registration, "complete")
+            )))
+            if rng.random() < mix.refunded:
+                stripe_events.append(("stripe.refunded", _stripe_event(
+                    "charge.refunded", _refund(registration)
+                )))
+            if rng.random() < mix.late_expired:
+                stripe_events.append(("stripe.late_expired", _stripe_event(
+                    "checkout.session.expired", _session(registration, "expired")
+                )))
+        if rng.random() < mix.sms:
+            sms_posts.append(_sms(registration.attendee))
+
+    deliveries = [
+        Delivery(kind, STRIPE_PATH, json.dumps(event).encode()) for kind, event in stripe_events
+    ]
+    for form in sms_posts:
+        # Stored as JSON, posted form-encoded
+        signature = validator.compute_signature(f"{_BASE_URL}{TWILIO_PATH}", form)
+        deliveries.append(Delivery("twilio.inbound", TWILIO_PATH, json.dumps(form).encode(), signature))
+
+    duplicates = [
+        Delivery(
+            "stripe.duplicate" if delivery.path == STRIPE_PATH else "twilio.duplicate",
+            delivery.path,
+            delivery.body,
+            delivery.twilio_signature,
+        )
+        for delivery in rng.sample(deliveries, int(len(deliveries) * mix.duplicates))
+    ]
+    deliveries += duplicates
+    rng.shuffle(deliveries)
+    return deliveries
+
+
+# --- Run ---
+
+
+async def seed(session_factory: async_sessionmaker, count: int) -> list[Registration]:
+    """A throwaway paid event with `count` pending Stripe registrations."""
+    tag = uuid.uuid4().hex[:8]
+    now = datetime.now(timezone.utc)
+    event = Event(
+        id=uuid.uuid4(),
+        name=f"Webhook benchmark {tag}",
+        slug=f"webhook-bench-{tag}",
+        event_date=now,
+        event_type="benchmark",
+        pricing_model=PricingModel.fixed,
+        fixed_price_cents=_PRICE_CENTS,
+        capacity=None,
+        status=EventStatus.draft,
+    )
+    attendees = [
+        Attendee(
+            id=uuid.uuid4(),
+            email=f"bench+{tag}-{n}@example.com",
+            first_name="Bench",
+            last_name=str(n),
+            phone=f"+1555{n:07d}",
+        )
+        for n in range(count)
+    ]
+    registrations = [
+        Registration(
+            id=uuid.uuid4(),
+            attendee=attendee,
+            event=event,
+            status=RegistrationStatus.pending_payment,
+            source=RegistrationSource.registration_form,
+            waiver_accepted_at=now,
+            stripe_checkout_session_id=f"cs_bench_{uuid.uuid4().hex}",
+        )
+        for attendee in attendees
+    ]
+    async with session_factory() as db:
+        db.add(event)
+        db.add_all(attendees)
+        db.add_all(registrations)
+        await db.commit()
+    return registrations
+
+
+@contextmanager
+def _bench_environment() -> Iterator[None]:
+    """Webhook secrets for the run (bench values when unset), restored afterwards."""
+    saved = settings.stripe_webhook_secret, settings.twilio_auth_token
+    settings.stripe_webhook_secret = settings.stripe_webhook_secret or "whsec_bench"
+    settings.twilio_auth_token = settings.twilio_auth_token or "bench"
+    try:
+        yield
+    finally:
+        settings.stripe_webhook_secret, settings.twilio_auth_token = saved
+
+
+async def _send(client: AsyncClient, delivery: Delivery, result: BenchResult) -> None:
+    counter = [0]
+    token = _statements.set(counter)
+    started = time.perf_counter()
+    try:
+        if delivery.path == STRIPE_PATH:
+            response = await client.post(
+                STRIPE_PATH,
+                content=delivery.body,
+                headers={
+                    "content-type": "application/json",
+                    "stripe-signature": sign_payload(delivery.body, settings.stripe_webhook_secret),
+                },
+            )
+        else:
+            response = await client.post(
+                TWILIO_PATH,
+                data=json.loads(delivery.body),
+                headers={"X-Twilio-Signature": delivery.twilio_signature},
+            )
+        ok = response.status_code == 200
+    except Exception:
+        logger.exception("Benchmark %s request failed", delivery.kind)
+        ok = False
+    finally:
+        _statements.reset(token)
+    result.kinds.setdefault(delivery.kind, KindStats()).record(
+        time.perf_counter() - started, counter[0], ok
+    )
+
+
+async def _ingest(app: FastAPI, deliveries: list[Delivery], concurrency: int, result: BenchResult) -> None:
+    pending = iter(deliveries)
+
+    async def _sender(client: AsyncClient) -> None:
+        for delivery in pending:
+            await _send(client, delivery, result)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=_BASE_URL) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_sender(client) for _ in range(concurrency)))
+        result.ingest_seconds = time.perf_counter() - started
+
+
+async def _drain(session_factory: async_sessionmaker, workers: int, result: BenchResult) -> None:
+    async def _worker() -> None:
+        counter = [0]
+        _statements.set(counter)
+        while True:
+            async with session_factory() as db:
+                webhook_id = await stripe_webhooks.claim_next(db)
+                if webhook_id is None:
+                    break
+                if await stripe_webhooks.process_webhook(db, webhook_id):
+                    result.processed += 1
+                else:
+                    result.failed += 1
+        result.process_statements += counter[0]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(workers)))
+    result.process_seconds = time.perf_counter() - started
+
+
+async def run(
+    registrations: int = 500,
+    concurrency: int = 16,
+    workers: int = 4,
+    mix: Mix | None = None,
+    seed_value: int | None = None,
+    app: FastAPI | None = None,
+    session_factory: async_sessionmaker = async_session,
+) -> BenchResult:
+    """Seed, fire the synthetic traffic at the webhook routes, then drain the queue."""
+    if settings.app_env == "production":
+        raise RuntimeError("The webhook benchmark cannot run against production")
+    if app is None:
+        from app.main import app
+
+    engine = session_factory.kw["bind"].sync_engine
+    result = BenchResult()
+    sa_event.listen(engine, "before_cursor_execute", _count_statement)
+    try:
+        with _bench_environment():
+            seeded = await seed(session_factory, registrations)
+            deliveries = build_traffic(seeded, mix or Mix(), random.Random(seed_value))
+            logger.info("Seeded %d registrations; sending %d requests", registrations, len(deliveries))
+            await _ingest(app, deliveries, concurrency, result)
+            await _drain(session_factory, workers, result)
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", _count_statement)
+    return result
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.bench_webhooks",
+        description="Benchmark webhook ingestion with signed synthetic Stripe and Twilio traffic.",
+    )
+    parser.add_argument("--registrations", type=int, default=500, help="Registrations to seed (default 500)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent senders (default 16)")
+    parser.add_argument("--workers", type=int, default=4, help="Webhook workers draining the queue (default 4)")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Share of requests redelivered (default 0.1)")
+    parser.add_argument("--seed", type=int, help="Random seed for a repeatable traffic mix")
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    result = await run(
+        registrations=max(args.registrations, 1),
+        concurrency=max(args.concurrency, 1),
+        workers=max(args.workers, 1),
+        mix=Mix(duplicates=args.duplicates),
+        seed_value=args.seed,
+    )
+    print(result.report())
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result.to_dict(), f, indent=2)
+    return 1 if result.errors or result.failed else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,230 @@
+"""Replay stored Stripe webhooks from webhooks_raw through the live handlers.
+
+Usage:
+    cd src/backend
+    python -m app.tools.replay_webhooks --failed
+    python -m app.tools.replay_webhooks --since 2026-10-01 --until 2026-10-02 \\
+        --type checkout.session.completed --concurrency 16
+
+Rows are streamed oldest first (a server-side cursor on Postgres) into a
+bounded queue worked by --concurrency tasks, each dispatching one event per
+transaction exactly as the webhook workers do. Handlers are idempotent and
+only move registrations forward from an unpaid state (a replayed
+checkout.session.completed leaves refunded and cancelled ones alone), so
+replaying already-processed events is safe.
+
+Only events the webhook workers no longer own are replayed: processed
+ones, and failed ones that have used up stripe_webhook_max_attempts.
+Events still queued or retrying are left to the workers, so the two never
+run the same event at once. Archived events (payload moved out by
+``python -m app.tools.webhook_archive``) are counted as skipped; restore
+them first to replay them.
+
+Prints progress every few seconds and a summary; exits non-zero if any
+event failed.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.models.webhook import WebhookRaw
+from app.services import stripe_webhooks
+
+logger = logging.getLogger(__name__)
+
+# SQLite has no server-side cursors and an open read blocks writers, so
+# there ids are read in keyset pages instead
+_PAGE_SIZE = 1000
+
+
+@dataclass
+class ReplayFilter:
+    since: datetime | None = None
+    until: datetime | None = None
+    event_types: list[str] = field(default_factory=list)
+    failed_only: bool = False
+
+    def _matching(self) -> list:
+        exhausted = WebhookRaw.attempts >= settings.stripe_webhook_max_attempts
+        conditions = [WebhookRaw.stripe_event_id.is_not(None)]
+        if self.since:
+            conditions.append(WebhookRaw.created_at >= self.since)
+        if self.until:
+            conditions.append(WebhookRaw.created_at < self.until)
+        if self.event_types:
+            conditions.append(WebhookRaw.event_type.in_(self.event_types))
+        if self.failed_only:
+            conditions += [WebhookRaw.processed_at.is_(None), exhausted]
+        else:
+            conditions.append(or_(WebhookRaw.processed_at.is_not(None), exhausted))
+        return conditions
+
+    def conditions(self) -> list:
+        """Matching events that still have their payload."""
+        return [*self._matching(), WebhookRaw.archived_at.is_(None)]
+
+    def archived_conditions(self) -> list:
+        return [*self._matching(), WebhookRaw.archived_at.is_not(None)]
+
+
+@dataclass
+class ReplayStats:
+    replayed: int = 0
+    failed: int = 0
+    archived: int = 0
+    failed_ids: list[UUID] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        return (self.replayed + self.failed) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.replayed} replayed, {self.failed} failed, {self.archived} skipped (archived) "
+            f"in {self.elapsed:.1f}s ({self.rate:.1f} events/s)"
+        )
+
+
+async def _stream_ids(session_factory: async_sessionmaker, replay_filter: ReplayFilter):
+    async with session_factory() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            result = await db.stream(
+                select(WebhookRaw.id)
+                .where(*replay_filter.conditions())
+                .order_by(WebhookRaw.created_at, WebhookRaw.id)
+                .execution_options(yield_per=_PAGE_SIZE)
+            )
+            async for webhook_id in result.scalars():
+                yield webhook_id
+            return
+
+    after = None
+    while True:
+        stmt = (
+            select(WebhookRaw.id, WebhookRaw.created_at)
+            .where(*replay_filter.conditions())
+            .order_by(WebhookRaw.created_at, WebhookRaw.id)
+            .limit(_PAGE_SIZE)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(WebhookRaw.created_at, WebhookRaw.id) > after)
+        async with session_factory() as db:
+            rows = (await db.execute(stmt)).all()
+        for webhook_id, _ in rows:
+            yield webhook_id
+        if len(rows) < _PAGE_SIZE:
+            return
+        after = (rows[-1].created_at, rows[-1].id)
+
+
+async def replay(
+    replay_filter: ReplayFilter,
+    concurrency: int = 8,
+    session_factory: async_sessionmaker = async_session,
+    progress_every: float = 5.0,
+) -> ReplayStats:
+    """Re-dispatch every matching Stripe event; returns throughput and failure stats."""
+    stats = ReplayStats()
+    async with session_factory() as db:
+        stats.archived = await db.scalar(
+            select(func.count()).select_from(WebhookRaw).where(*replay_filter.archived_conditions())
+        )
+    if stats.archived:
+        logger.warning(
+            "Skipping %d archived events; restore them with "
+            "python -m app.tools.webhook_archive restore to replay them",
+            stats.archived,
+        )
+    queue: asyncio.Queue[UUID | None] = asyncio.Queue(maxsize=concurrency * 4)
+
+    async def _worker() -> None:
+        while (webhook_id := await queue.get()) is not None:
+            try:
+                async with session_factory() as db:
+                    ok = await stripe_webhooks.process_webhook(db, webhook_id)
+            except Exception:
+                logger.exception("Could not replay webhooks_raw %s", webhook_id)
+                ok = False
+            if ok:
+                stats.replayed += 1
+            else:
+                stats.failed += 1
+                stats.failed_ids.append(webhook_id)
+
+    async def _report() -> None:
+        while True:
+            await asyncio.sleep(progress_every)
+            logger.info("Progress: %s", stats.summary())
+
+    workers = [asyncio.create_task(_worker()) for _ in range(concurrency)]
+    reporter = asyncio.create_task(_report())
+    try:
+        async for webhook_id in _stream_ids(session_factory, replay_filter):
+            await queue.put(webhook_id)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        reporter.cancel()
+        for task in workers:
+            task.cancel()
+    return stats
+
+
+def _parse_date(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.replay_webhooks",
+        description="Replay stored Stripe webhooks through the live handlers.",
+    )
+    parser.add_argument("--since", type=_parse_date, help="Received at or after (ISO date/time, UTC)")
+    parser.add_argument("--until", type=_parse_date, help="Received before (ISO date/time, UTC)")
+    parser.add_argument(
+        "--type", dest="event_types", action="append", default=[],
+        help="Stripe event type; repeat for several",
+    )
+    parser.add_argument(
+        "--failed", action="store_true", help="Only events that failed every retry (never processed)"
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent workers (default 8)")
+    return parser.parse_args(argv)
+
+
+async def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    replay_filter = ReplayFilter(
+        since=args.since,
+        until=args.until,
+        event_types=args.event_types,
+        failed_only=args.failed,
+    )
+    stats = await replay(replay_filter, concurrency=max(args.concurrency, 1))
+    logger.info("Done: %s", stats.summary())
+    for webhook_id in stats.failed_ids:
+        logger.warning("Failed: webhooks_raw %s", webhook_id)
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,63 @@
+"""Archive or restore webhooks_raw payloads (see app/services/webhook_archive.py).
+
+Usage:
+    cd src/backend
+    python -m app.tools.webhook_archive archive [--older-than-days 90]
+    python -m app.tools.webhook_archive restore --since 2026-03-01 [--until 2026-03-07] \\
+        [--event-id evt_123 ...]
+
+Restored rows can then be replayed with ``python -m app.tools.replay_webhooks``.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import date, timedelta
+
+from app.config import settings
+from app.services import webhook_archive
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.webhook_archive")
+    parser.add_argument(
+        "--dir",
+        default=settings.webhook_archive_dir or None,
+        required=not settings.webhook_archive_dir,
+        help="Archive directory (default: WEBHOOK_ARCHIVE_DIR)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive = commands.add_parser("archive", help="Archive processed payloads past retention")
+    archive.add_argument("--older-than-days", type=int, default=settings.webhook_retention_days)
+
+    restore = commands.add_parser("restore", help="Restore archived payloads into webhooks_raw")
+    restore.add_argument("--since", type=date.fromisoformat, required=True, help="First day (received on)")
+    restore.add_argument("--until", type=date.fromisoformat, help="Last day, inclusive (default: --since)")
+    restore.add_argument(
+        "--event-id", dest="event_ids", action="append", help="Only this Stripe event id; repeat for several"
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if args.command == "archive":
+        count = await webhook_archive.archive_processed(
+            archive_dir=args.dir, older_than=timedelta(days=args.older_than_days)
+        )
+        logger.info("Archived %d webhook payloads to %s", count, args.dir)
+    else:
+        count = await webhook_archive.restore(
+            args.since, args.until, stripe_event_ids=args.event_ids, archive_dir=args.dir
+        )
+        logger.info("Restored %d webhook payloads from %s", count, args.dir)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    sys.exit(asyncio.run(main()))
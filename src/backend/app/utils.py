@@ -2,6 +2,8 @@
 
 import re
 
+from app.template_cache import compile_text
+
 
 def normalize_phone(phone: str | None) -> str | None:
     """Normalize a phone number to E.164 format (+1XXXXXXXXXX).
@@ -39,8 +41,8 @@ def normalize_phone(phone: str | None) -> str | None:
 
 
 def render_template_text(text: str, variables: dict[str, str]) -> str:
-    """Replace {{variable}} placeholders with values."""
-    def replacer(match):
-        key = match.group(1).strip()
-        return variables.get(key, match.group(0))
-    return re.sub(r"\{\{([\w.]+)\}\}", replacer, text)
+    """Replace {{variable}} placeholders with values.
+
+    For one-off renders; bulk sends bind a compiled template once (see app/template_cache.py).
+    """
+    return compile_text(text).render(variables)
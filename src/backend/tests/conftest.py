@@ -6,8 +6,10 @@ import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app import http_cache, template_cache
 from app.database import get_db
 from app.limiter import limiter
+from app.services import circuit_breaker, event_catalog
 from app.models import Base
 from app.main import app
 
@@ -62,6 +64,10 @@ async def setup_database():
     async with engine.begin() as conn:
         for table in reversed(Base.metadata.sorted_tables):
             await conn.execute(table.delete())
+    http_cache.clear()
+    event_catalog.clear()
+    template_cache.clear()
+    circuit_breaker.reset()
 
 
 def pytest_sessionfinish(session, exitstatus):
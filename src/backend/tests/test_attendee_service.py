@@ -0,0 +1,81 @@
+"""Tests for attendee_service — case-insensitive attendee upserts."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Attendee, Registration
+from app.services import attendee_service
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+def _person(email: str, first_name: str = "Casey", phone: str | None = None):
+    return SimpleNamespace(email=email, first_name=first_name, last_name="Rivera", phone=phone)
+
+
+async def _attendee_count() -> int:
+    async with TestSessionLocal() as session:
+        return (await session.execute(select(func.count(Attendee.id)))).scalar()
+
+
+async def test_upsert_matches_email_case_insensitively(db_session: AsyncSession, sample_attendee):
+    found = await attendee_service.upsert_attendees(
+        db_session, [_person(" JANE@Example.com ", "Other"), _person("new@example.com")]
+    )
+    await db_session.commit()
+
+    assert set(found) == {"jane@example.com", "new@example.com"}
+    jane = found["jane@example.com"]
+    assert jane.id == sample_attendee.id
+    # Public paths never overwrite existing details
+    assert jane.first_name == "Jane"
+    assert await _attendee_count() == 2
+
+
+async def test_upsert_overwrite_keeps_phone_when_not_given(db_session: AsyncSession, sample_attendee):
+    attendee = await attendee_service.upsert_attendee(
+        db_session, _person("Jane@example.com", "Janet"), overwrite=True
+    )
+    assert attendee.id == sample_attendee.id
+    assert attendee.first_name == "Janet"
+    assert attendee.last_name == "Rivera"
+    assert attendee.phone == "+14045551234"
+
+
+async def test_registration_reuses_attendee_with_different_case(client, sample_event, sample_attendee):
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_case",
+    ):
+        response = await client.post(
+            f"/api/v1/register/{sample_event.slug}",
+            json={
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": "JANE@EXAMPLE.COM",
+                "waiver_accepted": True,
+            },
+        )
+        assert response.status_code == 201
+
+        again = await client.post(
+            f"/api/v1/register/{sample_event.slug}",
+            json={
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": "jane@example.com",
+                "waiver_accepted": True,
+            },
+        )
+    assert again.status_code == 409
+    assert await _attendee_count() == 1
+
+    async with TestSessionLocal() as session:
+        reg = (await session.execute(select(Registration))).scalar_one()
+        assert reg.attendee_id == sample_attendee.id
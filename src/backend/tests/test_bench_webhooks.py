@@ -0,0 +1,72 @@
+"""Tests for app.tools.bench_webhooks — the webhook ingestion benchmark."""
+
+import random
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.main import app
+from app.models import Registration, SmsConversation, WebhookRaw
+from app.tools import bench_webhooks
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_bench_reports_ingest_and_processing():
+    result = await bench_webhooks.run(
+        registrations=40, concurrency=8, workers=1, seed_value=5, app=app, session_factory=TestSessionLocal
+    )
+    data = result.to_dict()
+    ingest = data["ingest"]
+    assert ingest["errors"] == 0
+    assert ingest["events_per_second"] > 0
+    assert ingest["p99_ms"] >= ingest["p50_ms"] > 0
+    assert {"stripe.completed", "stripe.expired", "twilio.inbound"} <= set(ingest["kinds"])
+
+    async with TestSessionLocal() as db:
+        stripe_stored = await db.scalar(
+            select(func.count()).where(WebhookRaw.stripe_event_id.is_not(None))
+        )
+        twilio_stored = await db.scalar(select(func.count()).where(WebhookRaw.twilio_sid.is_not(None)))
+        conversations = await db.scalar(select(func.count()).select_from(SmsConversation))
+        statuses = Counter((await db.execute(select(Registration.status))).scalars())
+    kinds = ingest["kinds"]
+    stripe_unique = sum(kinds[k]["count"] for k in kinds if k.startswith("stripe.") and k != "stripe.duplicate")
+    # Redeliveries are acknowledged but stored once
+    assert stripe_stored == stripe_unique == data["processing"]["events"]
+    assert twilio_stored == conversations == kinds["twilio.inbound"]["count"]
+    assert data["processing"]["failed"] == 0
+    assert sum(statuses.values()) == 40
+    assert statuses.keys() <= {"complete", "expired", "refunded", "pending_payment"}
+
+
+async def test_statements_are_counted_per_request():
+    result = await bench_webhooks.run(
+        registrations=30, concurrency=6, workers=1, seed_value=1, app=app, session_factory=TestSessionLocal
+    )
+    # Every first delivery of a Stripe event costs the same statements however
+    # many requests are in flight, and redeliveries cost no more than that
+    completed = result.kinds["stripe.completed"].statements
+    assert len(set(completed)) == 1 and completed[0] > 0
+    assert max(result.kinds["stripe.duplicate"].statements) <= completed[0]
+    assert result.to_dict()["processing"]["queries_per_event"] > 0
+
+
+async def test_traffic_is_signed_and_restores_settings(sample_registration):
+    with bench_webhooks._bench_environment():
+        deliveries = bench_webhooks.build_traffic(
+            [sample_registration], bench_webhooks.Mix(expired=0, sms=1, duplicates=0), random.Random(0)
+        )
+        assert settings.stripe_webhook_secret == "whsec_bench"
+    assert settings.stripe_webhook_secret == ""
+    assert {d.kind for d in deliveries} >= {"stripe.completed", "twilio.inbound"}
+    assert all(d.twilio_signature for d in deliveries if d.path == bench_webhooks.TWILIO_PATH)
+
+
+async def test_refused_in_production():
+    with patch.object(settings, "app_env", "production"), pytest.raises(RuntimeError):
+        await bench_webhooks.run(registrations=1, app=app, session_factory=TestSessionLocal)
@@ -1,5 +1,6 @@
 """Tests for bulk notification endpoint — successful send, idempotency guard, missing event."""
 
+import asyncio
 import uuid
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
@@ -7,8 +8,10 @@ from unittest.mock import AsyncMock, patch
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
+from sqlalchemy import event as sa_event, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models import (
     Attendee,
     Event,
@@ -17,11 +20,13 @@ from app.models import (
     Registration,
     RegistrationSource,
     RegistrationStatus,
+    SmsConversation,
     User,
     UserRole,
 )
 from app.models.notification import NotificationLog
 from app.services.auth_service import hash_password
+from tests.conftest import TestSessionLocal, engine
 
 pytestmark = pytest.mark.asyncio
 
@@ -170,3 +175,123 @@ async def test_bulk_notification_missing_event(
         headers=notif_auth_headers,
     )
     assert resp.status_code == 404
+
+
+async def _add_registrations(db_session: AsyncSession, event: Event, count: int, phone: bool = True) -> None:
+    for _ in range(count):
+        attendee = Attendee(
+            email=f"{uuid.uuid4().hex[:10]}@example.com",
+            first_name="Guest",
+            last_name="Test",
+            phone=f"+1404{uuid.uuid4().int % 10**7:07d}" if phone else None,
+        )
+        db_session.add(Registration(
+            attendee=attendee,
+            event_id=event.id,
+            status=RegistrationStatus.complete,
+            source=RegistrationSource.registration_form,
+        ))
+    await db_session.commit()
+
+
+async def _bulk_statements(client, headers, event, message) -> tuple[int, dict]:
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa_event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        resp = await client.post(
+            f"/api/v1/events/{event.id}/notifications/bulk",
+            json={"channel": "both", "custom_message": message},
+            headers=headers,
+        )
+    finally:
+        sa_event.remove(engine.sync_engine, "before_cursor_execute", _count)
+    assert resp.status_code == 200
+    return len(statements), resp.json()
+
+
+async def test_bulk_notification_statements_do_not_grow_with_recipients(
+    client: AsyncClient,
+    notif_auth_headers: dict,
+    notif_event_with_registrations,
+    db_session: AsyncSession,
+):
+    event, _ = notif_event_with_registrations
+    with patch("app.routers.notifications.send_sms", new_callable=AsyncMock, return_value=True), \
+         patch(
+             "app.routers.notifications.send_batch",
+             AsyncMock(side_effect=lambda emails, keys=None: [True] * len(emails)),
+         ) as mock_batch:
+        small, small_data = await _bulk_statements(client, notif_auth_headers, event, "First {{first_name}}")
+        await _add_registrations(db_session, event, 20)
+        large, large_data = await _bulk_statements(client, notif_auth_headers, event, "Second {{first_name}}")
+
+    assert small == large
+    assert (small_data["sent_count"], large_data["sent_count"]) == (2, 22)
+    # Each send's emails go out in one Resend batch request
+    assert [len(call.args[0]) for call in mock_batch.await_args_list] == [2, 22]
+    async with TestSessionLocal() as session:
+        logs = await session.scalar(select(func.count()).select_from(NotificationLog))
+        conversations = await session.scalar(select(func.count()).select_from(SmsConversation))
+    # One SMS and one email log per recipient per send, one outbound conversation per SMS
+    assert logs == 2 * (2 + 22)
+    assert conversations == 2 + 22
+
+
+async def test_bulk_notification_bounds_provider_concurrency(
+    client: AsyncClient,
+    notif_auth_headers: dict,
+    notif_event_with_registrations,
+    db_session: AsyncSession,
+):
+    event, _ = notif_event_with_registrations
+    await _add_registrations(db_session, event, 10)
+    in_flight = peak = 0
+
+    async def _slow_sms(to, body):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return True
+
+    with patch.object(settings, "bulk_notification_concurrency", 3), \
+         patch("app.routers.notifications.send_sms", _slow_sms):
+        resp = await client.post(
+            f"/api/v1/events/{event.id}/notifications/bulk",
+            json={"channel": "sms", "custom_message": "Gate opens at 9"},
+            headers=notif_auth_headers,
+        )
+    assert resp.json()["sent_count"] == 12
+    assert peak == 3
+
+
+async def test_event_sms_logs_each_recipient(
+    client: AsyncClient,
+    notif_auth_headers: dict,
+    notif_event_with_registrations,
+    db_session: AsyncSession,
+):
+    event, _ = notif_event_with_registrations
+    await _add_registrations(db_session, event, 1, phone=False)
+
+    async def _sms(to, body):
+        return to != "+14045550000"  # the first fixture attendee
+
+    with patch("app.routers.notifications.send_sms", _sms):
+        resp = await client.post(
+            f"/api/v1/events/{event.id}/notifications/sms",
+            json={"message": "Meet at the main gate"},
+            headers=notif_auth_headers,
+        )
+    # One delivered, one provider failure, one attendee without a phone
+    assert resp.json() == {"sent_count": 1, "failed_count": 2}
+    async with TestSessionLocal() as session:
+        statuses = sorted(
+            (await session.execute(select(NotificationLog.status))).scalars(), key=lambda s: s.value
+        )
+    assert [s.value for s in statuses] == ["failed", "sent"]
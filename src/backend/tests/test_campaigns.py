@@ -0,0 +1,264 @@
+"""Tests for campaigns — queued bulk messages sent in checkpointed chunks."""
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+
+from app.config import settings
+from app.models import (
+    Attendee,
+    Campaign,
+    CampaignRecipient,
+    CampaignStatus,
+    Registration,
+    RegistrationStatus,
+    User,
+)
+from app.models.notification import NotificationLog
+from app.services import campaign_service
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def auth_headers(client: AsyncClient, sample_user: User) -> dict:
+    resp = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "admin@justloveforest.com", "password": "testpassword123"},
+    )
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+@pytest_asyncio.fixture
+async def guests(db_session, sample_event) -> list[Registration]:
+    registrations = [
+        Registration(
+            attendee=Attendee(
+                email=f"guest{n}@example.com", first_name=f"Guest{n}", last_name="Test", phone=f"+1404555{n:04d}"
+            ),
+            event_id=sample_event.id,
+            status=RegistrationStatus.complete,
+        )
+        for n in range(5)
+    ]
+    db_session.add_all(registrations)
+    await db_session.commit()
+    return registrations
+
+
+def _batch(result: bool = True) -> AsyncMock:
+    """A stand-in for email_service.send_batch returning `result` for every email."""
+    return AsyncMock(side_effect=lambda emails, keys=None: [result] * len(emails))
+
+
+async def _create(client, headers, event, **body) -> dict:
+    resp = await client.post(
+        f"/api/v1/events/{event.id}/campaigns",
+        json={"channel": "email", "custom_message": "Hi {{first_name}}", **body},
+        headers=headers,
+    )
+    assert resp.status_code == 202, resp.text
+    return resp.json()
+
+
+async def _campaign(campaign_id) -> Campaign:
+    async with TestSessionLocal() as session:
+        return await session.get(Campaign, uuid.UUID(campaign_id))
+
+
+async def _expire_lease(campaign_id) -> None:
+    async with TestSessionLocal() as session:
+        await session.execute(
+            update(Campaign)
+            .where(Campaign.id == uuid.UUID(campaign_id))
+            .values(lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        await session.commit()
+
+
+async def test_create_queues_recipients_without_sending(client, auth_headers, sample_event, guests):
+    with patch("app.services.email_service.send_batch", new_callable=AsyncMock) as mock_send:
+        data = await _create(client, auth_headers, sample_event)
+        again = await _create(client, auth_headers, sample_event)
+    mock_send.assert_not_awaited()
+    assert again["id"] == data["id"]
+    assert data["status"] == "pending"
+    assert (data["total"], data["remaining"], data["sent_count"]) == (5, 5, 0)
+    async with TestSessionLocal() as session:
+        assert await session.scalar(select(func.count()).select_from(CampaignRecipient)) == 5
+
+
+async def test_concurrent_create_returns_the_campaign_that_won(client, auth_headers, sample_event, guests):
+    first = await _create(client, auth_headers, sample_event)
+    # The other request passed its duplicate check before this one committed
+    with patch.object(campaign_service, "_find_queued", side_effect=[None, await _campaign(first["id"])]):
+        again = await _create(client, auth_headers, sample_event)
+    assert again["id"] == first["id"]
+    async with TestSessionLocal() as session:
+        assert await session.scalar(select(func.count()).select_from(Campaign)) == 1
+        assert await session.scalar(select(func.count()).select_from(CampaignRecipient)) == 5
+
+
+async def test_worker_sends_and_reports_progress(client, auth_headers, sample_event, guests):
+    data = await _create(client, auth_headers, sample_event)
+
+    async def _send(emails, keys=None):
+        return [email["to"] != ["guest0@example.com"] for email in emails]
+
+    with (
+        patch.object(settings, "campaign_chunk_size", 2),
+        patch("app.services.email_service.send_batch", AsyncMock(side_effect=_send)) as mock_send,
+    ):
+        assert await campaign_service.process_pending(TestSessionLocal) == 1
+    # One batch request per chunk
+    assert [len(call.args[0]) for call in mock_send.await_args_list] == [2, 2, 1]
+    assert all(key.startswith("campaign/") for key in mock_send.await_args.args[1])
+
+    resp = await client.get(f"/api/v1/campaigns/{data['id']}", headers=auth_headers)
+    progress = resp.json()
+    assert progress["status"] == "completed"
+    assert (progress["sent_count"], progress["failed_count"], progress["remaining"]) == (4, 1, 0)
+    async with TestSessionLocal() as session:
+        logs = (await session.execute(select(NotificationLog))).scalars().all()
+    campaign = await _campaign(data["id"])
+    assert len(logs) == 5
+    assert {log.template_id for log in logs} == {f"bulk:{campaign.idempotency_key}"}
+
+
+async def test_crashed_campaign_resumes_from_checkpoint(client, auth_headers, sample_event, guests):
+    data = await _create(client, auth_headers, sample_event)
+    sent_to = []
+
+    async def _crash_on_second_chunk(emails, keys=None):
+        if sent_to:
+            raise RuntimeError("worker died")
+        sent_to.extend(email["to"][0] for email in emails)
+        return [True] * len(emails)
+
+    with (
+        patch.object(settings, "campaign_chunk_size", 2),
+        patch("app.services.email_service.send_batch", _crash_on_second_chunk),
+        pytest.raises(RuntimeError),
+    ):
+        await campaign_service.process_pending(TestSessionLocal)
+
+    campaign = await _campaign(data["id"])
+    assert campaign.status == CampaignStatus.running
+    assert (campaign.sent_count, campaign.remaining) == (2, 3)
+
+    # Still leased by the dead worker; reclaimed once the lease lapses
+    assert await campaign_service.process_pending(TestSessionLocal) == 0
+    await _expire_lease(data["id"])
+    with patch("app.services.email_service.send_batch", _batch()) as mock_send:
+        assert await campaign_service.process_pending(TestSessionLocal) == 1
+    resent = {email["to"][0] for call in mock_send.await_args_list for email in call.args[0]}
+    assert len(resent) == 3 and not resent & set(sent_to)
+    campaign = await _campaign(data["id"])
+    assert (campaign.status, campaign.sent_count, campaign.remaining) == (CampaignStatus.completed, 5, 0)
+
+
+async def test_worker_that_lost_its_lease_sends_nothing(client, auth_headers, sample_event, guests):
+    data = await _create(client, auth_headers, sample_event)
+    async with TestSessionLocal() as session:
+        _, stale_token = await campaign_service.claim_next(session)
+    await _expire_lease(data["id"])
+    async with TestSessionLocal() as session:
+        _, token = await campaign_service.claim_next(session)
+
+    with patch("app.services.email_service.send_batch", _batch()) as mock_send:
+        assert not await campaign_service.run_chunk(uuid.UUID(data["id"]), stale_token, TestSessionLocal)
+        mock_send.assert_not_awaited()
+        assert await campaign_service.run_chunk(uuid.UUID(data["id"]), token, TestSessionLocal)
+    assert len(mock_send.await_args.args[0]) == 5
+
+
+async def test_checkpoint_after_takeover_is_discarded(client, auth_headers, sample_event, guests):
+    """A worker whose lease lapsed mid-send does not record its chunk over the new owner's."""
+    data = await _create(client, auth_headers, sample_event)
+    campaign_id = uuid.UUID(data["id"])
+    async with TestSessionLocal() as session:
+        _, slow_token = await campaign_service.claim_next(session)
+
+    async def _taken_over_while_sending(emails, keys=None):
+        await _expire_lease(data["id"])
+        async with TestSessionLocal() as session:
+            assert await campaign_service.claim_next(session) is not None
+        return [True] * len(emails)
+
+    with patch("app.services.email_service.send_batch", _taken_over_while_sending):
+        assert not await campaign_service.run_chunk(campaign_id, slow_token, TestSessionLocal)
+
+    campaign = await _campaign(data["id"])
+    assert (campaign.sent_count, campaign.remaining) == (0, 5)
+    async with TestSessionLocal() as session:
+        assert await session.scalar(select(func.count()).select_from(NotificationLog)) == 0
+
+
+async def test_cancel_and_resume(client, auth_headers, sample_event, guests):
+    data = await _create(client, auth_headers, sample_event)
+
+    async def _cancel_after_first_chunk(emails, keys=None):
+        async with TestSessionLocal() as session:
+            await session.execute(
+                update(Campaign).where(Campaign.id == uuid.UUID(data["id"])).values(status=CampaignStatus.cancelled)
+            )
+            await session.commit()
+        return [True] * len(emails)
+
+    with (
+        patch.object(settings, "campaign_chunk_size", 2),
+        patch("app.services.email_service.send_batch", _cancel_after_first_chunk),
+    ):
+        await campaign_service.process_pending(TestSessionLocal)
+    campaign = await _campaign(data["id"])
+    assert (campaign.status, campaign.sent_count, campaign.remaining) == (CampaignStatus.cancelled, 2, 3)
+
+    resp = await client.post(f"/api/v1/campaigns/{data['id']}/cancel", headers=auth_headers)
+    assert resp.status_code == 409
+    resp = await client.post(f"/api/v1/campaigns/{data['id']}/resume", headers=auth_headers)
+    assert resp.status_code == 202 and resp.json()["status"] == "pending"
+
+    with patch("app.services.email_service.send_batch", _batch()) as mock_send:
+        assert await campaign_service.process_pending(TestSessionLocal) == 1
+    assert len(mock_send.await_args.args[0]) == 3
+    assert (await _campaign(data["id"])).status == CampaignStatus.completed
+
+
+async def test_skips_recipients_reached_by_bulk_send(client, auth_headers, sample_event, guests):
+    body = {"channel": "sms", "custom_message": "Gate opens at 9", "idempotency_key": "gate-9"}
+    with patch("app.routers.notifications.send_sms", new_callable=AsyncMock, return_value=True):
+        resp = await client.post(
+            f"/api/v1/events/{sample_event.id}/notifications/bulk", json=body, headers=auth_headers
+        )
+    assert resp.json()["sent_count"] == 5
+
+    data = await _create(client, auth_headers, sample_event, **body)
+    assert (data["skipped_count"], data["remaining"]) == (5, 0)
+    with patch("app.services.sms_service.send_sms", new_callable=AsyncMock) as mock_send:
+        await campaign_service.process_pending(TestSessionLocal)
+    mock_send.assert_not_awaited()
+
+
+async def test_progress_stream(client, auth_headers, sample_event, guests):
+    data = await _create(client, auth_headers, sample_event)
+    with patch("app.services.email_service.send_batch", _batch()):
+        await campaign_service.process_pending(TestSessionLocal)
+
+    resp = await client.get(f"/api/v1/campaigns/{data['id']}/events", headers=auth_headers)
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    event, payload = resp.text.strip().split("\n")
+    assert event == "event: progress"
+    progress = json.loads(payload.removeprefix("data: "))
+    assert (progress["status"], progress["sent_count"], progress["remaining"]) == ("completed", 5, 0)
+
+
+async def test_unknown_campaign_is_404(client, auth_headers):
+    resp = await client.get("/api/v1/campaigns/00000000-0000-0000-0000-000000000000", headers=auth_headers)
+    assert resp.status_code == 404
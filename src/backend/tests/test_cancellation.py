@@ -13,6 +13,7 @@ from unittest.mock import patch, AsyncMock
 from app.models.attendee import Attendee
 from app.models.event import Event, EventStatus, PricingModel
 from app.models.registration import Registration, RegistrationSource, RegistrationStatus
+from app.services import notification_outbox
 
 pytestmark = pytest.mark.asyncio
 
@@ -97,6 +98,13 @@ async def test_cancel_request_success(
         assert reg.status == RegistrationStatus.complete
         assert "CANCEL REQUEST" in reg.notes
 
+    # The admin email is queued with the request and sent by the dispatcher
+    mock_notify.assert_not_awaited()
+    assert await notification_outbox.dispatch_pending(TestSessionLocal) == 1
+    notified, _, reason = mock_notify.await_args.args
+    assert notified.id == cancel_registration.id
+    assert reason == "Cannot attend due to schedule conflict"
+
 
 @patch("app.services.email_service.send_admin_cancel_notification", new_callable=AsyncMock, return_value=True)
 async def test_cancel_request_wrong_email(
@@ -0,0 +1,392 @@
+"""Tests for capacity_counters — atomic seat claims and status-transition upkeep."""
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+import stripe
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Attendee,
+    AuditLog,
+    CapacityCounter,
+    Event,
+    EventStatus,
+    PricingModel,
+    Registration,
+    RegistrationStatus,
+)
+from app.services import capacity_service, stripe_webhooks
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def one_seat_event(db_session: AsyncSession) -> Event:
+    event = Event(
+        id=uuid.uuid4(),
+        name="One Seat Retreat",
+        slug="one-seat",
+        event_date=datetime(2026, 6, 1, 13, 0, tzinfo=timezone.utc),
+        event_type="retreat",
+        pricing_model=PricingModel.fixed,
+        fixed_price_cents=25000,
+        capacity=1,
+        status=EventStatus.active,
+    )
+    db_session.add(event)
+    await db_session.commit()
+    await db_session.refresh(event)
+    return event
+
+
+def _payload(email: str) -> dict:
+    return {
+        "first_name": "Seat",
+        "last_name": "Taker",
+        "email": email,
+        "waiver_accepted": True,
+    }
+
+
+async def _event_taken(event_id) -> int | None:
+    async with TestSessionLocal() as session:
+        result = await session.execute(
+            select(CapacityCounter.taken).where(
+                CapacityCounter.event_id == event_id,
+                CapacityCounter.sub_event_id.is_(None),
+            )
+        )
+        return result.scalar_one_or_none()
+
+
+async def test_claim_never_oversells(db_session: AsyncSession, sample_event: Event):
+    """Conditional claim refuses a request that would exceed capacity (20)."""
+    assert await capacity_service.claim_event_seats(db_session, sample_event, 15)
+    assert not await capacity_service.claim_event_seats(db_session, sample_event, 6)
+    assert await capacity_service.claim_event_seats(db_session, sample_event, 5)
+    assert not await capacity_service.claim_event_seats(db_session, sample_event, 1)
+    assert await capacity_service.seats_remaining(db_session, sample_event) == 0
+
+
+async def test_counter_seeded_from_existing_registrations(client, full_event):
+    """A pre-existing registration is counted when the counter is first created."""
+    response = await client.get(f"/api/v1/register/{full_event.slug}/info")
+    assert response.status_code == 200
+    assert response.json()["event"]["spots_remaining"] == 0
+    assert await _event_taken(full_event.id) == 1
+
+
+async def test_registration_claims_seat(client, one_seat_event):
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_seat",
+    ):
+        first = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+        second = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("b@example.com"))
+
+    assert first.status_code == 201
+    assert second.status_code == 403
+    assert await _event_taken(one_seat_event.id) == 1
+
+
+async def test_expired_checkout_releases_seat(client, one_seat_event):
+    """checkout.session.expired frees the seat for the next attendee."""
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_seat",
+    ):
+        first = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+        reg_id = first.json()["registration_id"]
+
+        stripe_event = {
+            "id": "evt_expired_seat",
+            "type": "checkout.session.expired",
+            "data": {"object": {"id": "cs_test_seat", "client_reference_id": reg_id}},
+        }
+        with patch("app.routers.webhooks.verify_webhook", return_value=stripe_event):
+            await client.post(
+                "/api/v1/webhooks/stripe",
+                content=json.dumps(stripe_event).encode(),
+                headers={"stripe-signature": "test_sig"},
+            )
+        await stripe_webhooks.process_pending(TestSessionLocal)
+        assert await _event_taken(one_seat_event.id) == 0
+
+        second = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("b@example.com"))
+
+    assert second.status_code == 201
+    assert await _event_taken(one_seat_event.id) == 1
+
+
+async def test_stripe_failure_releases_seat_and_allows_retry(client, one_seat_event):
+    """A failed Checkout creation deletes the pending row and returns the seat."""
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        side_effect=stripe.error.APIConnectionError("boom"),
+    ):
+        failed = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+    assert failed.status_code == 500
+    assert await _event_taken(one_seat_event.id) == 0
+
+    async with TestSessionLocal() as session:
+        regs = (await session.execute(
+            select(Registration).where(Registration.event_id == one_seat_event.id)
+        )).scalars().all()
+        assert regs == []
+
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_retry",
+    ):
+        retry = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+    assert retry.status_code == 201
+
+
+async def test_status_change_releases_and_reclaims(db_session: AsyncSession, one_seat_event):
+    """Leaving a seat-holding status frees the seat; a late payment re-takes it."""
+    attendee = Attendee(id=uuid.uuid4(), email="held@example.com", first_name="Held", last_name="Seat")
+    db_session.add(attendee)
+    reg = Registration(
+        id=uuid.uuid4(),
+        attendee_id=attendee.id,
+        event_id=one_seat_event.id,
+        status=RegistrationStatus.complete,
+    )
+    db_session.add(reg)
+    await db_session.flush()
+    assert await capacity_service.seats_remaining(db_session, one_seat_event) == 0
+
+    await capacity_service.record_status_change(
+        db_session, one_seat_event.id, [reg.id], RegistrationStatus.complete, "cancelled"
+    )
+    assert await capacity_service.seats_remaining(db_session, one_seat_event) == 1
+
+    # Same-side transitions leave the counter alone
+    await capacity_service.record_status_change(
+        db_session, one_seat_event.id, [reg.id], RegistrationStatus.cancelled, RegistrationStatus.expired
+    )
+    assert await capacity_service.seats_remaining(db_session, one_seat_event) == 1
+
+    await capacity_service.record_status_change(
+        db_session, one_seat_event.id, [reg.id], RegistrationStatus.expired, RegistrationStatus.complete
+    )
+    assert await capacity_service.seats_remaining(db_session, one_seat_event) == 0
+
+
+async def test_availability_follows_counter_not_stale_event(db_session: AsyncSession, one_seat_event):
+    """Seats shown agree with what claims enforce, even from an outdated catalog snapshot."""
+    assert await capacity_service.availability(db_session, one_seat_event) == (1, 1, 0)
+    await capacity_service.set_capacity(db_session, one_seat_event.id, 3)
+
+    stale = SimpleNamespace(id=one_seat_event.id, capacity=1)
+    capacity, remaining, _ = await capacity_service.availability(db_session, stale)
+    assert (capacity, remaining) == (3, 3)
+    assert await capacity_service.claim_event_seats(db_session, stale, 3)
+    assert await capacity_service.seats_remaining(db_session, stale) == 0
+
+
+async def test_registration_records_lease_and_passes_expiry_to_stripe(client, one_seat_event):
+    with patch("stripe.checkout.Session.create") as mock_create:
+        mock_create.return_value.url = "https://checkout.stripe.com/c/pay/cs_test_lease"
+        response = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+    assert response.status_code == 201
+
+    async with TestSessionLocal() as session:
+        reg = (await session.execute(select(Registration))).scalar_one()
+    lease = reg.lease_expires_at.replace(tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
+    assert timedelta(minutes=29) < lease - now <= timedelta(minutes=30)
+
+    expires_at = mock_create.call_args.kwargs["expires_at"]
+    # Stripe requires at least 30 minutes; the lease is clamped up to that
+    assert expires_at >= int((now + timedelta(minutes=30)).timestamp())
+
+
+async def test_lease_sweeper_releases_lapsed_seats(client, db_session: AsyncSession, one_seat_event):
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_lease",
+    ):
+        first = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+        assert (await client.post(
+            f"/api/v1/register/{one_seat_event.slug}", json=_payload("b@example.com")
+        )).status_code == 403
+
+        # Not yet lapsed: sweeper leaves it alone
+        assert await capacity_service.release_expired_leases(db_session) == 0
+
+        await db_session.execute(
+            update(Registration).values(lease_expires_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+        )
+        assert await capacity_service.release_expired_leases(db_session) == 1
+        await db_session.commit()
+        assert await _event_taken(one_seat_event.id) == 0
+
+        retry = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("b@example.com"))
+    assert retry.status_code == 201
+
+    async with TestSessionLocal() as session:
+        lapsed = await session.get(Registration, uuid.UUID(first.json()["registration_id"]))
+        assert lapsed.status == RegistrationStatus.expired
+        audit = (await session.execute(
+            select(AuditLog).where(AuditLog.entity_id == lapsed.id)
+        )).scalar_one()
+        assert audit.actor == "system/lease"
+
+
+async def test_same_attendee_reregisters_after_lease_swept(client, db_session: AsyncSession, one_seat_event):
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_lease",
+    ):
+        first = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+        await db_session.execute(
+            update(Registration).values(lease_expires_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+        )
+        assert await capacity_service.release_expired_leases(db_session) == 1
+        await db_session.commit()
+
+        retry = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+        assert retry.status_code == 201
+        # The new registration holds the seat again
+        again = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+        assert again.status_code == 409
+
+    assert retry.json()["registration_id"] != first.json()["registration_id"]
+    assert await _event_taken(one_seat_event.id) == 1
+    async with TestSessionLocal() as session:
+        statuses = (await session.execute(
+            select(Registration.status).order_by(Registration.created_at)
+        )).scalars().all()
+    assert sorted(statuses) == sorted([RegistrationStatus.expired, RegistrationStatus.pending_payment])
+
+
+async def test_late_payment_does_not_complete_rebooked_registration(
+    client, db_session: AsyncSession, one_seat_event
+):
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_lease",
+    ):
+        first = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+        await db_session.execute(
+            update(Registration).values(lease_expires_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+        )
+        await capacity_service.release_expired_leases(db_session)
+        await db_session.commit()
+        retry = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+
+    first_id = first.json()["registration_id"]
+    stripe_event = {
+        "id": "evt_late_payment",
+        "type": "checkout.session.completed",
+        "data": {"object": {"id": "cs_late", "client_reference_id": first_id, "amount_total": 25000}},
+    }
+    with patch("app.routers.webhooks.verify_webhook", return_value=stripe_event):
+        await client.post(
+            "/api/v1/webhooks/stripe",
+            content=json.dumps(stripe_event).encode(),
+            headers={"stripe-signature": "test_sig"},
+        )
+    assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
+
+    async with TestSessionLocal() as session:
+        assert (await session.get(Registration, uuid.UUID(first_id))).status == RegistrationStatus.expired
+        rebooked = await session.get(Registration, uuid.UUID(retry.json()["registration_id"]))
+        assert rebooked.status == RegistrationStatus.pending_payment
+    assert await _event_taken(one_seat_event.id) == 1
+
+
+async def test_transition_skips_rows_the_sweeper_changed(client, db_session: AsyncSession, one_seat_event):
+    """A payment read as pending_payment but swept before its UPDATE is not recorded as pending→complete."""
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_lease",
+    ):
+        first = await client.post(f"/api/v1/register/{one_seat_event.slug}", json=_payload("a@example.com"))
+    reg_id = uuid.UUID(first.json()["registration_id"])
+    stale = await db_session.get(Registration, reg_id)
+    assert stale.status == RegistrationStatus.pending_payment
+
+    async with TestSessionLocal() as sweeper:
+        await sweeper.execute(
+            update(Registration).values(lease_expires_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+        )
+        assert await capacity_service.release_expired_leases(sweeper) == 1
+        await sweeper.commit()
+
+    moved = await stripe_webhooks.transition_registrations(db_session, [stale], RegistrationStatus.complete)
+    await db_session.commit()
+    assert moved == []
+    assert await _event_taken(one_seat_event.id) == 0
+
+    # Re-read (as the retried webhook does), the expired registration re-takes its seat
+    fresh = (await db_session.execute(
+        select(Registration).where(Registration.id == reg_id).execution_options(populate_existing=True)
+    )).scalar_one()
+    moved = await stripe_webhooks.transition_registrations(db_session, [fresh], RegistrationStatus.complete)
+    await db_session.commit()
+    assert moved == [fresh]
+    assert await _event_taken(one_seat_event.id) == 1
+
+
+async def test_admin_cannot_reactivate_registration_of_rebooked_attendee(
+    client, db_session: AsyncSession, one_seat_event, sample_user
+):
+    attendee = Attendee(id=uuid.uuid4(), email="held@example.com", first_name="Held", last_name="Seat")
+    old = Registration(
+        id=uuid.uuid4(), attendee_id=attendee.id, event_id=one_seat_event.id, status=RegistrationStatus.expired
+    )
+    current = Registration(
+        id=uuid.uuid4(), attendee_id=attendee.id, event_id=one_seat_event.id, status=RegistrationStatus.complete
+    )
+    db_session.add_all([attendee, old, current])
+    await db_session.commit()
+    login = await client.post(
+        "/api/v1/auth/login", json={"email": "admin@justloveforest.com", "password": "testpassword123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    resp = await client.put(f"/api/v1/registrations/{old.id}", json={"status": "complete"}, headers=headers)
+    assert resp.status_code == 409
+    assert "another active registration" in resp.json()["detail"]
+
+    # Once the other registration is cancelled the old one can be reinstated
+    resp = await client.put(f"/api/v1/registrations/{current.id}", json={"status": "cancelled"}, headers=headers)
+    assert resp.status_code == 200
+    resp = await client.put(f"/api/v1/registrations/{old.id}", json={"status": "complete"}, headers=headers)
+    assert resp.status_code == 200 and resp.json()["status"] == "complete"
+
+
+async def test_group_guest_reregisters_after_lease_swept(client, db_session: AsyncSession, one_seat_event):
+    guest = {**_payload("a@example.com"), "phone": "+14045551234"}
+    body = {"payer": guest, "guests": [_payload("a@example.com")], "payment_method": "stripe"}
+    with patch("stripe.checkout.Session.create") as mock_create:
+        mock_create.return_value.id = "cs_test_group_lease"
+        mock_create.return_value.url = "https://checkout.stripe.com/c/pay/cs_test_group_lease"
+        assert (await client.post(f"/api/v1/register/{one_seat_event.slug}/group", json=body)).status_code == 201
+        await db_session.execute(
+            update(Registration).values(lease_expires_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+        )
+        assert await capacity_service.release_expired_leases(db_session) == 1
+        await db_session.commit()
+
+        retry = await client.post(f"/api/v1/register/{one_seat_event.slug}/group", json=body)
+    assert retry.status_code == 201, retry.text
+    assert await _event_taken(one_seat_event.id) == 1
@@ -0,0 +1,182 @@
+"""Tests for provider circuit breakers and their fail-fast behaviour."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import stripe
+
+from app.services import circuit_breaker, email_service, sms_service, stripe_service
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock, **kwargs) -> CircuitBreaker:
+    options = {"failure_threshold": 3, "slow_call_seconds": 1.0, "reset_seconds": 30.0, "clock": clock}
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+async def _fail():
+    raise RuntimeError("provider down")
+
+
+async def _ok():
+    return "ok"
+
+
+async def test_opens_after_consecutive_failures_and_fails_fast():
+    breaker = _breaker(_Clock())
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+    assert breaker.state == circuit_breaker.OPEN
+
+    called = False
+
+    async def _never():
+        nonlocal called
+        called = True
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        await breaker.call(_never)
+    assert not called
+    assert exc_info.value.retry_after == pytest.approx(30.0)
+
+
+async def test_success_resets_failure_count():
+    breaker = _breaker(_Clock())
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+    assert await breaker.call(_ok) == "ok"
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+    assert breaker.state == circuit_breaker.CLOSED
+
+
+async def test_half_open_allows_one_probe():
+    clock = _Clock()
+    breaker = _breaker(clock, failure_threshold=1)
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+    clock.now += 30
+    assert breaker.state == circuit_breaker.HALF_OPEN
+
+    probe_started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _slow_probe():
+        probe_started.set()
+        await release.wait()
+        return "ok"
+
+    probe = asyncio.create_task(breaker.call(_slow_probe))
+    await probe_started.wait()
+    # Only the probe gets through; everyone else still fails fast
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(_ok)
+    release.set()
+    assert await probe == "ok"
+    assert breaker.state == circuit_breaker.CLOSED
+
+
+async def test_failed_probe_reopens():
+    clock = _Clock()
+    breaker = _breaker(clock, failure_threshold=3)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            await breaker.call(_fail)
+    clock.now += 30
+    with pytest.raises(RuntimeError):
+        await breaker.call(_fail)
+    assert breaker.state == circuit_breaker.OPEN
+    assert breaker.snapshot()["retry_in_seconds"] == 30.0
+
+
+async def test_slow_calls_count_as_failures():
+    clock = _Clock()
+    breaker = _breaker(clock, failure_threshold=2)
+
+    async def _slow():
+        clock.now += 2
+        return "late"
+
+    assert await breaker.call(_slow) == "late"
+    assert await breaker.call(_slow) == "late"
+    assert breaker.state == circuit_breaker.OPEN
+    assert breaker.snapshot()["last_error"] == "slow call: 2.0s"
+
+
+async def test_stripe_client_errors_do_not_open_circuit():
+    def _bad_request(**kwargs):
+        raise stripe.error.InvalidRequestError("No such price", "price")
+
+    for _ in range(10):
+        with pytest.raises(stripe.error.InvalidRequestError):
+            await stripe_service.call_stripe(_bad_request)
+    assert stripe_service.breaker.state == circuit_breaker.CLOSED
+
+
+async def test_open_stripe_circuit_raises_connection_error_without_calling():
+    def _down(**kwargs):
+        raise stripe.error.APIConnectionError("timeout")
+
+    calls = MagicMock(side_effect=_down)
+    for _ in range(5):
+        with pytest.raises(stripe.error.APIConnectionError):
+            await stripe_service.call_stripe(calls)
+    with pytest.raises(stripe.error.APIConnectionError, match="circuit is open"):
+        await stripe_service.call_stripe(calls)
+    assert calls.call_count == 5
+
+
+async def test_sms_fails_fast_once_twilio_circuit_opens():
+    client = MagicMock()
+    client.messages.create.side_effect = RuntimeError("twilio 503")
+    with patch("app.services.sms_service._get_client", return_value=client):
+        results = [await sms_service.send_sms("+14045550000", "hi") for _ in range(20)]
+    assert results == [False] * 20
+    assert client.messages.create.call_count == 5
+
+
+async def test_email_timeout_does_not_block_the_caller():
+    def _hang(params):
+        time.sleep(0.5)
+
+    with (
+        patch("resend.Emails.send", side_effect=_hang),
+        patch("app.services.email_service.settings.resend_timeout_seconds", 0.05),
+    ):
+        started = time.monotonic()
+        sent = await email_service.send_branded_email("a@example.com", "Hi", "Body")
+        elapsed = time.monotonic() - started
+    assert sent is False
+    assert elapsed < 0.4
+    assert email_service.breaker.snapshot()["consecutive_failures"] == 1
+
+
+async def test_deep_health_reports_provider_states(client):
+    for _ in range(5):
+        with pytest.raises(RuntimeError):
+            await sms_service.breaker.call(_fail)
+
+    with patch("app.database.async_session", TestSessionLocal):
+        response = await client.get("/health/deep")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "degraded"
+    assert data["providers"]["twilio"]["state"] == "open"
+    assert data["providers"]["stripe"] == {"state": "closed", "consecutive_failures": 0}
+    assert set(data["providers"]) == {"resend", "stripe", "twilio"}
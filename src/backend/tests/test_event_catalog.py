@@ -0,0 +1,85 @@
+"""Tests for the in-process event catalog used by public slug routes."""
+
+import dataclasses
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Event, EventStatus
+from app.services import event_catalog
+from tests.conftest import engine
+
+pytestmark = pytest.mark.asyncio
+
+
+class _StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        sa_event.listen(engine.sync_engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        sa_event.remove(engine.sync_engine, "before_cursor_execute", self)
+
+
+async def test_public_route_served_from_catalog_without_sql(client, sample_event):
+    first = await client.get(f"/api/v1/register/{sample_event.slug}/cancelled")
+    assert first.status_code == 200
+
+    with _StatementCounter() as counter:
+        second = await client.get(f"/api/v1/register/{sample_event.slug}/cancelled")
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert counter.count == 0
+
+
+async def test_snapshot_is_immutable(db_session: AsyncSession, sample_event):
+    snapshot = await event_catalog.get_by_slug(db_session, sample_event.slug)
+    assert snapshot.id == sample_event.id
+    assert snapshot.is_active
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.name = "Changed"
+
+
+async def test_invalidate_reloads_changes(db_session: AsyncSession, sample_event: Event):
+    await event_catalog.get_by_slug(db_session, sample_event.slug)
+
+    sample_event.status = EventStatus.cancelled
+    db_session.add(sample_event)
+    await db_session.commit()
+
+    # Still the cached snapshot until the write path invalidates it
+    assert (await event_catalog.get_by_slug(db_session, sample_event.slug)).is_active
+    event_catalog.invalidate(sample_event.id)
+    assert not (await event_catalog.get_by_slug(db_session, sample_event.slug)).is_active
+
+
+async def test_load_racing_an_invalidation_is_not_cached(db_session: AsyncSession, sample_event):
+    original = event_catalog._snapshot
+
+    def snapshot_then_invalidate(event):
+        snapshot = original(event)
+        event_catalog.invalidate(event.id)  # a write lands while we were loading
+        return snapshot
+
+    with patch.object(event_catalog, "_snapshot", side_effect=snapshot_then_invalidate):
+        await event_catalog.get_by_slug(db_session, sample_event.slug)
+    assert sample_event.slug not in event_catalog._entries
+
+
+async def test_inactive_event_rejected_for_registration(client, db_session: AsyncSession, sample_event):
+    sample_event.status = EventStatus.draft
+    await db_session.commit()
+
+    response = await client.post(
+        f"/api/v1/register/{sample_event.slug}",
+        json={"first_name": "A", "last_name": "B", "email": "ab@example.com", "waiver_accepted": True},
+    )
+    assert response.status_code == 404
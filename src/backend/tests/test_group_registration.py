@@ -1,19 +1,25 @@
 from unittest.mock import AsyncMock, patch, MagicMock
+import json
 import uuid
 
 import pytest
+from sqlalchemy import event as sa_event, func, select
 
 from app.models import (
     Attendee,
+    AuditLog,
     Event,
     EventStatus,
     Membership,
+    NotificationOutbox,
     PricingModel,
     Registration,
     RegistrationStatus,
 )
 from app.models.scholarship_link import ScholarshipLink
+from app.services import stripe_webhooks
 from datetime import datetime, timezone
+from tests.conftest import TestSessionLocal, engine
 
 pytestmark = pytest.mark.asyncio
 
@@ -323,3 +329,216 @@ async def test_group_member_discount_max_slots(client, sample_event, db_session)
     # The 4th member should pay full price (25000 cents) since 3 slots are used
     data = response.json()
     assert data["status"] == "pending_payment"
+
+
+def _guest(i: int) -> dict:
+    return {
+        "first_name": f"Guest{i}",
+        "last_name": "Batch",
+        "email": f"guest{i}@example.com",
+        "waiver_accepted": True,
+    }
+
+
+async def _count_group_queries(client, slug: str, guests: list[dict]) -> int:
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa_event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        with patch("stripe.checkout.Session.create", return_value=_mock_stripe_session()):
+            response = await client.post(
+                f"/api/v1/register/{slug}/group",
+                json={"payer": guests[0], "guests": guests, "payment_method": "stripe"},
+            )
+    finally:
+        sa_event.remove(engine.sync_engine, "before_cursor_execute", _count)
+    assert response.status_code == 201
+    return len(statements)
+
+
+async def test_group_query_count_flat_in_group_size(client, sample_event):
+    """Attendee, duplicate and insert work is batched, not per guest."""
+    # First group seeds the capacity counter; measure after that
+    await _count_group_queries(client, sample_event.slug, [_guest(99)])
+    small = await _count_group_queries(client, sample_event.slug, [_guest(i) for i in range(2)])
+    large = await _count_group_queries(client, sample_event.slug, [_guest(i) for i in range(2, 10)])
+    assert large == small
+
+
+async def test_group_reuses_existing_attendee_and_rejects_duplicate(client, sample_event, db_session):
+    existing = Attendee(
+        id=uuid.uuid4(), email="guest1@example.com", first_name="Already", last_name="Here"
+    )
+    db_session.add(existing)
+    await db_session.commit()
+
+    with patch("stripe.checkout.Session.create", return_value=_mock_stripe_session()):
+        first = await client.post(
+            f"/api/v1/register/{sample_event.slug}/group",
+            json={"payer": _guest(0), "guests": [_guest(0), _guest(1)], "payment_method": "stripe"},
+        )
+        assert first.status_code == 201
+
+        again = await client.post(
+            f"/api/v1/register/{sample_event.slug}/group",
+            json={"payer": _guest(2), "guests": [_guest(2), _guest(1)], "payment_method": "stripe"},
+        )
+    assert again.status_code == 409
+    assert "guest1@example.com" in again.json()["detail"]
+
+    async with TestSessionLocal() as session:
+        reg = (await session.execute(
+            select(Registration).where(Registration.attendee_id == existing.id)
+        )).scalar_one()
+        assert reg.event_id == sample_event.id
+        # The failed group rolled back its new attendee
+        assert (await session.execute(
+            select(func.count(Attendee.id)).where(Attendee.email == "guest2@example.com")
+        )).scalar() == 0
+
+
+async def test_group_member_discount_from_loaded_membership(client, sample_event, db_session):
+    member = Attendee(
+        id=uuid.uuid4(), email="guest0@example.com", first_name="Guest0", last_name="Batch", is_member=True
+    )
+    db_session.add(member)
+    await db_session.flush()
+    membership = Membership(id=uuid.uuid4(), attendee_id=member.id, discount_value_cents=2500)
+    db_session.add(membership)
+    await db_session.flush()
+    member.membership_id = membership.id
+    await db_session.commit()
+
+    with patch("stripe.checkout.Session.create", return_value=_mock_stripe_session()) as mock_create:
+        response = await client.post(
+            f"/api/v1/register/{sample_event.slug}/group",
+            json={"payer": _guest(0), "guests": [_guest(0), _guest(1)], "payment_method": "stripe"},
+        )
+
+    assert response.status_code == 201
+    amounts = sorted(item["price_data"]["unit_amount"] for item in mock_create.call_args.kwargs["line_items"])
+    assert amounts == [sample_event.fixed_price_cents - 2500, sample_event.fixed_price_cents]
+
+
+async def _create_group(client, slug: str, guests: list[dict]) -> dict:
+    with patch("stripe.checkout.Session.create", return_value=_mock_stripe_session()):
+        response = await client.post(
+            f"/api/v1/register/{slug}/group",
+            json={"payer": guests[0], "guests": guests, "payment_method": "stripe"},
+        )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def _deliver(client, stripe_event: dict) -> int:
+    """Post a Stripe event, process it, and return the statements the worker ran."""
+    with patch("app.routers.webhooks.verify_webhook", return_value=stripe_event):
+        response = await client.post(
+            "/api/v1/webhooks/stripe",
+            content=json.dumps(stripe_event).encode(),
+            headers={"stripe-signature": "test_sig"},
+        )
+    assert response.status_code == 200
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa_event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
+    finally:
+        sa_event.remove(engine.sync_engine, "before_cursor_execute", _count)
+    return len(statements)
+
+
+def _group_session_event(event_id: str, event_type: str, group: dict) -> dict:
+    return {
+        "id": event_id,
+        "type": event_type,
+        "data": {
+            "object": {
+                "id": "cs_test_group",
+                "client_reference_id": group["group_id"],
+                "payment_intent": f"pi_{group['group_id']}",
+                "amount_total": 99999,
+                "metadata": {
+                    "group_id": group["group_id"],
+                    "registration_ids": ",".join(r["registration_id"] for r in group["registrations"]),
+                },
+            }
+        },
+    }
+
+
+async def _group_registrations(group: dict) -> list[Registration]:
+    async with TestSessionLocal() as session:
+        result = await session.execute(
+            select(Registration).where(Registration.group_id == uuid.UUID(group["group_id"]))
+        )
+        return list(result.scalars().all())
+
+
+async def test_group_checkout_completed_completes_every_guest(client, sample_event):
+    small = await _create_group(client, sample_event.slug, [_guest(i) for i in range(2)])
+    large = await _create_group(client, sample_event.slug, [_guest(i) for i in range(2, 8)])
+
+    small_queries = await _deliver(
+        client, _group_session_event("evt_group_small", "checkout.session.completed", small)
+    )
+    large_queries = await _deliver(
+        client, _group_session_event("evt_group_large", "checkout.session.completed", large)
+    )
+
+    assert large_queries == small_queries
+    # Every guest's confirmation is queued in the same transaction
+    async with TestSessionLocal() as session:
+        queued = set((await session.execute(
+            select(NotificationOutbox.registration_id).where(NotificationOutbox.kind == "confirmation")
+        )).scalars())
+    assert queued == {uuid.UUID(r["registration_id"]) for r in small["registrations"] + large["registrations"]}
+
+    regs = await _group_registrations(large)
+    assert {r.status for r in regs} == {RegistrationStatus.complete}
+    assert {r.stripe_payment_intent_id for r in regs} == {f"pi_{large['group_id']}"}
+    # Per-guest amounts are kept, not overwritten with the session total
+    assert {r.payment_amount_cents for r in regs} == {sample_event.fixed_price_cents}
+
+    async with TestSessionLocal() as session:
+        audits = (await session.execute(
+            select(func.count(AuditLog.id)).where(AuditLog.entity_id.in_([r.id for r in regs]))
+        )).scalar()
+    assert audits == 6
+
+
+async def test_group_checkout_expired_then_refund(client, sample_event):
+    group = await _create_group(client, sample_event.slug, [_guest(i) for i in range(3)])
+    await _deliver(client, _group_session_event("evt_group_exp", "checkout.session.expired", group))
+    regs = await _group_registrations(group)
+    assert {r.status for r in regs} == {RegistrationStatus.expired}
+
+    # A late payment re-completes the whole group, then a full refund covers it too
+    await _deliver(client, _group_session_event("evt_group_paid", "checkout.session.completed", group))
+    await _deliver(
+        client,
+        {
+            "id": "evt_group_refund",
+            "type": "charge.refunded",
+            "data": {
+                "object": {
+                    "payment_intent": f"pi_{group['group_id']}",
+                    "amount": 75000,
+                    "amount_refunded": 75000,
+                }
+            },
+        },
+    )
+    regs = await _group_registrations(group)
+    assert {r.status for r in regs} == {RegistrationStatus.refunded}
+
+    info = await client.get(f"/api/v1/register/{sample_event.slug}/info")
+    assert info.json()["event"]["spots_remaining"] == sample_event.capacity
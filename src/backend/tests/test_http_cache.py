@@ -0,0 +1,124 @@
+"""Tests for conditional GET / cache headers on public registration endpoints."""
+
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Event, SubEvent
+from app.models.sub_event import SubEventPricingModel
+from app.services import capacity_service, event_catalog
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_info_sets_validators_and_cache_control(client, sample_event):
+    response = await client.get(f"/api/v1/register/{sample_event.slug}/info")
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert "last-modified" in response.headers
+    cache_control = response.headers["cache-control"]
+    assert "public" in cache_control
+    assert "s-maxage=" in cache_control
+    assert "stale-while-revalidate=" in cache_control
+
+
+async def test_info_revalidates_without_database(client, sample_event):
+    first = await client.get(f"/api/v1/register/{sample_event.slug}/info")
+    etag = first.headers["etag"]
+
+    with patch("app.routers.registration.capacity_service.availability", new_callable=AsyncMock) as availability:
+        second = await client.get(
+            f"/api/v1/register/{sample_event.slug}/info",
+            headers={"If-None-Match": etag},
+        )
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+    availability.assert_not_called()
+
+
+async def test_info_etag_changes_when_seat_claimed(client, db_session: AsyncSession, sample_event):
+    first = await client.get(f"/api/v1/register/{sample_event.slug}/info")
+    etag = first.headers["etag"]
+
+    assert await capacity_service.claim_event_seats(db_session, sample_event)
+    await db_session.commit()
+
+    second = await client.get(
+        f"/api/v1/register/{sample_event.slug}/info",
+        headers={"If-None-Match": etag},
+    )
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert second.json()["event"]["spots_remaining"] == first.json()["event"]["spots_remaining"] - 1
+
+
+async def test_info_etag_changes_when_sub_event_added(client, db_session: AsyncSession, sample_event):
+    first = await client.get(f"/api/v1/register/{sample_event.slug}/info")
+
+    db_session.add(SubEvent(
+        id=uuid.uuid4(),
+        parent_event_id=sample_event.id,
+        name="Friday Night",
+        pricing_model=SubEventPricingModel.fixed,
+        fixed_price_cents=5000,
+    ))
+    await db_session.commit()
+    # Direct DB writes bypass the routers, so invalidate by hand
+    event_catalog.invalidate(sample_event.id)
+
+    second = await client.get(
+        f"/api/v1/register/{sample_event.slug}/info",
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert second.status_code == 200
+
+
+async def test_success_and_cancelled_support_if_none_match(client, sample_event):
+    for path in ("success?session_id=cs_test_1", "cancelled"):
+        first = await client.get(f"/api/v1/register/{sample_event.slug}/{path}")
+        assert first.status_code == 200
+        second = await client.get(
+            f"/api/v1/register/{sample_event.slug}/{path}",
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        assert second.status_code == 304
+
+
+async def test_success_ignores_session_id_for_caching(client, sample_event):
+    first = await client.get(f"/api/v1/register/{sample_event.slug}/success?session_id=cs_a")
+    second = await client.get(
+        f"/api/v1/register/{sample_event.slug}/success?session_id=cs_b",
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert second.status_code == 304
+
+
+async def test_recurring_dates_support_if_none_match(client, db_session: AsyncSession, sample_event: Event):
+    sample_event.is_recurring = True
+    sample_event.recurrence_rule = "FREQ=WEEKLY;BYDAY=SA"
+    await db_session.commit()
+
+    first = await client.get(f"/api/v1/events/{sample_event.slug}/recurring-dates?count=4")
+    assert first.status_code == 200
+    assert "stale-while-revalidate=" in first.headers["cache-control"]
+
+    second = await client.get(
+        f"/api/v1/events/{sample_event.slug}/recurring-dates?count=4",
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert second.status_code == 304
+
+    other_count = await client.get(
+        f"/api/v1/events/{sample_event.slug}/recurring-dates?count=5",
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert other_count.status_code == 200
+
+
+async def test_not_found_is_not_cached(client):
+    response = await client.get("/api/v1/register/no-such-event/info")
+    assert response.status_code == 404
+    assert "etag" not in response.headers
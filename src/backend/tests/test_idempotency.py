@@ -0,0 +1,130 @@
+"""Tests for Idempotency-Key replay on public registration POSTs."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.models import IdempotencyKey, Registration
+from app.services import idempotency_service
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+PAYLOAD = {
+    "first_name": "Retry",
+    "last_name": "Storm",
+    "email": "retry@example.com",
+    "waiver_accepted": True,
+}
+
+
+async def _registration_count(event_id) -> int:
+    async with TestSessionLocal() as session:
+        return (await session.execute(
+            select(func.count(Registration.id)).where(Registration.event_id == event_id)
+        )).scalar()
+
+
+async def test_replay_returns_original_response(client, sample_event):
+    headers = {"Idempotency-Key": "key-single-1"}
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_idem",
+    ) as mock_checkout:
+        first = await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD, headers=headers)
+        second = await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD, headers=headers)
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers["idempotent-replayed"] == "true"
+    assert mock_checkout.await_count == 1
+    assert await _registration_count(sample_event.id) == 1
+
+
+async def test_key_reused_with_different_body_rejected(client, sample_event):
+    headers = {"Idempotency-Key": "key-single-2"}
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_idem",
+    ):
+        await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD, headers=headers)
+        other = await client.post(
+            f"/api/v1/register/{sample_event.slug}",
+            json={**PAYLOAD, "email": "someone-else@example.com"},
+            headers=headers,
+        )
+    assert other.status_code == 422
+
+
+async def test_failed_request_releases_key(client, sample_event):
+    headers = {"Idempotency-Key": "key-single-3"}
+    failed = await client.post(
+        f"/api/v1/register/{sample_event.slug}",
+        json={**PAYLOAD, "waiver_accepted": False},
+        headers=headers,
+    )
+    assert failed.status_code == 422
+
+    async with TestSessionLocal() as session:
+        assert (await session.execute(select(IdempotencyKey))).scalars().all() == []
+
+
+async def test_in_flight_key_conflicts(client, sample_event):
+    async with TestSessionLocal() as session:
+        session.add(IdempotencyKey(
+            key="key-in-flight",
+            fingerprint="x" * 64,
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=5),
+        ))
+        await session.commit()
+
+    response = await client.post(
+        f"/api/v1/register/{sample_event.slug}",
+        json=PAYLOAD,
+        headers={"Idempotency-Key": "key-in-flight"},
+    )
+    # Fingerprint differs from the stored one → rejected before the handler runs
+    assert response.status_code == 422
+    assert await _registration_count(sample_event.id) == 0
+
+
+async def test_expired_keys_are_purged(client, sample_event):
+    headers = {"Idempotency-Key": "key-expiring"}
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_idem",
+    ):
+        await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD, headers=headers)
+
+    async with TestSessionLocal() as session:
+        await session.execute(
+            update(IdempotencyKey).values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+        )
+        await session.commit()
+        assert await idempotency_service.purge_expired(session) == 1
+        await session.commit()
+
+
+async def test_group_replay_creates_one_checkout_session(client, sample_event):
+    mock_session = MagicMock(id="cs_test_group_idem", url="https://checkout.stripe.com/c/pay/cs_test_group_idem")
+    body = {
+        "payer": PAYLOAD,
+        "guests": [PAYLOAD, {**PAYLOAD, "first_name": "Plus", "email": "plus@example.com"}],
+        "payment_method": "stripe",
+    }
+    headers = {"Idempotency-Key": "key-group-1"}
+    with patch("stripe.checkout.Session.create", return_value=mock_session) as mock_create:
+        first = await client.post(f"/api/v1/register/{sample_event.slug}/group", json=body, headers=headers)
+        second = await client.post(f"/api/v1/register/{sample_event.slug}/group", json=body, headers=headers)
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.json() == first.json()
+    assert mock_create.call_count == 1
+    assert await _registration_count(sample_event.id) == 2
@@ -0,0 +1,155 @@
+"""Tests for intake_service — compiled form-template validators for intake_data."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Event, Registration
+from app.models.event_form_link import EventFormLink
+from app.models.form_template import FormTemplate, FormType
+from app.services import intake_service
+from tests.conftest import TestSessionLocal
+
+FIELDS = [
+    {"id": "referral", "type": "dropdown", "label": "How did you hear?", "options": ["Instagram", "Friend"]},
+    {"id": "notes", "type": "textarea", "label": "Notes", "max_length": 20},
+    {"id": "age", "type": "number", "label": "Age"},
+    {"id": "first_time", "type": "checkbox", "label": "First time?"},
+    {"id": "arrival", "type": "date", "label": "Arrival"},
+    {"id": "meals", "type": "multi_select", "label": "Meals", "options": ["breakfast", "dinner"]},
+]
+
+
+@pytest_asyncio.fixture
+async def intake_template(db_session: AsyncSession, sample_event: Event) -> FormTemplate:
+    template = FormTemplate(id=uuid.uuid4(), name="Intake", form_type=FormType.intake, fields=FIELDS)
+    db_session.add(template)
+    await db_session.flush()
+    db_session.add(EventFormLink(event_id=sample_event.id, form_template_id=template.id))
+    await db_session.commit()
+    return template
+
+
+def test_free_form_strips_private_keys_and_truncates():
+    result = intake_service.sanitize(
+        {"_secret": 1, "$where": 2, "answer": "x" * 3000, "deep": {"a": {"b": {"c": 1}}}}
+    )
+    assert set(result) == {"answer", "deep"}
+    assert len(result["answer"]) == 2000
+    assert result["deep"] == {"a": {"b": "[truncated]"}}
+
+
+def test_size_limit_aborts_before_walking_everything():
+    seen = []
+
+    class Tracking(str):
+        def __getitem__(self, item):
+            seen.append(1)
+            return str.__getitem__(self, item)
+
+    payload = {f"k{i}": Tracking("y" * 1500) for i in range(50)}
+    with pytest.raises(ValueError, match="10KB"):
+        intake_service.sanitize(payload)
+    assert len(seen) < 10
+
+
+def test_template_validator_keeps_declared_fields_and_coerces():
+    template_id = str(uuid.uuid4())
+    validators = {template_id: intake_service.compile_template(template_id, FIELDS)}
+    result = intake_service.sanitize(
+        {
+            template_id: {
+                "referral": "Friend",
+                "notes": "n" * 50,
+                "age": "42",
+                "first_time": "true",
+                "arrival": "2026-06-01",
+                "meals": ["dinner"],
+                "junk": "dropped",
+                "empty": "",
+            },
+            "not-a-template": {"x": 1},
+            "how_did_you_hear": "legacy",
+        },
+        validators,
+    )
+    assert result == {
+        template_id: {
+            "referral": "Friend",
+            "notes": "n" * 20,
+            "age": 42,
+            "first_time": True,
+            "arrival": "2026-06-01",
+            "meals": ["dinner"],
+        }
+    }
+
+
+@pytest.mark.parametrize(
+    "field,value",
+    [
+        ("referral", "Billboard"),
+        ("age", "old"),
+        ("age", "nan"),
+        ("age", "inf"),
+        ("age", "-Infinity"),
+        ("age", "1e400"),
+        ("age", float("nan")),
+        ("age", float("-inf")),
+        ("arrival", "tomorrow"),
+        ("meals", "dinner"),
+        ("notes", {"a": 1}),
+    ],
+)
+def test_template_validator_rejects_bad_values(field, value):
+    template_id = str(uuid.uuid4())
+    validators = {template_id: intake_service.compile_template(template_id, FIELDS)}
+    with pytest.raises(ValueError, match="Invalid value"):
+        intake_service.sanitize({template_id: {field: value}}, validators)
+
+
+@pytest.mark.asyncio
+async def test_validators_cached_by_updated_at(db_session: AsyncSession, intake_template):
+    first = await intake_service.get_validators(db_session, [intake_template.id])
+    again = await intake_service.get_validators(db_session, [intake_template.id])
+    assert again[str(intake_template.id)] is first[str(intake_template.id)]
+
+    intake_template.fields = [{"id": "referral", "type": "text", "label": "Referral"}]
+    intake_template.updated_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+    await db_session.flush()
+    edited = await intake_service.get_validators(db_session, [intake_template.id])
+    assert set(edited[str(intake_template.id)].fields) == {"referral"}
+
+
+@pytest.mark.asyncio
+async def test_registration_stores_only_template_fields(client, sample_event, intake_template):
+    template_id = str(intake_template.id)
+    payload = {
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "email": "jane@example.com",
+        "waiver_accepted": True,
+        "intake_data": {template_id: {"referral": "Instagram", "age": 30, "junk": "x"}, "junk": {"a": 1}},
+    }
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_intake",
+    ):
+        response = await client.post(f"/api/v1/register/{sample_event.slug}", json=payload)
+        assert response.status_code == 201
+
+        payload["email"] = "john@example.com"
+        payload["intake_data"] = {template_id: {"referral": "Billboard"}}
+        rejected = await client.post(f"/api/v1/register/{sample_event.slug}", json=payload)
+    assert rejected.status_code == 422
+    assert "How did you hear?" in rejected.json()["detail"]
+
+    async with TestSessionLocal() as session:
+        reg = (await session.execute(select(Registration))).scalar_one()
+    assert reg.intake_data == {template_id: {"referral": "Instagram", "age": 30}}
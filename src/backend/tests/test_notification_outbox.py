@@ -0,0 +1,204 @@
+"""Tests for the notification outbox and its dispatcher."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.models import NotificationOutbox
+from app.services import notification_outbox
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _rows() -> list[NotificationOutbox]:
+    async with TestSessionLocal() as session:
+        return list((await session.execute(select(NotificationOutbox))).scalars().all())
+
+
+def _batch(result: bool = True) -> AsyncMock:
+    """A stand-in for email_service.send_batch returning `result` for every email."""
+    return AsyncMock(side_effect=lambda emails, keys=None: [result] * len(emails))
+
+
+async def _enqueue(registrations, kind=notification_outbox.CONFIRMATION, **kwargs) -> None:
+    async with TestSessionLocal() as session:
+        await notification_outbox.enqueue(session, kind, registrations, **kwargs)
+        await session.commit()
+
+
+async def test_free_registration_queues_confirmation_without_sending(client, free_event):
+    with patch("app.services.email_service.send_batch", _batch()) as mock_send:
+        response = await client.post(
+            f"/api/v1/register/{free_event.slug}",
+            json={
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "email": "jane@example.com",
+                "waiver_accepted": True,
+                "payment_method": "free",
+            },
+        )
+        assert response.status_code == 201, response.text
+        mock_send.assert_not_awaited()
+
+        [row] = await _rows()
+        assert str(row.registration_id) == response.json()["registration_id"]
+        assert row.sent_at is None
+
+        assert await notification_outbox.dispatch_pending(TestSessionLocal) == 1
+    [email], keys = mock_send.await_args.args
+    assert email["to"] == ["jane@example.com"]
+    assert keys == [f"outbox/{row.id}"]
+    [row] = await _rows()
+    assert row.sent_at is not None and row.attempts == 1
+
+
+async def test_enqueue_dedupes_per_registration_and_kind(sample_registration):
+    await _enqueue([sample_registration])
+    await _enqueue([sample_registration])
+    await _enqueue([sample_registration], notification_outbox.ADMIN_CANCEL, dedupe=False)
+    await _enqueue([sample_registration], notification_outbox.ADMIN_CANCEL, dedupe=False)
+    kinds = sorted(row.kind for row in await _rows())
+    assert kinds == ["admin_cancel", "admin_cancel", "confirmation"]
+
+
+async def test_rolled_back_transaction_queues_nothing(sample_registration):
+    async with TestSessionLocal() as session:
+        await notification_outbox.enqueue(session, notification_outbox.CONFIRMATION, [sample_registration])
+        await session.rollback()
+    assert await _rows() == []
+
+
+async def test_failed_send_retries_with_backoff(sample_registration):
+    await _enqueue([sample_registration])
+    with patch("app.services.email_service.send_batch", _batch(False)):
+        assert await notification_outbox.dispatch_pending(TestSessionLocal) == 1
+    [row] = await _rows()
+    assert row.sent_at is None
+    assert row.attempts == 1
+    assert row.last_error == "Provider send failed"
+    assert row.next_attempt_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+
+    # Not due yet; once due it is sent
+    assert await notification_outbox.dispatch_pending(TestSessionLocal) == 0
+    async with TestSessionLocal() as session:
+        await session.execute(update(NotificationOutbox).values(next_attempt_at=datetime.now(timezone.utc)))
+        await session.commit()
+    with (
+        patch("app.services.email_service.send_batch", _batch()) as mock_batch,
+        patch("app.services.email_service.send_confirmation_email", new_callable=AsyncMock, return_value=True),
+    ):
+        assert await notification_outbox.dispatch_pending(TestSessionLocal) == 1
+    mock_batch.assert_not_awaited()
+    [row] = await _rows()
+    assert row.sent_at is not None and row.last_error is None and row.attempts == 2
+
+
+async def test_gives_up_after_max_attempts(sample_registration):
+    await _enqueue([sample_registration])
+    async with TestSessionLocal() as session:
+        await session.execute(
+            update(NotificationOutbox).values(attempts=settings.notification_outbox_max_attempts)
+        )
+        await session.commit()
+    assert await notification_outbox.dispatch_pending(TestSessionLocal) == 0
+
+
+async def test_lapsed_lease_is_reclaimed(sample_registration):
+    """A dispatcher that died mid-send leaves its lease; the row is sent after it lapses."""
+    await _enqueue([sample_registration])
+    async with TestSessionLocal() as session:
+        assert len(await notification_outbox.claim_batch(session, 10)) == 1
+    assert await notification_outbox.dispatch_pending(TestSessionLocal) == 0
+
+    async with TestSessionLocal() as session:
+        await session.execute(
+            update(NotificationOutbox).values(next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        await session.commit()
+    with patch(
+        "app.services.email_service.send_confirmation_email", new_callable=AsyncMock, return_value=True
+    ) as mock_send:
+        assert await notification_outbox.dispatch_pending(TestSessionLocal) == 1
+    [row] = await _rows()
+    # A retry is sent on its own under the row's key, so every later retry repeats it exactly
+    assert mock_send.await_args.kwargs["idempotency_key"] == f"outbox/{row.id}"
+    assert row.attempts == 2 and row.sent_at is not None
+
+
+async def _guests(db_session, event, count):
+    from app.models import Attendee, Registration, RegistrationStatus
+
+    registrations = []
+    for n in range(count):
+        attendee = Attendee(email=f"guest{n}@example.com", first_name="Guest", last_name=str(n))
+        registrations.append(
+            Registration(attendee=attendee, event_id=event.id, status=RegistrationStatus.complete)
+        )
+    db_session.add_all(registrations)
+    await db_session.commit()
+    return registrations
+
+
+async def test_confirmations_share_one_batch_request(db_session, sample_event):
+    await _enqueue(await _guests(db_session, sample_event, 7))
+    with (
+        patch.object(settings, "notification_outbox_batch_size", 3),
+        patch("app.services.email_service.send_batch", _batch()) as mock_send,
+    ):
+        assert await notification_outbox.dispatch_pending(TestSessionLocal) == 7
+    assert [len(call.args[0]) for call in mock_send.await_args_list] == [3, 3, 1]
+    assert all(row.sent_at is not None for row in await _rows())
+
+
+async def test_retried_confirmations_are_not_regrouped(db_session, sample_event):
+    """A failed batch's rows are retried one by one under their own keys, never as a new batch."""
+    await _enqueue(await _guests(db_session, sample_event, 4))
+    with patch("app.services.email_service.send_batch", _batch(False)):
+        assert await notification_outbox.dispatch_pending(TestSessionLocal) == 4
+    async with TestSessionLocal() as session:
+        await session.execute(update(NotificationOutbox).values(next_attempt_at=datetime.now(timezone.utc)))
+        await session.commit()
+
+    with (
+        patch.object(settings, "notification_outbox_batch_size", 3),
+        patch("app.services.email_service.send_batch", _batch()) as mock_batch,
+        patch(
+            "app.services.email_service.send_confirmation_email", new_callable=AsyncMock, return_value=True
+        ) as mock_send,
+    ):
+        assert await notification_outbox.dispatch_pending(TestSessionLocal) == 4
+    mock_batch.assert_not_awaited()
+    rows = await _rows()
+    assert sorted(call.kwargs["idempotency_key"] for call in mock_send.await_args_list) == sorted(
+        f"outbox/{row.id}" for row in rows
+    )
+    assert all(row.sent_at is not None for row in rows)
+
+
+async def test_bounds_concurrency_of_single_sends(db_session, sample_event):
+    await _enqueue(await _guests(db_session, sample_event, 7), notification_outbox.ADMIN_CANCEL, dedupe=False)
+    in_flight = peak = 0
+
+    async def _send(registration, event, reason, idempotency_key=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return True
+
+    with (
+        patch.object(settings, "notification_outbox_batch_size", 3),
+        patch.object(settings, "notification_outbox_concurrency", 2),
+        patch("app.services.email_service.send_admin_cancel_notification", _send),
+    ):
+        assert await notification_outbox.dispatch_batch(TestSessionLocal) == 3
+        assert await notification_outbox.dispatch_pending(TestSessionLocal) == 4
+    assert peak == 2
+    assert all(row.sent_at is not None for row in await _rows())
@@ -88,7 +88,7 @@ async def test_sends_1d_reminder(reminder_event_1d):
     """Reminders are sent for events happening in 1 day."""
     event, reg = reminder_event_1d
 
-    with patch("app.tasks.reminders.send_event_reminder_email", new_callable=AsyncMock, return_value=True) as mock_email, \
+    with patch("app.tasks.reminders.send_batch", new_callable=AsyncMock, return_value=[True]) as mock_email, \
          patch("app.tasks.reminders.send_sms", new_callable=AsyncMock, return_value=True) as mock_sms, \
          patch("app.tasks.reminders.async_session") as mock_session_ctx:
 
@@ -124,7 +124,7 @@ async def test_reminders_idempotent(db_session: AsyncSession, reminder_event_1d)
     ))
     await db_session.commit()
 
-    with patch("app.tasks.reminders.send_event_reminder_email", new_callable=AsyncMock) as mock_email, \
+    with patch("app.tasks.reminders.send_batch", new_callable=AsyncMock) as mock_email, \
          patch("app.tasks.reminders.send_sms", new_callable=AsyncMock) as mock_sms, \
          patch("app.tasks.reminders.async_session") as mock_session_ctx:
 
@@ -142,7 +142,7 @@ async def test_reminders_idempotent(db_session: AsyncSession, reminder_event_1d)
 
 async def test_skips_events_outside_reminder_window(event_not_in_reminder_window):
     """Events not happening in 1 or 7 days are skipped (no reminders sent)."""
-    with patch("app.tasks.reminders.send_event_reminder_email", new_callable=AsyncMock) as mock_email, \
+    with patch("app.tasks.reminders.send_batch", new_callable=AsyncMock) as mock_email, \
          patch("app.tasks.reminders.send_sms", new_callable=AsyncMock) as mock_sms, \
          patch("app.tasks.reminders.async_session") as mock_session_ctx:
 
@@ -0,0 +1,208 @@
+"""Tests for the local provider simulators (real SDKs over in-process transports)."""
+
+import json
+import statistics
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+import resend
+import stripe
+from sqlalchemy import select
+
+from app import simulators
+from app.config import settings
+from app.models import Registration, RegistrationStatus
+from app.services import email_service, notification_outbox, sms_service, stripe_catalog, stripe_reconciliation, stripe_webhooks
+from app.services.stripe_service import call_stripe
+from app.simulators.faults import FaultProfile
+from app.simulators.stripe_api import sign_payload
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture
+def sims():
+    with (
+        patch.object(settings, "simulator_latency_ms", 0.0),
+        patch.object(settings, "simulator_overrides", {}),
+        patch.object(stripe, "max_network_retries", 0),
+    ):
+        installed = simulators.install(simulators.PROVIDERS)
+        try:
+            yield installed
+        finally:
+            simulators.uninstall()
+
+
+def test_uninstall_restores_transports_and_settings(sims):
+    assert stripe.default_http_client is sims["stripe"]
+    assert settings.stripe_webhook_secret == "whsec_simulator"
+    simulators.uninstall()
+    assert stripe.default_http_client is not sims["stripe"]
+    assert resend.default_http_client is not sims["resend"]
+    assert sms_service.http_client is None
+    assert settings.stripe_webhook_secret == ""
+
+
+def test_configured_parses_setting():
+    with patch.object(settings, "provider_simulators", "Stripe, resend"):
+        assert simulators.configured() == {"stripe", "resend"}
+    with patch.object(settings, "provider_simulators", "all"):
+        assert simulators.configured() == set(simulators.PROVIDERS)
+    with patch.object(settings, "provider_simulators", "paypal"), pytest.raises(ValueError):
+        simulators.configured()
+
+
+def test_refused_in_production():
+    with patch.object(settings, "app_env", "production"), pytest.raises(RuntimeError):
+        simulators.install(["stripe"])
+
+
+def test_latency_distribution_matches_median_and_p99():
+    faults = FaultProfile(latency_ms=100, latency_p99_ms=400, seed=7)
+    samples = sorted(faults.sample_latency() for _ in range(20000))
+    assert statistics.median(samples) == pytest.approx(0.100, rel=0.05)
+    assert samples[int(len(samples) * 0.99)] == pytest.approx(0.400, rel=0.1)
+
+
+def test_injected_outcomes_follow_rates():
+    faults = FaultProfile(error_rate=0.1, rate_limit_rate=0.2, seed=3)
+    outcomes = [faults.outcome() for _ in range(10000)]
+    assert outcomes.count(429) / len(outcomes) == pytest.approx(0.2, abs=0.02)
+    assert outcomes.count(500) / len(outcomes) == pytest.approx(0.1, abs=0.02)
+
+
+@pytest.mark.asyncio
+async def test_checkout_webhook_round_trip(client, sims, sample_event):
+    response = await client.post(
+        f"/api/v1/register/{sample_event.slug}",
+        json={
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "email": "jane@example.com",
+            "waiver_accepted": True,
+            "payment_method": "stripe",
+        },
+    )
+    assert response.status_code == 201, response.text
+    checkout_url = response.json()["checkout_url"]
+    session_id = checkout_url.rsplit("/", 1)[-1]
+    assert sims["stripe"].sessions[session_id]["amount_total"] == 25000
+
+    # What the hosted page + Stripe's webhook delivery would do
+    event = sims["stripe"].complete_session(session_id)
+    payload = json.dumps(event).encode()
+    delivered = await client.post(
+        "/api/v1/webhooks/stripe",
+        content=payload,
+        headers={"stripe-signature": sign_payload(payload, settings.stripe_webhook_secret)},
+    )
+    assert delivered.json() == {"status": "queued"}
+    assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
+    # The confirmation goes out through the outbox to the simulated Resend
+    assert await notification_outbox.dispatch_pending(TestSessionLocal) == 1
+    assert sims["resend"].emails[0]["to"] == ["jane@example.com"]
+
+    async with TestSessionLocal() as db:
+        registration = (await db.execute(select(Registration))).scalar_one()
+    assert registration.status == RegistrationStatus.complete
+    assert registration.stripe_payment_intent_id.startswith("pi_sim_")
+
+
+@pytest.mark.asyncio
+async def test_catalog_sync_and_price_refs(sims, sample_event):
+    await stripe_catalog.sync_event(sample_event)
+    assert sample_event.stripe_price_id in sims["stripe"].prices
+
+    session = await call_stripe(
+        stripe.checkout.Session.create,
+        mode="payment",
+        line_items=[{"price": sample_event.stripe_price_id, "quantity": 3}],
+        success_url="https://example.com/ok",
+    )
+    assert session.amount_total == 75000
+
+
+@pytest.mark.asyncio
+async def test_reconcile_auto_paginates_simulated_sessions(sims):
+    simulator = sims["stripe"]
+    for _ in range(250):
+        simulator._create_session({"line_items": [{"price_data": {"unit_amount": "100"}}]})
+
+    now = datetime.now(timezone.utc)
+    stats = await stripe_reconciliation.reconcile(
+        since=now - timedelta(hours=1), until=now + timedelta(minutes=1), session_factory=TestSessionLocal
+    )
+    assert stats.sessions == 250
+    # Three list pages of 100 (the last holding 50)
+    assert simulator.request_count == 3 + 1
+
+
+@pytest.mark.asyncio
+async def test_injected_stripe_errors_surface_as_sdk_errors(sims):
+    sims["stripe"].faults = FaultProfile(rate_limit_rate=1.0)
+    with pytest.raises(stripe.error.RateLimitError):
+        await call_stripe(stripe.Product.create, name="x")
+    sims["stripe"].faults = FaultProfile(error_rate=1.0)
+    with pytest.raises(stripe.error.APIError):
+        await call_stripe(stripe.Product.create, name="x")
+
+
+@pytest.mark.asyncio
+async def test_twilio_and_resend_send_through_simulators(sims):
+    assert await sms_service.send_sms("+14045551234", "See you at the gate")
+    assert sims["twilio"].messages[0]["to"] == "+14045551234"
+    assert sims["twilio"].messages[0]["body"] == "See you at the gate"
+
+    assert await email_service.send_branded_email("jane@example.com", "Hello", "Body text")
+    assert sims["resend"].emails[0]["to"] == ["jane@example.com"]
+
+    sims["twilio"].faults = FaultProfile(rate_limit_rate=1.0)
+    sims["resend"].faults = FaultProfile(error_rate=1.0)
+    assert not await sms_service.send_sms("+14045551234", "again")
+    assert not await email_service.send_branded_email("jane@example.com", "Hello", "Body text")
+
+
+@pytest.mark.asyncio
+async def test_hosted_checkout_route_pays_and_delivers_webhook(sims):
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+
+    from app.routers import simulators as simulator_routes
+
+    session = sims["stripe"]._create_session({
+        "line_items": [{"price_data": {"unit_amount": "5000"}}],
+        "success_url": "https://example.com/done?session_id={CHECKOUT_SESSION_ID}",
+    })
+    sim_app = FastAPI()
+    sim_app.include_router(simulator_routes.router)
+    delivered = []
+
+    async def _deliver(event, url=None):
+        delivered.append(event)
+        return 200
+
+    with patch("app.routers.simulators.deliver_webhook", _deliver):
+        async with AsyncClient(transport=ASGITransport(app=sim_app), base_url="http://test") as sim_client:
+            response = await sim_client.get(f"/simulators/stripe/checkout/{session['id']}")
+            again = await sim_client.get(f"/simulators/stripe/checkout/{session['id']}")
+
+    assert response.status_code == 303
+    assert response.headers["location"] == f"https://example.com/done?session_id={session['id']}"
+    assert again.status_code == 409
+    assert [e["type"] for e in delivered] == ["checkout.session.completed"]
+    assert delivered[0]["data"]["object"]["payment_status"] == "paid"
+
+
+@pytest.mark.asyncio
+async def test_send_batch_chunks_and_maps_rejections(sims):
+    emails = [email_service.branded_email(f"guest{n}@example.com", "Hello", "Body") for n in range(150)]
+    emails[120]["to"] = []
+    results = await email_service.send_batch(emails, [f"key/{n}" for n in range(150)])
+
+    assert sims["resend"].request_count == 2  # 100 + 50
+    assert len(sims["resend"].emails) == 149
+    assert results == [n != 120 for n in range(150)]
+
+    sims["resend"].faults = FaultProfile(error_rate=1.0)
+    assert await email_service.send_batch(emails[:3]) == [False, False, False]
@@ -14,6 +14,7 @@ from app.models.event import Event, EventStatus, PricingModel
 from app.models.registration import Registration, RegistrationSource, RegistrationStatus
 from app.models.sms_conversation import SmsConversation
 from app.models.user import User
+from app.models.webhook import WebhookRaw
 from app.routers.webhooks import parse_eta
 
 pytestmark = pytest.mark.asyncio
@@ -179,6 +180,27 @@ async def test_twilio_inbound_idempotent(
     assert resp2.status_code == 200
 
 
+async def test_twilio_inbound_duplicate_sid_stores_once(
+    client: AsyncClient, phone_attendee: Attendee, active_registration: Registration
+):
+    data = {"From": "+14045559999", "Body": "Running late", "MessageSid": "SM_dup_once"}
+    await client.post("/api/v1/webhooks/twilio/inbound", data=data)
+    await client.post("/api/v1/webhooks/twilio/inbound", data=data)
+    # Messages without a SID are never deduplicated
+    no_sid = {"From": "+14045559999", "Body": "No sid"}
+    await client.post("/api/v1/webhooks/twilio/inbound", data=no_sid)
+    await client.post("/api/v1/webhooks/twilio/inbound", data=no_sid)
+
+    from tests.conftest import TestSessionLocal
+
+    async with TestSessionLocal() as session:
+        webhooks = (await session.execute(select(WebhookRaw))).scalars().all()
+        conversations = (await session.execute(select(SmsConversation))).scalars().all()
+    assert sorted(w.twilio_sid or "" for w in webhooks) == ["", "", "SM_dup_once"]
+    assert all(w.processed_at is not None for w in webhooks)
+    assert len(conversations) == 3
+
+
 async def test_twilio_inbound_eta_parsing(
     client: AsyncClient,
     phone_attendee: Attendee,
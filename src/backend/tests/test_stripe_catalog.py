@@ -0,0 +1,219 @@
+"""Tests for Stripe Product/Price sync and Checkout price references."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+import stripe
+
+from app.models import Event, PricingModel
+from app.models.sub_event import SubEvent, SubEventPricingModel
+from app.services import stripe_catalog
+from app.services.stripe_service import create_checkout_session, create_composite_checkout_session
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def stripe_api():
+    """Stub the Stripe catalog endpoints with a configured key; replaced Prices archive at once."""
+    counter = {"price": 0}
+
+    def create_price(**kwargs):
+        counter["price"] += 1
+        return SimpleNamespace(id=f"price_{counter['price']}")
+
+    with (
+        patch("app.services.stripe_catalog.settings.stripe_secret_key", "sk_test_x"),
+        patch("app.services.stripe_catalog.settings.event_catalog_ttl_seconds", 0),
+        patch("app.services.stripe_catalog._ARCHIVE_GRACE_SECONDS", 0),
+        patch("stripe.Product.create", return_value=SimpleNamespace(id="prod_1")) as product_create,
+        patch("stripe.Product.modify") as product_modify,
+        patch("stripe.Price.create", side_effect=create_price) as price_create,
+        patch("stripe.Price.modify") as price_modify,
+    ):
+        yield SimpleNamespace(
+            product_create=product_create,
+            product_modify=product_modify,
+            price_create=price_create,
+            price_modify=price_modify,
+        )
+        await stripe_catalog.wait_for_archives()
+
+
+async def test_new_fixed_event_gets_product_and_price(stripe_api, sample_event):
+    sample_event.stripe_price_id = None
+    await stripe_catalog.sync_event(sample_event)
+
+    assert sample_event.stripe_product_id == "prod_1"
+    assert sample_event.stripe_price_id == "price_1"
+    assert stripe_api.product_create.call_args.kwargs["name"] == sample_event.name
+    price_kwargs = stripe_api.price_create.call_args.kwargs
+    assert price_kwargs["product"] == "prod_1"
+    assert price_kwargs["unit_amount"] == 25000
+    stripe_api.price_modify.assert_not_called()
+
+
+async def test_price_change_creates_new_price_and_archives_old(stripe_api, sample_event):
+    await stripe_catalog.sync_event(sample_event)
+    sample_event.fixed_price_cents = 30000
+    await stripe_catalog.sync_event(sample_event, changed={"fixed_price_cents"})
+
+    assert sample_event.stripe_price_id == "price_2"
+    assert stripe_api.price_create.call_args.kwargs["unit_amount"] == 30000
+    await stripe_catalog.wait_for_archives()
+    stripe_api.price_modify.assert_called_once_with("price_1", active=False)
+    assert stripe_api.product_create.call_count == 1
+
+
+async def test_replaced_price_stays_active_while_catalogs_may_reference_it(stripe_api, sample_event):
+    await stripe_catalog.sync_event(sample_event)
+    sample_event.fixed_price_cents = 30000
+    with patch("app.services.stripe_catalog.settings.event_catalog_ttl_seconds", 30):
+        await stripe_catalog.sync_event(sample_event, changed={"fixed_price_cents"})
+        await asyncio.sleep(0)
+    stripe_api.price_modify.assert_not_called()
+    for task in stripe_catalog._archiving:
+        task.cancel()
+
+
+async def test_leaving_fixed_pricing_drops_price(stripe_api, sample_event):
+    await stripe_catalog.sync_event(sample_event)
+    sample_event.pricing_model = PricingModel.donation
+    await stripe_catalog.sync_event(sample_event, changed={"pricing_model"})
+    assert sample_event.stripe_price_id is None
+
+    sample_event.pricing_model = PricingModel.fixed
+    await stripe_catalog.sync_event(sample_event, changed={"pricing_model"})
+    assert sample_event.stripe_price_id == "price_2"
+    sample_event.fixed_price_cents = None
+    await stripe_catalog.sync_event(sample_event, changed={"fixed_price_cents"})
+    assert sample_event.stripe_price_id is None
+
+    await stripe_catalog.wait_for_archives()
+    assert {c.args for c in stripe_api.price_modify.call_args_list} == {("price_1",), ("price_2",)}
+
+
+async def test_rename_updates_product_without_new_price(stripe_api, sample_event):
+    await stripe_catalog.sync_event(sample_event)
+    sample_event.name = "Spring Retreat"
+    await stripe_catalog.sync_event(sample_event, changed={"name"})
+
+    stripe_api.product_modify.assert_called_once_with("prod_1", name="Spring Retreat")
+    assert stripe_api.price_create.call_count == 1
+    assert sample_event.stripe_price_id == "price_1"
+
+
+async def test_explicit_price_id_is_left_alone(stripe_api, sample_event):
+    sample_event.stripe_price_id = "price_manual"
+    await stripe_catalog.sync_event(sample_event)
+    await stripe_catalog.sync_event(sample_event, changed={"stripe_price_id", "fixed_price_cents"})
+
+    assert sample_event.stripe_price_id == "price_manual"
+    stripe_api.price_create.assert_not_called()
+
+
+async def test_non_fixed_or_unconfigured_is_skipped(stripe_api, free_event, sample_event):
+    await stripe_catalog.sync_event(free_event)
+    with patch("app.services.stripe_catalog.settings.stripe_secret_key", ""):
+        await stripe_catalog.sync_event(sample_event)
+
+    stripe_api.product_create.assert_not_called()
+    assert sample_event.stripe_price_id is None
+
+
+async def test_stripe_error_never_leaves_stale_price(stripe_api, sample_event):
+    await stripe_catalog.sync_event(sample_event)
+    stripe_api.price_create.side_effect = stripe.error.APIConnectionError("down")
+    sample_event.fixed_price_cents = 30000
+    await stripe_catalog.sync_event(sample_event, changed={"fixed_price_cents"})
+
+    assert sample_event.stripe_price_id is None
+    assert sample_event.stripe_product_id == "prod_1"
+
+
+async def test_sub_event_sync_names_product_after_parent(stripe_api, db_session):
+    event = Event(
+        name="Forest Weekend",
+        slug="forest-weekend",
+        event_date=datetime(2026, 5, 2, 10, 0, tzinfo=timezone.utc),
+        event_type="retreat",
+        pricing_model=PricingModel.composite,
+    )
+    db_session.add(event)
+    await db_session.flush()
+    sub_event = SubEvent(
+        parent_event_id=event.id,
+        name="Saturday",
+        pricing_model=SubEventPricingModel.fixed,
+        fixed_price_cents=5000,
+    )
+    db_session.add(sub_event)
+    await db_session.flush()
+
+    await stripe_catalog.sync_sub_event(sub_event, event.name)
+
+    assert stripe_api.product_create.call_args.kwargs["name"] == "Forest Weekend — Saturday"
+    assert stripe_api.product_create.call_args.kwargs["metadata"]["sub_event_id"] == str(sub_event.id)
+    assert sub_event.stripe_price_id == "price_1"
+
+    await db_session.refresh(event, ["sub_events"])
+    event.name = "Autumn Weekend"
+    await stripe_catalog.sync_event(event, changed={"name"})
+    stripe_api.product_modify.assert_called_once_with("prod_1", name="Autumn Weekend — Saturday")
+
+
+async def test_checkout_references_synced_price(sample_registration, sample_attendee, sample_event):
+    sample_registration.attendee = sample_attendee
+    sample_event.stripe_price_id = "price_abc"
+    with patch("stripe.checkout.Session.create", return_value=MagicMock(url="https://x")) as create:
+        await create_checkout_session(sample_registration, sample_event)
+    assert create.call_args.kwargs["line_items"] == [{"price": "price_abc", "quantity": 1}]
+
+
+async def test_composite_checkout_mixes_price_refs_and_products(
+    sample_registration, sample_attendee, sample_event
+):
+    sample_registration.attendee = sample_attendee
+    synced = SimpleNamespace(
+        name="Saturday", pricing_model="fixed", fixed_price_cents=5000,
+        stripe_price_id="price_sat", stripe_product_id="prod_sat",
+    )
+    unsynced = SimpleNamespace(
+        name="Sunday", pricing_model="fixed", fixed_price_cents=4000,
+        stripe_price_id=None, stripe_product_id="prod_sun",
+    )
+    with patch("stripe.checkout.Session.create", return_value=MagicMock(url="https://x")) as create:
+        await create_composite_checkout_session(sample_registration, sample_event, [synced, unsynced])
+
+    line_items = create.call_args.kwargs["line_items"]
+    assert line_items[0] == {"price": "price_sat", "quantity": 1}
+    assert line_items[1]["price_data"] == {"currency": "usd", "unit_amount": 4000, "product": "prod_sun"}
+
+
+async def test_group_checkout_collapses_list_price_guests(client, db_session, sample_event):
+    sample_event.stripe_price_id = "price_list"
+    await db_session.commit()
+    guests = [
+        {"first_name": name, "last_name": "Doe", "email": f"{name.lower()}@example.com", "waiver_accepted": True}
+        for name in ("Jane", "John", "Jill")
+    ]
+    with patch(
+        "stripe.checkout.Session.create",
+        return_value=MagicMock(id="cs_group", url="https://checkout.stripe.com/c/pay/cs_group"),
+    ) as create:
+        response = await client.post(
+            f"/api/v1/register/{sample_event.slug}/group",
+            json={
+                "payer": {"first_name": "Jane", "last_name": "Doe", "email": "jane@example.com"},
+                "guests": guests,
+                "payment_method": "stripe",
+            },
+        )
+
+    assert response.status_code == 201
+    assert create.call_args.kwargs["line_items"] == [{"price": "price_list", "quantity": 3}]
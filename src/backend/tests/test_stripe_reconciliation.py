@@ -0,0 +1,251 @@
+"""Tests for the Stripe reconciliation job, run against a local list-API stub."""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event as sa_event, select
+
+from app.models import Attendee, AuditLog, NotificationOutbox, Registration, RegistrationStatus
+from app.services import stripe_reconciliation
+from tests.conftest import TestSessionLocal, engine
+
+pytestmark = pytest.mark.asyncio
+
+
+def _stub(objects: list[dict]):
+    """Stand-in for Session.list(...).auto_paging_iter(): a lazy iterator over `objects`."""
+    calls = []
+
+    def _list(since, until):
+        calls.append((since, until))
+        return iter(objects)
+
+    _list.calls = calls
+    return _list
+
+
+def _session(session_id: str, status: str = "complete", **fields) -> dict:
+    return {
+        "id": session_id,
+        "status": status,
+        "payment_status": "paid" if status == "complete" else "unpaid",
+        "payment_intent": fields.pop("payment_intent", None),
+        "amount_total": fields.pop("amount_total", None),
+        "client_reference_id": fields.pop("client_reference_id", None),
+        "metadata": fields.pop("metadata", {}),
+    }
+
+
+async def _confirmations() -> set[uuid.UUID]:
+    async with TestSessionLocal() as session:
+        return set((await session.execute(select(NotificationOutbox.id))).scalars())
+
+
+async def _reconcile(sessions=(), charges=()):
+    """Run reconciliation; returns its stats and the registration ids it queued confirmations for."""
+    before = await _confirmations()
+    stats = await stripe_reconciliation.reconcile(
+        session_factory=TestSessionLocal,
+        list_sessions=_stub(list(sessions)),
+        list_charges=_stub(list(charges)),
+    )
+    async with TestSessionLocal() as session:
+        queued = (await session.execute(
+            select(NotificationOutbox.registration_id).where(NotificationOutbox.id.not_in(before))
+        )).scalars().all()
+    return stats, list(queued)
+
+
+async def _status(db_session, registration_id) -> Registration:
+    result = await db_session.execute(
+        select(Registration).where(Registration.id == registration_id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def test_completes_missed_payment(db_session, sample_registration):
+    stats, queued = await _reconcile([
+        _session("cs_test_123", payment_intent="pi_123", amount_total=25000),
+    ])
+
+    registration = await _status(db_session, sample_registration.id)
+    assert registration.status == RegistrationStatus.complete
+    assert registration.stripe_payment_intent_id == "pi_123"
+    assert registration.payment_amount_cents == 25000
+    assert stats.completed == 1 and stats.sessions == 1
+    assert queued == [sample_registration.id]
+
+    audit = (await db_session.execute(select(AuditLog).where(AuditLog.entity_id == sample_registration.id))).scalar_one()
+    assert audit.actor == "system/reconciliation"
+
+    # Idempotent
+    stats, queued = await _reconcile([_session("cs_test_123", payment_intent="pi_123")])
+    assert stats.completed == 0
+    assert queued == []
+
+
+async def test_matches_by_client_reference_when_session_id_not_stored(db_session, sample_registration):
+    sample_registration.stripe_checkout_session_id = None
+    await db_session.commit()
+
+    await _reconcile([
+        _session("cs_other", payment_intent="pi_9", client_reference_id=str(sample_registration.id)),
+    ])
+
+    registration = await _status(db_session, sample_registration.id)
+    assert registration.status == RegistrationStatus.complete
+    assert registration.stripe_checkout_session_id == "cs_other"
+
+
+async def test_expires_only_the_current_session(db_session, sample_registration):
+    stats, _ = await _reconcile([
+        _session("cs_stale", "expired", client_reference_id=str(sample_registration.id)),
+    ])
+    assert stats.expired == 0
+    assert (await _status(db_session, sample_registration.id)).status == RegistrationStatus.pending_payment
+
+    stats, _ = await _reconcile([_session("cs_test_123", "expired")])
+    assert stats.expired == 1
+    assert (await _status(db_session, sample_registration.id)).status == RegistrationStatus.expired
+
+
+async def test_completed_session_wins_over_expired_retry_in_same_page(db_session, sample_registration):
+    sample_registration.stripe_checkout_session_id = None
+    await db_session.commit()
+    ref = str(sample_registration.id)
+
+    await _reconcile([
+        _session("cs_first", "complete", client_reference_id=ref),
+        _session("cs_second", "expired", client_reference_id=ref),
+    ])
+    assert (await _status(db_session, sample_registration.id)).status == RegistrationStatus.complete
+
+
+async def test_paid_expired_registration_is_skipped_once_rebooked(db_session, sample_registration, sample_event):
+    """A late payment for an expired registration must not clash with the attendee's new one."""
+    sample_registration.status = RegistrationStatus.expired
+    rebooked = Registration(
+        id=uuid.uuid4(),
+        attendee_id=sample_registration.attendee_id,
+        event_id=sample_event.id,
+        status=RegistrationStatus.pending_payment,
+    )
+    other = Registration(
+        attendee=Attendee(email="drifted@example.com", first_name="Drifted", last_name="Payer"),
+        event_id=sample_event.id,
+        status=RegistrationStatus.pending_payment,
+        stripe_checkout_session_id="cs_drifted",
+    )
+    db_session.add_all([rebooked, other])
+    await db_session.commit()
+
+    stats, queued = await _reconcile([
+        _session("cs_test_123", payment_intent="pi_late"),
+        _session("cs_drifted", payment_intent="pi_drifted"),
+    ])
+
+    assert (await _status(db_session, sample_registration.id)).status == RegistrationStatus.expired
+    assert (await _status(db_session, rebooked.id)).status == RegistrationStatus.pending_payment
+    # The rest of the run still reconciles
+    assert (await _status(db_session, other.id)).status == RegistrationStatus.complete
+    assert stats.completed == 1 and queued == [other.id]
+
+
+async def test_group_session_completes_every_guest(db_session, sample_event):
+    group_id = uuid.uuid4()
+    attendees = [Attendee(email=f"g{i}@example.com", first_name="G", last_name=str(i)) for i in range(3)]
+    db_session.add_all(attendees)
+    await db_session.flush()
+    registrations = [
+        Registration(
+            attendee_id=a.id,
+            event_id=sample_event.id,
+            status=RegistrationStatus.pending_payment,
+            group_id=group_id,
+            payment_amount_cents=25000,
+            waiver_accepted_at=datetime.now(timezone.utc),
+        )
+        for a in attendees
+    ]
+    db_session.add_all(registrations)
+    await db_session.commit()
+
+    await _reconcile([
+        _session("cs_group", payment_intent="pi_group", amount_total=75000, client_reference_id=str(group_id)),
+    ])
+
+    for registration in registrations:
+        reloaded = await _status(db_session, registration.id)
+        assert reloaded.status == RegistrationStatus.complete
+        assert reloaded.stripe_payment_intent_id == "pi_group"
+        assert reloaded.payment_amount_cents == 25000
+
+
+async def test_full_refund_is_applied_and_partial_is_left(db_session, sample_registration):
+    sample_registration.status = RegistrationStatus.complete
+    sample_registration.stripe_payment_intent_id = "pi_full"
+    await db_session.commit()
+
+    stats, _ = await _reconcile(charges=[
+        {"id": "ch_1", "payment_intent": "pi_full", "amount": 25000, "amount_refunded": 25000},
+        {"id": "ch_2", "payment_intent": "pi_partial", "amount": 25000, "amount_refunded": 5000},
+    ])
+
+    assert stats.charges == 2 and stats.refunded == 1
+    assert (await _status(db_session, sample_registration.id)).status == RegistrationStatus.refunded
+
+
+async def _seed(db_session, event, count: int) -> list[dict]:
+    attendees = [Attendee(email=f"bulk{i}@example.com", first_name="Bulk", last_name=str(i)) for i in range(count)]
+    db_session.add_all(attendees)
+    await db_session.flush()
+    db_session.add_all([
+        Registration(
+            attendee_id=a.id,
+            event_id=event.id,
+            status=RegistrationStatus.pending_payment,
+            stripe_checkout_session_id=f"cs_bulk_{i}",
+            waiver_accepted_at=datetime.now(timezone.utc),
+        )
+        for i, a in enumerate(attendees)
+    ])
+    await db_session.commit()
+    return [_session(f"cs_bulk_{i}", payment_intent=f"pi_bulk_{i}", amount_total=25000) for i in range(count)]
+
+
+async def _count_statements(sessions: list[dict]) -> int:
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa_event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        stats = await stripe_reconciliation.reconcile(
+            session_factory=TestSessionLocal, list_sessions=_stub(sessions), list_charges=_stub([])
+        )
+    finally:
+        sa_event.remove(engine.sync_engine, "before_cursor_execute", _count)
+    assert stats.completed == len(sessions)
+    return len(statements)
+
+
+async def test_statements_scale_with_pages_not_sessions(db_session, sample_event):
+    sessions = await _seed(db_session, sample_event, 250)
+
+    # Warm the capacity counter, then measure one page of 5 vs one page of 100
+    await _count_statements(sessions[:1])
+    small = await _count_statements(sessions[1:6])
+    full_page = await _count_statements(sessions[6:106])
+    assert full_page == small
+
+    # 144 sessions = 2 pages
+    assert await _count_statements(sessions[106:]) == 2 * small
+
+    completed = (
+        await db_session.execute(
+            select(Registration.id).where(Registration.status == RegistrationStatus.complete)
+        )
+    ).all()
+    assert len(completed) == 250
@@ -0,0 +1,45 @@
+"""Tests for stripe_service — Stripe SDK calls must not block the event loop."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.services.stripe_service import call_stripe, create_checkout_session
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_call_stripe_runs_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    ticks = 0
+
+    def slow_create(**kwargs):
+        assert threading.get_ident() != loop_thread
+        time.sleep(0.2)
+        return SimpleNamespace(url="https://checkout.stripe.com/c/pay/cs_slow", kwargs=kwargs)
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    session, _ = await asyncio.gather(call_stripe(slow_create, mode="payment"), ticker())
+    assert session.kwargs == {"mode": "payment"}
+    # The loop kept running while the "Stripe" call was in flight
+    assert ticks == 10
+
+
+async def test_create_checkout_session_uses_pool(sample_registration, sample_attendee, sample_event):
+    sample_registration.attendee = sample_attendee
+    with patch(
+        "stripe.checkout.Session.create",
+        return_value=SimpleNamespace(url="https://checkout.stripe.com/c/pay/cs_pool"),
+    ) as mock_create:
+        url = await create_checkout_session(sample_registration, sample_event)
+    assert url == "https://checkout.stripe.com/c/pay/cs_pool"
+    assert mock_create.call_args.kwargs["client_reference_id"] == str(sample_registration.id)
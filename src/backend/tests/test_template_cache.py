@@ -0,0 +1,91 @@
+"""Tests for compiled message templates and bulk rendering."""
+
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.models import Attendee, Event, MessageTemplate
+from app.services import bulk_messaging
+from app.template_cache import compile_message_template, compile_text
+
+
+def _regex_render(text: str, variables: dict[str, str]) -> str:
+    """The renderer compiled templates replaced."""
+    return re.sub(r"\{\{([\w.]+)\}\}", lambda m: variables.get(m.group(1), m.group(0)), text)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "No placeholders at all",
+    "Hi {{first_name}}!",
+    "{{first_name}}{{last_name}}",
+    "{{unknown}} and {{ first_name }} stay, {{first_name}} does not",
+    "Dotted {{event.name}} / {single} / {{}} / {{first_name}",
+])
+def test_renders_like_the_regex(text):
+    variables = {"first_name": "Jane", "last_name": "Doe", "event.name": "Retreat"}
+    assert compile_text(text).render(variables) == _regex_render(text, variables)
+
+
+def test_bind_fills_shared_fields_once():
+    compiled = compile_text("{{event_name}} on {{event_date}}: hi {{first_name}}, see {{where}}")
+    bound = compiled.bind({"event_name": "Retreat", "event_date": "May 1"})
+    assert bound.placeholders == {"first_name", "where"}
+    assert bound.render({"first_name": "Jane"}) == "Retreat on May 1: hi Jane, see {{where}}"
+    # The original is untouched
+    assert compiled.placeholders == {"event_name", "event_date", "first_name", "where"}
+
+
+def test_message_template_cached_until_edited():
+    template = MessageTemplate(id=uuid.uuid4(), body="Hi {{first_name}}", subject=None)
+    template.updated_at = datetime.now(timezone.utc)
+    body, subject = compile_message_template(template)
+    assert subject is None
+    assert compile_message_template(template)[0] is body
+
+    template.body = "Hello {{first_name}}"
+    template.updated_at += timedelta(seconds=1)
+    edited, _ = compile_message_template(template)
+    assert edited is not body
+    assert edited.render({"first_name": "Jane"}) == "Hello Jane"
+
+
+def test_bulk_render_matches_per_recipient_render():
+    event = Event(
+        id=uuid.uuid4(), name="Retreat", slug="retreat",
+        event_date=datetime(2026, 5, 1, 14, 0, tzinfo=timezone.utc), meeting_point_a="Main gate",
+    )
+    registrations = [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            attendee=Attendee(email=f"g{n}@example.com", first_name=f"G{n}", last_name="Test", phone=None),
+        )
+        for n in range(10_000)
+    ]
+    text = "Hi {{first_name}}, {{event_name}} is {{event_date}} at {{event_time}} ({{meeting_point}}). {{cancel_url}}"
+
+    started = time.perf_counter()
+    messages = bulk_messaging.render_messages(
+        registrations, event, "email", compile_text(text), compile_text("{{event_name}}")
+    )
+    elapsed = time.perf_counter() - started
+
+    registration = registrations[42]
+    expected = _regex_render(text, {
+        "first_name": "G42",
+        "event_name": "Retreat",
+        "event_date": "May 01, 2026",
+        "event_time": "02:00 PM",
+        "meeting_point": "Main gate",
+        "cancel_url": f"{settings.app_url}/register/retreat/cancel?reg={registration.id}",
+    })
+    assert messages[42].body == expected
+    assert messages[42].subject == "Retreat"
+    assert (messages[42].email, messages[42].phone) == ("g42@example.com", None)
+    # Generous bound for slow CI; typically a few tens of milliseconds
+    assert elapsed < 1.0
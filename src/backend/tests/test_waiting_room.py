@@ -0,0 +1,177 @@
+"""Tests for the opt-in waiting room (admission control) on registration."""
+
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import stripe
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import AdmissionTicketUse, Event
+from app.services import admission_service
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+PAYLOAD = {
+    "first_name": "Queue",
+    "last_name": "Person",
+    "email": "queue@example.com",
+    "waiver_accepted": True,
+}
+
+
+@pytest.fixture
+def mock_checkout():
+    with patch(
+        "app.routers.registration.create_checkout_session",
+        new_callable=AsyncMock,
+        return_value="https://checkout.stripe.com/c/pay/cs_test_queue",
+    ) as mock:
+        yield mock
+
+
+async def _enable_waiting_room(db_session: AsyncSession, event: Event, rate: int) -> None:
+    event.admission_rate_per_second = rate
+    await db_session.commit()
+
+
+async def test_registration_without_ticket_rejected(client, db_session, sample_event, mock_checkout):
+    await _enable_waiting_room(db_session, sample_event, 1)
+    response = await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD)
+    assert response.status_code == 403
+    mock_checkout.assert_not_called()
+
+
+async def test_events_without_waiting_room_unaffected(client, sample_event, mock_checkout):
+    response = await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD)
+    assert response.status_code == 201
+
+
+async def test_tickets_are_paced_at_admission_rate(client, db_session, sample_event, mock_checkout):
+    await _enable_waiting_room(db_session, sample_event, 2)
+
+    tickets = []
+    for _ in range(5):
+        response = await client.post(f"/api/v1/register/{sample_event.slug}/queue")
+        assert response.status_code == 201
+        tickets.append(response.json())
+
+    # 2 per second: the 5th arrival waits ~2s behind the first
+    waits = [t["retry_after"] for t in tickets]
+    assert waits[0] == 0
+    assert waits == sorted(waits)
+    assert 1.5 <= waits[4] <= 2.1
+
+    first = await client.get(
+        f"/api/v1/register/{sample_event.slug}/queue/status",
+        headers={"X-Queue-Ticket": tickets[0]["ticket"]},
+    )
+    assert first.json()["admitted"] is True
+    last = await client.get(
+        f"/api/v1/register/{sample_event.slug}/queue/status",
+        headers={"X-Queue-Ticket": tickets[4]["ticket"]},
+    )
+    assert last.json()["admitted"] is False
+
+    # Waiting ticket is held back with Retry-After; admitted ticket gets through
+    held = await client.post(
+        f"/api/v1/register/{sample_event.slug}",
+        json=PAYLOAD,
+        headers={"X-Queue-Ticket": tickets[4]["ticket"]},
+    )
+    assert held.status_code == 429
+    assert int(held.headers["retry-after"]) >= 1
+
+    admitted = await client.post(
+        f"/api/v1/register/{sample_event.slug}",
+        json=PAYLOAD,
+        headers={"X-Queue-Ticket": tickets[0]["ticket"]},
+    )
+    assert admitted.status_code == 201
+
+
+async def test_ticket_for_other_event_rejected(client, db_session, sample_event, free_event):
+    await _enable_waiting_room(db_session, free_event, 5)
+    ticket = (await client.post(f"/api/v1/register/{sample_event.slug}/queue")).json()["ticket"]
+
+    response = await client.post(
+        f"/api/v1/register/{free_event.slug}",
+        json=PAYLOAD,
+        headers={"X-Queue-Ticket": ticket},
+    )
+    assert response.status_code == 403
+
+
+async def test_tampered_and_expired_tickets_rejected(client, db_session, sample_event):
+    await _enable_waiting_room(db_session, sample_event, 1)
+    ticket = (await client.post(f"/api/v1/register/{sample_event.slug}/queue")).json()["ticket"]
+
+    tampered = await client.get(
+        f"/api/v1/register/{sample_event.slug}/queue/status",
+        headers={"X-Queue-Ticket": ticket[:-2] + "xx"},
+    )
+    assert tampered.status_code == 403
+
+    with patch.object(settings, "admission_ticket_window_minutes", 0):
+        stale = (await client.post(f"/api/v1/register/{sample_event.slug}/queue")).json()["ticket"]
+    time.sleep(1)
+    expired = await client.get(
+        f"/api/v1/register/{sample_event.slug}/queue/status",
+        headers={"X-Queue-Ticket": stale},
+    )
+    assert expired.status_code == 403
+
+
+async def _admitted_ticket(client, event: Event) -> str:
+    return (await client.post(f"/api/v1/register/{event.slug}/queue")).json()["ticket"]
+
+
+async def test_ticket_admits_a_single_registration(client, db_session, sample_event, mock_checkout):
+    await _enable_waiting_room(db_session, sample_event, 5)
+    ticket = await _admitted_ticket(client, sample_event)
+    headers = {"X-Queue-Ticket": ticket}
+
+    # A failed attempt doesn't spend the ticket
+    refused = await client.post(
+        f"/api/v1/register/{sample_event.slug}", json={**PAYLOAD, "waiver_accepted": False}, headers=headers
+    )
+    assert refused.status_code == 422
+
+    first = await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD, headers=headers)
+    assert first.status_code == 201
+    again = await client.post(
+        f"/api/v1/register/{sample_event.slug}", json={**PAYLOAD, "email": "friend@example.com"}, headers=headers
+    )
+    assert again.status_code == 403
+    assert "already been used" in again.json()["detail"]
+
+
+async def test_ticket_released_when_checkout_fails(client, db_session, sample_event, mock_checkout):
+    await _enable_waiting_room(db_session, sample_event, 5)
+    headers = {"X-Queue-Ticket": await _admitted_ticket(client, sample_event)}
+
+    mock_checkout.side_effect = stripe.error.APIConnectionError("down")
+    failed = await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD, headers=headers)
+    assert failed.status_code == 500
+
+    mock_checkout.side_effect = None
+    retried = await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD, headers=headers)
+    assert retried.status_code == 201
+
+
+async def test_purge_drops_uses_of_expired_tickets(client, db_session, sample_event, mock_checkout):
+    await _enable_waiting_room(db_session, sample_event, 5)
+    headers = {"X-Queue-Ticket": await _admitted_ticket(client, sample_event)}
+    response = await client.post(f"/api/v1/register/{sample_event.slug}", json=PAYLOAD, headers=headers)
+    assert response.status_code == 201
+
+    async with TestSessionLocal() as session:
+        assert await admission_service.purge_expired(session) == 0
+        await session.execute(update(AdmissionTicketUse).values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)))
+        assert await admission_service.purge_expired(session) == 1
+        await session.commit()
+        assert await session.scalar(select(func.count()).select_from(AdmissionTicketUse)) == 0
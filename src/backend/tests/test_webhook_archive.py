@@ -0,0 +1,122 @@
+"""Tests for webhook_archive — webhooks_raw retention, archive files and restore."""
+
+import gzip
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import WebhookRaw
+from app.services import webhook_archive
+from app.tasks import scheduler
+from app.tasks.webhook_retention import archive_old_webhooks
+from tests.conftest import TestSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+OLD = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+async def _store(db_session, event_id: str, created_at: datetime, processed: bool = True) -> WebhookRaw:
+    webhook = WebhookRaw(
+        id=uuid.uuid4(),
+        stripe_event_id=event_id,
+        event_type="checkout.session.completed",
+        payload_json={"id": event_id, "data": {"object": {"amount_total": 25000}}},
+        processed_at=created_at + timedelta(seconds=1) if processed else None,
+        created_at=created_at,
+    )
+    db_session.add(webhook)
+    await db_session.commit()
+    return webhook
+
+
+async def _rows() -> dict[str, WebhookRaw]:
+    async with TestSessionLocal() as session:
+        result = await session.execute(select(WebhookRaw))
+        return {w.stripe_event_id: w for w in result.scalars().all()}
+
+
+async def test_archive_moves_old_processed_payloads(db_session, tmp_path):
+    await _store(db_session, "evt_old_1", OLD)
+    await _store(db_session, "evt_old_2", OLD + timedelta(days=1))
+    await _store(db_session, "evt_old_unprocessed", OLD, processed=False)
+    await _store(db_session, "evt_recent", datetime.now(timezone.utc))
+
+    archived = await webhook_archive.archive_processed(
+        tmp_path, older_than=timedelta(days=30), batch_size=1, session_factory=TestSessionLocal
+    )
+    assert archived == 2
+
+    rows = await _rows()
+    # Dedupe ids stay in the hot table; only the payload moves out
+    assert rows["evt_old_1"].payload_json is None
+    assert rows["evt_old_1"].archived_at is not None
+    assert rows["evt_old_unprocessed"].payload_json is not None
+    assert rows["evt_recent"].payload_json is not None
+
+    partition = tmp_path / "2026" / "03" / "01"
+    index = [json.loads(line) for line in (partition / "index.ndjson").read_text().splitlines()]
+    assert [entry["stripe_event_id"] for entry in index] == ["evt_old_1"]
+    with gzip.open(partition / index[0]["file"], "rt") as part:
+        record = json.loads(part.readlines()[index[0]["line"]])
+    assert record["payload_json"]["id"] == "evt_old_1"
+    assert (tmp_path / "2026" / "03" / "02" / "index.ndjson").exists()
+
+    # Nothing left to archive
+    assert await webhook_archive.archive_processed(
+        tmp_path, older_than=timedelta(days=30), session_factory=TestSessionLocal
+    ) == 0
+
+
+async def test_restore_by_event_id_and_date_range(db_session, tmp_path):
+    await _store(db_session, "evt_a", OLD)
+    await _store(db_session, "evt_b", OLD)
+    await _store(db_session, "evt_c", OLD + timedelta(days=2))
+    await webhook_archive.archive_processed(
+        tmp_path, older_than=timedelta(days=30), session_factory=TestSessionLocal
+    )
+
+    restored = await webhook_archive.restore(
+        date(2026, 3, 1), stripe_event_ids=["evt_b"], archive_dir=tmp_path, session_factory=TestSessionLocal
+    )
+    assert restored == 1
+    rows = await _rows()
+    assert rows["evt_b"].payload_json["id"] == "evt_b"
+    assert rows["evt_b"].archived_at is None
+    assert rows["evt_a"].payload_json is None
+
+    # A deleted row is re-inserted from the archive
+    async with TestSessionLocal() as session:
+        await session.delete(await session.get(WebhookRaw, rows["evt_c"].id))
+        await session.commit()
+    restored = await webhook_archive.restore(
+        date(2026, 3, 1), date(2026, 3, 3), archive_dir=tmp_path, session_factory=TestSessionLocal
+    )
+    assert restored == 3
+    rows = await _rows()
+    assert {key: row.payload_json["id"] for key, row in rows.items()} == {
+        "evt_a": "evt_a",
+        "evt_b": "evt_b",
+        "evt_c": "evt_c",
+    }
+
+
+async def test_archiving_is_off_without_archive_dir(db_session):
+    await _store(db_session, "evt_a", OLD)
+    with patch.object(settings, "webhook_archive_dir", ""):
+        assert await archive_old_webhooks() == 0
+        with pytest.raises(ValueError):
+            await webhook_archive.archive_processed(session_factory=TestSessionLocal)
+        with patch.object(scheduler.scheduler, "start"):
+            scheduler.start_scheduler()
+        jobs = {job.id for job in scheduler.scheduler.get_jobs()}
+        scheduler.scheduler.remove_all_jobs()
+    assert "release_seat_leases" in jobs
+    assert "archive_old_webhooks" not in jobs
+    assert (await _rows())["evt_a"].payload_json is not None
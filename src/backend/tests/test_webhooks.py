@@ -1,10 +1,14 @@
 import json
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, update
 
-from app.models import Registration, RegistrationStatus, WebhookRaw
+from app.config import settings
+
+from app.models import NotificationOutbox, Registration, RegistrationStatus, WebhookRaw
+from app.services import stripe_webhooks
 from tests.conftest import TestSessionLocal
 
 pytestmark = pytest.mark.asyncio
@@ -36,9 +40,6 @@ async def test_checkout_completed(client, sample_registration):
     with patch(
         "app.routers.webhooks.verify_webhook",
         return_value=stripe_event,
-    ), patch(
-        "app.routers.webhooks.send_confirmation_email",
-        new_callable=AsyncMock,
     ):
         response = await client.post(
             "/api/v1/webhooks/stripe",
@@ -48,9 +49,9 @@ async def test_checkout_completed(client, sample_registration):
                 "content-type": "application/json",
             },
         )
-
-    assert response.status_code == 200
-    assert response.json()["status"] == "processed"
+        assert response.status_code == 200
+        assert response.json()["status"] == "queued"
+        assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
 
     # Open a fresh session to verify the committed state
     async with TestSessionLocal() as fresh_session:
@@ -73,9 +74,6 @@ async def test_idempotent_webhook(client, sample_registration, db_session):
     with patch(
         "app.routers.webhooks.verify_webhook",
         return_value=stripe_event,
-    ), patch(
-        "app.routers.webhooks.send_confirmation_email",
-        new_callable=AsyncMock,
     ):
         # First call
         resp1 = await client.post(
@@ -86,7 +84,7 @@ async def test_idempotent_webhook(client, sample_registration, db_session):
                 "content-type": "application/json",
             },
         )
-        assert resp1.json()["status"] == "processed"
+        assert resp1.json()["status"] == "queued"
 
         # Second call — same event_id
         resp2 = await client.post(
@@ -131,7 +129,8 @@ async def test_checkout_expired(client, sample_registration):
         )
 
     assert response.status_code == 200
-    assert response.json()["status"] == "processed"
+    assert response.json()["status"] == "queued"
+    assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
 
     # Open a fresh session to verify the committed state
     async with TestSessionLocal() as fresh_session:
@@ -140,3 +139,111 @@ async def test_checkout_expired(client, sample_registration):
         )
         reg = result.scalar_one()
         assert reg.status == RegistrationStatus.expired
+
+
+async def _post_stripe_event(client, stripe_event):
+    with patch("app.routers.webhooks.verify_webhook", return_value=stripe_event):
+        return await client.post(
+            "/api/v1/webhooks/stripe",
+            content=json.dumps(stripe_event).encode(),
+            headers={"stripe-signature": "test_sig", "content-type": "application/json"},
+        )
+
+
+async def test_webhook_acks_before_processing(client, sample_registration):
+    """The endpoint only stores the event; the worker completes it and queues the email."""
+    stripe_event = _make_stripe_event("evt_fast_ack", "checkout.session.completed", sample_registration.id)
+    response = await _post_stripe_event(client, stripe_event)
+    assert response.json()["status"] == "queued"
+
+    async with TestSessionLocal() as session:
+        reg = await session.get(Registration, sample_registration.id)
+        assert reg.status == RegistrationStatus.pending_payment
+        assert (await session.execute(select(NotificationOutbox))).first() is None
+
+    assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
+    async with TestSessionLocal() as session:
+        outbox = (await session.execute(select(NotificationOutbox))).scalar_one()
+    assert (outbox.kind, outbox.registration_id) == ("confirmation", sample_registration.id)
+    # Nothing left to do
+    assert await stripe_webhooks.process_pending(TestSessionLocal) == 0
+
+
+async def test_failed_webhook_retried_with_backoff(client, sample_registration):
+    stripe_event = _make_stripe_event("evt_retry", "checkout.session.completed", sample_registration.id)
+    await _post_stripe_event(client, stripe_event)
+
+    with patch(
+        "app.services.notification_outbox.enqueue",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("database down"),
+    ):
+        assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
+
+    async with TestSessionLocal() as session:
+        webhook = (await session.execute(select(WebhookRaw))).scalar_one()
+        reg = await session.get(Registration, sample_registration.id)
+    assert webhook.processed_at is None
+    assert webhook.attempts == 1
+    assert "database down" in webhook.last_error
+    assert webhook.next_attempt_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+    # The failed attempt was rolled back as a whole
+    assert reg.status == RegistrationStatus.pending_payment
+
+    # Not due yet
+    assert await stripe_webhooks.process_pending(TestSessionLocal) == 0
+
+    async with TestSessionLocal() as session:
+        await session.execute(update(WebhookRaw).values(next_attempt_at=datetime.now(timezone.utc)))
+        await session.commit()
+    assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
+
+    async with TestSessionLocal() as session:
+        webhook = (await session.execute(select(WebhookRaw))).scalar_one()
+        reg = await session.get(Registration, sample_registration.id)
+    assert webhook.processed_at is not None
+    assert webhook.attempts == 2
+    assert webhook.last_error is None
+    assert reg.status == RegistrationStatus.complete
+
+
+async def test_claim_skips_leased_and_exhausted_rows(client, sample_registration):
+    for n in range(2):
+        await _post_stripe_event(
+            client, _make_stripe_event(f"evt_claim_{n}", "checkout.session.expired", sample_registration.id)
+        )
+
+    async with TestSessionLocal() as session:
+        first = await stripe_webhooks.claim_next(session)
+        second = await stripe_webhooks.claim_next(session)
+        assert first != second
+        # Both leased by a (pretend) live worker
+        assert await stripe_webhooks.claim_next(session) is None
+
+        await session.execute(
+            update(WebhookRaw).values(
+                next_attempt_at=None, attempts=settings.stripe_webhook_max_attempts
+            )
+        )
+        await session.commit()
+        assert await stripe_webhooks.claim_next(session) is None
+
+
+async def test_partial_refund_updates_amount_and_notes(client, sample_registration, db_session):
+    sample_registration.stripe_payment_intent_id = "pi_partial"
+    sample_registration.status = RegistrationStatus.complete
+    await db_session.commit()
+
+    stripe_event = {
+        "id": "evt_partial_refund",
+        "type": "charge.refunded",
+        "data": {"object": {"payment_intent": "pi_partial", "amount": 25000, "amount_refunded": 5000}},
+    }
+    await _post_stripe_event(client, stripe_event)
+    assert await stripe_webhooks.process_pending(TestSessionLocal) == 1
+
+    async with TestSessionLocal() as session:
+        reg = await session.get(Registration, sample_registration.id)
+    assert reg.status == RegistrationStatus.complete
+    assert reg.payment_amount_cents == 20000
+    assert reg.notes == "Partial refund: 5000 cents refunded."